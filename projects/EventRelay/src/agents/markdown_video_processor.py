@@ -14,6 +14,11 @@ import aiohttp
 import ssl
 from dotenv import load_dotenv
 
+try:
+    from youtube_extension.backend.services.result_index import LEGACY, get_result_index
+except ImportError:
+    get_result_index = None
+
 # Load environment variables
 load_dotenv()
 
@@ -310,6 +315,9 @@ processed_at: {datetime.now().isoformat()}
         with open(json_filepath, 'w', encoding='utf-8') as f:
             json.dump(metadata, f, indent=2)
         
+        if get_result_index is not None:
+            get_result_index().record(video_id, category, LEGACY, filepath, json_filepath, metadata)
+        
         logger.info(f"Saved markdown analysis to: {filepath}")
         return str(filepath)
 
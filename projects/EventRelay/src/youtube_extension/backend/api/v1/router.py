@@ -559,19 +559,16 @@ async def list_videos_v1(
 ):
     """Get paginated list of processed videos"""
     try:
-        all_videos = data_service.get_videos_summary()
-        
-        # Apply pagination
-        start = offset
-        end = offset + limit
-        paginated_videos = all_videos[start:end]
+        # Paginated by the result index
+        paginated_videos = data_service.get_videos_summary(limit=limit, offset=offset)
+        total = data_service.count_videos()
         
         return {
             "videos": paginated_videos,
-            "total": len(all_videos),
+            "total": total,
             "limit": limit,
             "offset": offset,
-            "has_more": end < len(all_videos)
+            "has_more": offset + limit < total
         }
         
     except Exception as e:
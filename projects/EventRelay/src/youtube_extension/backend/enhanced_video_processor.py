@@ -22,6 +22,7 @@ import hashlib
 from dotenv import load_dotenv
 
 from youtube_extension.utils import extract_video_id, format_duration
+from youtube_extension.backend.services.result_index import ENHANCED, get_result_index
 
 # Load environment variables
 load_dotenv()
@@ -591,6 +592,10 @@ class EnhancedVideoProcessor:
             with open(metadata_file, "w", encoding="utf-8") as f:
                 json.dump(metadata, f, indent=2, default=str)
 
+            get_result_index().record(
+                video_id, category, ENHANCED, filepath, metadata_file, metadata
+            )
+
             logger.info(f"✅ Enhanced results saved to: {filepath}")
             return str(filepath)
 
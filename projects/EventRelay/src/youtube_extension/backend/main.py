@@ -63,6 +63,9 @@ except ImportError:
         normalized = (target or "vercel").strip().lower()
         return {"requested": normalized, "resolved": "vercel", "alias_applied": normalized != "vercel"}
 
+from .services.result_index import ENHANCED, LEGACY, get_result_index
+from .services.single_flight import SingleFlight, video_job_key
+
 # --- Runtime mandatory environment variable guard ---
 REQUIRED_ENV_VARS = ["YOUTUBE_API_KEY", "OPENAI_API_KEY", "GEMINI_API_KEY"]
 MISSING_ENV_VARS = [v for v in REQUIRED_ENV_VARS if not os.getenv(v)]
@@ -293,6 +296,15 @@ class ConnectionManager:
 
 manager = ConnectionManager()
 
+# Concurrent requests for the same video share one processing job, its
+# progress is broadcast to the WebSocket clients
+video_flights = SingleFlight(publish=lambda event: manager.broadcast(json.dumps(event)))
+
+async def _process_video_coalesced(processor, video_url: str) -> Dict[str, Any]:
+    """Run processor.process_video, joining the in-flight job of the same video if any"""
+    key = video_job_key(video_url, kind="process_video")
+    return await video_flights.run(key, lambda: processor.process_video(video_url))
+
 # Pydantic models
 class ChatRequest(BaseModel):
     message: str
@@ -516,57 +528,41 @@ class CacheManager:
         
         raise ValueError(f"Could not extract video ID from: {url}")
     
+    @property
+    def index(self):
+        """Result index of the cache directories, looked up instead of walking them"""
+        return get_result_index(cache_dir=self.cache_dir)
+    
     def get_cached_result(self, video_url: str) -> Optional[Dict[str, Any]]:
         """Get cached markdown result if available (supports legacy and enhanced caches)"""
         try:
             video_id = self._extract_video_id(video_url)
 
-            # 1) Legacy markdown_analysis cache
-            for category_dir in self.cache_dir.iterdir():
-                if category_dir.is_dir():
-                    markdown_file = category_dir / f"{video_id}_analysis.md"
-                    metadata_file = category_dir / f"{video_id}_metadata.json"
-
-                    if markdown_file.exists() and metadata_file.exists():
-                        age = time.time() - markdown_file.stat().st_mtime
-                        if age < 86400:
-                            with open(markdown_file, 'r', encoding='utf-8') as f:
-                                content = f.read()
-                            with open(metadata_file, 'r', encoding='utf-8') as f:
-                                metadata = json.load(f)
-                            return {
-                                'video_id': video_id,
-                                'markdown_content': content,
-                                'metadata': metadata,
-                                'save_path': str(markdown_file),
-                                'cached': True
-                            }
-
-            # 2) Enhanced enhanced_analysis cache
-            enhanced_base = Path('youtube_processed_videos') / 'enhanced_analysis'
-            if enhanced_base.exists():
-                for category_dir in enhanced_base.iterdir():
-                    if not category_dir.is_dir():
-                        continue
-                    # Find latest enhanced md for this video_id
-                    candidates = sorted(category_dir.glob(f"{video_id}_*_enhanced.md"))
-                    if candidates:
-                        md_path = candidates[-1]
-                        # Matching metadata file
-                        meta_candidates = sorted(category_dir.glob(f"{video_id}_*_metadata.json"))
-                        metadata = {}
-                        if meta_candidates:
-                            with open(meta_candidates[-1], 'r', encoding='utf-8') as f:
-                                metadata = json.load(f)
-                        with open(md_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                        return {
-                            'video_id': video_id,
-                            'markdown_content': content,
-                            'metadata': metadata,
-                            'save_path': str(md_path),
-                            'cached': True
-                        }
+            # 1) Legacy markdown_analysis cache, valid for 24 hours
+            entry = self.index.lookup(video_id, LEGACY)
+            if entry and entry['metadata_path'] and time.time() - entry['modified_at'] < 86400:
+                with open(entry['markdown_path'], 'r', encoding='utf-8') as f:
+                    content = f.read()
+                return {
+                    'video_id': video_id,
+                    'markdown_content': content,
+                    'metadata': entry['metadata'],
+                    'save_path': entry['markdown_path'],
+                    'cached': True
+                }
+
+            # 2) Latest enhanced_analysis result
+            entry = self.index.lookup(video_id, ENHANCED)
+            if entry:
+                with open(entry['markdown_path'], 'r', encoding='utf-8') as f:
+                    content = f.read()
+                return {
+                    'video_id': video_id,
+                    'markdown_content': content,
+                    'metadata': entry['metadata'],
+                    'save_path': entry['markdown_path'],
+                    'cached': True
+                }
 
             return None
         except Exception as e:
@@ -586,6 +582,7 @@ class CacheManager:
                             markdown_file.unlink()
                         if metadata_file.exists():
                             metadata_file.unlink()
+                self.index.remove(video_id, LEGACY)
                 logger.info(f"Cleared cache for video: {video_id}")
             except Exception as e:
                 logger.error(f"Error clearing cache: {e}")
@@ -595,6 +592,7 @@ class CacheManager:
             if self.cache_dir.exists():
                 shutil.rmtree(self.cache_dir)
                 self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self.index.clear(LEGACY)
             logger.info("Cleared all cache")
 
 cache_manager = CacheManager()
@@ -639,6 +637,7 @@ async def health_check():
         "version": "2.0.0-real-api",
         "connections": len(manager.active_connections),
         "video_processor": processor_status,
+        "request_coalescing": video_flights.get_stats(),
         "real_api_integration": real_api_status,
         "connectors": connectors,
         "features": {
@@ -759,7 +758,7 @@ async def process_video_markdown(request: MarkdownRequest):
         try:
             # Process the video with enhanced markdown processor
             start_time = datetime.now()
-            result = await processor.process_video(request.video_url)
+            result = await _process_video_coalesced(processor, request.video_url)
             processing_duration = (datetime.now() - start_time).total_seconds()
             
             if not result or not result.get('success'):
@@ -848,44 +847,33 @@ async def process_video_markdown(request: MarkdownRequest):
 async def get_markdown_analysis(video_id: str, format: str = "markdown"):
     """Get cached markdown analysis by video ID"""
     try:
-        # Search for the video in cache directories
-        cache_dir = Path("youtube_processed_videos/markdown_analysis")
-        
-        for category_dir in cache_dir.iterdir():
-            if category_dir.is_dir():
-                analysis_path = category_dir / f"{video_id}_analysis.md"
-                metadata_path = category_dir / f"{video_id}_metadata.json"
-                
-                if analysis_path.exists():
-                    with open(analysis_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    metadata = {}
-                    if metadata_path.exists():
-                        with open(metadata_path, 'r', encoding='utf-8') as f:
-                            metadata = json.load(f)
-                    
-                    # Skip the frontmatter if present
-                    markdown_content = content
-                    if content.startswith('---'):
-                        end_idx = content.find('---', 3)
-                        if end_idx != -1:
-                            markdown_content = content[end_idx + 3:].strip()
-                    
-                    # Get file stats
-                    file_stats = analysis_path.stat()
-                    age_hours = (time.time() - file_stats.st_mtime) / 3600
-                    
-                    return {
-                        "video_id": video_id,
-                        "format": format,
-                        "markdown_content": markdown_content,
-                        "metadata": metadata,
-                        "cached": True,
-                        "cache_age_hours": round(age_hours, 2),
-                        "file_size": file_stats.st_size,
-                        "last_modified": datetime.fromtimestamp(file_stats.st_mtime).isoformat()
-                    }
+        entry = get_result_index().lookup(video_id, LEGACY)
+        if entry:
+            analysis_path = Path(entry["markdown_path"])
+            with open(analysis_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            
+            # Skip the frontmatter if present
+            markdown_content = content
+            if content.startswith('---'):
+                end_idx = content.find('---', 3)
+                if end_idx != -1:
+                    markdown_content = content[end_idx + 3:].strip()
+            
+            # Get file stats
+            file_stats = analysis_path.stat()
+            age_hours = (time.time() - file_stats.st_mtime) / 3600
+            
+            return {
+                "video_id": video_id,
+                "format": format,
+                "markdown_content": markdown_content,
+                "metadata": entry["metadata"],
+                "cached": True,
+                "cache_age_hours": round(age_hours, 2),
+                "file_size": file_stats.st_size,
+                "last_modified": datetime.fromtimestamp(file_stats.st_mtime).isoformat()
+            }
         
         raise HTTPException(status_code=404, detail=f"Markdown analysis not found for video ID: {video_id}")
     
@@ -910,7 +898,7 @@ async def process_video_endpoint(request: VideoProcessingRequest):
         if processor:
             try:
                 # Process the video with markdown processor
-                result = await processor.process_video(request.video_url)
+                result = await _process_video_coalesced(processor, request.video_url)
                 
                 # Validate the result structure
                 if not isinstance(result, dict):
@@ -1090,7 +1078,7 @@ async def handle_video_processing_message(message: Dict[str, Any]) -> Dict[str,
         if processor:
             try:
                 # Process the video with real functionality  
-                result = await processor.process_video(video_url)
+                result = await _process_video_coalesced(processor, video_url)
                 
                 # Validate the result structure
                 if not isinstance(result, dict):
@@ -1172,8 +1160,6 @@ async def clear_all_cache():
 async def get_cache_stats():
     """Get cache statistics"""
     try:
-        cache_dir = Path("youtube_processed_videos/markdown_analysis")
-        
         stats = {
             "total_cached_videos": 0,
             "categories": {},
@@ -1182,39 +1168,22 @@ async def get_cache_stats():
             "newest_cache": None
         }
         
-        if cache_dir.exists():
-            oldest_time = float('inf')
-            newest_time = 0
-            
-            for category_dir in cache_dir.iterdir():
-                if category_dir.is_dir():
-                    category_name = category_dir.name
-                    markdown_files = list(category_dir.glob("*_analysis.md"))
-                    category_count = len(markdown_files)
-                    category_size = sum(f.stat().st_size for f in markdown_files)
-                    
-                    stats["categories"][category_name] = {
-                        "count": category_count,
-                        "size_mb": round(category_size / 1024 / 1024, 2)
-                    }
-                    
-                    stats["total_cached_videos"] += category_count
-                    stats["total_size_mb"] += category_size
-                    
-                    # Track oldest and newest
-                    for f in markdown_files:
-                        mtime = f.stat().st_mtime
-                        if mtime < oldest_time:
-                            oldest_time = mtime
-                        if mtime > newest_time:
-                            newest_time = mtime
-            
-            stats["total_size_mb"] = round(stats["total_size_mb"] / 1024 / 1024, 2)
-            
-            if oldest_time != float('inf'):
-                stats["oldest_cache"] = datetime.fromtimestamp(oldest_time).isoformat()
-            if newest_time > 0:
-                stats["newest_cache"] = datetime.fromtimestamp(newest_time).isoformat()
+        # Aggregated by the result index instead of walking the category directories
+        category_stats = [s for s in cache_manager.index.category_stats() if s["cache_type"] == LEGACY]
+        for category_stat in category_stats:
+            category_size = category_stat["size_bytes"] or 0
+            stats["categories"][category_stat["category"]] = {
+                "count": category_stat["count"],
+                "size_mb": round(category_size / 1024 / 1024, 2)
+            }
+            stats["total_cached_videos"] += category_stat["count"]
+            stats["total_size_mb"] += category_size
+        
+        stats["total_size_mb"] = round(stats["total_size_mb"] / 1024 / 1024, 2)
+        
+        if category_stats:
+            stats["oldest_cache"] = datetime.fromtimestamp(min(s["oldest"] for s in category_stats)).isoformat()
+            stats["newest_cache"] = datetime.fromtimestamp(max(s["newest"] for s in category_stats)).isoformat()
         
         return stats
         
@@ -1549,67 +1518,43 @@ async def video_to_software_health():
         }
 
 @app.get("/results/learning_log")
-async def get_learning_log():
-	"""Return a simple learning log compiled from enhanced analysis files."""
+async def get_learning_log(limit: Optional[int] = None, offset: int = 0):
+	"""Return a simple learning log compiled from the indexed enhanced analysis results."""
 	try:
-		base_dir = Path("youtube_processed_videos/enhanced_analysis")
 		items = []
-		if base_dir.exists():
-			for category_dir in base_dir.iterdir():
-				if not category_dir.is_dir():
-					continue
-				for md_file in category_dir.glob("*_enhanced.md"):
-					video_id = md_file.name.split("_")[0]
-					metadata_file = next(category_dir.glob(f"{video_id}_*_metadata.json"), None)
-					metadata = {}
-					if metadata_file and metadata_file.exists():
-						with open(metadata_file, "r", encoding="utf-8") as f:
-							metadata = json.load(f)
-					stat = md_file.stat()
-					items.append({
-						"video_id": video_id,
-						"category": category_dir.name,
-						"actions_generated": None,
-						"transcript_segments": None,
-						"processing_time": None,
-						"quality_assessment": None,
-						"timestamp": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-						"feedback": None,
-						"title": metadata.get("title") or metadata.get("snippet", {}).get("title")
-					})
+		for entry in get_result_index().list(limit=limit, offset=offset):
+			items.append({
+				"video_id": entry["video_id"],
+				"category": entry["category"],
+				"actions_generated": None,
+				"transcript_segments": None,
+				"processing_time": None,
+				"quality_assessment": None,
+				"timestamp": datetime.fromtimestamp(entry["modified_at"]).isoformat(),
+				"feedback": None,
+				"title": entry["title"]
+			})
 		return items
 	except Exception as e:
 		logger.error(f"Error building learning log: {e}")
 		raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/results/videos")
-async def get_videos_summary():
-	"""Return a summary list of processed videos."""
+async def get_videos_summary(limit: Optional[int] = None, offset: int = 0):
+	"""Return a summary list of processed videos, most recent first."""
 	try:
-		base_dir = Path("youtube_processed_videos/enhanced_analysis")
 		results = []
-		if base_dir.exists():
-			for category_dir in base_dir.iterdir():
-				if not category_dir.is_dir():
-					continue
-				for md_file in category_dir.glob("*_enhanced.md"):
-					video_id = md_file.name.split("_")[0]
-					metadata_file = next(category_dir.glob(f"{video_id}_*_metadata.json"), None)
-					metadata = {}
-					if metadata_file and metadata_file.exists():
-						with open(metadata_file, "r", encoding="utf-8") as f:
-							metadata = json.load(f)
-					stat = md_file.stat()
-					results.append({
-						"video_id": video_id,
-						"category": category_dir.name,
-						"title": metadata.get("title") or metadata.get("snippet", {}).get("title"),
-						"published_at": metadata.get("published_at") or metadata.get("snippet", {}).get("publishedAt"),
-						"view_count": metadata.get("view_count") or metadata.get("statistics", {}).get("viewCount"),
-						"last_modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-						"markdown_path": str(md_file),
-						"metadata_path": str(metadata_file) if metadata_file else None
-					})
+		for entry in get_result_index().list(limit=limit, offset=offset):
+			results.append({
+				"video_id": entry["video_id"],
+				"category": entry["category"],
+				"title": entry["title"],
+				"published_at": entry["published_at"],
+				"view_count": entry["view_count"],
+				"last_modified": datetime.fromtimestamp(entry["modified_at"]).isoformat(),
+				"markdown_path": entry["markdown_path"],
+				"metadata_path": entry["metadata_path"]
+			})
 		return results
 	except Exception as e:
 		logger.error(f"Error listing videos: {e}")
@@ -1619,35 +1564,36 @@ async def get_videos_summary():
 async def get_video_detail(video_id: str):
 	"""Return detailed info for a specific video from enhanced analysis."""
 	try:
-		base_dir = Path("youtube_processed_videos/enhanced_analysis")
-		for category_dir in base_dir.iterdir():
-			if not category_dir.is_dir():
-				continue
-			md_file = next(category_dir.glob(f"{video_id}_*_enhanced.md"), None)
-			if md_file and md_file.exists():
-				metadata_file = next(category_dir.glob(f"{video_id}_*_metadata.json"), None)
-				metadata = {}
-				if metadata_file and metadata_file.exists():
-					with open(metadata_file, "r", encoding="utf-8") as f:
-						metadata = json.load(f)
-				with open(md_file, "r", encoding="utf-8") as f:
-					markdown = f.read()
-				return {
-					"video_id": video_id,
-					"category": category_dir.name,
-					"title": metadata.get("title") or metadata.get("snippet", {}).get("title"),
-					"metadata": metadata,
-					"markdown": markdown,
-					"markdown_path": str(md_file),
-					"metadata_path": str(metadata_file) if metadata_file else None
-				}
-		raise HTTPException(status_code=404, detail=f"Video not found: {video_id}")
+		entry = get_result_index().lookup(video_id, ENHANCED)
+		if not entry:
+			raise HTTPException(status_code=404, detail=f"Video not found: {video_id}")
+		with open(entry["markdown_path"], "r", encoding="utf-8") as f:
+			markdown = f.read()
+		return {
+			"video_id": video_id,
+			"category": entry["category"],
+			"title": entry["title"],
+			"metadata": entry["metadata"],
+			"markdown": markdown,
+			"markdown_path": entry["markdown_path"],
+			"metadata_path": entry["metadata_path"]
+		}
 	except HTTPException:
 		raise
 	except Exception as e:
 		logger.error(f"Error reading video detail: {e}")
 		raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/results/reindex")
+async def rebuild_results_index():
+	"""Rebuild the results index from the files on disk."""
+	try:
+		indexed = await asyncio.to_thread(get_result_index().rebuild)
+		return {"indexed": indexed}
+	except Exception as e:
+		logger.error(f"Error rebuilding results index: {e}")
+		raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/feedback")
 async def post_feedback(payload: Dict[str, Any]):
 	"""Accept feedback and append to a jsonl file."""
@@ -1694,6 +1640,14 @@ async def global_exception_handler(request, exc):
         content=error_detail
     )
 
+@app.on_event("startup")
+async def _build_result_index():
+    # The first use of the index may rebuild it from disk, keep that off the event loop
+    try:
+        await asyncio.to_thread(get_result_index, cache_dir=cache_manager.cache_dir)
+    except Exception as e:
+        logger.warning(f"Result index initialization warning: {e}")
+
 @app.on_event("shutdown")
 async def _shutdown_cleanup():
     try:
@@ -13,6 +13,7 @@ This refactored version maintains full backward compatibility
 while providing a more modular and scalable architecture.
 """
 
+import asyncio
 import logging
 import sys
 from datetime import datetime
@@ -395,11 +396,13 @@ async def get_cache_stats(
 # Data Endpoints
 @app.get("/results/learning_log")
 async def get_learning_log(
+    limit: Optional[int] = None,
+    offset: int = 0,
     data_service: DataService = Depends(get_data_service)
 ):
-    """Get learning log from enhanced analysis files"""
+    """Get learning log from the indexed enhanced analysis results"""
     try:
-        learning_log = data_service.get_learning_log()
+        learning_log = data_service.get_learning_log(limit=limit, offset=offset)
         return learning_log
     except Exception as e:
         logger.error(f"Error getting learning log: {e}")
@@ -407,11 +410,13 @@ async def get_learning_log(
 
 @app.get("/results/videos")
 async def get_videos_summary(
+    limit: Optional[int] = None,
+    offset: int = 0,
     data_service: DataService = Depends(get_data_service)
 ):
-    """Get summary list of processed videos"""
+    """Get summary list of processed videos, most recent first"""
     try:
-        videos_summary = data_service.get_videos_summary()
+        videos_summary = data_service.get_videos_summary(limit=limit, offset=offset)
         return videos_summary
     except Exception as e:
         logger.error(f"Error getting videos summary: {e}")
@@ -534,7 +539,8 @@ async def startup_event():
     # Verify critical services
     try:
         video_service = get_service('video_processing_service')
-        cache_service = get_service('cache_service')
+        # Creating the cache service may build its result index from disk
+        cache_service = await asyncio.to_thread(get_service, 'cache_service')
         health_service = get_service('health_monitoring_service')
         
         logger.info("✅ Core services verified and ready")
@@ -8,7 +8,6 @@ Handles video processing result caching, statistics, and cleanup operations.
 """
 
 import hashlib
-import json
 import logging
 import shutil
 import time
@@ -18,6 +17,8 @@ from typing import Dict, Any, Optional
 
 from youtube_extension.utils import extract_video_id
 
+from .result_index import ENHANCED, LEGACY, ResultIndex, get_result_index
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,20 +26,29 @@ class CacheService:
     """
     Service for managing cached video processing results.
     Provides unified interface for cache operations across different storage formats.
+    
+    Lookups and statistics go through a ResultIndex (SQLite) instead of walking
+    the cache directories, the files on disk remain the source of truth.
     """
     
-    def __init__(self, cache_dir: str = "youtube_processed_videos/markdown_analysis"):
+    def __init__(self, cache_dir: str = "youtube_processed_videos/markdown_analysis",
+                 index: Optional[ResultIndex] = None):
         """
         Initialize cache service.
         
         Args:
             cache_dir: Base directory for cache storage
+            index: Result index to use, defaults to the shared index of the cache directories
         """
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         
         # Enhanced analysis cache directory
         self.enhanced_cache_dir = Path('youtube_processed_videos') / 'enhanced_analysis'
+        
+        self.index = index or get_result_index(
+            cache_dir=self.cache_dir, enhanced_dir=self.enhanced_cache_dir
+        )
     
     def _get_cache_key(self, video_url: str) -> str:
         """Generate cache key from video URL"""
@@ -77,32 +87,26 @@ class CacheService:
     def _get_legacy_cached_result(self, video_id: str, video_url: str) -> Optional[Dict[str, Any]]:
         """Check legacy markdown_analysis cache"""
         try:
-            for category_dir in self.cache_dir.iterdir():
-                if not category_dir.is_dir():
-                    continue
-                    
-                markdown_file = category_dir / f"{video_id}_analysis.md"
-                metadata_file = category_dir / f"{video_id}_metadata.json"
-                
-                if markdown_file.exists() and metadata_file.exists():
-                    # Check if cache is still valid (within 24 hours)
-                    age = time.time() - markdown_file.stat().st_mtime
-                    if age < 86400:  # 24 hours
-                        with open(markdown_file, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                        with open(metadata_file, 'r', encoding='utf-8') as f:
-                            metadata = json.load(f)
-                        
-                        return {
-                            'video_id': video_id,
-                            'video_url': video_url,
-                            'markdown_content': content,
-                            'metadata': metadata,
-                            'save_path': str(markdown_file),
-                            'cached': True
-                        }
+            entry = self.index.lookup(video_id, LEGACY)
+            if not entry or not entry['metadata_path']:
+                return None
             
-            return None
+            # Check if cache is still valid (within 24 hours)
+            age = time.time() - entry['modified_at']
+            if age >= 86400:  # 24 hours
+                return None
+            
+            with open(entry['markdown_path'], 'r', encoding='utf-8') as f:
+                content = f.read()
+            
+            return {
+                'video_id': video_id,
+                'video_url': video_url,
+                'markdown_content': content,
+                'metadata': entry['metadata'],
+                'save_path': entry['markdown_path'],
+                'cached': True
+            }
             
         except Exception as e:
             logger.warning(f"Error checking legacy cache: {e}")
@@ -111,38 +115,22 @@ class CacheService:
     def _get_enhanced_cached_result(self, video_id: str, video_url: str) -> Optional[Dict[str, Any]]:
         """Check enhanced_analysis cache"""
         try:
-            if not self.enhanced_cache_dir.exists():
+            # Latest enhanced markdown for this video_id
+            entry = self.index.lookup(video_id, ENHANCED)
+            if not entry:
                 return None
             
-            for category_dir in self.enhanced_cache_dir.iterdir():
-                if not category_dir.is_dir():
-                    continue
-                
-                # Find latest enhanced markdown for this video_id
-                candidates = sorted(category_dir.glob(f"{video_id}_*_enhanced.md"))
-                if candidates:
-                    md_path = candidates[-1]
-                    
-                    # Find matching metadata file
-                    meta_candidates = sorted(category_dir.glob(f"{video_id}_*_metadata.json"))
-                    metadata = {}
-                    if meta_candidates:
-                        with open(meta_candidates[-1], 'r', encoding='utf-8') as f:
-                            metadata = json.load(f)
-                    
-                    with open(md_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    return {
-                        'video_id': video_id,
-                        'video_url': video_url,
-                        'markdown_content': content,
-                        'metadata': metadata,
-                        'save_path': str(md_path),
-                        'cached': True
-                    }
+            with open(entry['markdown_path'], 'r', encoding='utf-8') as f:
+                content = f.read()
             
-            return None
+            return {
+                'video_id': video_id,
+                'video_url': video_url,
+                'markdown_content': content,
+                'metadata': entry['metadata'],
+                'save_path': entry['markdown_path'],
+                'cached': True
+            }
             
         except Exception as e:
             logger.warning(f"Error checking enhanced cache: {e}")
@@ -188,6 +176,8 @@ class CacheService:
                         for file_path in category_dir.glob(f"{video_id}_*"):
                             file_path.unlink()
             
+            self.index.remove(video_id)
+            
             logger.info(f"Cleared cache for video: {video_id}")
             
         except Exception as e:
@@ -205,6 +195,8 @@ class CacheService:
             if self.enhanced_cache_dir.exists():
                 shutil.rmtree(self.enhanced_cache_dir)
             
+            self.index.clear()
+            
             logger.info("Cleared all cache")
             
         except Exception as e:
@@ -249,37 +241,25 @@ class CacheService:
     
     def _analyze_legacy_cache_stats(self, stats: Dict[str, Any]):
         """Analyze legacy cache statistics"""
-        if not self.cache_dir.exists():
-            return
-        
         oldest_time = float('inf')
         newest_time = 0
         
-        for category_dir in self.cache_dir.iterdir():
-            if not category_dir.is_dir():
+        for row in self.index.category_stats():
+            if row["cache_type"] != LEGACY:
                 continue
-                
-            category_name = category_dir.name
-            markdown_files = list(category_dir.glob("*_analysis.md"))
-            category_count = len(markdown_files)
-            category_size = sum(f.stat().st_size for f in markdown_files)
-            
-            stats["categories"][category_name] = {
-                "count": category_count,
-                "size_mb": round(category_size / 1024 / 1024, 2),
+            
+            stats["categories"][row["category"]] = {
+                "count": row["count"],
+                "size_mb": round(row["size_bytes"] / 1024 / 1024, 2),
                 "type": "legacy"
             }
             
-            stats["total_cached_videos"] += category_count
-            stats["total_size_mb"] += category_size
+            stats["total_cached_videos"] += row["count"]
+            stats["total_size_mb"] += row["size_bytes"]
             
             # Track timestamps
-            for f in markdown_files:
-                mtime = f.stat().st_mtime
-                if mtime < oldest_time:
-                    oldest_time = mtime
-                if mtime > newest_time:
-                    newest_time = mtime
+            oldest_time = min(oldest_time, row["oldest"])
+            newest_time = max(newest_time, row["newest"])
         
         # Set timestamp info
         if oldest_time != float('inf'):
@@ -289,37 +269,30 @@ class CacheService:
     
     def _analyze_enhanced_cache_stats(self, stats: Dict[str, Any]):
         """Analyze enhanced cache statistics"""
-        if not self.enhanced_cache_dir.exists():
-            return
-        
         enhanced_stats = {
             "total_videos": 0,
             "categories": {},
             "total_size_mb": 0
         }
         
-        for category_dir in self.enhanced_cache_dir.iterdir():
-            if not category_dir.is_dir():
+        for row in self.index.category_stats():
+            if row["cache_type"] != ENHANCED:
                 continue
-                
-            category_name = f"enhanced_{category_dir.name}"
-            enhanced_files = list(category_dir.glob("*_enhanced.md"))
-            category_count = len(enhanced_files)
-            category_size = sum(f.stat().st_size for f in enhanced_files)
             
+            category_name = f"enhanced_{row['category']}"
             enhanced_stats["categories"][category_name] = {
-                "count": category_count,
-                "size_mb": round(category_size / 1024 / 1024, 2),
+                "count": row["count"],
+                "size_mb": round(row["size_bytes"] / 1024 / 1024, 2),
                 "type": "enhanced"
             }
             
-            enhanced_stats["total_videos"] += category_count
-            enhanced_stats["total_size_mb"] += category_size
+            enhanced_stats["total_videos"] += row["count"]
+            enhanced_stats["total_size_mb"] += row["size_bytes"]
             
             # Also include in main stats
             stats["categories"][category_name] = enhanced_stats["categories"][category_name]
-            stats["total_cached_videos"] += category_count
-            stats["total_size_mb"] += category_size
+            stats["total_cached_videos"] += row["count"]
+            stats["total_size_mb"] += row["size_bytes"]
         
         stats["enhanced_cache_stats"] = enhanced_stats
     
@@ -335,43 +308,35 @@ class CacheService:
         """
         try:
             # Search legacy cache
-            for category_dir in self.cache_dir.iterdir():
-                if not category_dir.is_dir():
-                    continue
-                    
-                analysis_path = category_dir / f"{video_id}_analysis.md"
-                metadata_path = category_dir / f"{video_id}_metadata.json"
+            entry = self.index.lookup(video_id, LEGACY)
+            if entry:
+                analysis_path = Path(entry['markdown_path'])
+                with open(analysis_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
                 
-                if analysis_path.exists():
-                    with open(analysis_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    metadata = {}
-                    if metadata_path.exists():
-                        with open(metadata_path, 'r', encoding='utf-8') as f:
-                            metadata = json.load(f)
-                    
-                    # Skip frontmatter if present
-                    markdown_content = content
-                    if content.startswith('---'):
-                        end_idx = content.find('---', 3)
-                        if end_idx != -1:
-                            markdown_content = content[end_idx + 3:].strip()
-                    
-                    # File statistics
-                    file_stats = analysis_path.stat()
-                    age_hours = (time.time() - file_stats.st_mtime) / 3600
-                    
-                    return {
-                        "video_id": video_id,
-                        "markdown_content": markdown_content,
-                        "metadata": metadata,
-                        "cached": True,
-                        "cache_age_hours": round(age_hours, 2),
-                        "file_size": file_stats.st_size,
-                        "last_modified": datetime.fromtimestamp(file_stats.st_mtime).isoformat(),
-                        "cache_type": "legacy"
-                    }
+                metadata = entry['metadata']
+                
+                # Skip frontmatter if present
+                markdown_content = content
+                if content.startswith('---'):
+                    end_idx = content.find('---', 3)
+                    if end_idx != -1:
+                        markdown_content = content[end_idx + 3:].strip()
+                
+                # File statistics
+                file_stats = analysis_path.stat()
+                age_hours = (time.time() - file_stats.st_mtime) / 3600
+                
+                return {
+                    "video_id": video_id,
+                    "markdown_content": markdown_content,
+                    "metadata": metadata,
+                    "cached": True,
+                    "cache_age_hours": round(age_hours, 2),
+                    "file_size": file_stats.st_size,
+                    "last_modified": datetime.fromtimestamp(file_stats.st_mtime).isoformat(),
+                    "cache_type": "legacy"
+                }
             
             return None
             
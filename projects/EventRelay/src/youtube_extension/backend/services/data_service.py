@@ -13,6 +13,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
+from .result_index import ENHANCED, ResultIndex, get_result_index
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,84 +22,55 @@ class DataService:
     """
     Service for handling data operations.
     Provides unified interface for video information, learning logs, and feedback management.
+    
+    Video listings, details and statistics go through a ResultIndex (SQLite)
+    instead of walking the enhanced analysis directories.
     """
     
     def __init__(self, 
                  enhanced_analysis_dir: str = "youtube_processed_videos/enhanced_analysis",
-                 feedback_dir: str = "youtube_processed_videos/feedback"):
+                 feedback_dir: str = "youtube_processed_videos/feedback",
+                 index: Optional[ResultIndex] = None):
         """
         Initialize data service.
         
         Args:
             enhanced_analysis_dir: Directory for enhanced analysis data
             feedback_dir: Directory for feedback data
+            index: Result index to use, defaults to the shared index of the enhanced analysis directory
         """
         self.enhanced_analysis_dir = Path(enhanced_analysis_dir)
         self.feedback_dir = Path(feedback_dir)
+        self.index = index or get_result_index(enhanced_dir=self.enhanced_analysis_dir)
         
         # Ensure directories exist
         self.feedback_dir.mkdir(parents=True, exist_ok=True)
     
-    def get_learning_log(self) -> List[Dict[str, Any]]:
+    def get_learning_log(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
         """
-        Generate learning log from enhanced analysis files.
+        Generate learning log from the indexed enhanced analysis results.
         
+        Args:
+            limit: Maximum number of entries, None for all
+            offset: Number of entries to skip
+            
         Returns:
-            List of learning log entries
+            List of learning log entries, newest first
         """
         try:
             items = []
-            
-            if not self.enhanced_analysis_dir.exists():
-                logger.warning(f"Enhanced analysis directory does not exist: {self.enhanced_analysis_dir}")
-                return items
-            
-            for category_dir in self.enhanced_analysis_dir.iterdir():
-                if not category_dir.is_dir():
-                    continue
-                
-                for md_file in category_dir.glob("*_enhanced.md"):
-                    try:
-                        # Extract video ID from filename
-                        video_id = md_file.name.split("_")[0]
-                        
-                        # Find corresponding metadata file
-                        metadata_file = next(category_dir.glob(f"{video_id}_*_metadata.json"), None)
-                        metadata = {}
-                        
-                        if metadata_file and metadata_file.exists():
-                            try:
-                                with open(metadata_file, "r", encoding="utf-8") as f:
-                                    metadata = json.load(f)
-                            except json.JSONDecodeError as e:
-                                logger.warning(f"Failed to parse metadata file {metadata_file}: {e}")
-                        
-                        # Get file statistics
-                        stat = md_file.stat()
-                        
-                        # Extract title from metadata
-                        title = (metadata.get("title") or 
-                                metadata.get("snippet", {}).get("title") or
-                                f"Video {video_id}")
-                        
-                        items.append({
-                            "video_id": video_id,
-                            "category": category_dir.name,
-                            "title": title,
-                            "actions_generated": None,  # Could be extracted from content
-                            "transcript_segments": None,  # Could be extracted from metadata
-                            "processing_time": None,  # Could be stored in metadata
-                            "quality_assessment": None,  # Could be computed from content
-                            "timestamp": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                            "feedback": None  # Could be linked to feedback data
-                        })
-                        
-                    except Exception as e:
-                        logger.warning(f"Error processing learning log entry for {md_file}: {e}")
-                        continue
-            
-            # Sort by timestamp (newest first)
-            items.sort(key=lambda x: x["timestamp"], reverse=True)
+            for entry in self.index.list(ENHANCED, limit=limit, offset=offset):
+                items.append({
+                    "video_id": entry["video_id"],
+                    "category": entry["category"],
+                    "title": entry["title"] or f"Video {entry['video_id']}",
+                    "actions_generated": None,  # Could be extracted from content
+                    "transcript_segments": None,  # Could be extracted from metadata
+                    "processing_time": None,  # Could be stored in metadata
+                    "quality_assessment": None,  # Could be computed from content
+                    "timestamp": datetime.fromtimestamp(entry["modified_at"]).isoformat(),
+                    "feedback": None  # Could be linked to feedback data
+                })
             
             logger.info(f"Generated learning log with {len(items)} entries")
             return items
@@ -106,71 +79,30 @@ class DataService:
             logger.error(f"Error building learning log: {e}")
             return []
     
-    def get_videos_summary(self) -> List[Dict[str, Any]]:
+    def get_videos_summary(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
         """
         Get summary list of processed videos.
         
+        Args:
+            limit: Maximum number of videos, None for all
+            offset: Number of videos to skip
+            
         Returns:
-            List of video summaries
+            List of video summaries, most recently modified first
         """
         try:
             results = []
-            
-            if not self.enhanced_analysis_dir.exists():
-                logger.warning(f"Enhanced analysis directory does not exist: {self.enhanced_analysis_dir}")
-                return results
-            
-            for category_dir in self.enhanced_analysis_dir.iterdir():
-                if not category_dir.is_dir():
-                    continue
-                
-                for md_file in category_dir.glob("*_enhanced.md"):
-                    try:
-                        # Extract video ID from filename
-                        video_id = md_file.name.split("_")[0]
-                        
-                        # Find corresponding metadata file
-                        metadata_file = next(category_dir.glob(f"{video_id}_*_metadata.json"), None)
-                        metadata = {}
-                        
-                        if metadata_file and metadata_file.exists():
-                            try:
-                                with open(metadata_file, "r", encoding="utf-8") as f:
-                                    metadata = json.load(f)
-                            except json.JSONDecodeError as e:
-                                logger.warning(f"Failed to parse metadata file {metadata_file}: {e}")
-                        
-                        # Get file statistics
-                        stat = md_file.stat()
-                        
-                        # Extract information from metadata
-                        title = (metadata.get("title") or 
-                                metadata.get("snippet", {}).get("title") or
-                                f"Video {video_id}")
-                        
-                        published_at = (metadata.get("published_at") or 
-                                      metadata.get("snippet", {}).get("publishedAt"))
-                        
-                        view_count = (metadata.get("view_count") or 
-                                    metadata.get("statistics", {}).get("viewCount"))
-                        
-                        results.append({
-                            "video_id": video_id,
-                            "category": category_dir.name,
-                            "title": title,
-                            "published_at": published_at,
-                            "view_count": view_count,
-                            "last_modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                            "markdown_path": str(md_file),
-                            "metadata_path": str(metadata_file) if metadata_file else None
-                        })
-                        
-                    except Exception as e:
-                        logger.warning(f"Error processing video summary for {md_file}: {e}")
-                        continue
-            
-            # Sort by last modified (newest first)
-            results.sort(key=lambda x: x["last_modified"], reverse=True)
+            for entry in self.index.list(ENHANCED, limit=limit, offset=offset):
+                results.append({
+                    "video_id": entry["video_id"],
+                    "category": entry["category"],
+                    "title": entry["title"] or f"Video {entry['video_id']}",
+                    "published_at": entry["published_at"],
+                    "view_count": entry["view_count"],
+                    "last_modified": datetime.fromtimestamp(entry["modified_at"]).isoformat(),
+                    "markdown_path": entry["markdown_path"],
+                    "metadata_path": entry["metadata_path"]
+                })
             
             logger.info(f"Generated videos summary with {len(results)} entries")
             return results
@@ -179,6 +111,19 @@ class DataService:
             logger.error(f"Error listing videos: {e}")
             return []
     
+    def count_videos(self) -> int:
+        """
+        Count the processed videos listed by get_videos_summary.
+        
+        Returns:
+            Number of indexed enhanced analysis results
+        """
+        try:
+            return self.index.count(ENHANCED)
+        except Exception as e:
+            logger.error(f"Error counting videos: {e}")
+            return 0
+    
     def get_video_detail(self, video_id: str) -> Optional[Dict[str, Any]]:
         """
         Get detailed information for a specific video.
@@ -190,56 +135,28 @@ class DataService:
             Video details or None if not found
         """
         try:
-            if not self.enhanced_analysis_dir.exists():
-                logger.warning(f"Enhanced analysis directory does not exist: {self.enhanced_analysis_dir}")
+            entry = self.index.lookup(video_id, ENHANCED)
+            if not entry:
+                logger.info(f"Video not found: {video_id}")
                 return None
             
-            for category_dir in self.enhanced_analysis_dir.iterdir():
-                if not category_dir.is_dir():
-                    continue
-                
-                # Find markdown file for this video
-                md_file = next(category_dir.glob(f"{video_id}_*_enhanced.md"), None)
-                if not md_file or not md_file.exists():
-                    continue
-                
-                # Find corresponding metadata file
-                metadata_file = next(category_dir.glob(f"{video_id}_*_metadata.json"), None)
-                metadata = {}
-                
-                if metadata_file and metadata_file.exists():
-                    try:
-                        with open(metadata_file, "r", encoding="utf-8") as f:
-                            metadata = json.load(f)
-                    except json.JSONDecodeError as e:
-                        logger.warning(f"Failed to parse metadata file {metadata_file}: {e}")
-                
-                # Read markdown content
-                try:
-                    with open(md_file, "r", encoding="utf-8") as f:
-                        markdown = f.read()
-                except Exception as e:
-                    logger.error(f"Failed to read markdown file {md_file}: {e}")
-                    markdown = ""
-                
-                # Extract title
-                title = (metadata.get("title") or 
-                        metadata.get("snippet", {}).get("title") or
-                        f"Video {video_id}")
-                
-                return {
-                    "video_id": video_id,
-                    "category": category_dir.name,
-                    "title": title,
-                    "metadata": metadata,
-                    "markdown": markdown,
-                    "markdown_path": str(md_file),
-                    "metadata_path": str(metadata_file) if metadata_file else None
-                }
+            # Read markdown content
+            try:
+                with open(entry["markdown_path"], "r", encoding="utf-8") as f:
+                    markdown = f.read()
+            except Exception as e:
+                logger.error(f"Failed to read markdown file {entry['markdown_path']}: {e}")
+                markdown = ""
             
-            # Video not found
-            logger.info(f"Video not found: {video_id}")
-            return None
+            return {
+                "video_id": video_id,
+                "category": entry["category"],
+                "title": entry["title"] or f"Video {video_id}",
+                "metadata": entry["metadata"],
+                "markdown": markdown,
+                "markdown_path": entry["markdown_path"],
+                "metadata_path": entry["metadata_path"]
+            }
             
         except Exception as e:
             logger.error(f"Error reading video detail: {e}")
@@ -332,38 +249,26 @@ class DataService:
                 "last_updated": None
             }
             
-            # Analyze enhanced analysis data
-            if self.enhanced_analysis_dir.exists():
-                newest_time = 0
-                total_size = 0
-                
-                for category_dir in self.enhanced_analysis_dir.iterdir():
-                    if not category_dir.is_dir():
-                        continue
-                    
-                    category_name = category_dir.name
-                    enhanced_files = list(category_dir.glob("*_enhanced.md"))
-                    category_count = len(enhanced_files)
-                    category_size = sum(f.stat().st_size for f in enhanced_files)
-                    
-                    stats["categories"][category_name] = {
-                        "count": category_count,
-                        "size_mb": round(category_size / 1024 / 1024, 2)
-                    }
-                    
-                    stats["enhanced_videos"] += category_count
-                    total_size += category_size
-                    
-                    # Track newest modification time
-                    for f in enhanced_files:
-                        mtime = f.stat().st_mtime
-                        if mtime > newest_time:
-                            newest_time = mtime
+            # Analyze enhanced analysis data, aggregated by the result index
+            newest_time = 0
+            total_size = 0
+            for row in self.index.category_stats():
+                if row["cache_type"] != ENHANCED:
+                    continue
                 
-                stats["total_storage_mb"] = round(total_size / 1024 / 1024, 2)
+                stats["categories"][row["category"]] = {
+                    "count": row["count"],
+                    "size_mb": round(row["size_bytes"] / 1024 / 1024, 2)
+                }
                 
-                if newest_time > 0:
-                    stats["last_updated"] = datetime.fromtimestamp(newest_time).isoformat()
+                stats["enhanced_videos"] += row["count"]
+                total_size += row["size_bytes"]
+                newest_time = max(newest_time, row["newest"])
+            
+            stats["total_storage_mb"] = round(total_size / 1024 / 1024, 2)
+            
+            if newest_time > 0:
+                stats["last_updated"] = datetime.fromtimestamp(newest_time).isoformat()
             
             # Count feedback entries
             feedback_file = self.feedback_dir / "feedback.jsonl"
@@ -428,6 +333,10 @@ class DataService:
             
             cleanup_summary["size_freed_mb"] = round(cleanup_summary["size_freed_mb"] / 1024 / 1024, 2)
             
+            # Drop the removed results from the index
+            if cleanup_summary["files_removed"] > 0:
+                self.index.rebuild()
+            
             logger.info(f"Cleanup completed: {cleanup_summary}")
             return cleanup_summary
             
@@ -24,7 +24,8 @@ import hashlib
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, List, Optional, Tuple, Union
 from dataclasses import dataclass, asdict
-from collections import defaultdict, OrderedDict
+from collections import OrderedDict
+from itertools import islice
 import threading
 import redis.asyncio as redis
 from contextlib import asynccontextmanager
@@ -106,140 +107,376 @@ class IntelligentCacheLayer:
         """Clear all cache entries"""
         raise NotImplementedError
     
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Get several values, returns only the keys that were found"""
+        results = {}
+        for key in keys:
+            value = await self.get(key)
+            if value is not None:
+                results[key] = value
+        return results
+    
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None, tags: List[str] = None) -> int:
+        """Set several values with the same TTL, returns the number of values set"""
+        count = 0
+        for key, value in items.items():
+            if await self.set(key, value, ttl, tags):
+                count += 1
+        return count
+    
     async def get_stats(self) -> CacheStats:
         """Get cache statistics"""
         return self.stats
 
+def _estimate_size_bytes(value: Any, sample_size: int = 16, budget: Optional[List[int]] = None) -> int:
+    """
+    Cheap estimate of the JSON size of a value, without serializing it.
+    
+    Strings and bytes count their length. Containers are estimated from their first
+    `sample_size` items, scaled to their length, and at most ~256 items are looked
+    at in total, so the cost doesn't grow with the size of large cached results.
+    """
+    if budget is None:
+        budget = [256]
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value) + 2
+    if not isinstance(value, (dict, list, tuple, set)):
+        # Numbers, booleans, None, datetimes...
+        return 8
+    
+    length = len(value)
+    if length == 0:
+        return 2
+    if budget[0] <= 0:
+        # Out of budget, assume small items
+        return 2 + length * 16
+    
+    items = islice(value.items() if isinstance(value, dict) else value, sample_size)
+    sampled = 0
+    sampled_size = 0
+    for item in items:
+        budget[0] -= 1
+        sampled += 1
+        if isinstance(value, dict):
+            sampled_size += _estimate_size_bytes(item[0], sample_size, budget) + _estimate_size_bytes(item[1], sample_size, budget) + 2
+        else:
+            sampled_size += _estimate_size_bytes(item, sample_size, budget) + 1
+    return 2 + int(sampled_size * length / sampled)
+
+class AccessFrequencySketch:
+    """
+    Fixed-size, decaying count-min sketch of key accesses.
+    
+    Replaces an unbounded per-key list of access timestamps: memory is
+    width * depth counters whatever the number of keys. Every `window_seconds`
+    all counters are halved, so old traffic fades out. A count-min sketch only
+    over-estimates (on hash collisions), never under-estimates.
+    """
+    
+    def __init__(self, width: int = 4096, depth: int = 4, window_seconds: float = 300.0):
+        self.width = width
+        self.depth = depth
+        self.window_seconds = window_seconds
+        self._rows = [[0] * width for _ in range(depth)]
+        self._started_at = time.monotonic()
+        self._last_decay: Optional[float] = None
+    
+    def add(self, key: str, now: Optional[float] = None):
+        """Record one access to key"""
+        now = time.monotonic() if now is None else now
+        self._maybe_decay(now)
+        for row, index in zip(self._rows, self._indexes(key)):
+            row[index] += 1
+    
+    def estimate(self, key: str) -> int:
+        """Estimated (decayed) number of accesses to key"""
+        return min(row[index] for row, index in zip(self._rows, self._indexes(key)))
+    
+    def rate(self, key: str, now: Optional[float] = None) -> float:
+        """
+        Estimated accesses per second to key, 0 if it was accessed less than twice.
+        
+        Halving every window keeps a steady rate r at about r * (window + time since
+        the last halving), which is what the count is divided by.
+        """
+        now = time.monotonic() if now is None else now
+        self._maybe_decay(now)
+        count = self.estimate(key)
+        if count < 2:
+            return 0.0
+        if self._last_decay is None:
+            elapsed = now - self._started_at
+        else:
+            elapsed = self.window_seconds + (now - self._last_decay)
+        return count / elapsed if elapsed > 0 else 0.0
+    
+    def remove(self, key: str):
+        """Forget most of the accesses to key (other keys sharing its counters keep theirs)"""
+        count = self.estimate(key)
+        for row, index in zip(self._rows, self._indexes(key)):
+            row[index] -= count
+    
+    def clear(self):
+        for row in self._rows:
+            for i in range(self.width):
+                row[i] = 0
+        self._started_at = time.monotonic()
+        self._last_decay = None
+    
+    def _indexes(self, key: str):
+        return (hash((i, key)) % self.width for i in range(self.depth))
+    
+    def _maybe_decay(self, now: float):
+        last = self._started_at if self._last_decay is None else self._last_decay
+        if now - last < self.window_seconds:
+            return
+        for row in self._rows:
+            for i, count in enumerate(row):
+                if count:
+                    row[i] = count >> 1
+        self._last_decay = now
+
+class _CacheShard:
+    """
+    One shard of the L1 cache: its own entries, size accounting, eviction order
+    and lock. Every operation is O(1) and never awaits, so the lock is only held
+    for a few dict operations.
+    """
+    
+    def __init__(self, max_entries: int, max_size_bytes: int, eviction_policy: str):
+        self.max_entries = max_entries
+        self.max_size_bytes = max_size_bytes
+        self.eviction_policy = eviction_policy
+        self.lock = threading.Lock()
+        # LRU: insertion/access order. LFU: only used for lookups
+        self.entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        # LFU: access count -> keys with that count, least recently used first
+        self._frequencies: Dict[int, OrderedDict] = {}
+        self._min_frequency = 0
+        self.size_bytes = 0
+        self.evictions = 0
+    
+    def get(self, key: str, now: datetime) -> Optional[CacheEntry]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at and now > entry.expires_at:
+            self.remove(key)
+            return None
+        
+        self._touch(entry)
+        entry.access_count += 1
+        entry.last_accessed = now
+        return entry
+    
+    def put(self, entry: CacheEntry) -> int:
+        """Add or replace an entry, evicting others to make room. Returns the number evicted."""
+        self.remove(entry.key)
+        evicted = 0
+        while self.entries and (len(self.entries) >= self.max_entries or
+                                self.size_bytes + entry.size_bytes > self.max_size_bytes):
+            self._evict_one()
+            evicted += 1
+        
+        self.entries[entry.key] = entry
+        self.size_bytes += entry.size_bytes
+        if self.eviction_policy == "lfu":
+            self._frequencies.setdefault(entry.access_count, OrderedDict())[entry.key] = None
+            if len(self.entries) == 1 or entry.access_count < self._min_frequency:
+                self._min_frequency = entry.access_count
+        return evicted
+    
+    def remove(self, key: str) -> Optional[CacheEntry]:
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return None
+        self.size_bytes -= entry.size_bytes
+        if self.eviction_policy == "lfu":
+            self._discard_frequency(key, entry.access_count)
+        return entry
+    
+    def clear(self) -> int:
+        count = len(self.entries)
+        self.entries.clear()
+        self._frequencies.clear()
+        self._min_frequency = 0
+        self.size_bytes = 0
+        return count
+    
+    def _touch(self, entry: CacheEntry):
+        if self.eviction_policy == "lfu":
+            # Move the key to the next frequency bucket
+            self._discard_frequency(entry.key, entry.access_count)
+            self._frequencies.setdefault(entry.access_count + 1, OrderedDict())[entry.key] = None
+            if entry.access_count == self._min_frequency and entry.access_count not in self._frequencies:
+                self._min_frequency = entry.access_count + 1
+        else:
+            self.entries.move_to_end(entry.key)
+    
+    def _discard_frequency(self, key: str, frequency: int):
+        bucket = self._frequencies.get(frequency)
+        if bucket is None:
+            return
+        bucket.pop(key, None)
+        if not bucket:
+            del self._frequencies[frequency]
+    
+    def _evict_one(self):
+        if self.eviction_policy == "lfu":
+            if self._min_frequency not in self._frequencies:
+                # Only after removals, not on the hot path
+                self._min_frequency = min(self._frequencies)
+            key = next(iter(self._frequencies[self._min_frequency]))
+        else:
+            key = next(iter(self.entries))
+        self.remove(key)
+        self.evictions += 1
+        logger.debug(f"L1 Cache EVICTED: {key}")
+
 class InMemoryCacheLayer(IntelligentCacheLayer):
-    """L1 Cache: In-memory cache with LRU eviction"""
+    """
+    L1 Cache: sharded in-memory cache with LRU or LFU eviction
+    
+    - Keys are spread over `num_shards` shards, each with its own lock (lock
+      striping), entries, byte accounting and O(1) eviction. The locks are never
+      held across an await, so event loop code doesn't block on them, and threads
+      only contend on the same shard.
+    - Entry sizes come from the caller's `size_hint` (e.g. the length of an
+      already serialized payload) or a cheap estimate, instead of serializing
+      every value to JSON just to measure it.
+    - Access patterns are kept in a fixed-size decaying count-min sketch, which
+      feeds the adaptive TTL of IntelligentCacheSystem.
     
-    def __init__(self, name: str = "L1_Memory", max_size: int = 10000, max_size_bytes: int = 100 * 1024 * 1024):  # 100MB
+    `max_size` and `max_size_bytes` are split evenly between the shards.
+    """
+    
+    def __init__(self, name: str = "L1_Memory", max_size: int = 10000, max_size_bytes: int = 100 * 1024 * 1024,  # 100MB
+                 num_shards: int = 16, eviction_policy: str = "lru"):
         super().__init__(name, max_size)
+        if eviction_policy not in ("lru", "lfu"):
+            raise ValueError(f"eviction_policy must be 'lru' or 'lfu', got {eviction_policy!r}")
+        num_shards = max(1, min(num_shards, max_size))
         self.max_size_bytes = max_size_bytes
-        self.cache: OrderedDict[str, CacheEntry] = OrderedDict()
-        self.access_patterns = defaultdict(list)  # Track access patterns for intelligent TTL
+        self.eviction_policy = eviction_policy
+        self.shards = [
+            _CacheShard(
+                max_entries=max(1, -(-max_size // num_shards)),
+                max_size_bytes=max(1, max_size_bytes // num_shards),
+                eviction_policy=eviction_policy,
+            )
+            for _ in range(num_shards)
+        ]
+        self.access_sketch = AccessFrequencySketch()  # Track access patterns for intelligent TTL
+    
+    def _shard(self, key: str) -> _CacheShard:
+        return self.shards[hash(key) % len(self.shards)]
     
     async def get(self, key: str) -> Optional[Any]:
         """Get value from in-memory cache"""
-        start_time = time.time()
+        start_time = time.perf_counter()
+        shard = self._shard(key)
         
-        with self._lock:
-            if key in self.cache:
-                entry = self.cache[key]
-                
-                # Check expiration
-                if entry.expires_at and datetime.now(timezone.utc) > entry.expires_at:
-                    del self.cache[key]
-                    self.stats.miss_count += 1
-                    return None
-                
-                # Update access info
-                entry.access_count += 1
-                entry.last_accessed = datetime.now(timezone.utc)
-                self.access_patterns[key].append(time.time())
-                
-                # Move to end (LRU)
-                self.cache.move_to_end(key)
-                
-                self.stats.hit_count += 1
-                access_time = (time.time() - start_time) * 1000
-                self._update_avg_access_time(access_time)
-                
-                logger.debug(f"L1 Cache HIT: {key}")
-                return entry.value
-            
+        with shard.lock:
+            entry = shard.get(key, datetime.now(timezone.utc))
+        
+        if entry is None:
             self.stats.miss_count += 1
             logger.debug(f"L1 Cache MISS: {key}")
             return None
+        
+        self.access_sketch.add(key)
+        self.stats.hit_count += 1
+        self._update_avg_access_time((time.perf_counter() - start_time) * 1000)
+        logger.debug(f"L1 Cache HIT: {key}")
+        return entry.value
     
-    async def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: List[str] = None) -> bool:
-        """Set value in in-memory cache"""
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: List[str] = None,
+                  size_hint: Optional[int] = None) -> bool:
+        """
+        Set value in in-memory cache
+        
+        Args:
+            size_hint: Size of the value in bytes if the caller knows it (e.g. the
+                length of its serialized form). Estimated otherwise.
+        """
         try:
-            # Calculate size (using JSON for safety)
-            size_bytes = len(json.dumps(value, cls=DateTimeEncoder).encode('utf-8'))
+            size_bytes = size_hint if size_hint is not None else _estimate_size_bytes(value)
+            now = datetime.now(timezone.utc)
+            entry = CacheEntry(
+                key=key,
+                value=value,
+                created_at=now,
+                expires_at=now + timedelta(seconds=ttl) if ttl else None,
+                size_bytes=size_bytes,
+                tags=tags or []
+            )
             
-            with self._lock:
-                # Check if we need to evict
-                await self._evict_if_needed(size_bytes)
-                
-                # Calculate expiration
-                expires_at = None
-                if ttl:
-                    expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl)
-                
-                # Create entry
-                entry = CacheEntry(
-                    key=key,
-                    value=value,
-                    created_at=datetime.now(timezone.utc),
-                    expires_at=expires_at,
-                    size_bytes=size_bytes,
-                    tags=tags or []
-                )
-                
-                # Update existing or add new
-                if key in self.cache:
-                    old_entry = self.cache[key]
-                    self.stats.total_size_bytes -= old_entry.size_bytes
-                else:
-                    self.stats.total_entries += 1
-                
-                self.cache[key] = entry
-                self.stats.total_size_bytes += size_bytes
-                
-                logger.debug(f"L1 Cache SET: {key} ({size_bytes} bytes)")
-                return True
-                
+            shard = self._shard(key)
+            with shard.lock:
+                shard.put(entry)
+            
+            logger.debug(f"L1 Cache SET: {key} ({size_bytes} bytes)")
+            return True
+        
         except Exception as e:
             logger.error(f"Failed to set L1 cache entry {key}: {e}")
             return False
     
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Get several values from in-memory cache, returns only the keys that were found"""
+        start_time = time.perf_counter()
+        now = datetime.now(timezone.utc)
+        results = {}
+        
+        for key in keys:
+            shard = self._shard(key)
+            with shard.lock:
+                entry = shard.get(key, now)
+            if entry is None:
+                self.stats.miss_count += 1
+                continue
+            self.access_sketch.add(key)
+            self.stats.hit_count += 1
+            results[key] = entry.value
+        
+        if results:
+            self._update_avg_access_time((time.perf_counter() - start_time) * 1000 / len(results))
+        logger.debug(f"L1 Cache GET_MANY: {len(results)}/{len(keys)} hits")
+        return results
+    
     async def delete(self, key: str) -> bool:
         """Delete value from in-memory cache"""
-        with self._lock:
-            if key in self.cache:
-                entry = self.cache[key]
-                del self.cache[key]
-                self.stats.total_entries -= 1
-                self.stats.total_size_bytes -= entry.size_bytes
-                
-                # Clean access patterns
-                if key in self.access_patterns:
-                    del self.access_patterns[key]
-                
-                logger.debug(f"L1 Cache DELETE: {key}")
-                return True
+        shard = self._shard(key)
+        with shard.lock:
+            entry = shard.remove(key)
+        if entry is None:
             return False
+        
+        # Clean access patterns
+        self.access_sketch.remove(key)
+        logger.debug(f"L1 Cache DELETE: {key}")
+        return True
     
     async def clear(self) -> int:
         """Clear all in-memory cache entries"""
-        with self._lock:
-            count = len(self.cache)
-            self.cache.clear()
-            self.access_patterns.clear()
-            self.stats.total_entries = 0
-            self.stats.total_size_bytes = 0
-            logger.info(f"L1 Cache CLEARED: {count} entries")
-            return count
-    
-    async def _evict_if_needed(self, new_size_bytes: int):
-        """Evict entries if needed to make space"""
-        while (len(self.cache) >= self.max_size or 
-               self.stats.total_size_bytes + new_size_bytes > self.max_size_bytes):
-            
-            if not self.cache:
-                break
-            
-            # Remove oldest entry (LRU)
-            oldest_key = next(iter(self.cache))
-            entry = self.cache[oldest_key]
-            del self.cache[oldest_key]
-            
-            self.stats.total_entries -= 1
-            self.stats.total_size_bytes -= entry.size_bytes
-            self.stats.eviction_count += 1
-            
-            logger.debug(f"L1 Cache EVICTED: {oldest_key}")
+        count = 0
+        for shard in self.shards:
+            with shard.lock:
+                count += shard.clear()
+        self.access_sketch.clear()
+        logger.info(f"L1 Cache CLEARED: {count} entries")
+        return count
+    
+    async def get_stats(self) -> CacheStats:
+        """Get cache statistics, with the entry, size and eviction totals of all shards"""
+        self.stats.total_entries = sum(len(shard.entries) for shard in self.shards)
+        self.stats.total_size_bytes = sum(shard.size_bytes for shard in self.shards)
+        self.stats.eviction_count = sum(shard.evictions for shard in self.shards)
+        return self.stats
+    
+    def estimate_access_rate(self, key: str) -> float:
+        """Estimated accesses per second to key (0 if accessed less than twice recently)"""
+        return self.access_sketch.rate(key)
     
     def _update_avg_access_time(self, access_time_ms: float):
         """Update average access time"""
@@ -252,26 +489,44 @@ class InMemoryCacheLayer(IntelligentCacheLayer):
                                            (1 - alpha) * self.stats.avg_access_time_ms)
 
 class RedisCacheLayer(IntelligentCacheLayer):
-    """L2 Cache: Redis distributed cache"""
+    """
+    L2 Cache: Redis distributed cache
+    
+    `get_many` and `set_many` use one MGET and one pipeline per batch, so a batch
+    costs one or two round trips instead of several per key. A `client` can be
+    passed instead of a URL (e.g. an in-process fake Redis in tests).
+    """
     
-    def __init__(self, name: str = "L2_Redis", redis_url: str = "redis://localhost:6379", max_connections: int = 20):
+    def __init__(self, name: str = "L2_Redis", redis_url: str = "redis://localhost:6379", max_connections: int = 20,
+                 client: Any = None):
         super().__init__(name, max_size=100000)  # Logical limit for Redis
         self.redis_url = redis_url
         self.max_connections = max_connections
         self.redis_pool = None
+        self.client = client
         self._connected = False
     
+    @asynccontextmanager
+    async def _connection(self):
+        """Redis connection: the injected client, or one from the pool"""
+        if self.client is not None:
+            yield self.client
+        else:
+            async with redis.Redis(connection_pool=self.redis_pool) as conn:
+                yield conn
+    
     async def connect(self):
         """Connect to Redis"""
         try:
-            self.redis_pool = redis.ConnectionPool.from_url(
-                self.redis_url,
-                max_connections=self.max_connections,
-                decode_responses=False  # We handle binary data
-            )
+            if self.client is None:
+                self.redis_pool = redis.ConnectionPool.from_url(
+                    self.redis_url,
+                    max_connections=self.max_connections,
+                    decode_responses=False  # We handle binary data
+                )
             
             # Test connection
-            async with redis.Redis(connection_pool=self.redis_pool) as conn:
+            async with self._connection() as conn:
                 await conn.ping()
             
             self._connected = True
@@ -289,22 +544,19 @@ class RedisCacheLayer(IntelligentCacheLayer):
         start_time = time.time()
         
         try:
-            async with redis.Redis(connection_pool=self.redis_pool) as conn:
+            async with self._connection() as conn:
                 # Get serialized data
                 data = await conn.get(f"uvai:cache:{key}")
                 
                 if data:
-                    # Deserialize using JSON
-                    try:
-                        entry_data = json.loads(data, object_hook=datetime_decoder)
-                    except (json.JSONDecodeError, TypeError):
-                        # Fallback for legacy pickle data (optional, or just treat as miss)
-                        logger.warning(f"Failed to decode JSON for {key}, treating as miss")
+                    entry_data = self._decode(key, data)
+                    if entry_data is None:
                         return None
                     
                     # Update access count
-                    await conn.hincrby(f"uvai:stats:{key}", "access_count", 1)
-                    await conn.hset(f"uvai:stats:{key}", "last_accessed", time.time())
+                    pipe = conn.pipeline(transaction=False)
+                    self._queue_access_update(pipe, key, time.time())
+                    await pipe.execute()
                     
                     self.stats.hit_count += 1
                     access_time = (time.time() - start_time) * 1000
@@ -328,7 +580,7 @@ class RedisCacheLayer(IntelligentCacheLayer):
             return False
         
         try:
-            async with redis.Redis(connection_pool=self.redis_pool) as conn:
+            async with self._connection() as conn:
                 # Prepare entry data
                 entry_data = {
                     "value": value,
@@ -363,13 +615,99 @@ class RedisCacheLayer(IntelligentCacheLayer):
             logger.error(f"Redis set error for {key}: {e}")
             return False
     
+    @staticmethod
+    def _decode(key: str, data: bytes) -> Optional[Dict[str, Any]]:
+        """Deserialize a stored entry using JSON, None if it can't be decoded"""
+        try:
+            return json.loads(data, object_hook=datetime_decoder)
+        except (json.JSONDecodeError, TypeError):
+            # Fallback for legacy pickle data (optional, or just treat as miss)
+            logger.warning(f"Failed to decode JSON for {key}, treating as miss")
+            return None
+    
+    @staticmethod
+    def _queue_access_update(pipe, key: str, now: float):
+        pipe.hincrby(f"uvai:stats:{key}", "access_count", 1)
+        pipe.hset(f"uvai:stats:{key}", "last_accessed", now)
+    
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Get several values with a single MGET, returns only the keys that were found"""
+        if not self._connected or not keys:
+            return {}
+        
+        start_time = time.time()
+        
+        try:
+            async with self._connection() as conn:
+                data = await conn.mget([f"uvai:cache:{key}" for key in keys])
+                
+                results = {}
+                for key, raw in zip(keys, data):
+                    entry_data = self._decode(key, raw) if raw else None
+                    if entry_data is None:
+                        continue
+                    results[key] = entry_data["value"]
+                
+                if results:
+                    # Access stats of all hits in one pipelined round trip
+                    now = time.time()
+                    pipe = conn.pipeline(transaction=False)
+                    for key in results:
+                        self._queue_access_update(pipe, key, now)
+                    await pipe.execute()
+                    self._update_avg_access_time((time.time() - start_time) * 1000 / len(results))
+                
+                self.stats.hit_count += len(results)
+                self.stats.miss_count += len(keys) - len(results)
+                logger.debug(f"L2 Redis GET_MANY: {len(results)}/{len(keys)} hits")
+                return results
+                
+        except Exception as e:
+            logger.error(f"Redis get_many error for {len(keys)} keys: {e}")
+            self.stats.miss_count += len(keys)
+            return {}
+    
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None, tags: List[str] = None) -> int:
+        """Set several values in one pipelined round trip, returns the number of values set"""
+        if not self._connected or not items:
+            return 0
+        
+        try:
+            async with self._connection() as conn:
+                now = time.time()
+                pipe = conn.pipeline(transaction=False)
+                for key, value in items.items():
+                    serialized_data = json.dumps(
+                        {"value": value, "created_at": now, "tags": tags or []},
+                        cls=DateTimeEncoder
+                    )
+                    if ttl:
+                        pipe.setex(f"uvai:cache:{key}", ttl, serialized_data)
+                    else:
+                        pipe.set(f"uvai:cache:{key}", serialized_data)
+                    pipe.hset(f"uvai:stats:{key}", mapping={
+                        "created_at": now,
+                        "access_count": 0,
+                        "size_bytes": len(serialized_data)
+                    })
+                    for tag in (tags or []):
+                        pipe.sadd(f"uvai:tag:{tag}", key)
+                await pipe.execute()
+                
+                logger.debug(f"L2 Redis SET_MANY: {len(items)} entries")
+                return len(items)
+                
+        except Exception as e:
+            logger.error(f"Redis set_many error for {len(items)} keys: {e}")
+            return 0
+    
     async def delete(self, key: str) -> bool:
         """Delete value from Redis cache"""
         if not self._connected:
             return False
         
         try:
-            async with redis.Redis(connection_pool=self.redis_pool) as conn:
+            async with self._connection() as conn:
                 # Get tags before deletion
                 stats_data = await conn.hgetall(f"uvai:stats:{key}")
                 
@@ -392,7 +730,7 @@ class RedisCacheLayer(IntelligentCacheLayer):
             return 0
         
         try:
-            async with redis.Redis(connection_pool=self.redis_pool) as conn:
+            async with self._connection() as conn:
                 # Get all cache keys
                 keys = await conn.keys("uvai:cache:*")
                 stat_keys = await conn.keys("uvai:stats:*")
@@ -417,7 +755,7 @@ class RedisCacheLayer(IntelligentCacheLayer):
             return 0
         
         try:
-            async with redis.Redis(connection_pool=self.redis_pool) as conn:
+            async with self._connection() as conn:
                 total_deleted = 0
                 
                 for tag in tags:
@@ -457,17 +795,44 @@ class IntelligentCacheSystem:
     - L1: In-memory cache (fastest, smallest)
     - L2: Redis cache (fast, distributed)
     - L3: Database/persistent storage (slowest, largest)
+    
+    Batches of keys go through `get_many` / `set_many`, which cost one round trip
+    per lower layer instead of one per key. `set_many` writes L1 right away and
+    the lower layers concurrently in the background (write-behind), `flush`
+    waits for those writes. Background writes are ordered per key: `set`,
+    `delete` and a later `set_many` of a key wait for (or queue behind) its
+    pending write, and `invalidate_by_tags` waits for all of them, so a stale
+    background write never lands after a newer write or an invalidation.
+    
+    Negative caching is opt-in: with `negative_ttl` > 0, keys missing from every
+    layer are remembered for that many seconds, so repeated lookups of absent
+    keys don't hit Redis. The negative cache is local to each worker process:
+    a key set by another worker stays hidden here for up to `negative_ttl`
+    seconds, so only enable it for keys that tolerate that staleness.
     """
     
-    def __init__(self, redis_url: str = "redis://localhost:6379"):
+    def __init__(self, redis_url: str = "redis://localhost:6379", redis_client: Any = None,
+                 negative_ttl: float = 0.0, max_negative_entries: int = 10000):
         self.layers = [
             InMemoryCacheLayer("L1_Memory", max_size=10000),
-            RedisCacheLayer("L2_Redis", redis_url=redis_url)
+            RedisCacheLayer("L2_Redis", redis_url=redis_url, client=redis_client)
         ]
         
         self.adaptive_ttl_enabled = True
         self.cache_warming_enabled = True
         self.auto_invalidation_enabled = True
+        self.write_behind_enabled = True
+        
+        # Negative cache of this process: key -> monotonic expiry time. Off if negative_ttl <= 0
+        self.negative_ttl = negative_ttl
+        self.max_negative_entries = max_negative_entries
+        self._negative_cache: Dict[str, float] = {}
+        self.negative_hits = 0
+        
+        # Pending write-behind tasks, and the latest one writing each key
+        self._write_behind_tasks = set()
+        self._pending_writes: Dict[str, asyncio.Task] = {}
+        self.write_behind_failures = 0
         
         # Performance tracking
         self.performance_history = []
@@ -485,6 +850,10 @@ class IntelligentCacheSystem:
         """Get value from cache layers (L1 → L2 → L3)"""
         start_time = time.time()
         
+        if self._is_negative(key, time.monotonic()):
+            self.negative_hits += 1
+            return None
+        
         for i, layer in enumerate(self.layers):
             value = await layer.get(key)
             
@@ -498,26 +867,170 @@ class IntelligentCacheSystem:
                 return value
         
         # Cache miss in all layers
+        self._remember_missing([key])
         access_time = (time.time() - start_time) * 1000
         self._record_access_performance(key, access_time, -1)
         
         return None
     
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Get several values from cache layers (L1 → L2 → L3)
+        
+        Each layer is asked once for all the keys still missing, and values found
+        in a lower layer are promoted to the higher ones in one batch.
+        
+        Returns:
+            Dict of the keys that were found, missing keys are left out
+        """
+        start_time = time.time()
+        now = time.monotonic()
+        keys = list(dict.fromkeys(keys))  # Dedupe, keep order
+        
+        missing = [key for key in keys if not self._is_negative(key, now)]
+        self.negative_hits += len(keys) - len(missing)
+        
+        results = {}
+        found_at = {}
+        for i, layer in enumerate(self.layers):
+            if not missing:
+                break
+            found = await layer.get_many(missing)
+            if not found:
+                continue
+            if i > 0:
+                await self._promote_cache_entries(found, i)
+            results.update(found)
+            for key in found:
+                found_at[key] = i
+            missing = [key for key in missing if key not in found]
+        
+        self._remember_missing(missing)
+        
+        access_time = (time.time() - start_time) * 1000 / max(len(keys), 1)
+        for key in keys:
+            self._record_access_performance(key, access_time, found_at.get(key, -1))
+        
+        return results
+    
     async def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: List[str] = None) -> bool:
-        """Set value in all cache layers"""
+        """Set value in all cache layers, concurrently"""
         # Calculate adaptive TTL if enabled
         if self.adaptive_ttl_enabled and ttl is None:
             ttl = self._calculate_adaptive_ttl(key)
         
-        results = []
-        for layer in self.layers:
-            result = await layer.set(key, value, ttl, tags)
-            results.append(result)
+        self._negative_cache.pop(key, None)
+        await self._wait_pending_writes([key])
+        results = await asyncio.gather(
+            *(layer.set(key, value, ttl, tags) for layer in self.layers),
+            return_exceptions=True
+        )
         
-        return any(results)  # Success if at least one layer succeeded
+        return any(result is True for result in results)  # Success if at least one layer succeeded
+    
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None, tags: List[str] = None,
+                       write_behind: Optional[bool] = None) -> int:
+        """
+        Set several values in all cache layers
+        
+        L1 is written before returning. The lower layers are written concurrently,
+        with one pipelined batch per layer and TTL, in the background unless
+        `write_behind` is False (defaults to `write_behind_enabled`).
+        
+        Returns:
+            Number of values stored in L1
+        """
+        if not items:
+            return 0
+        
+        # Group keys by TTL, the adaptive TTL may differ per key
+        batches: Dict[Optional[int], Dict[str, Any]] = {}
+        for key, value in items.items():
+            key_ttl = ttl
+            if self.adaptive_ttl_enabled and key_ttl is None:
+                key_ttl = self._calculate_adaptive_ttl(key)
+            batches.setdefault(key_ttl, {})[key] = value
+            self._negative_cache.pop(key, None)
+        
+        stored = 0
+        for batch_ttl, batch in batches.items():
+            stored += await self.layers[0].set_many(batch, batch_ttl, tags)
+        
+        lower_writes = [
+            layer.set_many(batch, batch_ttl, tags)
+            for layer in self.layers[1:]
+            for batch_ttl, batch in batches.items()
+        ]
+        if lower_writes:
+            keys = list(items)
+            if write_behind if write_behind is not None else self.write_behind_enabled:
+                # Queue behind the pending writes of the same keys, so they land in call order
+                previous = {self._pending_writes[key] for key in keys if key in self._pending_writes}
+                task = asyncio.create_task(self._write_lower_layers(lower_writes, after=previous))
+                self._write_behind_tasks.add(task)
+                for key in keys:
+                    self._pending_writes[key] = task
+                task.add_done_callback(lambda done: self._write_behind_done(done, keys))
+            else:
+                await self._wait_pending_writes(keys)
+                await self._write_lower_layers(lower_writes)
+        
+        return stored
+    
+    async def _write_lower_layers(self, writes: List[Any], after: Optional[set] = None):
+        if after:
+            await asyncio.gather(*after, return_exceptions=True)
+        results = await asyncio.gather(*writes, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                self.write_behind_failures += 1
+                logger.error(f"Write-behind to lower cache layer failed: {result}")
+    
+    def _write_behind_done(self, task: asyncio.Task, keys: List[str]):
+        self._write_behind_tasks.discard(task)
+        for key in keys:
+            if self._pending_writes.get(key) is task:
+                del self._pending_writes[key]
+    
+    async def _wait_pending_writes(self, keys: List[str]):
+        """Wait for the pending write-behind writes of these keys"""
+        tasks = {self._pending_writes[key] for key in keys if key in self._pending_writes}
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def flush(self):
+        """Wait for the pending write-behind writes to the lower layers"""
+        while self._write_behind_tasks:
+            await asyncio.gather(*list(self._write_behind_tasks), return_exceptions=True)
+    
+    def _is_negative(self, key: str, now: float) -> bool:
+        """Check if key is known to be missing from every layer"""
+        expires_at = self._negative_cache.get(key)
+        if expires_at is None:
+            return False
+        if expires_at <= now:
+            del self._negative_cache[key]
+            return False
+        return True
+    
+    def _remember_missing(self, keys: List[str]):
+        """Negatively cache keys that were missing from every layer"""
+        if not keys or self.negative_ttl <= 0:
+            return
+        now = time.monotonic()
+        if len(self._negative_cache) + len(keys) > self.max_negative_entries:
+            # Drop expired entries, then the oldest ones (dicts keep insertion order)
+            self._negative_cache = {k: t for k, t in self._negative_cache.items() if t > now}
+            overflow = len(self._negative_cache) + len(keys) - self.max_negative_entries
+            for key in list(islice(self._negative_cache, max(overflow, 0))):
+                del self._negative_cache[key]
+        expires_at = now + self.negative_ttl
+        for key in keys[-self.max_negative_entries:]:
+            self._negative_cache[key] = expires_at
     
     async def delete(self, key: str) -> bool:
         """Delete value from all cache layers"""
+        await self._wait_pending_writes([key])
         results = []
         for layer in self.layers:
             result = await layer.delete(key)
@@ -527,6 +1040,8 @@ class IntelligentCacheSystem:
     
     async def clear(self) -> Dict[str, int]:
         """Clear all cache layers"""
+        await self.flush()
+        self._negative_cache.clear()
         results = {}
         for layer in self.layers:
             count = await layer.clear()
@@ -536,6 +1051,7 @@ class IntelligentCacheSystem:
     
     async def invalidate_by_tags(self, tags: List[str]) -> Dict[str, int]:
         """Invalidate cache entries by tags in all layers"""
+        await self.flush()  # The tagged keys aren't known here, wait for every pending write
         results = {}
         for layer in self.layers:
             if hasattr(layer, 'invalidate_by_tags'):
@@ -570,6 +1086,14 @@ class IntelligentCacheSystem:
                 'total_requests': 0,
                 'avg_access_time_ms': 0
             },
+            'negative_cache': {
+                'entries': len(self._negative_cache),
+                'hits': self.negative_hits
+            },
+            'write_behind': {
+                'pending': len(self._write_behind_tasks),
+                'failures': self.write_behind_failures
+            },
             'optimization_suggestions': self.optimization_suggestions[-10:]  # Last 10 suggestions
         }
         
@@ -598,6 +1122,11 @@ class IntelligentCacheSystem:
             layer = self.layers[i]
             await layer.set(key, value, ttl=self._calculate_promotion_ttl(i))
     
+    async def _promote_cache_entries(self, items: Dict[str, Any], found_at_layer: int):
+        """Promote a batch of cache entries to higher layers"""
+        for i in range(found_at_layer):
+            await self.layers[i].set_many(items, ttl=self._calculate_promotion_ttl(i))
+    
     def _calculate_adaptive_ttl(self, key: str) -> int:
         """Calculate adaptive TTL based on access patterns"""
         # Default TTL values
@@ -605,20 +1134,14 @@ class IntelligentCacheSystem:
         
         # Get access patterns from L1 cache
         l1_layer = self.layers[0]
-        if hasattr(l1_layer, 'access_patterns') and key in l1_layer.access_patterns:
-            accesses = l1_layer.access_patterns[key]
+        if hasattr(l1_layer, 'estimate_access_rate'):
+            frequency = l1_layer.estimate_access_rate(key)  # accesses per second
             
-            if len(accesses) > 1:
-                # Calculate access frequency
-                time_span = accesses[-1] - accesses[0]
-                if time_span > 0:
-                    frequency = len(accesses) / time_span  # accesses per second
-                    
-                    # Higher frequency = longer TTL
-                    if frequency > 0.1:  # More than once per 10 seconds
-                        return base_ttl * 4  # 4 hours
-                    elif frequency > 0.01:  # More than once per 100 seconds
-                        return base_ttl * 2  # 2 hours
+            # Higher frequency = longer TTL
+            if frequency > 0.1:  # More than once per 10 seconds
+                return base_ttl * 4  # 4 hours
+            elif frequency > 0.01:  # More than once per 100 seconds
+                return base_ttl * 2  # 2 hours
         
         return base_ttl
     
@@ -700,6 +1223,14 @@ async def cache_set(key: str, value: Any, ttl: Optional[int] = None, tags: List[
     """Set value in intelligent cache"""
     return await intelligent_cache.set(key, value, ttl, tags)
 
+async def cache_get_many(keys: List[str]) -> Dict[str, Any]:
+    """Get several values from intelligent cache"""
+    return await intelligent_cache.get_many(keys)
+
+async def cache_set_many(items: Dict[str, Any], ttl: Optional[int] = None, tags: List[str] = None) -> int:
+    """Set several values in intelligent cache"""
+    return await intelligent_cache.set_many(items, ttl, tags)
+
 async def cache_delete(key: str) -> bool:
     """Delete value from intelligent cache"""
     return await intelligent_cache.delete(key)
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Result Index
+============
+
+Local SQLite index of the processed video results stored on disk.
+
+The markdown and metadata files under ``youtube_processed_videos`` stay the
+source of truth. The index keeps one row per (video id, category, cache type)
+with the file paths, modification time, size and parsed metadata, so cache
+lookups and result listings don't walk the category directories and reparse
+every metadata JSON on each request.
+
+Writers record their files with ``ResultIndex.record`` right after saving them.
+The index is rebuilt from disk when its database is created, and can be rebuilt
+at any time with ``ResultIndex.rebuild``. Both walk the directories, so async
+applications create the index at startup off the event loop, e.g.
+``await asyncio.to_thread(get_result_index)``. The database runs in WAL mode, so
+readers in other processes are not blocked by writes.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+LEGACY = "legacy"
+ENHANCED = "enhanced"
+
+DEFAULT_CACHE_DIR = "youtube_processed_videos/markdown_analysis"
+DEFAULT_ENHANCED_DIR = "youtube_processed_videos/enhanced_analysis"
+
+_LEGACY_SUFFIX = "_analysis.md"
+_ENHANCED_SUFFIX = "_enhanced.md"
+_METADATA_SUFFIX = "_metadata.json"
+
+
+def _enhanced_video_id(file_name: str, suffix: str) -> Optional[str]:
+    """Video id of an enhanced result file ``{video_id}_{YYYYmmdd}_{HHMMSS}{suffix}``."""
+    if not file_name.endswith(suffix):
+        return None
+    parts = file_name[:-len(suffix)].rsplit("_", 2)
+    return parts[0] if len(parts) == 3 else None
+
+_COLUMNS = (
+    "video_id, category, cache_type, markdown_path, metadata_path, "
+    "modified_at, size_bytes, title, published_at, view_count, metadata"
+)
+
+
+class ResultIndex:
+    """
+    SQLite index of cached video results, keyed by video id and category.
+    Supports point lookups, paginated listings and a full rebuild from disk.
+    """
+
+    def __init__(self,
+                 db_path: Optional[Union[str, Path]] = None,
+                 cache_dir: Union[str, Path] = DEFAULT_CACHE_DIR,
+                 enhanced_dir: Union[str, Path] = DEFAULT_ENHANCED_DIR):
+        """
+        Initialize the result index.
+
+        Args:
+            db_path: SQLite database file, defaults to ``result_index.db`` next to the enhanced directory
+            cache_dir: Legacy markdown_analysis directory
+            enhanced_dir: Enhanced analysis directory
+        """
+        self.cache_dir = Path(cache_dir)
+        self.enhanced_dir = Path(enhanced_dir)
+        self.db_path = Path(db_path) if db_path else self.enhanced_dir.parent / "result_index.db"
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            str(self.db_path), timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+        if self._init_database():
+            self.rebuild()
+
+    def _init_database(self) -> bool:
+        """Create the schema. Returns True if the results table did not exist yet."""
+        with self._lock:
+            created = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'results'"
+            ).fetchone() is None
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS results (
+                    video_id TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    cache_type TEXT NOT NULL,
+                    markdown_path TEXT NOT NULL,
+                    metadata_path TEXT,
+                    modified_at REAL NOT NULL,
+                    size_bytes INTEGER NOT NULL DEFAULT 0,
+                    title TEXT,
+                    published_at TEXT,
+                    view_count,
+                    metadata TEXT,
+                    PRIMARY KEY (video_id, category, cache_type)
+                )
+            ''')
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_results_listing "
+                "ON results (cache_type, modified_at DESC)"
+            )
+            return created
+
+    @staticmethod
+    def _load_metadata(metadata_path: Optional[Path]) -> Dict[str, Any]:
+        if not metadata_path or not metadata_path.exists():
+            return {}
+        try:
+            with open(metadata_path, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+            return metadata if isinstance(metadata, dict) else {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Failed to parse metadata file {metadata_path}: {e}")
+            return {}
+
+    @staticmethod
+    def _row_values(video_id: str, category: str, cache_type: str,
+                    markdown_path: Path, metadata_path: Optional[Path],
+                    metadata: Dict[str, Any]) -> tuple:
+        stat = markdown_path.stat()
+        snippet = metadata.get("snippet") or {}
+        statistics = metadata.get("statistics") or {}
+        view_count = metadata.get("view_count") or statistics.get("viewCount")
+        return (
+            video_id,
+            category,
+            cache_type,
+            str(markdown_path),
+            str(metadata_path) if metadata_path else None,
+            stat.st_mtime,
+            stat.st_size,
+            metadata.get("title") or snippet.get("title"),
+            metadata.get("published_at") or snippet.get("publishedAt"),
+            view_count if isinstance(view_count, (int, float, str)) else None,
+            json.dumps(metadata, default=str),
+        )
+
+    def record(self, video_id: str, category: str, cache_type: str,
+               markdown_path: Union[str, Path],
+               metadata_path: Optional[Union[str, Path]] = None,
+               metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Add or update the index entry of a result that was just written to disk.
+
+        Enhanced results are saved with a timestamp in their file name; an older
+        file never replaces the entry of a newer one.
+
+        Args:
+            video_id: YouTube video ID
+            category: Category directory name
+            cache_type: ``LEGACY`` or ``ENHANCED``
+            markdown_path: Saved markdown file
+            metadata_path: Saved metadata JSON file, if any
+            metadata: Metadata dict, read from metadata_path when omitted
+
+        Returns:
+            True if the entry was recorded
+        """
+        try:
+            markdown_path = Path(markdown_path)
+            metadata_path = Path(metadata_path) if metadata_path else None
+            if metadata is None:
+                metadata = self._load_metadata(metadata_path)
+            values = self._row_values(
+                video_id, category, cache_type, markdown_path, metadata_path, metadata
+            )
+            with self._lock:
+                self._conn.execute(
+                    f"INSERT INTO results ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (video_id, category, cache_type) DO UPDATE SET "
+                    "markdown_path = excluded.markdown_path, "
+                    "metadata_path = excluded.metadata_path, "
+                    "modified_at = excluded.modified_at, "
+                    "size_bytes = excluded.size_bytes, "
+                    "title = excluded.title, "
+                    "published_at = excluded.published_at, "
+                    "view_count = excluded.view_count, "
+                    "metadata = excluded.metadata "
+                    "WHERE excluded.markdown_path >= results.markdown_path",
+                    values,
+                )
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to index result {markdown_path}: {e}")
+            return False
+
+    @staticmethod
+    def _to_entry(row: sqlite3.Row) -> Dict[str, Any]:
+        entry = dict(row)
+        entry["metadata"] = json.loads(entry["metadata"]) if entry["metadata"] else {}
+        return entry
+
+    def lookup(self, video_id: str, cache_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get the most recent entry of a video.
+
+        Entries whose markdown file no longer exists are dropped from the index.
+
+        Args:
+            video_id: YouTube video ID
+            cache_type: Restrict to ``LEGACY`` or ``ENHANCED`` entries
+
+        Returns:
+            Entry dict (with parsed ``metadata``) or None if not indexed
+        """
+        query = f"SELECT {_COLUMNS} FROM results WHERE video_id = ?"
+        params: list = [video_id]
+        if cache_type:
+            query += " AND cache_type = ?"
+            params.append(cache_type)
+        query += " ORDER BY modified_at DESC"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        for row in rows:
+            if Path(row["markdown_path"]).exists():
+                return self._to_entry(row)
+            self._delete(row["video_id"], row["category"], row["cache_type"])
+        return None
+
+    def list(self, cache_type: Optional[str] = ENHANCED, category: Optional[str] = None,
+             limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        List entries, most recently modified first.
+
+        Args:
+            cache_type: Restrict to ``LEGACY`` or ``ENHANCED`` entries, None for both
+            category: Restrict to one category
+            limit: Maximum number of entries, None for all
+            offset: Number of entries to skip
+
+        Returns:
+            List of entry dicts (with parsed ``metadata``)
+        """
+        query, params = self._filtered(f"SELECT {_COLUMNS} FROM results", cache_type, category)
+        query += " ORDER BY modified_at DESC LIMIT ? OFFSET ?"
+        params.extend([-1 if limit is None else max(limit, 0), max(offset, 0)])
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [self._to_entry(row) for row in rows]
+
+    def count(self, cache_type: Optional[str] = ENHANCED, category: Optional[str] = None) -> int:
+        """Count the entries matching the same filters as ``list``."""
+        query, params = self._filtered("SELECT COUNT(*) FROM results", cache_type, category)
+        with self._lock:
+            return self._conn.execute(query, params).fetchone()[0]
+
+    @staticmethod
+    def _filtered(query: str, cache_type: Optional[str], category: Optional[str]) -> tuple:
+        clauses, params = [], []
+        if cache_type:
+            clauses.append("cache_type = ?")
+            params.append(cache_type)
+        if category:
+            clauses.append("category = ?")
+            params.append(category)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        return query, params
+
+    def category_stats(self) -> List[Dict[str, Any]]:
+        """
+        Aggregate the entries per cache type and category.
+
+        Returns:
+            List of dicts with cache_type, category, count, size_bytes, oldest and newest
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT cache_type, category, COUNT(*) AS count, SUM(size_bytes) AS size_bytes, "
+                "MIN(modified_at) AS oldest, MAX(modified_at) AS newest "
+                "FROM results GROUP BY cache_type, category ORDER BY cache_type, category"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _delete(self, video_id: str, category: str, cache_type: str):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM results WHERE video_id = ? AND category = ? AND cache_type = ?",
+                (video_id, category, cache_type),
+            )
+
+    def remove(self, video_id: str, cache_type: Optional[str] = None):
+        """Remove all entries of a video, optionally only of one cache type."""
+        query = "DELETE FROM results WHERE video_id = ?"
+        params: list = [video_id]
+        if cache_type:
+            query += " AND cache_type = ?"
+            params.append(cache_type)
+        with self._lock:
+            self._conn.execute(query, params)
+
+    def clear(self, cache_type: Optional[str] = None):
+        """Remove all entries, optionally only of one cache type."""
+        query, params = self._filtered("DELETE FROM results", cache_type, None)
+        with self._lock:
+            self._conn.execute(query, params)
+
+    def _scan(self) -> List[tuple]:
+        """Walk both cache directories and build the rows of every result on disk."""
+        rows = []
+
+        if self.cache_dir.exists():
+            for category_dir in self.cache_dir.iterdir():
+                if not category_dir.is_dir():
+                    continue
+                for md_file in category_dir.glob(f"*{_LEGACY_SUFFIX}"):
+                    video_id = md_file.name[:-len(_LEGACY_SUFFIX)]
+                    metadata_file = category_dir / f"{video_id}{_METADATA_SUFFIX}"
+                    if not metadata_file.exists():
+                        metadata_file = None
+                    rows.append(self._row_values(
+                        video_id, category_dir.name, LEGACY, md_file, metadata_file,
+                        self._load_metadata(metadata_file),
+                    ))
+
+        if self.enhanced_dir.exists():
+            for category_dir in self.enhanced_dir.iterdir():
+                if not category_dir.is_dir():
+                    continue
+                # {video_id}_{YYYYmmdd}_{HHMMSS}_enhanced.md, keep the latest per video.
+                # Video ids may contain "_", so they are split from the right
+                latest: Dict[str, Path] = {}
+                for md_file in sorted(category_dir.glob(f"*{_ENHANCED_SUFFIX}")):
+                    video_id = _enhanced_video_id(md_file.name, _ENHANCED_SUFFIX)
+                    if video_id:
+                        latest[video_id] = md_file
+                for video_id, md_file in latest.items():
+                    metadata_file = md_file.with_name(
+                        md_file.name[:-len(_ENHANCED_SUFFIX)] + _METADATA_SUFFIX
+                    )
+                    if not metadata_file.exists():
+                        # The glob also matches the ids that start with this one
+                        metadata_file = next(iter(sorted(
+                            (path for path in category_dir.glob(f"{video_id}_*{_METADATA_SUFFIX}")
+                             if _enhanced_video_id(path.name, _METADATA_SUFFIX) == video_id),
+                            reverse=True,
+                        )), None)
+                    rows.append(self._row_values(
+                        video_id, category_dir.name, ENHANCED, md_file, metadata_file,
+                        self._load_metadata(metadata_file),
+                    ))
+
+        return rows
+
+    def rebuild(self) -> int:
+        """
+        Rebuild the whole index from the files on disk.
+
+        Returns:
+            Number of indexed results
+        """
+        start_time = time.time()
+        rows = self._scan()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM results")
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO results ({_COLUMNS}) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        logger.info(f"📇 Rebuilt result index with {len(rows)} entries in {time.time() - start_time:.2f}s")
+        return len(rows)
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+_indexes: Dict[Path, ResultIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_result_index(db_path: Optional[Union[str, Path]] = None,
+                     cache_dir: Union[str, Path] = DEFAULT_CACHE_DIR,
+                     enhanced_dir: Union[str, Path] = DEFAULT_ENHANCED_DIR) -> ResultIndex:
+    """
+    Get the shared ResultIndex of a database file, creating it on first use.
+
+    Creating it may rebuild it from disk: from async code, call it once at startup
+    with ``asyncio.to_thread``, later calls return the same index.
+    """
+    path = Path(db_path) if db_path else Path(enhanced_dir).parent / "result_index.db"
+    key = path.resolve()
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = ResultIndex(path, cache_dir=cache_dir, enhanced_dir=enhanced_dir)
+            _indexes[key] = index
+        return index
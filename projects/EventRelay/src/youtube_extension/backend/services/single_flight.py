@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Single-Flight Request Coalescing
+================================
+
+Makes concurrent callers asking for the same work share a single in-flight job.
+
+When a popular video is requested many times at once, only the first caller
+(the leader) starts the processing pipeline; every other caller with the same
+key awaits the leader's job and gets the same result or exception. Once the job
+is finished the key is released, so later requests go through the normal
+cache lookup again.
+
+The job runs in its own task: a caller that disconnects or is cancelled does
+not cancel the job for the others. Lifecycle events (started, joined, completed,
+failed) can be published, e.g. to the WebSocket connection manager, so every
+waiter can follow the progress of the shared job. Events are sent from their own
+tasks, so a slow broadcast never delays the callers or the job's result.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from youtube_extension.utils import extract_video_id
+
+logger = logging.getLogger(__name__)
+
+ProgressPublisher = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def video_job_key(video_url: str, **options: Any) -> str:
+    """
+    Build the single-flight key of a video job.
+
+    The URL is normalized to its video ID, so different URL forms of the same
+    video share a job. Options that change the result are part of the key.
+
+    Args:
+        video_url: YouTube video URL or video ID
+        **options: Job options, e.g. ``kind="process_video"``
+
+    Returns:
+        Key string such as ``auJzb1D-fag|kind=process_video``
+    """
+    try:
+        video_id = extract_video_id(video_url)
+    except ValueError:
+        video_id = (video_url or "").strip()
+    parts = [video_id] + [f"{name}={options[name]}" for name in sorted(options)]
+    return "|".join(parts)
+
+
+class _Flight:
+    """A job in flight and the callers waiting for it."""
+
+    __slots__ = ("key", "task", "started_at", "waiters")
+
+    def __init__(self, key: str, task: asyncio.Task):
+        self.key = key
+        self.task = task
+        self.started_at = time.time()
+        self.waiters = 1
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one execution.
+
+    Example:
+        flights = SingleFlight(publish=manager.broadcast_json)
+        key = video_job_key(video_url, kind="process_video")
+        result = await flights.run(key, lambda: processor.process_video(video_url))
+    """
+
+    def __init__(self, publish: Optional[ProgressPublisher] = None):
+        """
+        Initialize the coalescer.
+
+        Args:
+            publish: Coroutine called with the progress event dicts of every job
+        """
+        self.publish = publish
+        self._flights: Dict[str, _Flight] = {}
+        # Publishing tasks in progress, referenced so they are not garbage collected
+        self._publish_tasks: Set[asyncio.Task] = set()
+
+        # Stats
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.max_waiters = 0
+
+    def in_flight(self, key: str) -> bool:
+        """Check if a job is currently running for a key."""
+        return key in self._flights
+
+    async def run(self, key: str, job: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``job`` for ``key``, or wait for the job already running for it.
+
+        Args:
+            key: Single-flight key, see ``video_job_key``
+            job: Zero-argument coroutine function doing the actual work
+
+        Returns:
+            The job's result, shared by every caller of the same flight
+
+        Raises:
+            Exception: Whatever the job raised, for every caller of the flight
+        """
+        self.calls += 1
+        flight = self._flights.get(key)
+
+        if flight is None:
+            self.executions += 1
+            task = asyncio.create_task(self._execute(key, job))
+            flight = _Flight(key, task)
+            self._flights[key] = flight
+            task.add_done_callback(lambda _: self._release(flight))
+            self._publish(flight, "started")
+        else:
+            self.coalesced += 1
+            flight.waiters += 1
+            self.max_waiters = max(self.max_waiters, flight.waiters)
+            logger.info(f"🔗 Joined in-flight job {key} ({flight.waiters} waiters)")
+            self._publish(flight, "joined")
+
+        # Shielded: a cancelled caller must not cancel the job of the other waiters
+        return await asyncio.shield(flight.task)
+
+    async def _execute(self, key: str, job: Callable[[], Awaitable[Any]]) -> Any:
+        flight = None
+        try:
+            result = await job()
+        except Exception as e:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self._publish(flight, "failed", error=str(e))
+            raise
+        flight = self._flights.get(key)
+        if flight is not None:
+            self._publish(flight, "completed")
+        return result
+
+    def _release(self, flight: _Flight):
+        if self._flights.get(flight.key) is flight:
+            del self._flights[flight.key]
+        # Retrieve the exception so it's not reported as never retrieved
+        # when every waiter was cancelled
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+    def _publish(self, flight: _Flight, stage: str, **extra: Any):
+        """Send a progress event from its own task, without waiting for it."""
+        if self.publish is None:
+            return
+        event = {
+            "type": "video_processing_progress",
+            "job_key": flight.key,
+            "stage": stage,
+            "waiters": flight.waiters,
+            "elapsed_seconds": round(time.time() - flight.started_at, 3),
+            "timestamp": time.time(),
+            **extra,
+        }
+        task = asyncio.create_task(self._send(event))
+        self._publish_tasks.add(task)
+        task.add_done_callback(self._publish_tasks.discard)
+
+    async def _send(self, event: Dict[str, Any]):
+        try:
+            await self.publish(event)
+        except Exception as e:
+            logger.warning(f"Failed to publish progress of {event['job_key']}: {e}")
+
+    async def drain(self):
+        """Wait for the progress events being published, e.g. before shutdown."""
+        while self._publish_tasks:
+            await asyncio.gather(*self._publish_tasks, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get coalescing statistics.
+
+        Returns:
+            Dict with calls, executions, coalesced calls, hit rate and in-flight jobs
+        """
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "hit_rate": round(self.coalesced / self.calls, 4) if self.calls else 0.0,
+            "in_flight": len(self._flights),
+            "max_waiters": self.max_waiters,
+        }
@@ -9,6 +9,7 @@ consolidated from the previous `optimized_video_processor`,
 """
 
 import asyncio
+import functools
 import json
 import logging
 import os
@@ -16,9 +17,10 @@ import sys
 import time
 import hashlib
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Union, Callable, Awaitable, Tuple
 from pathlib import Path
 from urllib.parse import urlparse, parse_qs
+from concurrent.futures import ThreadPoolExecutor
 import re
 import httpx
 
@@ -118,6 +120,56 @@ class VideoContent:
     processing_stage: ProcessingStage = ProcessingStage.EXTRACTION
     processing_time: float = 0.0
     error_log: List[str] = None
+    stage_timings: Dict[str, float] = None
+
+@dataclass
+class PipelineStage:
+    """A stage of a processing pipeline and the stages it depends on"""
+    name: str
+    run: Callable[[Dict[str, Any]], Awaitable[Any]]  # Called with the results of its dependencies
+    depends_on: Tuple[str, ...] = ()
+    timeout: Optional[float] = None
+
+async def run_stage_graph(stages: List[PipelineStage], timings: Dict[str, float]) -> Dict[str, Any]:
+    """
+    Run pipeline stages as a dependency graph.
+
+    Every stage starts as soon as the stages it depends on are done, so
+    independent stages run concurrently. A stage exceeding its timeout raises
+    asyncio.TimeoutError. The first failing stage cancels the stages still
+    running and its exception is raised.
+
+    Args:
+        stages: Stages of the pipeline, dependencies must be part of the list
+        timings: Filled with the duration in seconds of every finished stage
+
+    Returns:
+        Dict of stage name to stage result
+    """
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def run_stage(stage: PipelineStage) -> Any:
+        inputs = {name: await tasks[name] for name in stage.depends_on}
+        start_time = time.time()
+        try:
+            return await asyncio.wait_for(stage.run(inputs), timeout=stage.timeout)
+        except asyncio.TimeoutError:
+            raise asyncio.TimeoutError(f"Stage {stage.name} timed out after {stage.timeout}s")
+        finally:
+            timings[stage.name] = round(time.time() - start_time, 3)
+
+    for stage in stages:
+        tasks[stage.name] = asyncio.ensure_future(run_stage(stage))
+
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+
+    return {name: task.result() for name, task in tasks.items()}
 
 from abc import ABC, abstractmethod
 
@@ -315,9 +367,25 @@ class EnhancedStrategy(ProcessorStrategy):
     """
     An enhanced video processing strategy that extracts metadata,
     transcript, and performs AI analysis.
+
+    The steps run as a stage graph: metadata and transcript extraction run
+    concurrently and the analysis starts as soon as the transcript is ready.
+    Blocking SDK calls (Video Intelligence, Gemini) run on a bounded thread
+    pool, never on the event loop, and every stage has its own timeout.
     """
+    DEFAULT_STAGE_TIMEOUTS = {
+        "metadata": 90.0,
+        "transcript": 180.0,
+        "analysis": 120.0,
+    }
+
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         self.config = config or {}
+        self.stage_timeouts = {**self.DEFAULT_STAGE_TIMEOUTS, **self.config.get("stage_timeouts", {})}
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.config.get("max_blocking_calls", 8),
+            thread_name_prefix="enhanced-strategy"
+        )
         if HAS_VIDEO_DEPS:
             self.video_client = videointelligence.VideoIntelligenceServiceClient()
         if HAS_AI_DEPS:
@@ -326,9 +394,32 @@ class EnhancedStrategy(ProcessorStrategy):
                 raise ValueError("Gemini API key is not configured.")
             genai.configure(api_key=gemini_api_key)
             self.gemini_model = genai.GenerativeModel('gemini-pro')
+
+    async def _run_blocking(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking call on the bounded executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def _annotate_video(self, request, timeout: float):
+        """Run a Video Intelligence annotation off the event loop, cancelling it if we stop waiting"""
+        operation = await self._run_blocking(self.video_client.annotate_video, request=request)
+        try:
+            return await self._run_blocking(operation.result, timeout=timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            # Don't keep paying for an annotation nobody waits for
+            self._executor.submit(operation.cancel)
+            raise
+
+    def close(self):
+        """Release the executor threads"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
     async def process_video(self, video_url: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
         """Complete video processing pipeline"""
         start_time = time.time()
+        options = options or {}
+        video_id = None
+        stage_timings: Dict[str, float] = {}
         
         try:
             # Extract video ID
@@ -338,32 +429,45 @@ class EnhancedStrategy(ProcessorStrategy):
             
             logger.info(f"Processing video: {video_id}")
             
-            # Extract metadata
-            metadata = await self.extract_video_metadata(video_id)
-            
-            # Extract transcript
-            transcript = await self.extract_transcript(video_id, options.get("languages"))
-            
-            # Analyze content
-            analysis = await self.analyze_content(transcript)
+            results = await run_stage_graph([
+                PipelineStage(
+                    "metadata",
+                    lambda _: self.extract_video_metadata(video_id),
+                    timeout=self.stage_timeouts["metadata"]
+                ),
+                PipelineStage(
+                    "transcript",
+                    lambda _: self.extract_transcript(video_id, options.get("languages")),
+                    timeout=self.stage_timeouts["transcript"]
+                ),
+                PipelineStage(
+                    "analysis",
+                    lambda inputs: self.analyze_content(inputs["transcript"]),
+                    depends_on=("transcript",),
+                    timeout=self.stage_timeouts["analysis"]
+                ),
+            ], stage_timings)
+            analysis = results["analysis"]
             
             # Create video content object
             content = VideoContent(
-                metadata=metadata,
-                transcript=transcript,
+                metadata=results["metadata"],
+                transcript=results["transcript"],
                 summary=analysis.get('summary'),
                 key_points=analysis.get('key_points', []),
                 topics=analysis.get('topics', []),
                 sentiment=analysis.get('sentiment'),
                 processing_stage=ProcessingStage.COMPLETE,
-                processing_time=time.time() - start_time
+                processing_time=time.time() - start_time,
+                stage_timings=stage_timings
             )
             
-            logger.info(f"Successfully processed video {video_id} in {content.processing_time:.2f}s")
+            logger.info(f"Successfully processed video {video_id} in {content.processing_time:.2f}s (stages: {stage_timings})")
             return asdict(content)
             
         except Exception as e:
-            logger.info(f"Video processing failed for {video_url}: {e}")
+            error = str(e) or type(e).__name__
+            logger.info(f"Video processing failed for {video_url}: {error} (stages: {stage_timings})")
             
             # Return partial content with error
             content = VideoContent(
@@ -379,7 +483,8 @@ class EnhancedStrategy(ProcessorStrategy):
                 transcript=[],
                 processing_stage=ProcessingStage.EXTRACTION,
                 processing_time=time.time() - start_time,
-                error_log=[str(e)]
+                error_log=[error],
+                stage_timings=stage_timings
             )
             
             return asdict(content)
@@ -402,8 +507,7 @@ class EnhancedStrategy(ProcessorStrategy):
             features=features,
         )
 
-        operation = self.video_client.annotate_video(request=request)
-        result = operation.result(timeout=90)
+        result = await self._annotate_video(request, timeout=self.stage_timeouts["metadata"])
         
         annotation_results = result.annotation_results[0]
         
@@ -441,8 +545,7 @@ class EnhancedStrategy(ProcessorStrategy):
             video_context=video_context,
         )
 
-        operation = self.video_client.annotate_video(request=request)
-        result = operation.result(timeout=180)
+        result = await self._annotate_video(request, timeout=self.stage_timeouts["transcript"])
 
         segments = []
         for result in result.annotation_results:
@@ -480,7 +583,7 @@ class EnhancedStrategy(ProcessorStrategy):
         """
         
         try:
-            response = self.gemini_model.generate_content(prompt)
+            response = await self._run_blocking(self.gemini_model.generate_content, prompt)
             return json.loads(response.text)
         except Exception as e:
             logger.error(f"Content analysis failed: {e}")
@@ -0,0 +1,71 @@
+"""
+Tests for the DataService listings backed by the result index
+"""
+
+import json
+import os
+
+import pytest
+
+from src.youtube_extension.backend.services.data_service import DataService
+from src.youtube_extension.backend.services.result_index import ResultIndex
+
+
+def _enhanced(root, category, video_id, stamp, title, mtime):
+    category_dir = root / "enhanced_analysis" / category
+    category_dir.mkdir(parents=True, exist_ok=True)
+    markdown = category_dir / f"{video_id}_{stamp}_enhanced.md"
+    markdown.write_text(f"# {title}", encoding="utf-8")
+    os.utime(markdown, (mtime, mtime))
+    (category_dir / f"{video_id}_{stamp}_metadata.json").write_text(
+        json.dumps({"snippet": {"title": title}, "statistics": {"viewCount": "42"}}), encoding="utf-8"
+    )
+    return markdown
+
+
+@pytest.fixture
+def service(tmp_path):
+    _enhanced(tmp_path, "tech", "abc_def", "20240101_000000", "Old", 1_700_000_000)
+    _enhanced(tmp_path, "tech", "abc_def", "20240201_000000", "New", 1_700_000_002)
+    _enhanced(tmp_path, "music", "xyz", "20240101_000000", "Xyz", 1_700_000_001)
+    index = ResultIndex(
+        tmp_path / "result_index.db",
+        cache_dir=tmp_path / "markdown_analysis",
+        enhanced_dir=tmp_path / "enhanced_analysis",
+    )
+    yield DataService(
+        enhanced_analysis_dir=str(tmp_path / "enhanced_analysis"),
+        feedback_dir=str(tmp_path / "feedback"),
+        index=index,
+    )
+    index.close()
+
+
+def test_videos_summary_lists_latest_result_per_video(service):
+    """Test that each video is listed once, with its newest result, most recent first"""
+    videos = service.get_videos_summary()
+    assert [(v["video_id"], v["title"]) for v in videos] == [("abc_def", "New"), ("xyz", "Xyz")]
+    assert videos[0]["view_count"] == "42"
+    assert service.count_videos() == 2
+    assert [v["video_id"] for v in service.get_videos_summary(limit=1, offset=1)] == ["xyz"]
+    assert [e["video_id"] for e in service.get_learning_log(limit=1)] == ["abc_def"]
+
+
+def test_video_detail_and_statistics(service):
+    """Test the detail of an underscored video id and the per category statistics"""
+    detail = service.get_video_detail("abc_def")
+    assert detail["markdown"] == "# New"
+    assert detail["metadata"]["snippet"]["title"] == "New"
+    assert service.get_video_detail("abc") is None
+
+    stats = service.get_data_statistics()
+    assert stats["enhanced_videos"] == 2
+    assert {name: c["count"] for name, c in stats["categories"].items()} == {"music": 1, "tech": 1}
+
+
+def test_cleanup_drops_removed_results_from_the_index(service):
+    """Test that results deleted by the cleanup are no longer listed"""
+    summary = service.cleanup_old_data(days_old=0)
+    assert summary["files_removed"] == 6
+    assert service.get_videos_summary() == []
+    assert service.get_data_statistics()["enhanced_videos"] == 0
@@ -0,0 +1,323 @@
+"""
+Tests for the batched multi-layer operations of the intelligent cache
+"""
+
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("redis")
+
+from src.youtube_extension.backend.services.intelligent_cache import (
+    AccessFrequencySketch,
+    CacheEntry,
+    IntelligentCacheSystem,
+    _CacheShard,
+)
+
+
+class FakeRedisPipeline:
+    """Queues commands and runs them on the fake client in one round trip"""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self):
+        self.client.round_trips += 1
+        await asyncio.sleep(self.client.latency)
+        return [getattr(self.client, f"_{name}")(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class FakeRedis:
+    """In-process Redis client supporting the commands used by the cache layer"""
+
+    def __init__(self):
+        self.data = {}
+        self.hashes = {}
+        self.sets = {}
+        self.ttls = {}
+        self.round_trips = 0
+        self.latency = 0
+
+    def pipeline(self, transaction=True):
+        return FakeRedisPipeline(self)
+
+    async def ping(self):
+        self.round_trips += 1
+        return True
+
+    async def get(self, name):
+        self.round_trips += 1
+        return self.data.get(name)
+
+    async def mget(self, keys):
+        self.round_trips += 1
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, name, value):
+        self.round_trips += 1
+        return self._set(name, value)
+
+    async def setex(self, name, ttl, value):
+        self.round_trips += 1
+        return self._setex(name, ttl, value)
+
+    async def hset(self, name, key=None, value=None, mapping=None):
+        self.round_trips += 1
+        return self._hset(name, key, value, mapping)
+
+    async def sadd(self, name, *values):
+        self.round_trips += 1
+        return self._sadd(name, *values)
+
+    async def smembers(self, name):
+        self.round_trips += 1
+        return set(self.sets.get(name, ()))
+
+    async def hgetall(self, name):
+        self.round_trips += 1
+        return dict(self.hashes.get(name, {}))
+
+    async def delete(self, *names):
+        self.round_trips += 1
+        deleted = 0
+        for name in names:
+            for store in (self.data, self.hashes, self.sets):
+                deleted += store.pop(name, None) is not None
+        return deleted
+
+    def value(self, key):
+        raw = self.data.get(f"uvai:cache:{key}")
+        return None if raw is None else json.loads(raw)["value"]
+
+    def _set(self, name, value):
+        self.data[name] = value.encode() if isinstance(value, str) else value
+        return True
+
+    def _setex(self, name, ttl, value):
+        self.ttls[name] = ttl
+        return self._set(name, value)
+
+    def _hset(self, name, key=None, value=None, mapping=None):
+        fields = self.hashes.setdefault(name, {})
+        if key is not None:
+            fields[key] = value
+        fields.update(mapping or {})
+        return len(fields)
+
+    def _hincrby(self, name, key, amount=1):
+        fields = self.hashes.setdefault(name, {})
+        fields[key] = int(fields.get(key, 0)) + amount
+        return fields[key]
+
+    def _sadd(self, name, *values):
+        self.sets.setdefault(name, set()).update(values)
+        return len(values)
+
+
+@pytest.fixture
+async def cache():
+    fake = FakeRedis()
+    cache = IntelligentCacheSystem(redis_client=fake)
+    await cache.initialize()
+    fake.round_trips = 0
+    return cache, fake
+
+
+@pytest.mark.asyncio
+async def test_set_many_pipelines_lower_layer_writes(cache):
+    """Test that set_many writes a batch to Redis in one round trip, in the background"""
+    cache, fake = cache
+    items = {f"chunk:{i}": {"text": f"segment {i}"} for i in range(20)}
+
+    stored = await cache.set_many(items, ttl=60)
+    assert stored == 20
+
+    await cache.flush()
+    assert fake.round_trips == 1
+    assert len(fake.data) == 20
+    assert set(fake.ttls.values()) == {60}
+
+
+@pytest.mark.asyncio
+async def test_get_many_uses_single_mget_and_promotes(cache):
+    """Test that L1 misses are fetched with one MGET and promoted to L1"""
+    cache, fake = cache
+    items = {f"meta:{i}": {"id": i} for i in range(10)}
+    await cache.set_many(items, ttl=60, write_behind=False)
+    await cache.layers[0].clear()
+    fake.round_trips = 0
+
+    results = await cache.get_many(list(items))
+    assert results == items
+    # One MGET plus one pipeline for the access stats
+    assert fake.round_trips == 2
+
+    fake.round_trips = 0
+    assert await cache.get_many(list(items)) == items
+    assert fake.round_trips == 0
+
+
+@pytest.mark.asyncio
+async def test_missing_keys_are_not_negatively_cached_by_default(cache):
+    """Test that without negative_ttl every lookup of a missing key reaches Redis"""
+    cache, fake = cache
+    assert await cache.get_many(["absent"]) == {}
+    assert await cache.get("absent") is None
+    assert fake.round_trips == 2
+    assert cache.negative_hits == 0
+
+
+@pytest.mark.asyncio
+async def test_missing_keys_are_negatively_cached():
+    """Test that with negative_ttl keys missing from every layer don't hit Redis again"""
+    fake = FakeRedis()
+    cache = IntelligentCacheSystem(redis_client=fake, negative_ttl=30)
+    await cache.initialize()
+    await cache.set_many({"present": 1}, ttl=60, write_behind=False)
+    fake.round_trips = 0
+
+    assert await cache.get_many(["present", "absent:1", "absent:2"]) == {"present": 1}
+    assert fake.round_trips == 1
+
+    fake.round_trips = 0
+    assert await cache.get_many(["absent:1", "absent:2"]) == {}
+    assert await cache.get("absent:1") is None
+    assert fake.round_trips == 0
+    assert cache.negative_hits == 3
+
+    # Setting a key clears its negative entry
+    await cache.set_many({"absent:1": "now here"}, ttl=60)
+    assert await cache.get_many(["absent:1"]) == {"absent:1": "now here"}
+
+
+@pytest.mark.asyncio
+async def test_delete_after_set_many_is_not_undone_by_write_behind(cache):
+    """Test that a delete waits for the pending background write of its key"""
+    cache, fake = cache
+    fake.latency = 0.01
+
+    await cache.set_many({"k": "v1"}, ttl=60)
+    assert await cache.delete("k")
+    await cache.flush()
+    assert fake.value("k") is None
+
+    await cache.layers[0].clear()
+    assert await cache.get("k") is None
+
+
+@pytest.mark.asyncio
+async def test_set_after_set_many_is_not_overwritten_by_write_behind(cache):
+    """Test that background writes of a key land in call order"""
+    cache, fake = cache
+    fake.latency = 0.01
+
+    await cache.set_many({"j": "old"}, ttl=60)
+    await cache.set("j", "new", ttl=60)
+    await cache.flush()
+    assert fake.value("j") == "new"
+
+    await cache.set_many({"j": "first"}, ttl=60)
+    await cache.set_many({"j": "second"}, ttl=60)
+    await cache.flush()
+    assert fake.value("j") == "second"
+    assert not cache._pending_writes
+
+
+@pytest.mark.asyncio
+async def test_invalidate_by_tags_waits_for_write_behind(cache):
+    """Test that a pending background write of a tagged key can't outlive its invalidation"""
+    cache, fake = cache
+    fake.latency = 0.01
+
+    await cache.set_many({"t": "tagged"}, ttl=60, tags=["video"])
+    await cache.invalidate_by_tags(["video"])
+    await cache.flush()
+    assert fake.value("t") is None
+
+
+def _entry(key, size_bytes=1):
+    now = datetime.now(timezone.utc)
+    return CacheEntry(key=key, value=key, created_at=now, expires_at=None, size_bytes=size_bytes)
+
+
+def test_lru_shard_evicts_least_recently_used():
+    """Test that an LRU shard evicts the entry that was accessed least recently"""
+    shard = _CacheShard(max_entries=3, max_size_bytes=1000, eviction_policy="lru")
+    for key in ("a", "b", "c"):
+        shard.put(_entry(key))
+    shard.get("a", datetime.now(timezone.utc))
+
+    assert shard.put(_entry("d")) == 1
+    assert list(shard.entries) == ["c", "a", "d"]
+    assert shard.evictions == 1
+
+
+def test_lfu_shard_evicts_least_frequently_used():
+    """Test that an LFU shard evicts the least used entry, the oldest one on ties"""
+    shard = _CacheShard(max_entries=3, max_size_bytes=1000, eviction_policy="lfu")
+    now = datetime.now(timezone.utc)
+    for key in ("a", "b", "c"):
+        shard.put(_entry(key))
+    for _ in range(3):
+        shard.get("a", now)
+    shard.get("b", now)
+
+    shard.put(_entry("d"))
+    assert set(shard.entries) == {"a", "b", "d"}
+
+    # Once d is used more than b, b is evicted
+    shard.get("d", now)
+    shard.get("d", now)
+    shard.put(_entry("e"))
+    assert set(shard.entries) == {"a", "d", "e"}
+
+    # Ties go to the entry that reached the frequency first
+    shard.get("e", now)
+    shard.get("e", now)
+    shard.put(_entry("f"))
+    assert set(shard.entries) == {"a", "e", "f"}
+
+
+def test_shard_evicts_to_fit_size_budget():
+    """Test that a shard evicts entries until the new one fits in its byte budget"""
+    shard = _CacheShard(max_entries=10, max_size_bytes=100, eviction_policy="lru")
+    for key in ("a", "b", "c"):
+        shard.put(_entry(key, size_bytes=30))
+
+    assert shard.put(_entry("d", size_bytes=50)) == 2
+    assert list(shard.entries) == ["c", "d"]
+    assert shard.size_bytes == 80
+
+
+def test_access_frequency_sketch_counts_and_decays():
+    """Test the estimates, rates and decay of the access sketch"""
+    sketch = AccessFrequencySketch(width=256, depth=4, window_seconds=10.0)
+    start = sketch._started_at
+    for i in range(8):
+        sketch.add("hot", now=start + i * 0.5)
+    sketch.add("cold", now=start + 1)
+
+    assert sketch.estimate("hot") >= 8
+    assert sketch.estimate("missing") <= sketch.estimate("hot")
+    assert sketch.rate("cold", now=start + 4) == 0.0
+    assert sketch.rate("hot", now=start + 4) == pytest.approx(8 / 4, rel=0.5)
+
+    # Every window halves the counts
+    hot = sketch.estimate("hot")
+    sketch.add("other", now=start + 10)
+    assert sketch.estimate("hot") == hot // 2
+
+    sketch.remove("hot")
+    assert sketch.estimate("hot") == 0
+    sketch.clear()
+    assert sketch.estimate("cold") == 0
@@ -0,0 +1,137 @@
+"""
+Tests for the SQLite index of the processed video results
+"""
+
+import json
+import os
+
+import pytest
+
+from src.youtube_extension.backend.services.result_index import ENHANCED, LEGACY, ResultIndex
+
+
+def _write(path, content, mtime=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+def _legacy(root, category, video_id, title, mtime=None):
+    category_dir = root / "markdown_analysis" / category
+    markdown = _write(category_dir / f"{video_id}_analysis.md", f"# {title}", mtime)
+    metadata = _write(category_dir / f"{video_id}_metadata.json", json.dumps({"title": title}))
+    return markdown, metadata
+
+
+def _enhanced(root, category, video_id, stamp, title, mtime=None):
+    category_dir = root / "enhanced_analysis" / category
+    markdown = _write(category_dir / f"{video_id}_{stamp}_enhanced.md", f"# {title}", mtime)
+    metadata = _write(category_dir / f"{video_id}_{stamp}_metadata.json",
+                      json.dumps({"snippet": {"title": title, "publishedAt": "2024-01-01"}}))
+    return markdown, metadata
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = ResultIndex(
+        tmp_path / "result_index.db",
+        cache_dir=tmp_path / "markdown_analysis",
+        enhanced_dir=tmp_path / "enhanced_analysis",
+    )
+    yield index
+    index.close()
+
+
+def test_record_and_lookup(index, tmp_path):
+    """Test that a recorded result is found with its parsed metadata"""
+    markdown, metadata = _legacy(tmp_path, "education", "dQw4w9WgXcQ", "Legacy")
+    assert index.record("dQw4w9WgXcQ", "education", LEGACY, markdown, metadata)
+
+    entry = index.lookup("dQw4w9WgXcQ", LEGACY)
+    assert entry["category"] == "education"
+    assert entry["title"] == "Legacy"
+    assert entry["metadata"] == {"title": "Legacy"}
+    assert index.lookup("dQw4w9WgXcQ", ENHANCED) is None
+    assert index.lookup("missing") is None
+
+
+def test_record_keeps_the_newest_enhanced_result(index, tmp_path):
+    """Test that an older enhanced file never replaces the entry of a newer one"""
+    new_markdown, new_metadata = _enhanced(tmp_path, "tech", "abc", "20240102_000000", "New")
+    old_markdown, old_metadata = _enhanced(tmp_path, "tech", "abc", "20240101_000000", "Old")
+
+    index.record("abc", "tech", ENHANCED, new_markdown, new_metadata)
+    index.record("abc", "tech", ENHANCED, old_markdown, old_metadata)
+    assert index.lookup("abc")["title"] == "New"
+
+
+def test_lookup_drops_entries_of_deleted_files(index, tmp_path):
+    """Test that entries whose markdown file is gone are pruned on lookup"""
+    markdown, metadata = _legacy(tmp_path, "education", "gone", "Gone")
+    index.record("gone", "education", LEGACY, markdown, metadata)
+    markdown.unlink()
+
+    assert index.lookup("gone") is None
+    assert index.count(cache_type=None) == 0
+
+
+def test_list_paginates_most_recent_first(index, tmp_path):
+    """Test the order, pagination and filters of listings"""
+    for i in range(5):
+        category = "tech" if i % 2 else "music"
+        markdown, metadata = _enhanced(tmp_path, category, f"video{i}", "20240101_000000",
+                                       f"Video {i}", mtime=1_700_000_000 + i)
+        index.record(f"video{i}", category, ENHANCED, markdown, metadata)
+
+    assert [e["video_id"] for e in index.list()] == ["video4", "video3", "video2", "video1", "video0"]
+    assert [e["video_id"] for e in index.list(limit=2, offset=1)] == ["video3", "video2"]
+    assert [e["video_id"] for e in index.list(category="tech")] == ["video3", "video1"]
+    assert index.list(limit=2, offset=10) == []
+    assert index.count() == 5
+    assert index.count(category="music") == 3
+    assert index.list(cache_type=LEGACY) == []
+
+
+def test_rebuild_from_disk_with_underscored_video_ids(index, tmp_path):
+    """Test that a rebuild finds every result, including video ids containing '_'"""
+    _legacy(tmp_path, "education", "a_b-c_d1234", "Legacy")
+    _enhanced(tmp_path, "tech", "abc", "20240101_000000", "Abc")
+    _enhanced(tmp_path, "tech", "abc_def", "20240101_000000", "Abc def old")
+    newest, _ = _enhanced(tmp_path, "tech", "abc_def", "20240301_120000", "Abc def")
+
+    assert index.rebuild() == 3
+    assert index.lookup("a_b-c_d1234", LEGACY)["title"] == "Legacy"
+    assert index.lookup("abc", ENHANCED)["title"] == "Abc"
+    entry = index.lookup("abc_def", ENHANCED)
+    assert entry["markdown_path"] == str(newest)
+    assert entry["title"] == "Abc def"
+    assert entry["published_at"] == "2024-01-01"
+
+
+def test_rebuild_matches_metadata_of_the_same_video_id(index, tmp_path):
+    """Test that the metadata fallback doesn't pick the file of a longer video id"""
+    category_dir = tmp_path / "enhanced_analysis" / "tech"
+    _write(category_dir / "abc_20240101_000000_enhanced.md", "# Abc")
+    _write(category_dir / "abc_20231231_000000_metadata.json", json.dumps({"title": "Abc"}))
+    _write(category_dir / "abc_def_20240101_000000_metadata.json", json.dumps({"title": "Other"}))
+
+    index.rebuild()
+    assert index.lookup("abc", ENHANCED)["title"] == "Abc"
+
+
+def test_new_database_is_built_from_disk(tmp_path):
+    """Test that creating the index of a new database indexes the existing results"""
+    _legacy(tmp_path, "education", "xyz", "Existing")
+    index = ResultIndex(
+        tmp_path / "result_index.db",
+        cache_dir=tmp_path / "markdown_analysis",
+        enhanced_dir=tmp_path / "enhanced_analysis",
+    )
+    try:
+        assert index.lookup("xyz")["title"] == "Existing"
+        stats = index.category_stats()
+        assert [(s["cache_type"], s["category"], s["count"]) for s in stats] == [(LEGACY, "education", 1)]
+    finally:
+        index.close()
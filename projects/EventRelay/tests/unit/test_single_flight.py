@@ -0,0 +1,117 @@
+"""
+Tests for the single-flight coalescing of concurrent video jobs
+"""
+
+import asyncio
+
+import pytest
+
+from src.youtube_extension.backend.services.single_flight import SingleFlight, video_job_key
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_execution():
+    """Test that callers with the same key share the result of a single job"""
+    flights = SingleFlight()
+    release = asyncio.Event()
+    calls = 0
+
+    async def job():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"video_id": "auJzb1D-fag"}
+
+    callers = [asyncio.create_task(flights.run("key", job)) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert flights.in_flight("key")
+    release.set()
+    results = await asyncio.gather(*callers)
+
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+    assert not flights.in_flight("key")
+    stats = flights.get_stats()
+    assert stats["executions"] == 1
+    assert stats["coalesced"] == 4
+    assert stats["max_waiters"] == 5
+
+
+@pytest.mark.asyncio
+async def test_callers_share_the_exception():
+    """Test that every caller of a failed flight gets its exception, and the key is released"""
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def job():
+        await release.wait()
+        raise RuntimeError("transcript unavailable")
+
+    callers = [asyncio.create_task(flights.run("key", job)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*callers, return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert not flights.in_flight("key")
+
+    # A later call runs a new job
+    async def retry():
+        return "ok"
+
+    assert await flights.run("key", retry) == "ok"
+    assert flights.get_stats()["executions"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_the_job():
+    """Test that cancelling one caller leaves the shared job running for the others"""
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def job():
+        await release.wait()
+        return "done"
+
+    leader = asyncio.create_task(flights.run("key", job))
+    follower = asyncio.create_task(flights.run("key", job))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert flights.in_flight("key")
+
+    release.set()
+    assert await follower == "done"
+
+
+@pytest.mark.asyncio
+async def test_progress_events_do_not_delay_the_result():
+    """Test that a slow publisher doesn't hold up the callers"""
+    events = []
+    publishing = asyncio.Event()
+
+    async def publish(event):
+        await publishing.wait()
+        events.append(event["stage"])
+
+    flights = SingleFlight(publish=publish)
+
+    async def job():
+        return 42
+
+    callers = [flights.run("key", job) for _ in range(2)]
+    assert await asyncio.wait_for(asyncio.gather(*callers), timeout=1) == [42, 42]
+    assert events == []
+
+    publishing.set()
+    await flights.drain()
+    assert events == ["started", "joined", "completed"]
+
+
+def test_video_job_key_normalizes_urls():
+    """Test that URL forms of the same video and option order give the same key"""
+    key = video_job_key("https://www.youtube.com/watch?v=auJzb1D-fag", kind="process_video", lang="en")
+    assert key == video_job_key("https://youtu.be/auJzb1D-fag", lang="en", kind="process_video")
+    assert key != video_job_key("https://youtu.be/auJzb1D-fag", kind="markdown", lang="en")
@@ -0,0 +1,105 @@
+"""
+Tests for the concurrent stage graph of the processing strategies
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("pandas")
+
+from src.youtube_extension.processors.strategies import PipelineStage, run_stage_graph
+
+
+@pytest.mark.asyncio
+async def test_independent_stages_run_concurrently():
+    """Test that stages start once their dependencies are done, and get their results"""
+    running = set()
+    overlapped = []
+
+    def stage(name, result):
+        async def run(inputs):
+            running.add(name)
+            await asyncio.sleep(0.01)
+            overlapped.append(set(running))
+            running.discard(name)
+            return result(inputs)
+        return run
+
+    timings = {}
+    results = await run_stage_graph([
+        PipelineStage("transcript", stage("transcript", lambda _: "text")),
+        PipelineStage("metadata", stage("metadata", lambda _: {"title": "t"})),
+        PipelineStage("analysis", stage("analysis", lambda inputs: (inputs["transcript"], inputs["metadata"]["title"])),
+                      depends_on=("transcript", "metadata")),
+    ], timings)
+
+    assert results["analysis"] == ("text", "t")
+    assert {"transcript", "metadata"} in overlapped
+    assert set(timings) == {"transcript", "metadata", "analysis"}
+
+
+@pytest.mark.asyncio
+async def test_stage_timeout_names_the_stage():
+    """Test that a stage exceeding its timeout raises a TimeoutError naming it"""
+    async def slow(inputs):
+        await asyncio.sleep(10)
+
+    timings = {}
+    with pytest.raises(asyncio.TimeoutError, match="Stage transcript timed out after 0.01s"):
+        await run_stage_graph([PipelineStage("transcript", slow, timeout=0.01)], timings)
+    assert "transcript" in timings
+
+
+@pytest.mark.asyncio
+async def test_failing_stage_cancels_the_running_stages():
+    """Test that the first failure cancels the other stages and is raised"""
+    cancelled = []
+    dependent_ran = False
+
+    async def slow(inputs):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append("metadata")
+            raise
+
+    async def failing(inputs):
+        await asyncio.sleep(0)
+        raise ValueError("no transcript")
+
+    async def dependent(inputs):
+        nonlocal dependent_ran
+        dependent_ran = True
+
+    with pytest.raises(ValueError, match="no transcript"):
+        await run_stage_graph([
+            PipelineStage("metadata", slow),
+            PipelineStage("transcript", failing),
+            PipelineStage("analysis", dependent, depends_on=("transcript",)),
+        ], {})
+
+    assert cancelled == ["metadata"]
+    assert not dependent_ran
+
+
+@pytest.mark.asyncio
+async def test_cancelling_the_graph_cancels_every_stage():
+    """Test that cancelling the caller cancels the stages still running"""
+    started = asyncio.Event()
+    cancelled = []
+
+    async def slow(inputs):
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append("transcript")
+            raise
+
+    graph = asyncio.create_task(run_stage_graph([PipelineStage("transcript", slow)], {}))
+    await started.wait()
+    graph.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await graph
+    assert cancelled == ["transcript"]
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from vre.utils.colorizer.colorize_semantic_segmentation import (
+    colorize_semantic_segmentation, _class_label_positions, _colorize_sem_seg_batched)
+
+COLOR_MAP = [(0, 0, 0), (255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0)]
+CLASSES = ["background", "square", "u_shape", "tiny", "stripe"]
+
+def _sema() -> np.ndarray:
+    """(2, 20, 20) fixed maps: a square, a non convex U shape and a tiny region in the first, a stripe in the second"""
+    sema = np.zeros((2, 20, 20), dtype=np.int64)
+    sema[0, 2:6, 2:6] = 1 # 16 pixels, centroid (3, 3) is inside
+    sema[0, 10:18, 10:12] = sema[0, 10:18, 16:18] = sema[0, 16:18, 12:16] = 2 # U shape, centroid (13, 14) is outside
+    sema[0, 0:2, 18:20] = 3 # 4 pixels, below the area threshold
+    sema[1, :, 5:8] = 4
+    return sema
+
+def test_class_label_positions():
+    positions = [dict(x) for x in _class_label_positions(_sema(), n_classes=len(COLOR_MAP))]
+    assert set(positions[0].keys()) == {0, 1, 2} # the tiny region has no label
+    assert positions[0][1] == (3, 3)
+    x, y = positions[0][2] # snapped to the nearest pixel of the U shape
+    class_ys, class_xs = np.nonzero(_sema()[0] == 2)
+    assert _sema()[0, y, x] == 2
+    assert (x - 13) ** 2 + (y - 14) ** 2 == ((class_xs - 13) ** 2 + (class_ys - 14) ** 2).min()
+    assert positions[1] == {0: (10, 9), 4: (6, 9)}
+
+def test_colorize_sem_seg_batched_boundaries():
+    sema = np.zeros((1, 6, 6), dtype=np.int64) # 4 quadrants of 9 pixels each: below the area threshold, no labels
+    sema[0, 0:3, 3:6], sema[0, 3:6, 0:3], sema[0, 3:6, 3:6] = 1, 2, 3
+    rgb = np.full((1, 6, 6, 3), 100, dtype=np.uint8)
+    res = _colorize_sem_seg_batched(sema, rgb=rgb, classes=CLASSES, color_map=COLOR_MAP, alpha=0.5)
+    boundaries = np.zeros((6, 6), dtype=bool)
+    boundaries[2:4] = boundaries[:, 2:4] = True
+    assert (res[0][boundaries] == 255).all()
+    expected = (np.array(COLOR_MAP, dtype=np.float32)[sema[0]] * 0.5 + 50).astype(np.uint8)
+    assert np.array_equal(res[0][~boundaries], expected[~boundaries])
+
+def test_colorize_sem_seg_batched_workers(monkeypatch: pytest.MonkeyPatch):
+    sema = np.random.default_rng(seed=42).integers(0, len(COLOR_MAP), size=(4, 12, 16)).repeat(4, 1).repeat(4, 2)
+    rgb = np.random.default_rng(seed=43).integers(0, 256, size=(*sema.shape, 3), dtype=np.uint8)
+    monkeypatch.setenv("VRE_COLORIZE_SEMSEG_MODE", "batched")
+    monkeypatch.setenv("VRE_COLORIZE_SEMSEG_WORKERS", "1")
+    y_single = colorize_semantic_segmentation(sema, CLASSES, COLOR_MAP, rgb=rgb)
+    monkeypatch.setenv("VRE_COLORIZE_SEMSEG_WORKERS", "3")
+    y_workers = colorize_semantic_segmentation(sema, CLASSES, COLOR_MAP, rgb=rgb)
+    assert y_single.shape == (4, 48, 64, 3) and y_single.dtype == np.uint8
+    assert np.array_equal(y_single, y_workers)
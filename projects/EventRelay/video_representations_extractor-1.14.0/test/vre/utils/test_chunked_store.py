@@ -0,0 +1,46 @@
+import multiprocessing as mp
+import time
+import numpy as np
+import pytest
+from vre.utils.chunked_store import ChunkedStore
+
+def _writer(path: str, n_stores: int, n_batches: int, compress: bool):
+    write_header = ChunkedStore._write_header
+    def _slow_write_header(self, fp): # simulates a slow disk, so the reader runs while headers are being written
+        time.sleep(0.001)
+        write_header(self, fp)
+    ChunkedStore._write_header = _slow_write_header # patched in the forked writer process only
+    for i in range(n_stores):
+        store = ChunkedStore(f"{path}/{i}.chunked", chunk_size=4, compress=compress)
+        for j in range(n_batches):
+            frames = list(range(j * 3, j * 3 + 3))
+            store.write(frames, np.full((3, 8, 8), j, dtype=np.uint8))
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_ChunkedStore_read_while_another_process_writes(tmp_path, compress: bool):
+    n_stores, n_batches = 50, 3
+    proc = mp.get_context("fork").Process(target=_writer, args=(str(tmp_path), n_stores, n_batches, compress))
+    proc.start()
+    n_reads = 0
+    while proc.is_alive() or n_reads == 0:
+        for i in range(n_stores):
+            if not (path := tmp_path / f"{i}.chunked").exists():
+                continue
+            store = ChunkedStore(path) # i.e. DataWriter.all_batch_exists()
+            for frame in store.frames_computed():
+                assert (store[frame] == frame // 3).all()
+            store.contains([0, 1, 2])
+            n_reads += 1
+    proc.join()
+    assert proc.exitcode == 0
+    for i in range(n_stores):
+        assert ChunkedStore(tmp_path / f"{i}.chunked").frames_computed() == list(range(n_batches * 3))
+
+def test_ChunkedStore_empty_or_zeroed_file(tmp_path):
+    (tmp_path / "empty.chunked").touch()
+    (tmp_path / "zeros.chunked").write_bytes(b"\x00" * 100)
+    for name in ["empty.chunked", "zeros.chunked"]:
+        store = ChunkedStore(tmp_path / name)
+        assert store.frame_shape is None and not store.contains([0]) and store.frames_computed() == []
+        store.write([0, 1], np.ones((2, 3), dtype=np.float32))
+        assert np.allclose(ChunkedStore(tmp_path / name).read([0, 1]), 1)
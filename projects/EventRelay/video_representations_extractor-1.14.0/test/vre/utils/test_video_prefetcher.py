@@ -0,0 +1,38 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from vre.utils import VideoPrefetcher, SynchronizedVideo, make_batches
+
+class CursorVideo:
+    """a video whose reader has a seek/read cursor (i.e. ffmpeg): concurrent reads return the wrong frames"""
+    def __init__(self, n_frames: int):
+        self.data = np.arange(n_frames, dtype=np.uint8).reshape(-1, 1, 1, 1).repeat(4, axis=1)
+        self.cursor = 0
+        self.fps = 30
+
+    def __getitem__(self, ix: int | list[int]) -> np.ndarray:
+        if isinstance(ix, list):
+            return np.stack([self[_ix] for _ix in ix])
+        self.cursor = ix
+        time.sleep(0.0001) # decoding
+        return self.data[self.cursor]
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+def test_SynchronizedVideo_concurrent_reads():
+    video = SynchronizedVideo(CursorVideo(n_frames=50))
+    assert len(video) == 50 and video.fps == 30
+    ixs = np.random.default_rng(seed=42).integers(0, 50, size=500).tolist()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        frames = list(pool.map(video.__getitem__, ixs))
+    assert all((frame == ix).all() for frame, ix in zip(frames, ixs))
+    assert all((frame == ix).all() for ix, frame in enumerate(video))
+
+def test_VideoPrefetcher_reads_while_the_consumer_reads_other_frames():
+    video = CursorVideo(n_frames=100)
+    windows = make_batches(list(range(0, 100, 2)), 5) # odd frames are never prefetched
+    for window, prefetched in zip(windows, VideoPrefetcher(video, windows, n_prefetch=2)):
+        assert (prefetched[window] == np.array(window).reshape(-1, 1, 1, 1)).all()
+        for ix in [w + 1 for w in window]: # not prefetched: read from the video while the reader is prefetching
+            assert (prefetched[ix] == ix).all()
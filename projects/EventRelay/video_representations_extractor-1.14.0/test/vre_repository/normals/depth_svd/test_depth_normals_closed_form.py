@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+from vre_repository.normals.depth_svd.depth_svd_impl import depths_to_normals, depths_to_normals_tiled
+from vre_repository.normals.depth_svd.depth_svd_impl.utils import get_normalized_coords, fov_diag_to_intrinsic
+
+H, W, FOV = 30, 40, 75
+
+def _depths(kind: str) -> np.ndarray:
+    """(2, H, W) fixed depth maps: constant, a tilted 3D plane or a smooth surface with some noise"""
+    if kind == "constant":
+        return np.full((2, H, W), 7.5, dtype=np.float32)
+    if kind == "planar": # depth of the plane n . p = d seen through each pixel ray (x, y, 1)
+        rays = get_normalized_coords(W, H, fov_diag_to_intrinsic(FOV, (W, H), (W, H)))
+        return np.stack([10 / (rays @ np.array(n)) for n in [(0.3, -0.2, 1.0), (-0.5, 0.4, 0.8)]]).astype(np.float32)
+    ys, xs = np.meshgrid(np.linspace(0, 3, H), np.linspace(0, 4, W), indexing="ij")
+    noise = np.random.default_rng(seed=42).uniform(0, 0.05, size=(2, H, W))
+    return (5 + np.sin(xs) * np.cos(ys) + noise).astype(np.float32)
+
+@pytest.mark.parametrize("kind", ["constant", "planar", "smooth"])
+@pytest.mark.parametrize("window_size, stride", [(3, 1), (5, 2), (7, 1)])
+@pytest.mark.parametrize("tile_rows", [1, 4, None]) # 1: every row is a tile border, None: untiled
+def test_depths_to_normals_tiled_equals_svd(kind: str, window_size: int, stride: int, tile_rows: int | None):
+    depths = _depths(kind)
+    halo = window_size // 2 * stride
+    max_tile_bytes = 1 << 40 if tile_rows is None else (tile_rows + 2 * halo) * W * 8 * 40
+    y_svd = depths_to_normals(depths, FOV, window_size, stride, (W, H), 1)
+    y_closed = depths_to_normals_tiled(depths, FOV, window_size, stride, (W, H), 1, max_tile_bytes=max_tile_bytes)
+    assert y_closed.shape == y_svd.shape == (2, H, W, 3)
+    assert np.allclose(np.linalg.norm(y_closed, axis=-1), 1, atol=1e-5)
+    assert np.abs(y_closed - y_svd).max() < 1e-5
@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+from vre_repository.soft_segmentation.halftone import Halftone
+
+def _frame() -> np.ndarray:
+    """a fixed frame: a color gradient with some noise, so all the dot sizes are drawn"""
+    h, w = 48, 64
+    gradient = np.stack(np.meshgrid(np.linspace(0, 255, w), np.linspace(0, 255, h)), axis=-1)
+    noise = np.random.default_rng(seed=42).integers(0, 64, size=(h, w, 1))
+    return np.concatenate([gradient, noise], axis=-1).clip(0, 255).astype(np.uint8)
+
+@pytest.mark.parametrize("sample, scale, percentage, antialias", [
+    (4, 1, 0, False), (3, 2, 50, False), (5, 1, 100, True), (2, 3, 25, True)
+])
+def test_halftone_numpy_engine_equals_pil_engine(sample: int, scale: int, percentage: float, antialias: bool):
+    kwargs = dict(sample=sample, scale=scale, percentage=percentage, angles=[0, 15, 30, 45],
+                  antialias=antialias, resolution=(48, 64))
+    frame = _frame()
+    y_pil = Halftone(name="halftone_pil", engine="pil", **kwargs)._make_one_image(frame)
+    y_numpy = Halftone(name="halftone_numpy", engine="numpy", **kwargs)._make_one_image(frame)
+    assert y_numpy.shape == y_pil.shape == (48 * scale, 64 * scale, 3)
+    assert np.array_equal(y_numpy, y_pil)
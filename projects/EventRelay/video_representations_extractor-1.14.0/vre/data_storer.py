@@ -1,14 +1,60 @@
-"""DataStorer module -- Multi-threaded wrapper for DataWriter"""
+"""DataStorer module -- Multi-threaded or multi-process wrapper for DataWriter"""
 from threading import Thread
-from multiprocessing import cpu_count
-from queue import Queue, Empty
+from multiprocessing import cpu_count, get_context, get_all_start_methods, resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from queue import Queue, Empty, Full
 from copy import deepcopy
 from time import time
+import numpy as np
 
 from .representations import ReprOut
 from .data_writer import DataWriter
+from .utils import MemoryData
 from .logger import vre_logger as logger
 
+SharedArray = tuple[str, tuple[int, ...], str] # (shared memory name, shape, dtype)
+
+def _to_shared_memory(arr: np.ndarray | None) -> SharedArray | None:
+    """copies an array into a new shared memory block. The reader is responsible for unlinking it."""
+    if arr is None:
+        return None
+    arr = np.ascontiguousarray(arr)
+    shm = SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[:] = arr
+    res = (shm.name, arr.shape, arr.dtype.str)
+    shm.close()
+    return res
+
+def _from_shared_memory(shared_arr: SharedArray | None) -> tuple[np.ndarray | None, SharedMemory | None]:
+    """attaches to a shared memory block and returns a (zero-copy) view over it plus the handle to close it later"""
+    if shared_arr is None:
+        return None, None
+    name, shape, dtype = shared_arr
+    shm = SharedMemory(name=name)
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf), shm
+
+def _process_worker_fn(data_writer: DataWriter, queue: "Queue", n_written: "Synchronized", n_failed: "Synchronized"):
+    """The loop of each DataStorer process. Ends when it receives None (sent by `join_with_timeout`)."""
+    while (args := queue.get()) is not None:
+        (output, output_images), key, extra = args
+        output_arr, output_shm = _from_shared_memory(output)
+        images_arr, images_shm = _from_shared_memory(output_images)
+        try:
+            data_writer(ReprOut(frames=None, output=MemoryData(output_arr), key=key, extra=extra,
+                                output_images=images_arr))
+            with n_written.get_lock():
+                n_written.value += 1
+        except Exception as e: # pylint: disable=broad-exception-caught
+            logger.error(f"[{data_writer.rep.name}] Failed to store {key=}: {e}")
+            with n_failed.get_lock():
+                n_failed.value += 1
+        finally:
+            del output_arr, images_arr # the views must be released before closing the shared memory
+            for shm in (output_shm, images_shm):
+                if shm is not None:
+                    shm.close()
+                    shm.unlink()
+
 class DataStorer:
     """
     Equivalent of DataLoader on top of a Dataset -> DataStorer on top of a DataWriter
@@ -16,18 +62,49 @@ class DataStorer:
     - data_writer The DataWriter object used by this DataStorer (akin to Dataset and DataLoader)
     - n_threads_data_storer The number of workers used for the ThreadPool that stores data at each step. This is
     needed because storing data takes a lot of time sometimes, even more than the computation itself.
+    - mode The type of workers that store the data. Can be one of:
+        - 'thread' (default) A pool of threads. Data is deepcopied before enqueueing.
+        - 'process' A pool of processes. Arrays are sent via shared memory (no deepcopy, no pickling of large arrays),
+        so encoding (png, npz compression) does not fight the compute loop for the GIL.
+    - queue_size The max number of enqueued items before `__call__` blocks (backpressure). Default: 1.
     """
-    def __init__(self, data_writer: DataWriter, n_threads: int):
+    def __init__(self, data_writer: DataWriter, n_threads: int, mode: str = "thread", queue_size: int = 1):
         assert n_threads >= 0, n_threads
+        assert mode in ("thread", "process"), mode
+        assert queue_size >= 1, queue_size
         self.data_writer = data_writer
         self.n_threads = min(n_threads, cpu_count())
+        self.mode = mode
+        self.queue_size = queue_size
         self.threads: list[Thread] = []
-        if n_threads >= 1:
-            self.queue: Queue = Queue(maxsize=1) # maxisze=1 because we use many shared memory threads.
+        self.processes: list["Process"] = []
+        self.stats = {"n_enqueued": 0, "blocked_seconds": 0.0, "max_queue_size": 0}
+        if n_threads >= 1 and mode == "thread":
+            self.queue: Queue = Queue(maxsize=queue_size)
             for _ in range(n_threads):
                 self.threads.append(thr := Thread(target=self._worker_fn, daemon=True))
                 thr.start()
-        logger.debug(f"[{self.data_writer.rep.name}] Set up with {n_threads} threads.")
+        if n_threads >= 1 and mode == "process":
+            # fork (where available) so the DataWriter and its representation are not pickled for each worker.
+            ctx = get_context("fork" if "fork" in get_all_start_methods() else "spawn")
+            # workers must share the parent's tracker, otherwise the blocks they unlink are reported as leaked.
+            resource_tracker.ensure_running()
+            self.queue = ctx.Queue(maxsize=queue_size)
+            self._n_written, self._n_failed = ctx.Value("i", 0), ctx.Value("i", 0)
+            for _ in range(n_threads):
+                self.processes.append(proc := ctx.Process(target=_process_worker_fn, daemon=True,
+                                                          args=(data_writer, self.queue, self._n_written,
+                                                                self._n_failed)))
+                proc.start()
+        logger.debug(f"[{self.data_writer.rep.name}] Set up with {n_threads} {mode}s (queue size: {queue_size}).")
+
+    @property
+    def metrics(self) -> dict[str, int | float]:
+        """backpressure metrics: how many items were enqueued, how long the producer was blocked and the peak depth"""
+        res = {**self.stats, "blocked_seconds": round(self.stats["blocked_seconds"], 3)}
+        if self.mode == "process" and self.n_threads > 0:
+            res = {**res, "n_written": self._n_written.value, "n_failed": self._n_failed.value}
+        return res
 
     def _worker_fn(self):
         while True: # This loop is ended via `self.join_with_timeout` or `__del__` or manually setting queue to None.
@@ -45,6 +122,9 @@ class DataStorer:
         """calls queue.join() but throws after timeout seconds if it doesn't end"""
         if self.n_threads == 0:
             return
+        if self.mode == "process":
+            self._join_processes_with_timeout(timeout)
+            return
         logger.debug(f"[{self.data_writer.rep.name}] Waiting for {self.queue.unfinished_tasks} "
                      "leftover enqueued tasks")
         assert self.queue is not None, "Queue was closed, create a new DataStorer object..."
@@ -59,18 +139,64 @@ class DataStorer:
         finally:
             self.queue.all_tasks_done.release()
         self.queue = None
+        logger.debug(f"[{self.data_writer.rep.name}] Metrics: {self.metrics}")
+
+    def _join_processes_with_timeout(self, timeout: int):
+        """sends one sentinel per process and waits for all of them to finish the leftover enqueued tasks"""
+        assert self.queue is not None, "Queue was closed, create a new DataStorer object..."
+        logger.debug(f"[{self.data_writer.rep.name}] Waiting for {len(self.processes)} processes to finish")
+        endtime = time() + timeout
+        for _ in self.processes:
+            self.queue.put(None, block=True, timeout=max(endtime - time(), 0.01))
+        for proc in self.processes:
+            proc.join(timeout=max(endtime - time(), 0))
+            if proc.is_alive():
+                raise RuntimeError("Queue has not finished the join() before timeout")
+        self.queue.close()
+        self.queue = None
+        logger.debug(f"[{self.data_writer.rep.name}] Metrics: {self.metrics}")
+        self._raise_if_failed()
+
+    def _raise_if_failed(self):
+        """the process workers only count their failures, surface them like a failed thread worker would"""
+        if self.mode == "process" and self.n_threads > 0 and (n_failed := self._n_failed.value) > 0:
+            raise RuntimeError(f"[{self.data_writer.rep.name}] {n_failed} enqueued item(s) failed to be stored")
 
     def __call__(self, y_repr: ReprOut):
         assert isinstance(y_repr, ReprOut), f"{self.data_writer.rep=}, {type(y_repr)=}"
         if self.n_threads == 0:
             self.data_writer(y_repr)
-        else:
-            assert self.queue is not None, "Queue was closed, create a new DataStorer object..."
-            self.queue.put((deepcopy(y_repr), ), block=True, timeout=30)
+            return
+        assert self.queue is not None, "Queue was closed, create a new DataStorer object..."
+        if self.mode == "thread":
+            item = (deepcopy(y_repr), )
+        else: # frames are not needed by the DataWriter, so we don't send them
+            self._raise_if_failed() # fail fast on a previous item instead of only at join time
+            item = ((_to_shared_memory(y_repr.output), _to_shared_memory(y_repr.output_images)),
+                    y_repr.key, y_repr.extra)
+        self._put_with_metrics(item)
+
+    def _put_with_metrics(self, item: tuple):
+        try:
+            self.stats["max_queue_size"] = max(self.stats["max_queue_size"], self.queue.qsize() + 1)
+        except NotImplementedError: # multiprocessing.Queue.qsize() is not implemented on MacOS
+            pass
+        now = time()
+        try:
+            self.queue.put(item, block=True, timeout=30)
+        except Full:
+            if self.mode == "process": # nobody will ever read the shared memory blocks, so we clean them here
+                for shared_arr in item[0]:
+                    if shared_arr is not None:
+                        (shm := SharedMemory(name=shared_arr[0])).close()
+                        shm.unlink()
+            raise
+        self.stats["blocked_seconds"] += time() - now
+        self.stats["n_enqueued"] += 1
 
     def __repr__(self):
         return f"""[DataStorer]
-- Num threads: {self.n_threads} (0 = only using main thread)
+- Num {self.mode}s: {self.n_threads} (0 = only using main thread). Queue size: {self.queue_size}
 {self.data_writer}"""
 
     def __del__(self):
@@ -1,10 +1,11 @@
 """DataWriter module -- used to store binary (npz) or image (png) files given a representation output"""
 from __future__ import annotations
+import os
 import shutil
 from pathlib import Path
 import numpy as np
 
-from .utils import image_write, is_dir_empty
+from .utils import image_write, is_dir_empty, ChunkedStore
 from .representations import ReprOut, Representation, IORepresentationMixin
 from .logger import vre_logger as logger
 
@@ -25,6 +26,8 @@ class DataWriter:
         - 'overwrite' Overwrite the output dir if it already exists
         - 'skip_computed' Skip the computed frames and continue from the last computed frame
         - 'raise' (default) Raise an error if the output dir already exists
+    If the binary format is 'chunked', all the frames are stored in a single ChunkedStore file at
+    'output_dir/rep.name/chunked/data.chunked' with chunks of VRE_CHUNK_SIZE frames (default: 64).
     """
     def __init__(self, output_dir: Path, representation: Repr, output_dir_exists_mode: str):
         assert output_dir_exists_mode in ("overwrite", "skip_computed", "raise"), output_dir_exists_mode
@@ -34,6 +37,17 @@ class DataWriter:
         self.output_dir_exists_mode = output_dir_exists_mode
         self.rep_out_dir = self.output_dir / self.rep.name
         self._make_dirs()
+        self._chunked_store: ChunkedStore | None = None
+
+    @property
+    def chunked_store(self) -> ChunkedStore:
+        """The ChunkedStore of this representation. Only valid if the binary format is 'chunked'."""
+        assert self.rep.binary_format.value == "chunked", self.rep.binary_format
+        if self._chunked_store is None:
+            self._chunked_store = ChunkedStore(self.rep_out_dir / "chunked" / "data.chunked",
+                                               chunk_size=int(os.getenv("VRE_CHUNK_SIZE", "64")),
+                                               compress=self.rep.compress)
+        return self._chunked_store
 
     def write(self, y_repr: ReprOut):
         """store the data in the right format"""
@@ -48,6 +62,7 @@ class DataWriter:
         if isinstance(self.rep.output_size, tuple):
             y_repr = self.rep.resize(y_repr, self.rep.output_size)
 
+        chunked_data = []
         for i, t in enumerate(y_repr.key):
             if self.rep.export_binary:
                 ext = self.rep.binary_format.value
@@ -57,7 +72,10 @@ class DataWriter:
                 if disk_fmt.dtype != self.rep.output_dtype:
                     _check_dtype_compat(disk_fmt.dtype, self.rep.output_dtype)
                     disk_fmt = disk_fmt.astype(self.rep.output_dtype)
-                self.rep.save_to_disk(disk_fmt, bin_path)
+                if ext == "chunked": # written at once for all the batch below
+                    chunked_data.append(disk_fmt)
+                else:
+                    self.rep.save_to_disk(disk_fmt, bin_path)
                 if (extra := y_repr.extra) is not None:
                     np.savez(bin_path.parent / f"{t}_extra.npz", extra[i])
 
@@ -67,14 +85,20 @@ class DataWriter:
                     logger.warning(f"[{self.rep}] '{img_path}' already exists. Overwriting.")
                 image_write(y_repr.output_images[i], img_path)
 
+        if len(chunked_data) > 0:
+            self.chunked_store.write(y_repr.key, np.stack(chunked_data))
+
     def all_batch_exists(self, frames: list[int]) -> bool:
         """true if all batch [l:r] exists on the disk"""
         def _path(writer: DataWriter, t: int, suffix: str) -> Path:
             return writer.rep_out_dir / suffix / f"{t}.{suffix}"
         assert all(isinstance(frame, int) and frame >= 0 for frame in frames), (frames, self.rep)
         assert self.rep.export_binary or self.rep.export_image, self.rep
+        if self.rep.binary_format.value == "chunked" and not self.chunked_store.contains(frames):
+            return False
         for ix in frames:
-            if self.rep.export_binary and not _path(self, ix, self.rep.binary_format.value).exists():
+            if self.rep.export_binary and self.rep.binary_format.value != "chunked" and \
+                    not _path(self, ix, self.rep.binary_format.value).exists():
                 return False
             if self.rep.export_image and not _path(self, ix, self.rep.image_format.value).exists():
                 return False
@@ -0,0 +1,273 @@
+"""GraphScheduler module -- frame-major, DAG-aware scheduling of all the representations of a VRE run"""
+from __future__ import annotations
+from dataclasses import replace
+from datetime import datetime
+from pathlib import Path
+from queue import Queue
+from threading import Thread, Event
+import os
+import traceback
+from tqdm import tqdm
+import torch as tr
+import numpy as np
+
+from .representations import Representation, LearnedRepresentationMixin, RepresentationsList, IORepresentationMixin
+from .vre_runtime_args import VRERuntimeArgs
+from .data_writer import DataWriter
+from .data_storer import DataStorer
+from .representation_metadata import RepresentationMetadata
+from .utils import make_batches, ReprOut, MemoryData, SynchronizedVideo
+from .logger import vre_logger as logger
+
+def slice_repr_out(data: ReprOut, keys: list[int]) -> ReprOut:
+    """Returns a new ReprOut with only the provided keys (frames). The keys must be a subset of data.key"""
+    if keys == data.key:
+        return replace(data)
+    ixs = [data.key.index(k) for k in keys]
+    return ReprOut(frames=None if data.frames is None else data.frames[ixs], output=MemoryData(data.output[ixs]),
+                   key=keys, extra=None if data.extra is None else [data.extra[i] for i in ixs],
+                   output_images=None if data.output_images is None else data.output_images[ixs])
+
+def concat_repr_outs(data: list[ReprOut]) -> ReprOut:
+    """Concatenates a list of (batched) ReprOuts into a single ReprOut"""
+    assert len(data) > 0, "At least one ReprOut must be provided"
+    if len(data) == 1:
+        return data[0]
+    return ReprOut(frames=None if data[0].frames is None else np.concatenate([d.frames for d in data]),
+                   output=MemoryData(np.concatenate([d.output for d in data])), key=sum([d.key for d in data], []),
+                   extra=sum([d.extra for d in data], []) if all(d.extra is not None for d in data) else None)
+
+class GraphScheduler:
+    """
+    Frame-major scheduler for a VRE run. Instead of running each exported representation over all the frames before
+    moving to the next one, each window of frames is pushed through the whole topo-sorted graph while the outputs of
+    the dependencies are still in memory. Each node of the graph runs in its own thread and is connected to each of its
+    consumers via a bounded queue, so independent nodes (i.e. CPU ones like hsv and GPU ones like dpt) overlap on
+    different windows. The windows to be computed are planned upfront, so dependencies are computed (or loaded from
+    the disk) at most once per window regardless of the number of consumers. The nodes share the video through a
+    SynchronizedVideo, so their frame reads never run concurrently.
+    Parameters:
+    - vre The VideoRepresentationsExtractor whose representations are scheduled
+    - exported_reprs The representations that are exported in this run. Their dependencies are computed as well.
+    - output_dir The directory where VRE will store the representations
+    - output_dir_exists_mode What to do if the output dir already exists. See DataWriter docstring.
+    - runtime_args The runtime args of this run
+    - run_id The id of this run
+    - queue_size The max number of windows in flight between a producer and each of its consumers. If not set, uses
+    the VRE_SCHEDULER_QUEUE_SIZE env variable (default: 2).
+    """
+    def __init__(self, vre: "VideoRepresentationsExtractor", exported_reprs: RepresentationsList, output_dir: Path,
+                 output_dir_exists_mode: str, runtime_args: VRERuntimeArgs, run_id: str, queue_size: int | None = None):
+        self.vre = vre
+        self.video = SynchronizedVideo(vre.video)
+        self.output_dir = output_dir
+        self.runtime_args = runtime_args
+        self.run_id = run_id
+        self.queue_size = queue_size or int(os.getenv("VRE_SCHEDULER_QUEUE_SIZE", "2"))
+        assert self.queue_size >= 1, self.queue_size
+        self.exported_names = exported_reprs.names
+        self.nodes: list[Representation] = self._get_needed_nodes(vre.representations, exported_reprs)
+        self.consumers: dict[str, list[Representation]] = {n.name: [c for c in self.nodes if n.name in c.dep_names]
+                                                            for n in self.nodes}
+        self.window_size = max(n.batch_size for n in self.nodes)
+        self.windows: list[list[int]] = make_batches(runtime_args.frames, self.window_size)
+
+        self.data_writers: dict[str, DataWriter] = {}
+        self.data_storers: dict[str, DataStorer] = {}
+        self.repr_metadatas: dict[str, RepresentationMetadata] = {}
+        for rep in exported_reprs:
+            self.data_writers[rep.name] = DataWriter(output_dir=output_dir, representation=rep,
+                                                     output_dir_exists_mode=output_dir_exists_mode)
+            self.data_storers[rep.name] = DataStorer(self.data_writers[rep.name], runtime_args.n_threads_data_storer,
+                                                     mode=runtime_args.data_storer_mode,
+                                                     queue_size=runtime_args.data_storer_queue_size)
+            formats = sorted([f for f in [rep.image_format.value, rep.binary_format.value] if f != "not-set"])
+            self.repr_metadatas[rep.name] = RepresentationMetadata(
+                repr_name=rep.name, formats=formats, frames=list(range(len(vre.video))),
+                disk_location=self.data_writers[rep.name].rep_out_dir / ".repr_metadata.json")
+
+        self.stored_keys: dict[str, list[list[int]]] = self._make_stored_keys()
+        self.produce, self.compute = self._make_plan()
+        self.queues: dict[tuple[str, str], Queue] = {(dep.name, node.name): Queue(maxsize=self.queue_size)
+                                                     for node in self.nodes for dep in node.dependencies}
+        self.stop_event = Event()
+        self.pbar = tqdm(total=sum(len(k) for v in self.stored_keys.values() for k in v),
+                         desc=f"[VRE] frame_major ({len(self.nodes)} nodes) ws={self.window_size}",
+                         disable=os.getenv("VRE_PBAR", "1") == "0")
+
+    def run(self) -> dict[str, RepresentationMetadata]:
+        """Runs all the nodes until all the windows are processed. Returns the metadata of each exported repr."""
+        logger.debug(f"Running {self.run_id=} with {len(self.windows)} windows. Nodes: {[n.name for n in self.nodes]}")
+        threads = [Thread(target=self._node_worker, args=(node, ), daemon=True) for node in self.nodes]
+        for thr in threads:
+            thr.start()
+        for thr in threads:
+            thr.join()
+        self.pbar.close()
+        return self.repr_metadatas
+
+    # Helper private methods
+
+    @staticmethod
+    def _get_needed_nodes(representations: RepresentationsList,
+                          exported_reprs: RepresentationsList) -> list[Representation]:
+        """returns the topo-sorted exported representations and all their (recursive) dependencies"""
+        needed = set(exported_reprs.names)
+        for rep in representations[::-1]: # reversed topo-sort: consumers are always before their dependencies
+            if rep.name in needed:
+                needed.update(rep.dep_names)
+        return [r for r in representations if r.name in needed]
+
+    def _make_stored_keys(self) -> dict[str, list[list[int]]]:
+        """for each exported representation and window, the frames that are not already computed and stored"""
+        res = {}
+        for name, repr_metadata in self.repr_metadatas.items():
+            computed = set(repr_metadata.frames_computed())
+            res[name] = []
+            for window in self.windows:
+                keys = [f for f in window if f not in computed]
+                res[name].append(keys if len(keys) > 0 and not self.data_writers[name].all_batch_exists(keys) else [])
+        logger.debug(f"Out of {len(self.runtime_args.frames)} total frames, to be stored: "
+                     f"{ {k: sum(len(_v) for _v in v) for k, v in res.items()} }")
+        return res
+
+    def _is_on_disk(self, rep: Representation, window: list[int]) -> bool:
+        """mirrors VRE._load_from_disk_if_possible's check of whether a window can be loaded from the disk"""
+        return isinstance(rep, IORepresentationMixin) and \
+            all(x.exists() for x in self.vre._disk_paths(rep, window, self.output_dir)[0])
+
+    def _make_plan(self) -> tuple[dict[str, list[bool]], dict[str, list[bool]]]:
+        """
+        For each node and each window, plan whether the node has to produce it (to store it or to feed a consumer) and
+        whether it has to compute it from its dependencies (otherwise it is loaded from the disk).
+        """
+        produce = {n.name: [False] * len(self.windows) for n in self.nodes}
+        compute = {n.name: [False] * len(self.windows) for n in self.nodes}
+        for node in self.nodes[::-1]:
+            for w, window in enumerate(self.windows):
+                must_store = node.name in self.stored_keys and len(self.stored_keys[node.name][w]) > 0
+                needed_by_consumers = any(compute[c.name][w] for c in self.consumers[node.name])
+                produce[node.name][w] = must_store or needed_by_consumers
+                compute[node.name][w] = produce[node.name][w] and not self._is_on_disk(node, window)
+        return produce, compute
+
+    def _compute_window(self, rep: Representation, window: list[int], dep_data: list[ReprOut], w: int) -> ReprOut:
+        """computes (in batches of the rep's batch size) or loads from the disk the data of one window"""
+        if not self.compute[rep.name][w]:
+            res = self.vre._load_from_disk_if_possible(rep, self.video, window, self.output_dir)
+            assert res is not None, f"{rep=} {window=} was planned to be loaded from disk but it was not found."
+            return res
+        tr.cuda.empty_cache() # might empty some unused memory, not 100% if needed.
+        res, cache = [], self.vre.result_cache
+        for batch in make_batches(window, rep.batch_size):
+            if cache is not None and (cached := cache.get(rep, self.video, batch)) is not None:
+                res.append(cached)
+                continue
+            if isinstance(rep, LearnedRepresentationMixin) and rep.setup_called is False:
+                rep.vre_setup() # instantiates the model, loads to cuda device etc.
+            batch_dep_data = [slice_repr_out(dep, batch) for dep in dep_data]
+            res.append(rep.compute(self.video, ixs=batch, dep_data=batch_dep_data))
+            if cache is not None:
+                cache.put(rep, self.video, res[-1])
+        return concat_repr_outs(res)
+
+    def _store_window(self, rep: Representation | IORepresentationMixin, rep_data: ReprOut, w: int, duration: float):
+        """stores the frames of the window that are not already stored and updates the representation's metadata"""
+        if not rep.is_classification and rep.name.find("fastsam") == -1: # TODO: MemoryData of FSAM is binary...
+            assert rep_data.output.shape[-1] == rep.n_channels, (rep, rep_data.output, rep.n_channels)
+        keys = self.stored_keys[rep.name][w]
+        stored_data = slice_repr_out(rep_data, keys)
+        stored_data.output_images = rep.make_images(stored_data) if rep.export_image else None
+        self.data_storers[rep.name](stored_data)
+        self.repr_metadatas[rep.name].add_time(duration * len(keys) / len(rep_data.key), keys,
+                                               run_id=self.run_id, sync=True)
+        self.pbar.update(len(keys))
+
+    def _node_failed(self, rep: Representation, w: int, msg: str):
+        self.vre._log_error(f"\n[{rep.name} {rep.batch_size=} window={self.windows[w]}] {msg}\n")
+        if rep.name in self.repr_metadatas:
+            repr_metadata = self.repr_metadatas[rep.name]
+            if len(keys := self.stored_keys[rep.name][w]) > 0:
+                repr_metadata.add_time(None, keys, run_id=self.run_id, sync=True)
+            repr_metadata.run_had_exceptions = True
+        if self.runtime_args.exception_mode == "stop_execution":
+            self.stop_event.set()
+
+    def _node_worker(self, rep: Representation):
+        """
+        The loop of each node. For each planned window it waits for the dependencies' data from the input queues,
+        computes its own data, stores it (if exported) and sends it to the consumers that need it. A failed node keeps
+        sending None downstream so its consumers never block, and they fail as well (unless execution was stopped).
+        If the worker itself crashes, the remaining windows are released (inputs drained, None sent downstream).
+        """
+        failed = False
+        w, consumed, sent_to = 0, False, set() # progress of the current window, used to release it if we crash
+        try:
+            for w, window in enumerate(self.windows):
+                consumed, sent_to = False, set()
+                if not self.produce[rep.name][w]:
+                    continue
+                dep_data = [self.queues[(dep.name, rep.name)].get() for dep in rep.dependencies] \
+                    if self.compute[rep.name][w] else []
+                consumed = True
+                rep_data = None
+                if not failed and not self.stop_event.is_set():
+                    if any(d is None for d in dep_data):
+                        failed_deps = [dep.name for dep, d in zip(rep.dependencies, dep_data) if d is None]
+                        self._node_failed(rep, w, f"Dependencies {failed_deps} failed.")
+                        failed = True
+                    else:
+                        try:
+                            now = datetime.now()
+                            rep_data = self._compute_window(rep, window, dep_data, w)
+                            if rep.name in self.stored_keys and len(self.stored_keys[rep.name][w]) > 0:
+                                self._store_window(rep, rep_data, w, (datetime.now() - now).total_seconds())
+                        except Exception:
+                            self._node_failed(rep, w, traceback.format_exc())
+                            rep_data, failed = None, True
+                for consumer in self.consumers[rep.name]:
+                    if self.compute[consumer.name][w]:
+                        self.queues[(rep.name, consumer.name)].put(rep_data)
+                        sent_to.add(consumer.name)
+                del dep_data, rep_data # free the window's data as soon as possible, consumers hold their own refs
+            w += 1 # all the windows were handled
+        except BaseException:
+            self.vre._log_error(f"\n[{rep.name}] worker crashed at window {w}:\n{traceback.format_exc()}\n")
+            if rep.name in self.repr_metadatas:
+                self.repr_metadatas[rep.name].run_had_exceptions = True
+            if self.runtime_args.exception_mode == "stop_execution":
+                self.stop_event.set()
+        finally:
+            self._release_remaining_windows(rep, w, consumed, sent_to)
+            # various cleanup stuff before ending with this representation
+            if rep.name in self.data_storers:
+                try:
+                    self.data_storers[rep.name].join_with_timeout(timeout=30)
+                except Exception:
+                    self.vre._log_error(f"\n[{rep.name}] Failed to store the data:\n{traceback.format_exc()}\n")
+                    self.repr_metadatas[rep.name].run_had_exceptions = True
+                self.repr_metadatas[rep.name].store_on_disk()
+            if isinstance(rep, LearnedRepresentationMixin) and rep.setup_called:
+                rep.vre_free()
+
+    def _release_remaining_windows(self, rep: Representation, start_w: int, consumed: bool, sent_to: set[str]):
+        """
+        Called when a node's worker stops. For the windows from start_w onwards, drains the inputs the node would have
+        read (so producers don't block on full queues) and sends None to the consumers (so they don't block forever).
+        consumed/sent_to describe how far the worker got in start_w itself.
+        """
+        for w in range(start_w, len(self.windows)):
+            if not self.produce[rep.name][w]:
+                continue
+            if self.compute[rep.name][w] and not (w == start_w and consumed):
+                for dep in rep.dependencies:
+                    self.queues[(dep.name, rep.name)].get()
+            for consumer in self.consumers[rep.name]:
+                if self.compute[consumer.name][w] and not (w == start_w and consumer.name in sent_to):
+                    self.queues[(rep.name, consumer.name)].put(None)
+
+    def __repr__(self):
+        return f"""[GraphScheduler]
+- Nodes ({len(self.nodes)}): {", ".join(n.name for n in self.nodes)}
+- Exported ({len(self.exported_names)}): {", ".join(self.exported_names)}
+- Windows: {len(self.windows)} (window size: {self.window_size}, queue size: {self.queue_size})"""
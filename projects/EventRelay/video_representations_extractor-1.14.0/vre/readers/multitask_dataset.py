@@ -6,12 +6,14 @@ from pathlib import Path
 from typing import Iterable, NamedTuple
 from pprint import pformat
 from copy import deepcopy
+import numpy as np
 import torch as tr
 from torch.utils.data import Dataset
 
-from vre.representations import Representation, NormedRepresentationMixin, IORepresentationMixin, TaskMapper
+from vre.representations import (Representation, NormedRepresentationMixin, IORepresentationMixin, TaskMapper,
+                                  NpIORepresentation)
 from vre.logger import vre_logger as logger
-from vre.utils import natsorted
+from vre.utils import natsorted, open_chunked_store, ChunkedStoreFrame
 
 from .statistics import compute_statistics, load_external_statistics, TaskStatistics
 
@@ -46,12 +48,19 @@ class MultiTaskDataset(Dataset):
       - 'drop': Drop the data point if any of the representations is missing.
       - 'fill_{none,zero,nan}': Fill the missing data with Nones, zeros or NaNs.
     - files_suffix: What suffix to look for when creating the dataset. Valid values: 'npy' or 'npz'.
+    - mmap: If set to True, uncompressed data (npy files or uncompressed chunked stores) is memory-mapped and returned
+    as tensors that are views over the mapped pages (no copy, no per-path cache). Only NpIORepresentation tasks that
+    are not computed from dependencies benefit from it. Can be enabled using the environmental variable VRE_READER_MMAP=1.
     - cache_task_stats: If set to True, the statistics will be cached at '{path}/.task_statistics.npz'. Can be enabled
     using the environmental variable STATS_CACHE=1. Defaults to False.
     - batch_size_stats: Controls the batch size during statistics computation. Can be enabled by environmental variable
     STATS_BATCH_SIZE. Defaults to 1.
     - num_workers_stats: Controls the num_woprkers during statistics computation. Can be enabled by environmental
     variable STATS_NUM_WORKERS. Defaults to 0.
+    - num_shards_stats: Splits the statistics computation in this many contiguous frame ranges, each of them computed
+    by a separate process and merged at the end. Partial results are checkpointed if cache_task_stats is set, so an
+    interrupted computation is resumed and frames added later only update the cached statistics. Can be enabled by
+    environmental variable STATS_NUM_SHARDS. Defaults to 1.
     - statistics The dictionary of statistics which can be externally provided too, otherwise computes or loads them
     from the datasert dir if normalization is set.
 
@@ -60,6 +69,8 @@ class MultiTaskDataset(Dataset):
     - task_1/0.npz, ..., N.npz
     - ...
     - task_n/0.npz, ..., N.npz
+    Tasks exported with the 'chunked' binary format (task_i/chunked/data.chunked) are read frame by frame from their
+    chunked store and matched by frame number (i.e. '5.npz') with the tasks stored as regular files.
 
     Names can be in a different format (i.e. 2022-01-01.npz), but must be consistent and equal across all tasks.
     """
@@ -75,7 +86,9 @@ class MultiTaskDataset(Dataset):
         cache_task_stats: bool = (os.getenv("STATS_CACHE", "1") == "1"),
         batch_size_stats: int = int(os.getenv("STATS_BATCH_SIZE", "1")),
         num_workers_stats: int = int(os.getenv("NUM_WORKERS_STATS", "0")),
+        num_shards_stats: int = int(os.getenv("STATS_NUM_SHARDS", "1")),
         statistics: dict[str, TaskStatistics] | None = None,
+        mmap: bool = (os.getenv("VRE_READER_MMAP", "0") == "1"),
     ):
         assert Path(path).exists(), f"Provided path '{path}' doesn't exist!"
         assert handle_missing_data in ("drop", "fill_none", "fill_zero", "fill_nan", "raise"), \
@@ -84,17 +97,20 @@ class MultiTaskDataset(Dataset):
         self.path = Path(path).absolute()
         self.handle_missing_data = handle_missing_data
         self.suffix = files_suffix
+        self.mmap = mmap
         self.files_per_repr, self.file_names, self.task_types = self._build_dataset(task_types, task_names)
         self.task_names = sorted(task_names)
         self.cache_task_stats = cache_task_stats
         self.batch_size_stats = batch_size_stats
         self.num_workers_stats = num_workers_stats
+        self.num_shards_stats = num_shards_stats
 
         logger.info(f"Tasks used in this dataset: {self.task_names}")
 
-        self._data_shape: tuple[int, ...] | None = None
+        self._data_shape: dict[str, tuple[int, ...]] | None = None
         self._tasks: list[Repr] | None = None
-        self._default_vals: dict[str, tr.Tensor] | None = None
+        self._name_to_task: dict[str, Repr] | None = None
+        self._default_vals: dict[str, tr.Tensor | None] | None = None
         self._statistics: dict[str, TaskStatistics] | None = None
         if statistics is not None:
             self._statistics = load_external_statistics(self, statistics)
@@ -130,18 +146,24 @@ class MultiTaskDataset(Dataset):
     @property
     def name_to_task(self) -> dict[str, Repr]:
         """A dict that maps the name of the task to the task"""
-        return {task.name: task for task in self.tasks}
+        if self._name_to_task is None:
+            self._name_to_task = {task.name: task for task in self.tasks}
+        return self._name_to_task
 
     @property
-    def default_vals(self) -> dict[str, tr.Tensor]:
-        """default values for __getitem__ if item is not on disk but we retrieve a full batch anyway"""
-        _default_val = float("nan") if self.handle_missing_data == "fill_nan" else 0
-        return {task: None if self.handle_missing_data == "fill_none" else tr.full(self.data_shape[task], _default_val)
-                for task in self.task_names}
+    def default_vals(self) -> dict[str, tr.Tensor | None]:
+        """default values for __getitem__ if item is not on disk but we retrieve a full batch anyway. Cached."""
+        if self._default_vals is None or not set(self.task_names).issubset(self._default_vals):
+            _default_val = float("nan") if self.handle_missing_data == "fill_nan" else 0
+            self._default_vals = {task: None if self.handle_missing_data == "fill_none"
+                                  else tr.full(self.data_shape[task], _default_val) for task in self.name_to_task}
+        return self._default_vals
 
     @property
     def data_shape(self) -> dict[str, tuple[int, ...]]:
-        """Returns a {task: shape_tuple} for all representations. At least one npz file must exist for each."""
+        """Returns a {task: shape_tuple} for all representations. At least one npz file must exist for each. Cached."""
+        if self._data_shape is not None and set(self.task_names).issubset(self._data_shape):
+            return self._data_shape
         first_npz = {task: [_v for _v in files if _v is not None][0] for task, files in self.files_per_repr.items()}
         data_shape = {}
         for task_name, task in self.name_to_task.items():
@@ -149,6 +171,7 @@ class MultiTaskDataset(Dataset):
                 data_shape[task_name] = task.compute_from_dependencies_paths(first_npz[task_name]).shape
             else:
                 data_shape[task_name] = task.disk_to_memory_fmt(task.load_from_disk(first_npz[task_name])).shape
+        self._data_shape = data_shape
         return data_shape
 
     @property
@@ -219,7 +242,7 @@ class MultiTaskDataset(Dataset):
                 raise ValueError(f"Task '{task.name}' already exists: {self.task_names}")
         self.task_names = sorted([*self.task_names, task.name])
         self.task_types[task.name] = task
-        self._tasks = None
+        self._tasks, self._name_to_task, self._data_shape, self._default_vals = None, None, None, None
         self.files_per_repr, self.file_names, self.task_types = self._build_dataset(self.task_types, self.task_names)
 
     def remove_task(self, task_name: str):
@@ -228,39 +251,56 @@ class MultiTaskDataset(Dataset):
         assert task_name in self.task_names, f"Task '{task_name}' doesn't exist: {self.task_names}"
         self.task_names = sorted(name for name in self.task_names if name != task_name)
         del self.task_types[task_name]
-        self._tasks = None
+        self._tasks, self._name_to_task, self._data_shape, self._default_vals = None, None, None, None
         self.files_per_repr, self.file_names, self.task_types = self._build_dataset(self.task_types, self.task_names)
 
     def get_one_item(self, index: int, subset_tasks: list[str] | None = None) -> MultiTaskItem:
         """getitem implementation for a single index. Supports a subset of tasks as well"""
-        assert isinstance(index, int), type(index)
+        return self.get_items([index], subset_tasks)[0]
+
+    def get_items(self, indices: list[int], subset_tasks: list[str] | None = None) -> list[MultiTaskItem]:
+        """
+        getitem implementation for a batch of indices. Supports a subset of tasks as well. The tasks, statistics and
+        default values are resolved once per batch instead of once per item and per task.
+        """
+        assert isinstance(indices, (list, tuple)) and all(isinstance(ix, int) for ix in indices), indices
         assert isinstance(subset_tasks, (list, type(None))), type(subset_tasks)
         subset_tasks = self.task_names if subset_tasks is None else subset_tasks
         assert len(subset_tasks) > 0, subset_tasks
-        res: dict[str, tr.Tensor] = {}
+        assert all(t in self.name_to_task for t in subset_tasks), (subset_tasks, list(self.name_to_task))
+        statistics = self.statistics
+        res: list[dict[str, tr.Tensor]] = [{} for _ in indices]
         for task_name in subset_tasks:
-            assert task_name in self.name_to_task, (task_name, list(self.name_to_task))
             task = self.name_to_task[task_name]
-            file_path = self.files_per_repr[task_name][index]
-            if file_path is None:
-                res[task_name] = self.default_vals[task_name]
-            else:
+            normalize = statistics is not None and not hasattr(task, "classes") # TODO: use NormedRepresentationMixin
+            for i, index in enumerate(indices):
+                if (file_path := self.files_per_repr[task_name][index]) is None:
+                    default_val = self.default_vals[task_name]
+                    res[i][task_name] = None if default_val is None else default_val.clone()
+                    continue
                 if isinstance(task, TaskMapper) and task.dependencies[0] != task:
                     np_memory_data = task.compute_from_dependencies_paths(file_path)
                 else: # can also be TaskMapper here too, but with deps[0] == task (pre-computed)
-                    np_memory_data = task.disk_to_memory_fmt(task.load_from_disk(file_path))
+                    np_memory_data = task.disk_to_memory_fmt(self._load_from_disk(task, file_path))
 
-                if self.statistics is not None and not hasattr(task, "classes"): # TODO: use NormedRepresentationMixin
+                if normalize:
                     assert isinstance(task, NormedRepresentationMixin), task
                     np_memory_data = task.normalize(np_memory_data)
-                res[task_name] = tr.from_numpy(np_memory_data)
-        return res, self.file_names[index]
+                res[i][task_name] = tr.from_numpy(np_memory_data if np_memory_data.flags.writeable
+                                                  else np.array(np_memory_data)) # torch needs writable arrays
+        return [(item, self.file_names[index]) for item, index in zip(res, indices)]
 
     # Private methods
 
+    def _load_from_disk(self, task: Repr, path: Path) -> np.ndarray:
+        """loads the disk data of one item, memory-mapped if the reader is in mmap mode and the task supports it"""
+        if self.mmap and isinstance(task, NpIORepresentation):
+            return task.load_from_disk(path, mmap=True)
+        return task.load_from_disk(path)
+
     def _get_all_npz_files(self) -> dict[str, list[Path]]:
         """returns a dict of form: {"rgb": ["0.npz", "1.npz", ..., "N.npz"]}"""
-        assert self.suffix == "npz", f"Only npz supported right now (though trivial to update): {self.suffix}"
+        assert self.suffix in ("npz", "npy"), f"Only npz and npy supported right now: {self.suffix}"
         in_files = {}
         all_repr_dirs: list[str] = [x.name for x in self.path.iterdir() if x.is_dir() and not x.name.startswith(".")]
         for repr_dir_name in all_repr_dirs:
@@ -270,6 +310,9 @@ class MultiTaskDataset(Dataset):
                 all_files = []
                 for part in dir_name.iterdir():
                     all_files.extend(part.glob(f"*.{self.suffix}"))
+                    for store_path in part.glob("*.chunked"): # or as a single chunked store: repr/chunked/data.chunked
+                        all_files.extend(ChunkedStoreFrame(store_path, frame, self.suffix)
+                                         for frame in open_chunked_store(store_path).frames_computed())
             else: # dataset is stored as repr/0.npz, ..., repr/n.npz
                 all_files = dir_name.glob(f"*.{self.suffix}")
             all_files = [x for x in all_files if not x.name.endswith("_extra.npz")] # important: remove xxx_extra.npz
@@ -343,11 +386,16 @@ class MultiTaskDataset(Dataset):
             assert index.start is not None and index.stop is not None and index.step is None, "Only reader[l:r] allowed"
             index = list(range(index.start, index.stop))
         if isinstance(index, (list, tuple)):
-            return self.collate_fn([self.__getitem__(ix) for ix in index])
+            return self.collate_fn(self.__getitems__(index))
         if isinstance(index, str):
             return self.__getitem__(self.file_names.index(index))
         return self.get_one_item(index)
 
+    def __getitems__(self, indices: list[int | str]) -> list[MultiTaskItem]:
+        """Batched read used by torch's DataLoader (one call per batch). Returns the list of items, see collate_fn."""
+        indices = [self.file_names.index(ix) if isinstance(ix, str) else ix for ix in indices]
+        return self.get_items(indices)
+
     def __len__(self) -> int:
         return len(self.files_per_repr[self.task_names[0]]) # all of them have the same number (filled with None or not)
 
@@ -1,9 +1,11 @@
 """compute or load statistics for a set of Normed Representations of a MultiTaskDataset"""
 from __future__ import annotations
-from typing import Iterator
 from pathlib import Path
+from multiprocessing import get_context, get_all_start_methods
+from queue import Empty
 import os
-from torch.utils.data import DataLoader
+import hashlib
+from torch.utils.data import DataLoader, Subset
 import torch as tr
 import numpy as np
 from tqdm import tqdm
@@ -27,66 +29,256 @@ def load_external_statistics(reader: "MultiTaskDataset",
     logger.info(f"External statistics provided: { {k: tuple(v[0].shape) for k, v in res.items()} }")
     return res
 
+class StatisticsAccumulator:
+    """
+    Mergeable running statistics (min, max, mean and M2) of a set of tasks. Batches are added with Welford's update and
+    two accumulators are combined with Chan's parallel formula, so the statistics can be computed on disjoint frame
+    ranges (processes or machines) and merged. The file names that were seen are kept per task, which allows resuming
+    from a checkpoint (see `save` and `load`) and updating the statistics incrementally when new frames are added.
+    Parameters:
+    - n_channels A dict of form {task: number of channels} for all the tasks that are accumulated
+    """
+    def __init__(self, n_channels: dict[str, int]):
+        self.n_channels = n_channels
+        self.counts = {task: tr.zeros(ch).long() for task, ch in n_channels.items()}
+        self.mins = {task: tr.zeros(ch).type(tr.float64) + 10**10 for task, ch in n_channels.items()}
+        self.maxs = {task: tr.zeros(ch).type(tr.float64) - 10**10 for task, ch in n_channels.items()}
+        self.means = {task: tr.zeros(ch).type(tr.float64) for task, ch in n_channels.items()}
+        self.m2s = {task: tr.zeros(ch).type(tr.float64) for task, ch in n_channels.items()}
+        self.file_names: dict[str, set[str]] = {task: set() for task in n_channels}
+
+    @staticmethod
+    def from_data_shapes(tasks: list[str], data_shapes: dict[str, tuple[int, ...]]) -> StatisticsAccumulator:
+        """builds an empty accumulator given the data shapes of the tasks (i.e. reader.data_shape)"""
+        return StatisticsAccumulator({task: data_shapes[task][-1] if len(data_shapes[task]) == 3 else 1
+                                      for task in tasks})
+
+    @property
+    def tasks(self) -> list[str]:
+        """the tasks of this accumulator"""
+        return list(self.n_channels)
+
+    def update(self, item: dict[str, tr.Tensor], file_names: list[str]):
+        """adds a batch of data (i.e. from a DataLoader) to the statistics of each task"""
+        # kinda based on: https://en.wikipedia.org/wiki/Algorithms_for_calculating_variance#Welford's_online_algorithm
+        # sadly this function cannot be at task-level because of speed issues, even if it'd be a bit more readable.
+        assert all(task in item.keys() for task in self.tasks), f"Missing: {set(self.tasks).difference(item)}"
+        for task in self.tasks:
+            item_flat_ch = item[task].reshape(-1, self.n_channels[task])
+            item_no_nan = item_flat_ch.nan_to_num(0).type(tr.float64)
+            self.mins[task] = tr.minimum(self.mins[task], item_no_nan.min(0)[0])
+            self.maxs[task] = tr.maximum(self.maxs[task], item_no_nan.max(0)[0])
+            counts_delta = (item_flat_ch == item_flat_ch).long().sum(0) # pylint: disable=comparison-with-itself
+            batch_mean = item_no_nan.nanmean(0)
+            batch_m2 = ((item_no_nan - batch_mean) ** 2).nansum(0)
+            self._combine(task, counts_delta, batch_mean, batch_m2)
+            self.file_names[task].update(file_names)
+
+    def merge(self, other: StatisticsAccumulator) -> StatisticsAccumulator:
+        """merges another accumulator computed on a disjoint set of files (in place). New tasks are added as-is."""
+        for task in other.tasks:
+            if task not in self.n_channels:
+                self.n_channels[task] = other.n_channels[task]
+                for attr in ("counts", "mins", "maxs", "means", "m2s", "file_names"):
+                    getattr(self, attr)[task] = getattr(other, attr)[task]
+                continue
+            assert self.n_channels[task] == other.n_channels[task], (task, self.n_channels, other.n_channels)
+            assert len(common := self.file_names[task] & other.file_names[task]) == 0, \
+                f"'{task}': {len(common)} files were accumulated by both sides, e.g. {sorted(common)[0:5]}"
+            self.mins[task] = tr.minimum(self.mins[task], other.mins[task])
+            self.maxs[task] = tr.maximum(self.maxs[task], other.maxs[task])
+            self._combine(task, other.counts[task], other.means[task], other.m2s[task])
+            self.file_names[task] = self.file_names[task] | other.file_names[task]
+        return self
+
+    def remove_task(self, task: str):
+        """removes a task from this accumulator (i.e. its state is stale and must be recomputed)"""
+        for attr in ("n_channels", "counts", "mins", "maxs", "means", "m2s", "file_names"):
+            getattr(self, attr).pop(task, None)
+
+    def statistics(self) -> dict[str, TaskStatistics]:
+        """returns the (min, max, mean, std) statistics of each task"""
+        res = {}
+        for task in self.tasks:
+            res[task] = (self.mins[task], self.maxs[task], self.means[task], (self.m2s[task] / self.counts[task]).sqrt())
+            assert not any(x[0].isnan().any() for x in res[task]), (task, res[task])
+        return res
+
+    def state_dict(self) -> dict:
+        """the state of the accumulator as plain python/numpy objects (i.e. to be sent between processes or saved)"""
+        return {"n_channels": self.n_channels, "file_names": {k: sorted(v) for k, v in self.file_names.items()},
+                **{attr: {k: v.numpy() for k, v in getattr(self, attr).items()}
+                   for attr in ("counts", "mins", "maxs", "means", "m2s")}}
+
+    @staticmethod
+    def from_state_dict(state: dict) -> StatisticsAccumulator:
+        """builds an accumulator from the output of `state_dict`"""
+        res = StatisticsAccumulator(state["n_channels"])
+        for attr in ("counts", "mins", "maxs", "means", "m2s"):
+            setattr(res, attr, {k: tr.from_numpy(v) for k, v in state[attr].items()})
+        res.file_names = {k: set(v) for k, v in state["file_names"].items()}
+        return res
+
+    def save(self, path: Path):
+        """saves the state of the accumulator (atomically, so it can be used as a checkpoint)"""
+        tmp_path = Path(path).parent / f".{Path(path).name}.tmp"
+        with open(tmp_path, "wb") as fp:
+            np.savez(fp, self.state_dict())
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path: Path) -> StatisticsAccumulator:
+        """loads an accumulator saved with `save`"""
+        return StatisticsAccumulator.from_state_dict(np.load(path, allow_pickle=True)["arr_0"].item())
+
+    def _combine(self, task: str, counts_b: tr.Tensor, mean_b: tr.Tensor, m2_b: tr.Tensor):
+        counts_a, mean_a, m2_a = self.counts[task], self.means[task], self.m2s[task]
+        new_count = counts_a + counts_b
+        delta = mean_b - mean_a
+        new_count_no_zero = new_count + (new_count == 0) # add 1 (True) in case new_count is 0 to not divide by 0
+        new_mean = mean_a + delta * counts_b / new_count_no_zero
+        new_m2 = m2_a + m2_b + delta**2 * counts_a * counts_b / new_count_no_zero
+        assert not new_mean.isnan().any() and not new_m2.isnan().any(), (mean_a, new_mean, counts_a, counts_b)
+        self.counts[task], self.means[task], self.m2s[task] = new_count, new_mean, new_m2
+
+    def __repr__(self):
+        return f"""[StatisticsAccumulator]
+- Tasks ({len(self.tasks)}): {self.tasks}
+- Files: { {k: len(v) for k, v in self.file_names.items()} }"""
+
+def compute_statistics_shard(reader: "MultiTaskDataset", tasks: list[str], indices: list[int],
+                             checkpoint_path: Path | None = None) -> StatisticsAccumulator:
+    """
+    Computes the statistics of some tasks on a subset of the reader's indices (i.e. a frame range). Can be called on
+    different machines for disjoint ranges and the results merged via `StatisticsAccumulator.merge`.
+    If checkpoint_path is provided, the partial state is saved every STATS_CHECKPOINT_EVERY batches (default: 100) and
+    at the end. If it already exists, the computation is resumed from it (files already seen are skipped).
+    Note: the reader must not be normalized (reader.normalization is None) when calling this.
+    """
+    acc = StatisticsAccumulator.from_data_shapes(tasks, reader.data_shape)
+    if checkpoint_path is not None and Path(checkpoint_path).exists():
+        if sorted((ckpt := StatisticsAccumulator.load(checkpoint_path)).tasks) == sorted(tasks):
+            acc = ckpt
+            logger.info(f"Resuming from '{checkpoint_path}': {len(acc.file_names[tasks[0]])} files already done")
+        else:
+            logger.warning(f"Checkpoint '{checkpoint_path}' tasks {ckpt.tasks} differ from {tasks}. Ignoring it.")
+    seen = set.intersection(*[acc.file_names[task] for task in tasks])
+    todo = [ix for ix in indices if reader.file_names[ix] not in seen]
+    checkpoint_every = int(os.getenv("STATS_CHECKPOINT_EVERY", "100"))
+    loader = DataLoader(Subset(reader, todo), batch_size=reader.batch_size_stats, num_workers=reader.num_workers_stats)
+    for i, (item, names) in enumerate(tqdm(loader, disable=os.getenv("STATS_PBAR", "0") == "0",
+                                           desc="Computing stats")):
+        acc.update(item, names)
+        if checkpoint_path is not None and (i + 1) % checkpoint_every == 0:
+            acc.save(checkpoint_path)
+    if checkpoint_path is not None:
+        acc.save(checkpoint_path)
+    return acc
+
 def compute_statistics(reader: "MultiTaskDataset") -> dict[str, TaskStatistics]:
-    """computes statistics for all tasks that are not classification"""
+    """
+    computes statistics for all tasks that are not classification. If reader.cache_task_stats is set, the accumulated
+    state is also cached and only the frames added since the last computation are processed on the next call.
+    """
     name_to_task: dict[str, Representation] = reader.name_to_task
     cache_path: Path = reader.path / ".task_statistics.npz"
+    state_path: Path = reader.path / ".task_statistics_state.npz"
     res: dict[str, TaskStatistics] = {}
+    acc = StatisticsAccumulator({})
     if reader.cache_task_stats and cache_path.exists():
         res = np.load(cache_path, allow_pickle=True)["arr_0"].item()
         logger.info(f"Loaded task statistics: { {k: tuple(v[0].shape) for k, v in res.items()} } from {cache_path}")
-    missing_tasks = [t for t in set(reader.task_names).difference(res)
-                     if isinstance(name_to_task[t], NormedRepresentationMixin)]
-    if len(missing_tasks) == 0:
+    if reader.cache_task_stats and state_path.exists():
+        acc = StatisticsAccumulator.load(state_path)
+    normed_tasks = [t for t in sorted(reader.task_names) if isinstance(name_to_task[t], NormedRepresentationMixin)]
+
+    todo: dict[str, list[int]] = {} # task -> indices that must still be accumulated
+    for task in normed_tasks:
+        if task not in res:
+            todo[task] = list(range(len(reader)))
+            acc.remove_task(task)
+            continue
+        if task not in acc.tasks: # cached without the accumulated state, cannot be updated incrementally
+            continue
+        if len(removed := acc.file_names[task].difference(reader.file_names)) > 0:
+            logger.warning(f"'{task}': {len(removed)} files were removed since the last computation. Recomputing.")
+            todo[task] = list(range(len(reader)))
+            acc.remove_task(task)
+        elif len(new_ixs := [i for i, name in enumerate(reader.file_names) if name not in acc.file_names[task]]) > 0:
+            logger.info(f"'{task}': {len(new_ixs)} new files since the last computation. Updating the statistics.")
+            todo[task] = new_ixs
+    if len(todo) == 0:
         return res
 
-    logger.info(f"Computing global task statistics (dataset len {len(reader)}) for {missing_tasks}")
+    groups: dict[tuple[int, ...], list[str]] = {} # tasks that need the same indices are computed together
+    for task, ixs in todo.items():
+        groups.setdefault(tuple(ixs), []).append(task)
+    logger.info(f"Computing global task statistics (dataset len {len(reader)}) for {list(todo)}")
     old_names, old_normalization = reader.task_names, reader.normalization
-    reader.task_names, reader.normalization = missing_tasks, None # for reader[ix]
-    _iter = iter(DataLoader(reader, batch_size=reader.batch_size_stats, num_workers=reader.num_workers_stats))
-    res_missing = _c2(_iter, missing_tasks, reader.data_shape)
-    reader.task_names, reader.normalization = old_names, old_normalization
-    res = {**res, **res_missing}
+    try:
+        for ixs, tasks in groups.items():
+            reader.task_names, reader.normalization = tasks, None # for reader[ix]
+            acc.merge(_compute_sharded(reader, tasks, list(ixs)))
+    finally:
+        reader.task_names, reader.normalization = old_names, old_normalization
+    res = {**res, **{k: v for k, v in acc.statistics().items() if k in todo}}
 
     logger.info(f"Computed task statistics: { {k: tuple(v[0].shape) for k, v in res.items()} }")
     np.savez(cache_path, res)
+    if reader.cache_task_stats:
+        acc.save(state_path)
     return res
 
-def _c2(iterator: Iterator, tasks: list[str], data_shapes: dict[str, tuple[int, ...]]) -> dict[str, TaskStatistics]:
-    # kinda based on: https://en.wikipedia.org/wiki/Algorithms_for_calculating_variance#Welford's_online_algorithm
-    # sadly this function cannot be at task-level because of speed issues, even if it'd be a bit more readable.
-    def update(counts: tr.Tensor, counts_delta: float,  mean: tr.Tensor, m2: tr.Tensor,
-                new_value: tr.Tensor) -> tuple[tr.Tensor, tr.Tensor, tr.Tensor]:
-        new_count = counts + counts_delta
-        batch_mean = new_value.nanmean(0)
-        batch_var = ((new_value - batch_mean) ** 2).nansum(0)
-        delta = batch_mean - mean
-        new_count_no_zero = new_count + (new_count == 0) # add 1 (True) in case new_count is 0 to not divide by 0
-        new_mean = mean + delta * counts_delta / new_count_no_zero
-        new_m2 = m2 + batch_var + delta**2 * counts * counts_delta / new_count_no_zero
-        assert not new_mean.isnan().any() and not new_m2.isnan().any(), (mean, new_mean, counts, counts_delta)
-        return new_count, new_mean, new_m2
-
-    ch = {task_name: data_shapes[task_name][-1] if len(data_shapes[task_name]) == 3 else 1 for task_name in tasks}
-    counts = {task_name: tr.zeros(ch[task_name]).long() for task_name in tasks}
-    mins = {task_name: tr.zeros(ch[task_name]).type(tr.float64) + 10**10 for task_name in tasks}
-    maxs = {task_name: tr.zeros(ch[task_name]).type(tr.float64) - 10**10 for task_name in tasks}
-    means_vec = {task_name: tr.zeros(ch[task_name]).type(tr.float64) for task_name in tasks}
-    m2s_vec = {task_name: tr.zeros(ch[task_name]).type(tr.float64) for task_name in tasks}
-
-    for (item, _) in tqdm(iterator, disable=os.getenv("STATS_PBAR", "0") == "0", desc="Computing stats"):
-        assert all(task in item.keys() for task in tasks), f"Missing: {set(tasks).difference(item)}"
-        for task in tasks:
-            item_flat_ch = item[task].reshape(-1, ch[task])
-            item_no_nan = item_flat_ch.nan_to_num(0).type(tr.float64)
-            mins[task] = tr.minimum(mins[task], item_no_nan.min(0)[0])
-            maxs[task] = tr.maximum(maxs[task], item_no_nan.max(0)[0])
-            counts_delta = (item_flat_ch == item_flat_ch).long().sum(0) # pylint: disable=comparison-with-itself
-            counts[task], means_vec[task], m2s_vec[task] = \
-                update(counts[task], counts_delta, means_vec[task], m2s_vec[task], item_no_nan)
-
-    res = {}
-    for task in tasks:
-        res[task] = (mins[task], maxs[task], means_vec[task], (m2s_vec[task] / counts[task]).sqrt())
-        assert not any(x[0].isnan().any() for x in res[task]), (task, res[task])
+def _compute_sharded(reader: "MultiTaskDataset", tasks: list[str], indices: list[int]) -> StatisticsAccumulator:
+    """splits the indices in reader.num_shards_stats contiguous shards, each of them computed by a (forked) process"""
+    n_shards = max(min(reader.num_shards_stats, len(indices)), 1)
+    shards = [ixs.tolist() for ixs in np.array_split(indices, n_shards)]
+    tasks_hash = hashlib.md5(",".join(sorted(tasks)).encode()).hexdigest()[0:8]
+    ckpt_paths = [reader.path / f".task_statistics_{tasks_hash}_{i}_{n_shards}.npz" if reader.cache_task_stats else None
+                  for i in range(n_shards)]
+    if n_shards == 1:
+        res = compute_statistics_shard(reader, tasks, shards[0], ckpt_paths[0])
+    else:
+        ctx = get_context("fork" if "fork" in get_all_start_methods() else "spawn")
+        queue = ctx.Queue()
+        procs = [ctx.Process(target=_shard_worker_fn, args=(reader, tasks, i, shard, ckpt_path, queue))
+                 for i, (shard, ckpt_path) in enumerate(zip(shards, ckpt_paths))]
+        _ = [proc.start() for proc in procs]
+        states, errors = _collect_shard_states(procs, queue)
+        if len(errors) > 0:
+            raise RuntimeError("Statistics shards failed:\n" + "\n".join(f"- Shard {k}: {v}"
+                                                                          for k, v in sorted(errors.items())))
+        res = StatisticsAccumulator({})
+        for _, state in sorted(states.items()):
+            res.merge(StatisticsAccumulator.from_state_dict(state))
+    for ckpt_path in ckpt_paths:
+        if ckpt_path is not None:
+            ckpt_path.unlink(missing_ok=True)
     return res
+
+def _collect_shard_states(procs: list["Process"], queue: "Queue") -> tuple[dict[int, dict], dict[int, str]]:
+    """reads the states of all the shards (before joining). A process that died without a result is an error."""
+    states, errors = {}, {}
+    while len(states) + len(errors) < len(procs):
+        try:
+            shard_ix, state, error = queue.get(timeout=1)
+        except Empty:
+            for i, proc in enumerate(procs):
+                if not proc.is_alive() and i not in states and i not in errors and queue.empty():
+                    errors[i] = f"process died with exit code {proc.exitcode}"
+            continue
+        if error is None:
+            states[shard_ix] = state
+        else:
+            errors[shard_ix] = error
+    for proc in procs:
+        proc.join()
+    return states, errors
+
+def _shard_worker_fn(reader: "MultiTaskDataset", tasks: list[str], shard_ix: int, indices: list[int],
+                     checkpoint_path: Path | None, queue: "Queue"):
+    try:
+        queue.put((shard_ix, compute_statistics_shard(reader, tasks, indices, checkpoint_path).state_dict(), None))
+    except Exception as e: # pylint: disable=broad-exception-caught
+        logger.error(f"Statistics shard {shard_ix} failed: {e}")
+        queue.put((shard_ix, None, f"{type(e).__name__}: {e}"))
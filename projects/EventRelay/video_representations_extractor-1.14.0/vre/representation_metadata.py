@@ -2,6 +2,7 @@
 from pathlib import Path
 from typing import Any, NamedTuple
 from io import FileIO
+import os
 import json
 
 from .utils import AtomicOpen
@@ -11,28 +12,41 @@ FrameStats = NamedTuple("frame_stats", duration=float, run_id=str, formats=list[
 class RepresentationMetadata:
     """
     A class that defines the metadata and events that happened during a single representation's run.
-    It is backed by a single sqlite file living in the representation's directory under .run_metadata.json.
-    Note: that this file may be updated from multiple processes running at the same time. For this reason, we have an
-    extra layer protection based on json modification time via `os.path.getmtime` and we merge before storing to disk.
+    It is backed by two files living in the representation's directory:
+    - .repr_metadata.json: a (compacted) snapshot of all the frames' stats.
+    - .repr_metadata.json.log: an append-only journal (one json line per batch) of the stats added since the snapshot.
+    Note: that these files may be updated from multiple processes running at the same time. For this reason, all the
+    disk operations happen under a lock on the journal. Each sync only reads the journal lines appended by the other
+    processes since our last sync and appends our own new lines, so it is O(batch) and not O(frames). The journal is
+    compacted into the snapshot once it grows larger than the snapshot and when the representation is done. The first
+    line of the journal holds the snapshot's generation, so other processes know to reload it after a compaction.
     """
+    MIN_COMPACTION_BYTES = 64 * 1024
+
     def __init__(self, repr_name: str, disk_location: Path, frames: list[int], formats: list[str]):
         assert all(isinstance(x, int) for x in frames), frames
         assert len(formats) > 0, "formats cannot be empty, is your representation an IORepresentation?"
         self.repr_name = repr_name
-        self.disk_location = disk_location
+        self.disk_location = Path(disk_location)
         self.run_had_exceptions = False
         self.formats = formats
         self.run_stats: dict[int, FrameStats | None] = {f: None for f in frames}
-        self.store_on_disk()
+        self._computed: set[int] = set()
+        self._pending: list[dict] = [] # journal records added in memory but not yet appended to the journal
+        self._generation: int | None = None # the snapshot generation that our in-memory stats are based on
+        self._journal_offset = 0 # bytes of the journal already applied to our in-memory stats
+        self._sync(compact=not self.disk_location.exists())
+
+    @property
+    def journal_location(self) -> Path:
+        """The path of the append-only journal next to the snapshot"""
+        return self.disk_location.parent / f"{self.disk_location.name}.log"
 
     def frames_computed(self, run_id: str | None = None) -> list[int]:
         """returns the list of comptued frames so far for this representation"""
-        def condition(frame_stats: FrameStats | None) -> bool:
-            if frame_stats is None or frame_stats.duration is None:
-                return False
-            return set(self.formats).issubset(frame_stats.formats)
-        return [ix for ix, v in self.run_stats.items() if condition(v)
-                and (v.run_id == run_id if run_id is not None else True)]
+        if run_id is None:
+            return sorted(self._computed)
+        return sorted(ix for ix in self._computed if self.run_stats[ix].run_id == run_id)
 
     def frames_failed(self, run_id: str | None = None) -> list[int]:
         """returns the list of failed frames so far for this representation"""
@@ -40,28 +54,27 @@ class RepresentationMetadata:
                 and (v.run_id == run_id if run_id is not None else True)]
 
     def add_time(self, duration: float | None, frames: list[int], run_id: str, sync: bool=False):
-        """adds a (batched) time to the representation's run_stats. If sync is true, it also calls store_on_disk."""
+        """adds a (batched) time to the representation's run_stats. If sync is true, it also appends to the journal."""
         assert (batch_size := len(frames)) > 0, batch_size
         data = [duration / batch_size] * batch_size if duration is not None else [None] * batch_size
+        record = {"run_id": run_id, "formats": self.formats, "stats": {}}
         for ix, frame_duration in zip(frames, data):
             if self.run_stats[ix] is not None and self.run_stats[ix].duration is not None:
-                if set(self.formats).issubset(self.run_stats[ix].formats):
+                if ix in self._computed:
                     raise ValueError(f"Adding time to existing metadata {self}. Frame={ix}. "
                                      f"Previous: {self.run_stats[ix]}")
                 # overwrite the run id but add the previous time of the old representations to current frame duration
-                frame_duration += self.run_stats[ix].duration
-            self.run_stats[ix] = FrameStats(run_id=run_id, duration=frame_duration, formats=self.formats)
+                frame_duration = None if frame_duration is None else frame_duration + self.run_stats[ix].duration
+            record["stats"][ix] = frame_duration
+        self._apply_record(record)
+        self._pending.append(record)
         if sync:
-            self.store_on_disk()
+            self._sync(compact=False)
 
     def to_dict(self, sync: bool=False) -> dict:
-        """returns the metadata as a dict. Used mostly for tests. If atomic is set to true, uses AtomicOpen"""
-        if sync and self.disk_location.exists():
-            with AtomicOpen(self.disk_location, "a+") as fp:
-                self.run_stats = self._load_and_merge_with_metadata_from_disk(fp)
-                fp.seek(0)
-                fp.truncate()
-
+        """returns the metadata as a dict. Used mostly for tests. If sync is set to true, it reads the disk first"""
+        if sync:
+            self._sync(compact=False)
         return {
             "name": self.repr_name,
             "run_stats": {k: None if v is None else v._asdict() for k, v in self.run_stats.items()},
@@ -69,47 +82,121 @@ class RepresentationMetadata:
 
     def store_on_disk(self):
         """
-        Stores (overwrites) the metadata on disk. Note: this does allows for multi processing on the same repr!
-        Note: that disk_writer_meta will be overwritten by the last writer.
+        Stores the metadata on disk and compacts the journal into the snapshot. Note: this does allows for multi
+        processing on the same repr, the stats of the other processes are merged before writing the snapshot.
         """
-        file_exists = self.disk_location.exists()
-        with AtomicOpen(self.disk_location, "a+") as fp:
-            if file_exists: # if it exists, we merge the disk data with existing data before overwriting
-                self.run_stats = self._load_and_merge_with_metadata_from_disk(fp)
+        self._sync(compact=True)
+
+    # Private methods
 
+    def _sync(self, compact: bool):
+        """
+        Under the journal lock: applies the journal lines of the other processes since our last sync (or reloads
+        everything if the snapshot was compacted meanwhile), then appends our pending records or, if compacting (or
+        the journal got larger than the snapshot), writes a new snapshot and starts a new (empty) journal.
+        """
+        with AtomicOpen(self.journal_location, "a+") as fp:
             fp.seek(0)
-            fp.truncate()
-            json_data = {
+            header = fp.readline()
+            generation = json.loads(header)["generation"] if header.strip() != "" else None
+            if generation is None or generation != self._generation:
+                journal_clean = self._load_from_disk(fp, generation)
+            else:
+                fp.seek(self._journal_offset)
+                journal_clean = self._apply_journal_lines(fp)
+
+            journal_size = fp.seek(0, os.SEEK_END)
+            snapshot_size = self.disk_location.stat().st_size if self.disk_location.exists() else 0
+            if compact or not journal_clean or generation is None \
+                    or journal_size > max(snapshot_size, self.MIN_COMPACTION_BYTES):
+                self._compact(fp)
+            elif len(self._pending) > 0:
+                fp.write("".join(f"{json.dumps(record)}\n" for record in self._pending))
+                fp.flush()
+                self._journal_offset = fp.tell()
+            self._pending = []
+
+    def _load_from_disk(self, fp: FileIO, generation: int | None) -> bool:
+        """
+        (re)builds the in-memory stats from the snapshot and the whole journal, then re-applies our pending records.
+        Returns False if the journal ends with a partial line.
+        """
+        self.run_stats = {f: None for f in self.run_stats}
+        self._computed = set()
+        if self.disk_location.exists():
+            with open(self.disk_location, "r") as snapshot_fp:
+                loaded_json_data = json.load(snapshot_fp)
+            assert (a := loaded_json_data["name"]) == (b := self.repr_name), f"\n- {a}\n- {b}"
+            loaded_run_stats = {int(k): None if v is None else FrameStats(**v)
+                                for k, v in loaded_json_data["run_stats"].items()}
+            assert (a := loaded_run_stats.keys()) == (b := self.run_stats.keys()), f"\n- {a}\n- {b}"
+            for ix, v in loaded_run_stats.items():
+                if v is not None:
+                    self._set_frame_stats(ix, v)
+        self._generation = generation
+        journal_clean = self._apply_journal_lines(fp) if generation is not None else True
+        for record in self._pending:
+            self._apply_record(record)
+        return journal_clean
+
+    def _apply_journal_lines(self, fp: FileIO) -> bool:
+        """
+        applies all the journal lines from the current position of fp and updates our journal offset. Returns False if
+        the journal ends with a partial line (a crashed writer), so the caller compacts it away before appending.
+        """
+        self._journal_offset = fp.tell()
+        for line in iter(fp.readline, ""):
+            if not line.endswith("\n"):
+                return False
+            self._apply_record(json.loads(line))
+            self._journal_offset = fp.tell()
+        return True
+
+    def _compact(self, fp: FileIO):
+        """writes the merged stats as a new snapshot generation and truncates the journal to just its header"""
+        generation = (self._generation or 0) + 1
+        tmp_path = self.disk_location.parent / f"{self.disk_location.name}.tmp"
+        with open(tmp_path, "w") as snapshot_fp:
+            json.dump({
                 "name": self.repr_name,
+                "generation": generation,
                 "run_stats": {k: None if v is None else v._asdict() for k, v in self.run_stats.items()},
-            }
-            json.dump(json_data, fp, indent=4)
-
-    def _load_and_merge_with_metadata_from_disk(self, fp: FileIO) -> dict[str, Any]:
-        """given an (mutexed) fp, read the metadata from the disk and return the run stats. Fail if any errors"""
+            }, snapshot_fp, indent=4)
+            snapshot_fp.flush()
+            os.fsync(snapshot_fp.fileno())
+        os.replace(tmp_path, self.disk_location)
         fp.seek(0)
-        raw_data = fp.read()
-        loaded_json_data = json.loads(raw_data)
-        loaded_run_stats = {int(k): None if v is None else FrameStats(**v)
-                            for k, v in loaded_json_data["run_stats"].items()}
-        assert (a := loaded_run_stats.keys()) == (b := self.run_stats.keys()), f"\n- {a}\n- {b}"
-        assert (a := loaded_json_data["name"]) == (b := self.repr_name), f"\n- {a}\n- {b}"
-        merged_run_stats = {}
-        # TODO... test this stuff below
-        for k, v in self.run_stats.items():
-            if (loaded_v := loaded_run_stats[k]) is not None and loaded_v.duration is not None:
-                if v is None:
-                    merged_run_stats[k] = loaded_v
-                    continue
-                # v exists too below
-                if set(self.formats) == set(loaded_v.formats) and v != loaded_v:
-                    raise ValueError(k, v, loaded_v)
-                # v exists and is different from loaded_v (i.e. jpg in new run and npz in prev) -> merge formats
-                merged_formats = sorted(set(v.formats).union(loaded_v.formats))
-                merged_run_stats[k] = FrameStats(duration=v.duration, formats=merged_formats, run_id=v.run_id)
-            else:
-                merged_run_stats[k] = v
-        return merged_run_stats
+        fp.truncate()
+        fp.write(f"{json.dumps({'generation': generation})}\n")
+        fp.flush()
+        self._generation = generation
+        self._journal_offset = fp.tell()
+
+    def _apply_record(self, record: dict[str, Any]):
+        """merges one journal record (the stats of a batch) into the in-memory stats"""
+        for ix, duration in record["stats"].items():
+            incoming = FrameStats(duration=duration, run_id=record["run_id"], formats=record["formats"])
+            self._set_frame_stats(int(ix), self._merge_frame_stats(self.run_stats[int(ix)], incoming))
+
+    def _set_frame_stats(self, ix: int, frame_stats: FrameStats):
+        self.run_stats[ix] = frame_stats
+        if frame_stats.duration is not None and set(self.formats).issubset(frame_stats.formats):
+            self._computed.add(ix)
+        else:
+            self._computed.discard(ix)
+
+    @staticmethod
+    def _merge_frame_stats(current: FrameStats | None, incoming: FrameStats) -> FrameStats:
+        """
+        merges the stats of a frame. A failure never overwrites a computed frame and if both are computed (i.e. jpg in
+        the new run and npz in the previous one) the formats are merged and the newest duration and run id are kept.
+        """
+        if current is None or current.duration is None:
+            return incoming
+        if incoming.duration is None:
+            return current
+        merged_formats = sorted(set(current.formats).union(incoming.formats))
+        return FrameStats(duration=incoming.duration, formats=merged_formats, run_id=incoming.run_id)
 
     def __repr__(self):
         return (f"[ReprMetadata] Representation: {self.repr_name}. Frames: {len(self.run_stats)} "
@@ -14,6 +14,7 @@ class BinaryFormat(Enum):
     NOT_SET = "not-set"
     NPZ = "npz"
     NPY = "npy"
+    CHUNKED = "chunked" # single-file chunked store. See vre/utils/chunked_store.py
 
 class ImageFormat(Enum):
     """types of image outputs from a representation"""
@@ -5,7 +5,7 @@ from typing import Callable
 from pathlib import Path
 from overrides import overrides
 import numpy as np
-from vre.utils import FixedSizeOrderedDict
+from vre.utils import FixedSizeOrderedDict, ChunkedStoreFrame
 from vre.logger import vre_logger as logger
 
 from .io_representation_mixin import IORepresentationMixin, MemoryData, DiskData
@@ -30,14 +30,20 @@ class NpIORepresentation(IORepresentationMixin):
         return None
 
     @overrides
-    def load_from_disk(self, path: Path) -> DiskData:
-        """Reads the npz data from the disk and transforms it properly"""
+    def load_from_disk(self, path: Path, mmap: bool = False) -> DiskData:
+        """
+        Reads the npz data from the disk and transforms it properly. If mmap is set, uncompressed data (npy files and
+        uncompressed chunked stores) is memory-mapped (copy-on-write) and returned without any copy or caching.
+        """
+        if mmap and (isinstance(path, ChunkedStoreFrame) or Path(path).suffix == ".npy"):
+            data = path.read(mmap=True) if isinstance(path, ChunkedStoreFrame) else np.load(path, mmap_mode="c")
+            return data.astype(np.float32, copy=False) if np.issubdtype(data.dtype, np.floating) else data
         if (key := (str(getattr(self, "name", None)), str(getattr(self, "normalization", None)), str(path))) in _CACHE:
             logger.debug2(f"HIT: '{key}'")
             return deepcopy(_CACHE[key])
         logger.debug2(f"MISS: '{key}'")
         try:
-            data = np.load(path, allow_pickle=False)
+            data = path.read() if isinstance(path, ChunkedStoreFrame) else np.load(path, allow_pickle=False)
         except Exception as e:
             logger.error(f"Failed with {e} on '{path}'") # thx numpy for failing w/o giving me the path...
             raise e
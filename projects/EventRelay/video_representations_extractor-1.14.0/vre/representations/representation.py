@@ -61,6 +61,10 @@ class Representation(ABC):
         """
         raise NotImplementedError(f"{self} must implement .compute()")
 
+    def context_frames(self, video: VREVideo, ix: int) -> list[int]: # pylint: disable=unused-argument
+        """The other frames of the video (besides ix) whose content is used to compute frame ix. Used by ResultCache."""
+        return []
+
     def set_compute_params(self, **kwargs):
         """set the compute parameters for the representation"""
         attributes = ["batch_size"]
@@ -0,0 +1,219 @@
+"""ResultCache -- content-addressed, size-bounded cache of per-frame representation outputs shared across VRE runs"""
+from __future__ import annotations
+from pathlib import Path
+from enum import Enum
+import os
+import json
+import hashlib
+import threading
+import numpy as np
+import torch as tr
+from vre_video import VREVideo
+
+from .representations import Representation, LearnedRepresentationMixin
+from .utils import ReprOut, MemoryData, FixedSizeOrderedDict, SynchronizedVideo
+from .logger import vre_logger as logger
+
+# public attributes that only control how the representation runs, not what it computes
+_NON_COMPUTE_ATTRIBUTES = {"name", "dependencies", "setup_called"}
+
+_weights_digests: dict[tuple[str, int, int], str] = {} # (path, size, mtime_ns) -> digest of the file's content
+
+def _hash_bytes(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def _encode_param(x):
+    """a json-able encoding of a parameter's value. Arrays are encoded by content. Throws TypeError if unsupported."""
+    if x is None or isinstance(x, (bool, int, float, str)):
+        return x
+    if isinstance(x, (list, tuple)):
+        return [_encode_param(y) for y in x]
+    if isinstance(x, (set, frozenset)):
+        return sorted((_encode_param(y) for y in x), key=repr)
+    if isinstance(x, dict):
+        return sorted(([_encode_param(k), _encode_param(v)] for k, v in x.items()), key=repr)
+    if isinstance(x, (Path, Enum, np.dtype, tr.device, tr.dtype)):
+        return str(x)
+    if isinstance(x, np.generic):
+        return x.item()
+    if isinstance(x, tr.Tensor):
+        x = x.detach().cpu().numpy()
+    if isinstance(x, np.ndarray):
+        return {"dtype": str(x.dtype), "shape": x.shape, "data": _hash_bytes(np.ascontiguousarray(x).tobytes())}
+    raise TypeError(f"Cannot fingerprint a parameter of type {type(x)}")
+
+def _weights_digest(path: Path) -> str:
+    """hash of a weights file's content. Cached by (path, size, mtime), so large weights are only read once."""
+    st = (path := Path(path)).stat() # throws FileNotFoundError if the weights were not fetched yet
+    if (key := (str(path.absolute()), st.st_size, st.st_mtime_ns)) not in _weights_digests:
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as fp:
+            while len(block := fp.read(1 << 24)) > 0:
+                h.update(block)
+        _weights_digests[key] = h.hexdigest()
+    return _weights_digests[key]
+
+def representation_fingerprint(rep: Representation) -> str:
+    """
+    A hash of what a representation computes: its type, its parameters and the content of the weights it uses.
+    Runtime and I/O settings (name, device, batch size, formats) are not part of it, so they can change between runs.
+    Public attributes are the parameters: if one of them cannot be encoded (see `_encode_param`), this throws instead
+    of ignoring it, so two representations that may compute different things never share a fingerprint. Private
+    attributes are state derived from the parameters or set up later (i.e. normalization tensors, drawing caches), so
+    they are not part of it. The model of a learned representation is loaded from the weights, so only these are hashed.
+    """
+    params = {}
+    for k, v in sorted(vars(rep).items()):
+        if k.startswith("_") or k in _NON_COMPUTE_ATTRIBUTES or (k == "model"
+                                                                and isinstance(rep, LearnedRepresentationMixin)):
+            continue
+        try:
+            params[k] = _encode_param(v)
+        except TypeError as e:
+            raise TypeError(f"[{rep}] Parameter '{k}': {e}") from e
+    weights = None
+    if isinstance(rep, LearnedRepresentationMixin):
+        paths = type(rep).get_weights_paths(**({"variant": rep.variant} if hasattr(rep, "variant") else {}))
+        weights = [_weights_digest(path) for path in (paths or [])]
+    data = {"type": f"{type(rep).__module__}.{type(rep).__qualname__}", "params": params, "weights": weights}
+    return _hash_bytes(json.dumps(data, sort_keys=True).encode())
+
+class ResultCache:
+    """
+    Content-addressed cache of the outputs of representations, one entry per frame. The key of a frame is the hash of
+    the frame's bytes (plus the bytes of its `context_frames`, i.e. optical flow), of the representation's fingerprint
+    (see `representation_fingerprint`) and of the keys of its dependencies for that frame. Thus, the same footage
+    exported to a different output dir (or as part of an overlapping clip) reuses the previous results.
+    The entries are files under `path`. Reads touch them (mtime) and the least recently used ones are evicted when
+    the total size goes above `max_bytes`. The cache is safe to be shared by multiple processes.
+    Representations that cannot be fingerprinted (see `representation_fingerprint`) are never cached, nor are the ones
+    depending on them.
+    Parameters:
+    - path The directory of the cache. Created if it doesn't exist.
+    - max_bytes The max size of the cache on disk. Eviction brings it down to 90% of this value.
+    """
+    def __init__(self, path: Path, max_bytes: int):
+        assert max_bytes > 0, max_bytes
+        self.path = Path(path)
+        self.path.mkdir(exist_ok=True, parents=True)
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "puts": 0, "evicted": 0}
+        self._size = sum(f.stat().st_size for f in self.path.glob("*/*.npz"))
+        self._fingerprints: dict[int, str | None] = {}
+        self._frame_hashes = FixedSizeOrderedDict(maxlen=4096)
+        self._frame_hashes_lock = threading.Lock()
+
+    @staticmethod
+    def from_env() -> ResultCache | None:
+        """
+        builds the cache from the environment variables: VRE_RESULT_CACHE_DIR (not set = disabled) and
+        VRE_RESULT_CACHE_MAX_GB (defaults to 20)
+        """
+        if (path := os.getenv("VRE_RESULT_CACHE_DIR")) is None:
+            return None
+        return ResultCache(path, max_bytes=int(float(os.getenv("VRE_RESULT_CACHE_MAX_GB", "20")) * 1024**3))
+
+    def keys(self, rep: Representation, video: VREVideo, ixs: list[int]) -> list[str] | None:
+        """returns the cache key of each frame for this representation or None if it cannot be cached"""
+        if (fingerprint := self.fingerprint(rep)) is None:
+            return None
+        dep_keys = [self.keys(dep, video, ixs) for dep in rep.dependencies]
+        if any(keys is None for keys in dep_keys):
+            return None
+        res = []
+        for i, ix in enumerate(ixs):
+            h = hashlib.blake2b(fingerprint.encode(), digest_size=16)
+            for frame in [ix, *rep.context_frames(video, ix)]:
+                h.update(self._frame_hash(video, frame).encode())
+            for keys in dep_keys:
+                h.update(keys[i].encode())
+            res.append(h.hexdigest())
+        return res
+
+    def fingerprint(self, rep: Representation) -> str | None:
+        """the (memoized) fingerprint of the representation or None if it cannot be fingerprinted"""
+        if id(rep) not in self._fingerprints:
+            try:
+                self._fingerprints[id(rep)] = representation_fingerprint(rep)
+            except Exception as e: # pylint: disable=broad-exception-caught
+                logger.warning(f"[{rep}] Cannot fingerprint the representation, it will not be cached: {e}")
+                self._fingerprints[id(rep)] = None
+        return self._fingerprints[id(rep)]
+
+    def get(self, rep: Representation, video: VREVideo, ixs: list[int]) -> ReprOut | None:
+        """returns the cached output of these frames or None if any of them is not cached (all or nothing)"""
+        if (keys := self.keys(rep, video, ixs)) is None:
+            return None
+        entries = []
+        for key in keys:
+            try:
+                entries.append(np.load(path := self._entry_path(key), allow_pickle=True)["arr_0"].item())
+                os.utime(path) # mark as recently used
+            except (OSError, ValueError, EOFError, KeyError): # missing, evicted meanwhile or partially written
+                self.stats["misses"] += 1
+                return None
+        self.stats["hits"] += 1
+        extra = [e["extra"] for e in entries] if all(e["extra"] is not None for e in entries) else None
+        logger.debug2(f"[{rep}] Slice: [{ixs[0]}:{ixs[-1]}]. All data found in the result cache")
+        return ReprOut(frames=video[ixs], output=MemoryData(np.stack([e["output"] for e in entries])),
+                       extra=extra, key=ixs)
+
+    def put(self, rep: Representation, video: VREVideo, rep_out: ReprOut):
+        """stores the output of each frame of a (batched) ReprOut. Never throws, only logs on failure."""
+        try:
+            if (keys := self.keys(rep, video, rep_out.key)) is None:
+                return
+            for i, key in enumerate(keys):
+                extra = rep_out.extra[i] if rep_out.extra is not None else None
+                self._size += self._write_entry(key, {"output": np.asarray(rep_out.output[i]), "extra": extra})
+                self.stats["puts"] += 1
+        except Exception as e: # pylint: disable=broad-exception-caught
+            logger.warning(f"[{rep}] Could not store {rep_out.key} in the result cache: {e}")
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """removes the least recently used entries until the cache is at 90% of its max size"""
+        entries = []
+        for f in self.path.glob("*/*.npz"):
+            try:
+                entries.append((f.stat().st_mtime, f.stat().st_size, f))
+            except FileNotFoundError: # removed by another process
+                continue
+        self._size = sum(e[1] for e in entries)
+        for _, size, f in sorted(entries, key=lambda e: e[0]):
+            if self._size <= 0.9 * self.max_bytes:
+                break
+            f.unlink(missing_ok=True)
+            self._size -= size
+            self.stats["evicted"] += 1
+        logger.debug(f"[ResultCache] Evicted. Size: {self._size / 1024**2:.2f}MB. Stats: {self.stats}")
+
+    def _entry_path(self, key: str) -> Path:
+        return self.path / key[0:2] / f"{key}.npz"
+
+    def _write_entry(self, key: str, entry: dict) -> int:
+        """writes an entry atomically (tmp file + rename) and returns its size"""
+        (path := self._entry_path(key)).parent.mkdir(exist_ok=True)
+        tmp_path = path.parent / f".{key}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as fp:
+            np.savez(fp, entry)
+        os.replace(tmp_path, path)
+        return path.stat().st_size
+
+    def _frame_hash(self, video: VREVideo, ix: int) -> str:
+        """the (memoized) hash of a frame's bytes. The memo is bounded and shared by the scheduler's threads."""
+        base_video = video.video if isinstance(video, SynchronizedVideo) else video # the wrapper is per-run
+        with self._frame_hashes_lock:
+            if (res := self._frame_hashes.get(key := (id(base_video), ix))) is not None:
+                return res
+        res = _hash_bytes(np.ascontiguousarray(video[ix]).tobytes())
+        with self._frame_hashes_lock:
+            self._frame_hashes[key] = res
+        return res
+
+    def __repr__(self):
+        return f"""[ResultCache]
+- Path: '{self.path}'
+- Size: {self._size / 1024**2:.2f}MB / {self.max_bytes / 1024**2:.2f}MB
+- Stats: {self.stats}"""
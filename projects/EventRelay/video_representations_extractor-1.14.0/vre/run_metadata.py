@@ -60,6 +60,22 @@ class RunMetadata:
         }
         self.store_on_disk()
 
+    def add_shards_run_stats(self, name: str, shards_run_stats: list[dict[str, float]]):
+        """adds statistics of a single representation that was run in multiple shards (see ShardedRunner)"""
+        assert name not in self.run_stats, f"{name} in {self.run_stats.keys()}"
+        n_computed = sum(stats["n_computed"] for stats in shards_run_stats)
+        n_failed = sum(stats["n_failed"] for stats in shards_run_stats)
+        duration = sum(stats["average_duration"] * stats["n_computed"] for stats in shards_run_stats)
+        avg_duration = round(duration / n_computed, 3) if n_computed > 0 else 0
+        self.run_stats[name] = {"n_computed": n_computed, "n_failed": n_failed, "average_duration": avg_duration,
+                                "n_shards": len(shards_run_stats)}
+        self.total_stats = {
+            "n_computed": self.total_stats["n_computed"] + n_computed,
+            "n_failed": self.total_stats["n_failed"] + n_failed,
+            "duration": round(self.total_stats["duration"] + duration, 3)
+        }
+        self.store_on_disk()
+
     def store_on_disk(self):
         """stores (overwrites if needed) the metadata on disk"""
         with open(self.disk_location, "w") as fp:
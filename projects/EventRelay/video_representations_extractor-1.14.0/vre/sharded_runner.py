@@ -0,0 +1,116 @@
+"""ShardedRunner module -- runs a VRE run in multiple processes, each of them on a contiguous range of the frames"""
+from __future__ import annotations
+from multiprocessing import cpu_count, get_context, get_all_start_methods
+from pathlib import Path
+from queue import Empty
+import traceback
+import torch as tr
+
+from .representations import LearnedRepresentationMixin
+from .vre_runtime_args import VRERuntimeArgs
+from .data_writer import DataWriter
+from .run_metadata import RunMetadata
+from .logger import vre_logger as logger
+
+def _shard_worker_fn(vre: "VideoRepresentationsExtractor", shard_ix: int, frames: list[int], device: str | None,
+                     n_torch_threads: int, run_kwargs: dict, results: "Queue"):
+    """The body of each shard process: a regular (single process) VRE run on its frames. Sends back its run stats."""
+    try:
+        if device is not None:
+            for rep in vre.representations:
+                if isinstance(rep, LearnedRepresentationMixin):
+                    rep.device = device
+        tr.set_num_threads(n_torch_threads)
+        run_metadata = vre.run(frames=frames, n_shards=1, **run_kwargs)
+        results.put((shard_ix, run_metadata.run_stats, None))
+    except Exception: # pylint: disable=broad-exception-caught
+        results.put((shard_ix, None, traceback.format_exc()))
+
+class ShardedRunner:
+    """
+    Runs the exported representations of a VRE run in `n_shards` processes. The frames are split in contiguous ranges
+    (one per shard) and each process does a regular VRE run on its range with its own (forked, not yet set up) copy of
+    the representations, so each one loads its own models on its own device. The processes coordinate only through
+    the disk: the same representation directories and the RepresentationMetadata journal, which supports concurrent
+    writers. The output dir exists mode is applied once by the parent and the shards then run in 'skip_computed'
+    mode, so they never remove each other's outputs. The stats of all the shards are aggregated in a single RunMetadata.
+    Parameters:
+    - vre The VideoRepresentationsExtractor that is sharded
+    - runtime_args The runtime args of the whole (all frames) run
+    - output_dir The directory where VRE will store the representations
+    - output_dir_exists_mode What to do if the output dir already exists. See DataWriter docstring.
+    - run_metadata The (aggregated) metadata of the whole run
+    - devices If set, shard i sets the device of all the learned representations to devices[i % len(devices)]
+    """
+    def __init__(self, vre: "VideoRepresentationsExtractor", runtime_args: VRERuntimeArgs, output_dir: Path,
+                 output_dir_exists_mode: str, run_metadata: RunMetadata, devices: list[str] | None = None):
+        assert runtime_args.n_shards >= 2, runtime_args.n_shards
+        assert devices is None or len(devices) > 0, devices
+        self.vre = vre
+        self.runtime_args = runtime_args
+        self.output_dir = output_dir
+        self.output_dir_exists_mode = output_dir_exists_mode
+        self.run_metadata = run_metadata
+        self.devices = devices
+        frames = runtime_args.frames
+        n_shards = min(runtime_args.n_shards, len(frames))
+        self.shards: list[list[int]] = [frames[i * len(frames) // n_shards: (i + 1) * len(frames) // n_shards]
+                                        for i in range(n_shards)]
+
+    def run(self) -> RunMetadata:
+        """Runs all the shards until they are done. Returns the aggregated run metadata of all the shards"""
+        for rep in self.runtime_args.representations:
+            dw = DataWriter(output_dir=self.output_dir, representation=rep,
+                            output_dir_exists_mode=self.output_dir_exists_mode)
+            self.run_metadata.data_writers[rep.name] = dw.to_dict()
+
+        # fork (where available) so the VRE, its video and its representations are not pickled for each shard.
+        ctx = get_context("fork" if "fork" in get_all_start_methods() else "spawn")
+        results = ctx.Queue()
+        n_torch_threads = max(1, cpu_count() // len(self.shards))
+        run_kwargs = {"output_dir": self.output_dir, "output_dir_exists_mode": "skip_computed",
+                      "exception_mode": self.runtime_args.exception_mode,
+                      "n_threads_data_storer": self.runtime_args.n_threads_data_storer,
+                      "subset_exported_representations": self.runtime_args.representation_names,
+                      "scheduling_mode": self.runtime_args.scheduling_mode,
+                      "data_storer_mode": self.runtime_args.data_storer_mode,
+                      "data_storer_queue_size": self.runtime_args.data_storer_queue_size}
+        processes = []
+        for i, shard in enumerate(self.shards):
+            device = None if self.devices is None else self.devices[i % len(self.devices)]
+            logger.info(f"Starting shard {i}: frames [{shard[0]}:{shard[-1]}] ({len(shard)}). Device: {device}")
+            processes.append(proc := ctx.Process(target=_shard_worker_fn, daemon=False,
+                                                 args=(self.vre, i, shard, device, n_torch_threads, run_kwargs,
+                                                       results)))
+            proc.start()
+
+        shards_run_stats, errors = self._collect_results(processes, results)
+        for name in self.runtime_args.representation_names:
+            self.run_metadata.add_shards_run_stats(name, [stats[name] for stats in shards_run_stats.values()
+                                                          if name in stats])
+        if len(errors) > 0:
+            raise RuntimeError("Shards failed:\n" + "\n".join(f"- Shard {k}: {v}" for k, v in sorted(errors.items())))
+        return self.run_metadata
+
+    def _collect_results(self, processes: list["Process"], results: "Queue") -> tuple[dict[int, dict], dict[int, str]]:
+        """reads the results of all the shards (before joining, so large results never block the queue's pipe)"""
+        shards_run_stats, errors = {}, {}
+        while len(shards_run_stats) + len(errors) < len(processes):
+            try:
+                shard_ix, run_stats, error = results.get(timeout=1)
+            except Empty:
+                for i, proc in enumerate(processes):
+                    if not proc.is_alive() and i not in shards_run_stats and i not in errors and results.empty():
+                        errors[i] = f"process died with exit code {proc.exitcode}"
+                continue
+            if error is None:
+                shards_run_stats[shard_ix] = run_stats
+            else:
+                errors[shard_ix] = error
+        for proc in processes:
+            proc.join()
+        return shards_run_stats, errors
+
+    def __repr__(self):
+        return (f"[ShardedRunner] Shards: {len(self.shards)}. Devices: {self.devices}. "
+                f"Frames: {[len(s) for s in self.shards]}")
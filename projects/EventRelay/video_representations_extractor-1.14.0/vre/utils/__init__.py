@@ -10,5 +10,7 @@ from .colorizer import colorize_depth, colorize_semantic_segmentation, colorize_
 from .lovely import lo, monkey_patch
 from .repr_memory_layout import ReprOut, MemoryData, DiskData
 from .atomic_open import AtomicOpen
+from .chunked_store import ChunkedStore, ChunkedStoreFrame, open_chunked_store
 from .summary_printer import SummaryPrinter
 from .yaml import vre_yaml_load
+from .video_prefetcher import VideoPrefetcher, PrefetchedVideo, SynchronizedVideo
@@ -7,14 +7,12 @@ try:
     import fcntl
 
     def lock_file(f: FileIO):
-        """locks a file"""
-        if f.writable():
-            fcntl.flock(f, fcntl.LOCK_EX)
+        """locks a file: exclusive lock for writers, shared lock for readers"""
+        fcntl.flock(f, fcntl.LOCK_EX if f.writable() else fcntl.LOCK_SH)
 
     def unlock_file(f: FileIO):
         """unlocks a file"""
-        if f.writable():
-            fcntl.flock(f, fcntl.LOCK_UN)
+        fcntl.flock(f, fcntl.LOCK_UN)
 
 except ModuleNotFoundError:
     # Windows file locking
@@ -35,6 +33,8 @@ class AtomicOpen:
     """
     lass for ensuring that all file operations are atomic, treat initialization like a standard call to 'open' that
     happens to be atomic. This file opener *must* be used in a "with" block.
+    Files opened for writing get an exclusive lock, read-only files get a shared lock (on posix), so readers never see
+    a half-written file, while still not blocking each other.
     Open the file with arguments provided by user. Then acquire a lock on that file object.
     """
     def __init__(self, path: str, *args, **kwargs):
@@ -50,8 +50,9 @@ class AtomicOpen:
     # Unlock the file and close the file object.
     def __exit__(self, exc_type=None, exc_value=None, traceback=None):
         # Flush to make sure all buffered contents are written to file.
-        self.file.flush()
-        os.fsync(self.file.fileno())
+        if self.file.writable():
+            self.file.flush()
+            os.fsync(self.file.fileno())
         # Release the lock on the file.
         unlock_file(self.file)
         self.file.close()
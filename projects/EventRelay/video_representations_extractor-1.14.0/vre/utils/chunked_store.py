@@ -0,0 +1,325 @@
+"""ChunkedStore -- single-file, chunked and memory-mappable array store for the outputs of a representation"""
+from __future__ import annotations
+from pathlib import Path
+import json
+import os
+import threading
+import zlib
+import numpy as np
+
+from .atomic_open import AtomicOpen
+from .utils import FixedSizeOrderedDict
+
+_MAGIC = b"VRECHNK1"
+_META_SIZE = 1024 # magic + json metadata (padded)
+_ALIGN = 4096
+_STORES: dict[str, ChunkedStore] = {} # process-level cache of opened stores, used by ChunkedStoreFrame
+
+def _align(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+class ChunkedStore:
+    """
+    Stores all the frames of one representation as a (N, *frame_shape) array in a single file, split in fixed chunks
+    of `chunk_size` frames. Layout on disk: [header | chunk data ...]. The header holds the json metadata (frame shape,
+    dtype, chunk size, capacity), the index of the chunks (offset and number of bytes of each of them) and a flag for
+    each frame telling whether it was computed or not.
+    - Uncompressed chunks are memory-mapped on read (zero-copy) and rewritten in place. `mmap_frame()` maps a single
+    frame privately (copy-on-write), so readers get a writable array without copying it.
+    - Compressed chunks (zlib, one stream per chunk) are decompressed on read. A rewritten chunk that doesn't fit
+    in its previous slot is appended at the end of the file. Stale slots are reclaimed by `compact()`, which is called
+    automatically when they take more space than the live chunks.
+    Writes take an exclusive file lock and header/chunk reads take a shared one (AtomicOpen), so multiple processes can
+    read and write the same store without seeing half-written headers. Within a process, the in-memory header and chunk
+    cache are guarded by a per-instance lock (i.e. DataStorer threads). Memory-mapped frames are not locked: they can
+    see later writes of the same chunk made by other processes.
+    Parameters:
+    - path The path of the store file. Created on the first write if it doesn't exist.
+    - chunk_size The number of frames in each chunk. Only used when the store is created.
+    - compress Whether each chunk is zlib-compressed or not. Only used when the store is created.
+    """
+    def __init__(self, path: Path, chunk_size: int = 64, compress: bool = True):
+        assert isinstance(chunk_size, int) and chunk_size > 0, chunk_size
+        self.path = Path(path)
+        self._chunk_size = chunk_size
+        self._compress = compress
+        self.meta: dict | None = None
+        self.index: np.ndarray | None = None # (n_chunks, 2) -> [offset, nbytes]. 0 nbytes means not allocated.
+        self.computed: np.ndarray | None = None # (capacity, ) uint8
+        self._stat: tuple[int, int] | None = None # (mtime_ns, size) of the last read header
+        self._mmap: np.memmap | None = None
+        self._chunks_cache = FixedSizeOrderedDict(maxlen=4)
+        self._lock = threading.RLock()
+        if self.path.exists() and self.path.stat().st_size > 0:
+            self._refresh()
+
+    # Public methods and properties
+
+    @property
+    def chunk_size(self) -> int:
+        """the number of frames in each chunk"""
+        return self.meta["chunk_size"] if self.meta is not None else self._chunk_size
+
+    @property
+    def compress(self) -> bool:
+        """whether the chunks are compressed or not"""
+        return self.meta["compress"] if self.meta is not None else self._compress
+
+    @property
+    def frame_shape(self) -> tuple[int, ...] | None:
+        """the shape of one frame or None if nothing was written yet"""
+        return tuple(self.meta["frame_shape"]) if self.meta is not None else None
+
+    @property
+    def dtype(self) -> np.dtype | None:
+        """the dtype of the data or None if nothing was written yet"""
+        return np.dtype(self.meta["dtype"]) if self.meta is not None else None
+
+    def frames_computed(self) -> list[int]:
+        """the sorted list of frames that are stored in this container"""
+        self._refresh()
+        return [] if self.computed is None else np.nonzero(self.computed)[0].tolist()
+
+    def contains(self, frames: list[int]) -> bool:
+        """true if all the frames are stored in this container"""
+        self._refresh()
+        if self.computed is None:
+            return False
+        return all(0 <= f < len(self.computed) and self.computed[f] == 1 for f in frames)
+
+    def write(self, frames: list[int], data: np.ndarray):
+        """writes a batch of frames. data[i] is the data of frames[i]. Overwrites previously stored frames."""
+        assert len(frames) == len(data) > 0, (len(frames), len(data))
+        assert all(isinstance(f, int) and f >= 0 for f in frames), frames
+        with self._lock:
+            data = np.asarray(data)
+            self.path.parent.mkdir(exist_ok=True, parents=True)
+            self.path.touch(exist_ok=True)
+            with AtomicOpen(self.path, "r+b") as fp:
+                self._read_header(fp)
+                if self.meta is None:
+                    self._init_header(fp, data.shape[1:], data.dtype, capacity=max(frames) + 1)
+                assert data.shape[1:] == self.frame_shape, f"{self.path}: {data.shape[1:]} vs {self.frame_shape}"
+                data = data.astype(self.dtype, copy=False)
+                if (max_frame := max(frames)) >= self.meta["capacity"]:
+                    self._resize_header(fp, capacity=max(max_frame + 1, 2 * self.meta["capacity"]))
+                chunk_ixs = np.array(frames) // self.chunk_size
+                for chunk_ix in np.unique(chunk_ixs).tolist():
+                    chunk = self._read_chunk(fp, chunk_ix)
+                    chunk = np.zeros((self.chunk_size, *self.frame_shape), self.dtype) if chunk is None else chunk.copy()
+                    where = np.nonzero(chunk_ixs == chunk_ix)[0]
+                    chunk[np.array(frames)[where] % self.chunk_size] = data[where]
+                    self._write_chunk(fp, chunk_ix, chunk)
+                self.computed[frames] = 1
+                self._write_header(fp)
+                live = int(self.index[:, 1].sum())
+                if (fp.seek(0, os.SEEK_END) - self.meta["header_size"]) - live > max(live, 1 << 20):
+                    self._compact(fp)
+            self._stat, self._mmap = None, None
+
+    def read(self, frames: list[int]) -> np.ndarray:
+        """reads a batch of frames. Throws if any of them is not stored."""
+        return np.stack([self[f] for f in frames]) if len(frames) > 0 else np.zeros((0, *self.frame_shape), self.dtype)
+
+    def compact(self):
+        """reclaims the space of stale chunk slots by moving all the live chunks at the beginning of the data region"""
+        with self._lock, AtomicOpen(self.path, "r+b") as fp:
+            self._read_header(fp)
+            if self.meta is not None:
+                self._compact(fp)
+            self._stat, self._mmap = None, None
+
+    # Private methods
+
+    def _refresh(self):
+        """re-reads the header if the file was changed since the last read (i.e. by another process)"""
+        with self._lock:
+            if not self.path.exists():
+                return
+            if ((st := self.path.stat()).st_mtime_ns, st.st_size) == self._stat: # fast path, no file lock needed
+                return
+            with AtomicOpen(self.path, "rb") as fp:
+                self._sync_header(fp)
+
+    def _sync_header(self, fp):
+        """re-reads the header from the (locked) file if it changed since the last read"""
+        st = os.fstat(fp.fileno())
+        if (st.st_mtime_ns, st.st_size) == self._stat:
+            return
+        self._read_header(fp)
+        self._stat, self._mmap = (st.st_mtime_ns, st.st_size), None
+        self._chunks_cache.clear()
+
+    def _read_header(self, fp):
+        fp.seek(0)
+        raw = fp.read(_META_SIZE)
+        if raw.rstrip(b"\x00") == b"": # empty store (i.e. just touched by a writer)
+            self.meta, self.index, self.computed = None, None, None
+            return
+        assert raw[0:len(_MAGIC)] == _MAGIC, f"'{self.path}' is not a chunked store"
+        self.meta = json.loads(raw[len(_MAGIC):].decode("utf-8").strip())
+        n_chunks, capacity = self.meta["capacity"] // self.meta["chunk_size"], self.meta["capacity"]
+        raw = fp.read(n_chunks * 16 + capacity)
+        self.index = np.frombuffer(raw[0:n_chunks * 16], dtype=np.uint64).reshape(n_chunks, 2).copy()
+        self.computed = np.frombuffer(raw[n_chunks * 16:], dtype=np.uint8).copy()
+
+    def _header_size(self, capacity: int) -> int:
+        return _align(_META_SIZE + capacity // self.chunk_size * 16 + capacity)
+
+    def _init_header(self, fp, frame_shape: tuple[int, ...], dtype: np.dtype, capacity: int):
+        capacity = (capacity + self._chunk_size - 1) // self._chunk_size * self._chunk_size
+        self.meta = {"version": 1, "frame_shape": list(frame_shape), "dtype": np.dtype(dtype).str,
+                     "chunk_size": self._chunk_size, "compress": self._compress, "capacity": capacity}
+        self.meta["header_size"] = self._header_size(capacity)
+        self.index = np.zeros((capacity // self._chunk_size, 2), dtype=np.uint64)
+        self.computed = np.zeros(capacity, dtype=np.uint8)
+        self._write_header(fp) # the magic goes first, only then the file is extended to the full header size
+        fp.truncate(self.meta["header_size"])
+
+    def _write_header(self, fp):
+        meta = json.dumps(self.meta).encode("utf-8")
+        assert len(_MAGIC) + len(meta) <= _META_SIZE, f"Metadata too big: {self.meta}"
+        fp.seek(0)
+        fp.write(_MAGIC + meta.ljust(_META_SIZE - len(_MAGIC), b" "))
+        fp.write(self.index.tobytes())
+        fp.write(self.computed.tobytes())
+
+    def _resize_header(self, fp, capacity: int):
+        """grows the header to a new capacity, shifting all the chunks towards the end of the file"""
+        capacity = (capacity + self.chunk_size - 1) // self.chunk_size * self.chunk_size
+        shift = self._header_size(capacity) - self.meta["header_size"]
+        for chunk_ix in np.argsort(self.index[:, 0])[::-1].tolist(): # last chunk first, so we don't overwrite any
+            if (nbytes := int(self.index[chunk_ix, 1])) > 0:
+                fp.seek(offset := int(self.index[chunk_ix, 0]))
+                blob = fp.read(nbytes)
+                fp.seek(offset + shift)
+                fp.write(blob)
+                self.index[chunk_ix, 0] = offset + shift
+        new_index = np.zeros((capacity // self.chunk_size, 2), dtype=np.uint64)
+        new_index[0:len(self.index)] = self.index
+        new_computed = np.zeros(capacity, dtype=np.uint8)
+        new_computed[0:len(self.computed)] = self.computed
+        self.index, self.computed = new_index, new_computed
+        self.meta = {**self.meta, "capacity": capacity, "header_size": self._header_size(capacity)}
+        self._write_header(fp)
+
+    def _compact(self, fp):
+        """moves the live chunks (sorted by offset) towards the header and truncates the file"""
+        position = self.meta["header_size"]
+        for chunk_ix in np.argsort(self.index[:, 0]).tolist(): # first chunk first, so we don't overwrite any
+            if (nbytes := int(self.index[chunk_ix, 1])) == 0:
+                continue
+            if (offset := int(self.index[chunk_ix, 0])) != position:
+                fp.seek(offset)
+                blob = fp.read(nbytes)
+                fp.seek(position)
+                fp.write(blob)
+                self.index[chunk_ix, 0] = position
+            position += nbytes
+        fp.truncate(position)
+        self._write_header(fp)
+
+    def _read_chunk(self, fp, chunk_ix: int) -> np.ndarray | None:
+        """reads a chunk from the (locked) file. Returns None if it was never written."""
+        if chunk_ix >= len(self.index) or (nbytes := int(self.index[chunk_ix, 1])) == 0:
+            return None
+        fp.seek(int(self.index[chunk_ix, 0]))
+        raw = fp.read(nbytes)
+        raw = zlib.decompress(raw) if self.compress else raw
+        return np.frombuffer(raw, dtype=self.dtype).reshape(self.chunk_size, *self.frame_shape)
+
+    def _write_chunk(self, fp, chunk_ix: int, chunk: np.ndarray):
+        """writes a chunk in its previous slot if it fits there, otherwise at the end of the file"""
+        blob = zlib.compress(chunk.tobytes(), level=1) if self.compress else chunk.tobytes()
+        offset, nbytes = int(self.index[chunk_ix, 0]), int(self.index[chunk_ix, 1])
+        if nbytes == 0 or len(blob) > nbytes:
+            offset = fp.seek(0, os.SEEK_END)
+        fp.seek(offset)
+        fp.write(blob)
+        self.index[chunk_ix] = (offset, len(blob))
+
+    def _get_chunk(self, chunk_ix: int) -> np.ndarray:
+        """the chunk as an array: a view over the memory map if uncompressed, a (cached) decompressed copy otherwise"""
+        with self._lock:
+            offset, nbytes = int(self.index[chunk_ix, 0]), int(self.index[chunk_ix, 1])
+            if not self.compress:
+                if self._mmap is None:
+                    self._mmap = np.memmap(self.path, dtype=np.uint8, mode="r")
+                return self._mmap[offset: offset + nbytes].view(self.dtype).reshape(self.chunk_size,
+                                                                                     *self.frame_shape)
+            if (chunk := self._chunks_cache.get(chunk_ix)) is None:
+                with AtomicOpen(self.path, "rb") as fp:
+                    self._sync_header(fp) # another process may have moved the chunk since the last header read
+                    offset, nbytes = int(self.index[chunk_ix, 0]), int(self.index[chunk_ix, 1])
+                    fp.seek(offset)
+                    raw = zlib.decompress(fp.read(nbytes))
+                chunk = np.frombuffer(raw, dtype=self.dtype).reshape(self.chunk_size, *self.frame_shape)
+                self._chunks_cache[chunk_ix] = chunk
+            return chunk
+
+    def __getitem__(self, frame: int) -> np.ndarray:
+        """returns the data of one frame. Read-only view, copy it if it needs to be modified."""
+        with self._lock:  # the header must not change between the check and the read
+            if not self.contains([frame]):
+                raise KeyError(f"Frame {frame} is not stored in '{self.path}'")
+            return self._get_chunk(frame // self.chunk_size)[frame % self.chunk_size]
+
+    def mmap_frame(self, frame: int) -> np.ndarray:
+        """
+        returns the data of one frame as a private copy-on-write memory map (zero-copy, writable). Writing to it does
+        not change the store. Compressed stores can't be mapped, so a copy of the decompressed frame is returned.
+        """
+        with self._lock:
+            if not self.contains([frame]):
+                raise KeyError(f"Frame {frame} is not stored in '{self.path}'")
+            if self.compress:
+                return self[frame].copy()
+            chunk_ix = frame // self.chunk_size
+            frame_nbytes = int(np.prod(self.frame_shape)) * self.dtype.itemsize
+            offset = int(self.index[chunk_ix, 0]) + (frame % self.chunk_size) * frame_nbytes
+        return np.memmap(self.path, dtype=self.dtype, mode="c", offset=offset, shape=self.frame_shape)
+
+    def __len__(self) -> int:
+        return len(self.frames_computed())
+
+    def __repr__(self):
+        return (f"[ChunkedStore] Path: '{self.path}'. Frame shape: {self.frame_shape}, dtype: {self.dtype}, "
+                f"chunk size: {self.chunk_size}, compress: {self.compress}")
+
+def open_chunked_store(path: Path) -> ChunkedStore:
+    """returns the (process-level cached) ChunkedStore living at this path"""
+    if (key := str(Path(path).absolute())) not in _STORES:
+        _STORES[key] = ChunkedStore(path)
+    return _STORES[key]
+
+class ChunkedStoreFrame:
+    """
+    A (virtual) path to a single frame of a ChunkedStore. Readers (i.e. MultiTaskDataset or VRE when loading from
+    disk) use it as a drop-in replacement for the per-frame npz paths. The name mimics a regular file name (i.e.
+    '5.npz') so it can be matched against per-frame files of other representations.
+    """
+    def __init__(self, store_path: Path, frame: int, suffix: str = "npz"):
+        self.store_path = Path(store_path)
+        self.frame = frame
+        self.name = f"{frame}.{suffix}"
+
+    def read(self, mmap: bool = False) -> np.ndarray:
+        """reads the data of this frame from its store. If mmap is set, see `ChunkedStore.mmap_frame`."""
+        store = open_chunked_store(self.store_path)
+        return store.mmap_frame(self.frame) if mmap else store[self.frame]
+
+    def exists(self) -> bool:
+        """true if the frame is stored in the store"""
+        return self.store_path.exists() and open_chunked_store(self.store_path).contains([self.frame])
+
+    def __eq__(self, other: ChunkedStoreFrame) -> bool:
+        return isinstance(other, ChunkedStoreFrame) and (self.store_path, self.frame) == (other.store_path, other.frame)
+
+    def __hash__(self) -> int:
+        return hash((self.store_path, self.frame))
+
+    def __str__(self) -> str:
+        return f"{self.store_path}:{self.frame}"
+
+    def __repr__(self) -> str:
+        return f"ChunkedStoreFrame({self})"
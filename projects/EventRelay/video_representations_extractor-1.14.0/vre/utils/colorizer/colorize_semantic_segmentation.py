@@ -1,5 +1,6 @@
 """colorize semantic segmentation module -- based on the original M2F implementation but without matplotlib"""
 import os
+from concurrent.futures import ThreadPoolExecutor
 import pycocotools.mask as mask_util
 from PIL import Image, ImageDraw
 import numpy as np
@@ -18,19 +19,33 @@ COLOR = tuple[int, int, int]
 def colorize_semantic_segmentation(semantic_map: np.ndarray, classes: list[str], color_map: list[tuple[int, int, int]],
                                    rgb: np.ndarray | None = None, alpha: float = 0.8,
                                    size_px: int | None = None) -> np.ndarray:
-    """Colorize semantic segmentation maps. Must be argmaxed (H, W). Can paint over the original RGB frame or not."""
+    """
+    Colorize semantic segmentation maps. Must be argmaxed (B, H, W). Can paint over the original RGB frame or not.
+    The implementation is picked via the VRE_COLORIZE_SEMSEG_MODE env variable:
+    - 'per_frame' (default) The original Mask2Former-like rendering: per class polygons (cv2 contours) and labels per
+      frame.
+    - 'batched' LUT palette mapping, blending and class boundaries over the whole (B, H, W) stack at once, then one
+      label per class drawn at its (snapped) centroid. Much faster, but not pixel-identical to 'per_frame' (boundaries
+      and label placement differ slightly). Frames are labeled in VRE_COLORIZE_SEMSEG_WORKERS (default: 1) threads.
+    - 'fast' Only the palette mapping, without blending, boundaries or labels. Also set by VRE_COLORIZE_SEMSEG_FAST=1.
+    """
     assert np.issubdtype(semantic_map.dtype, np.integer), semantic_map.dtype
     assert (max_class := semantic_map.max()) <= len(color_map), (max_class, len(color_map))
     assert len(shp := semantic_map.shape) == 3, shp
     assert rgb is None or (rgb.shape[0:-1] == shp), (rgb.shape, shp)
+    mode = "fast" if os.getenv("VRE_COLORIZE_SEMSEG_FAST", "0") == "1" else os.getenv("VRE_COLORIZE_SEMSEG_MODE",
+                                                                                       "per_frame")
+    assert mode in ("batched", "per_frame", "fast"), mode
+    if mode == "fast":
+        return np.array(color_map)[semantic_map]
     alpha = alpha if rgb is not None else 1
     rgb = rgb if rgb is not None else np.zeros((*semantic_map.shape, 3), dtype=np.uint8)
-    if os.getenv("VRE_COLORIZE_SEMSEG_FAST", "0") == "1":
-        return np.array(color_map)[semantic_map]
-    else:
-        return np.array([_colorize_sem_seg(sema=_s, rgb=_r, classes=classes, color_map=color_map,
-                                          alpha=alpha, size_px=size_px)
-                        for _r, _s in zip(rgb, semantic_map)])
+    if mode == "batched":
+        return _colorize_sem_seg_batched(semantic_map, rgb=rgb, classes=classes, color_map=color_map, alpha=alpha,
+                                         size_px=size_px)
+    return np.array([_colorize_sem_seg(sema=_s, rgb=_r, classes=classes, color_map=color_map,
+                                       alpha=alpha, size_px=size_px)
+                    for _r, _s in zip(rgb, semantic_map)])
 
 class _GenericMask:
     """
@@ -191,3 +206,70 @@ def _colorize_sem_seg(sema: np.ndarray, rgb: np.ndarray | None, classes: list[st
     for text_data in texts_data: # TODO: if texts overlap, show just the one with highest area maybe
         res = _draw_text_in_mask(res, binary_mask=text_data[0], text=text_data[1], color=text_data[2], size_px=size_px)
     return res
+
+def _class_label_positions(sema: np.ndarray, n_classes: int) -> list[list[tuple[int, tuple[int, int]]]]:
+    """
+    For each frame of a (B, H, W) stack, returns the (class, (x, y)) position of the label of each class with at least
+    _AREA_THRESHOLD pixels. All the areas and centroids are computed at once via bincount. A centroid that falls
+    outside of its class (i.e. non convex regions) is snapped to the nearest pixel of that class.
+    """
+    B, H, W = sema.shape
+    flat_ids = (sema + (np.arange(B) * n_classes)[:, None, None]).reshape(-1)
+    ys, xs = np.broadcast_to(np.arange(H)[None, :, None], sema.shape), np.broadcast_to(np.arange(W), sema.shape)
+    areas = np.bincount(flat_ids, minlength=B * n_classes)
+    sum_ys = np.bincount(flat_ids, weights=ys.reshape(-1), minlength=B * n_classes)
+    sum_xs = np.bincount(flat_ids, weights=xs.reshape(-1), minlength=B * n_classes)
+    res = [[] for _ in range(B)]
+    for ix in np.nonzero(areas >= _AREA_THRESHOLD)[0]:
+        b, label = divmod(int(ix), n_classes)
+        y, x = int(sum_ys[ix] / areas[ix]), int(sum_xs[ix] / areas[ix])
+        if sema[b, y, x] != label:
+            class_ys, class_xs = np.nonzero(sema[b] == label)
+            nearest = np.argmin((class_ys - y) ** 2 + (class_xs - x) ** 2)
+            y, x = int(class_ys[nearest]), int(class_xs[nearest])
+        res[b].append((label, (x, y)))
+    return res
+
+def _draw_texts_with_background(image_array: np.ndarray, texts: list[tuple[str, tuple[int, int]]],
+                                font_size: int, color: COLOR) -> np.ndarray:
+    """Same as _add_text_with_background, but draws all the (text, (x, y)) texts of an image in one PIL image"""
+    image = Image.fromarray(image_array)
+    draw = ImageDraw.Draw(image)
+    font = _get_default_font(font_size)
+    for text, (x, y) in texts:
+        text_width, text_height = _pil_image_draw_textsize(draw, text, font=font)
+        x = max(5, min(x, image_array.shape[1] - text_width - 5))
+        y = max(5, min(y, image_array.shape[0] - text_height - 5))
+        draw.rectangle([x - 1, y + 2, x + text_width + 1, y + text_height], fill=(0, 0, 0))
+        draw.text((x, y), text, fill=color, font=font)
+    return np.array(image)
+
+def _colorize_sem_seg_batched(sema: np.ndarray, rgb: np.ndarray, classes: list[str],
+                              color_map: list[tuple[int, int, int]], alpha: float = 0.8,
+                              size_px: int | None = None) -> np.ndarray:
+    """colorize a (B, H, W) stack of semantic segmentation maps at once: LUT -> blend -> boundaries -> labels"""
+    classes = list(map(str, classes)) if all(isinstance(x, int) for x in classes) else classes
+    assert all(isinstance(x, str) for x in classes), classes
+    assert rgb.dtype == np.uint8, lo(rgb)
+    palette = np.array(color_map, dtype=np.uint8)
+    res = palette[sema]
+    if alpha != 1:
+        res = (res.astype(np.float32) * alpha + rgb.astype(np.float32) * (1 - alpha)).astype(np.uint8)
+
+    # class boundaries: pixels with a 4-neighbour of a different class (both sides of each edge, like the polygons)
+    boundaries = np.zeros(sema.shape, dtype=bool)
+    boundaries[:, :-1] |= sema[:, :-1] != sema[:, 1:]
+    boundaries[:, 1:] |= sema[:, 1:] != sema[:, :-1]
+    boundaries[:, :, :-1] |= sema[:, :, :-1] != sema[:, :, 1:]
+    boundaries[:, :, 1:] |= sema[:, :, 1:] != sema[:, :, :-1]
+    res[boundaries] = _WHITE
+
+    label_positions = _class_label_positions(sema, len(color_map))
+    font_size_px = _font_size_from_shape(sema.shape[1:3]) if size_px is None else size_px
+    def _label_one(i: int) -> np.ndarray:
+        texts = [(classes[label], position) for label, position in label_positions[i]]
+        return _draw_texts_with_background(res[i], texts, font_size_px, _WHITE) if len(texts) > 0 else res[i]
+    if (n_workers := int(os.getenv("VRE_COLORIZE_SEMSEG_WORKERS", "1"))) > 1 and len(sema) > 1:
+        with ThreadPoolExecutor(max_workers=min(n_workers, len(sema))) as pool:
+            return np.array(list(pool.map(_label_one, range(len(sema)))))
+    return np.array([_label_one(i) for i in range(len(sema))])
@@ -0,0 +1,114 @@
+"""VideoPrefetcher -- reads the frames of the upcoming windows of a video on a background thread"""
+from __future__ import annotations
+from queue import Queue, Full
+from threading import Thread, Event, Lock
+from typing import Any, Iterator
+import numpy as np
+
+class SynchronizedVideo:
+    """
+    A view of a video whose frame reads are serialized by a lock, so it can be shared by several threads (i.e. the
+    nodes of the GraphScheduler or the VideoPrefetcher's reader and its consumer). VREVideo makes no thread-safety
+    promise: readers with a seek/read cursor return wrong frames when used concurrently. Everything else (fps,
+    frame_shape, len etc.) is forwarded to the underlying video.
+    """
+    def __init__(self, video: "VREVideo"):
+        self.video = video
+        self.lock = Lock()
+
+    def __getitem__(self, ix: int | list[int] | np.ndarray | slice) -> np.ndarray:
+        with self.lock:
+            return self.video[ix]
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        return (self[i] for i in range(len(self)))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.video, name)
+
+    def __len__(self) -> int:
+        return len(self.video)
+
+    def __repr__(self):
+        return f"[SynchronizedVideo] Video: {self.video}"
+
+class PrefetchedVideo:
+    """
+    A read-only view of a video that serves the prefetched frames of one window from memory and falls back to the
+    underlying video for any other frame (i.e. the context frames of optical flow). Everything else (fps, frame_shape,
+    len etc.) is forwarded to the underlying video, so it can be passed to Representation.compute as is.
+    """
+    def __init__(self, video: "VREVideo", frames: dict[int, np.ndarray]):
+        self.video = video
+        self.frames = frames
+
+    def __getitem__(self, ix: int | list[int] | np.ndarray | slice) -> np.ndarray:
+        if isinstance(ix, (int, np.integer)):
+            return self.frames[ix] if ix in self.frames else self.video[ix]
+        if isinstance(ix, (list, np.ndarray)) and all(_ix in self.frames for _ix in ix):
+            return np.stack([self.frames[_ix] for _ix in ix])
+        return self.video[ix]
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.video, name)
+
+    def __len__(self) -> int:
+        return len(self.video)
+
+    def __repr__(self):
+        return f"[PrefetchedVideo] Frames: {len(self.frames)}. Video: {self.video}"
+
+class VideoPrefetcher:
+    """
+    Iterates over the windows of a video, yielding a PrefetchedVideo for each of them. The frames of the next
+    `n_prefetch` windows are read on a background thread while the current one is consumed, so at most
+    n_prefetch + 1 windows of frames are held in memory at any time. The video is wrapped in a SynchronizedVideo, so
+    the reader and the frames read by the consumer outside of the prefetched windows never access it concurrently.
+    """
+    def __init__(self, video: "VREVideo", windows: list[list[int]], n_prefetch: int = 1):
+        assert n_prefetch >= 1, n_prefetch
+        self.video = video if isinstance(video, SynchronizedVideo) else SynchronizedVideo(video)
+        self.windows = windows
+        self.n_prefetch = n_prefetch
+
+    def __iter__(self) -> Iterator[PrefetchedVideo]:
+        queue: Queue = Queue(maxsize=self.n_prefetch)
+        stop_event = Event()
+        thread = Thread(target=self._reader, args=(queue, stop_event), daemon=True)
+        thread.start()
+        try:
+            for _ in range(len(self.windows)):
+                item = queue.get()
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally: # the consumer stopped early (break or exception): unblock the reader and let it exit
+            stop_event.set()
+            while not queue.empty():
+                queue.get_nowait()
+            thread.join()
+
+    def _reader(self, queue: Queue, stop_event: Event):
+        for window in self.windows:
+            if stop_event.is_set():
+                return
+            try:
+                item = PrefetchedVideo(self.video, dict(zip(window, self.video[window])))
+            except Exception as e: # pylint: disable=broad-exception-caught
+                item = e
+            while not stop_event.is_set():
+                if self._try_put(queue, item):
+                    break
+            if isinstance(item, Exception):
+                return
+
+    @staticmethod
+    def _try_put(queue: Queue, item: Any) -> bool:
+        try:
+            queue.put(item, timeout=0.1)
+            return True
+        except Full:
+            return False
+
+    def __len__(self) -> int:
+        return len(self.windows)
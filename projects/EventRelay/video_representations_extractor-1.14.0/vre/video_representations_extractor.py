@@ -2,6 +2,7 @@
 from __future__ import annotations
 from pathlib import Path
 from datetime import datetime
+from typing import Iterator
 import os
 import traceback
 from tqdm import tqdm
@@ -13,9 +14,13 @@ from .representations import Representation, LearnedRepresentationMixin, Represe
 from .vre_runtime_args import VRERuntimeArgs
 from .data_writer import DataWriter
 from .data_storer import DataStorer
+from .graph_scheduler import GraphScheduler, slice_repr_out, concat_repr_outs
+from .sharded_runner import ShardedRunner
 from .run_metadata import RunMetadata
 from .representation_metadata import RepresentationMetadata
-from .utils import now_fmt, make_batches, ReprOut, DiskData, SummaryPrinter, random_chars, MemoryData
+from .result_cache import ResultCache
+from .utils import (now_fmt, make_batches, ReprOut, DiskData, SummaryPrinter, random_chars, ChunkedStoreFrame,
+                    VideoPrefetcher, PrefetchedVideo)
 from .logger import vre_logger as logger
 
 # TODO: split in 2 classes ?
@@ -30,11 +35,13 @@ class VideoRepresentationsExtractor:
         Parameters:
         - video The video we are performing VRE one
         - representations The list instantiated representations. Must be topo-sortable based on name and deps.
+        The (cross-run) result cache is enabled by setting VRE_RESULT_CACHE_DIR. See ResultCache docstring.
         """
         assert isinstance(video, VREVideo), (type(video), video)
         assert isinstance(representations, (list, tuple, RepresentationsList)), type(representations)
         self.video = video
         self.representations = RepresentationsList(representations)
+        self.result_cache: ResultCache | None = ResultCache.from_env()
 
     def set_compute_params(self, **kwargs) -> VideoRepresentationsExtractor:
         """Set the required params for all representations"""
@@ -50,7 +57,10 @@ class VideoRepresentationsExtractor:
 
     def run(self, output_dir: Path, frames: list[int] | None = None, output_dir_exists_mode: str = "raise",
             exception_mode: str = "stop_execution", n_threads_data_storer: int = 0,
-            subset_exported_representations: list[str] | None = None) -> RunMetadata:
+            subset_exported_representations: list[str] | None = None,
+            scheduling_mode: str = "representation_major", data_storer_mode: str = "thread",
+            data_storer_queue_size: int = 1, n_shards: int = 1,
+            shard_devices: list[str] | None = None) -> RunMetadata:
         """
         The main loop of the VRE. This will run all the representations on the video and store results in the output_dir
         Parameters:
@@ -61,8 +71,15 @@ class VideoRepresentationsExtractor:
           - 'skip_representation' Will stop the run of the current representation and start the next one
           - 'stop_execution' (default) Will stop the execution of VRE
         - n_threads_data_storer The number of threads used by the DataStorer
+        - data_storer_mode The type of workers of the DataStorer. See DataStorer docstring. Default 'thread'.
+        - data_storer_queue_size The max number of enqueued items in the DataStorer before the compute loop blocks
         - subset_exported_representations If set, only this subset of representations are exported, otherwise all of
             them based on these provided to the VRE constructor.
+        - scheduling_mode How the representations are scheduled during the run:
+          - 'representation_major' (default) Runs each exported representation on all the frames, one after another
+          - 'frame_major' Pushes each window of frames through the whole graph. See GraphScheduler docstring.
+        - n_shards The number of processes the frames are split across (contiguous ranges). See ShardedRunner docstring.
+        - shard_devices If set (and n_shards > 1), the device of the learned representations of each shard (round robin)
         Returns:
         - A RunMetadata object representing the run statistics for all representations of this run.
         """
@@ -74,19 +91,35 @@ class VideoRepresentationsExtractor:
         exported_reprs = self.representations.get_output_representations(subset=subset)
         assert len(exported_reprs) > 0, f"No output reprs returned, set I/O! {self.representations=}, {subset=}"
         runtime_args = VRERuntimeArgs(video=self.video, representations=exported_reprs, frames=frames,
-                                      exception_mode=exception_mode, n_threads_data_storer=n_threads_data_storer)
+                                      exception_mode=exception_mode, n_threads_data_storer=n_threads_data_storer,
+                                      scheduling_mode=scheduling_mode, data_storer_mode=data_storer_mode,
+                                      data_storer_queue_size=data_storer_queue_size, n_shards=n_shards)
         run_metadata = RunMetadata(repr_names=exported_reprs.names, runtime_args=runtime_args,
                                    logs_dir=logs_dir, now_str=now, run_id=run_id)
         logger.info(runtime_args)
+        if runtime_args.n_shards > 1:
+            return ShardedRunner(self, runtime_args=runtime_args, output_dir=output_dir,
+                                 output_dir_exists_mode=output_dir_exists_mode, run_metadata=run_metadata,
+                                 devices=shard_devices).run()
         summary_printer = SummaryPrinter(exported_reprs.names, runtime_args)
 
+        repr_metadatas: dict[str, RepresentationMetadata] = {}
+        if runtime_args.scheduling_mode == "frame_major":
+            scheduler = GraphScheduler(self, exported_reprs=exported_reprs, output_dir=output_dir,
+                                       output_dir_exists_mode=output_dir_exists_mode,
+                                       runtime_args=runtime_args, run_id=run_metadata.id)
+            run_metadata.data_writers = {name: dw.to_dict() for name, dw in scheduler.data_writers.items()}
+            repr_metadatas = scheduler.run()
+
         for vrepr in exported_reprs:
-            dw = DataWriter(output_dir=output_dir, representation=vrepr, output_dir_exists_mode=output_dir_exists_mode)
-            run_metadata.data_writers[vrepr.name] = dw.to_dict()
-            repr_metadata = self.do_one_representation(run_id=run_metadata.id, representation=vrepr,
-                                                       output_dir=output_dir,
-                                                       output_dir_exists_mode=output_dir_exists_mode,
-                                                       runtime_args=runtime_args)
+            if (repr_metadata := repr_metadatas.get(vrepr.name)) is None:
+                dw = DataWriter(output_dir=output_dir, representation=vrepr,
+                                output_dir_exists_mode=output_dir_exists_mode)
+                run_metadata.data_writers[vrepr.name] = dw.to_dict()
+                repr_metadata = self.do_one_representation(run_id=run_metadata.id, representation=vrepr,
+                                                           output_dir=output_dir,
+                                                           output_dir_exists_mode=output_dir_exists_mode,
+                                                           runtime_args=runtime_args)
             if repr_metadata.run_had_exceptions and runtime_args.exception_mode == "stop_execution":
                 raise RuntimeError(f"Representation '{vrepr.name}' threw. "
                                    f"Check '{logger.get_file_handler().baseFilename}' for information")
@@ -100,7 +133,8 @@ class VideoRepresentationsExtractor:
         """The loop of each representation. Returns a representation metadata with information about this repr's run"""
         data_writer = DataWriter(output_dir=output_dir, representation=representation,
                                  output_dir_exists_mode=output_dir_exists_mode)
-        data_storer = DataStorer(data_writer=data_writer, n_threads=runtime_args.n_threads_data_storer)
+        data_storer = DataStorer(data_writer=data_writer, n_threads=runtime_args.n_threads_data_storer,
+                                 mode=runtime_args.data_storer_mode, queue_size=runtime_args.data_storer_queue_size)
         logger.debug(f"Running {run_id=}:\n{representation}\n{data_storer}")
         rep: Representation | IORepresentationMixin = representation
         formats = sorted([f for f in [rep.image_format.value, rep.binary_format.value] if f != "not-set"])
@@ -108,7 +142,8 @@ class VideoRepresentationsExtractor:
                                                disk_location=data_writer.rep_out_dir / ".repr_metadata.json",
                                                frames=list(range(len(self.video))))
 
-        relevant_frames = [f for f in runtime_args.frames if f not in repr_metadata.frames_computed()]
+        computed_frames = set(repr_metadata.frames_computed())
+        relevant_frames = [f for f in runtime_args.frames if f not in computed_frames]
         logger.debug(f"Out of {len(runtime_args.frames)} total frames, "
                      f"{len(runtime_args.frames) - len(relevant_frames)} are precomputed and will be skipped.")
         batches = make_batches(relevant_frames, rep.batch_size)
@@ -148,15 +183,24 @@ class VideoRepresentationsExtractor:
 
     # Helper private methods
 
+    @staticmethod
+    def _disk_paths(rep: Representation, ixs: list[int], output_dir: Path) -> tuple[list[Path], list[Path]]:
+        """returns the paths of the binary data and extras of each frame (virtual ones for chunked stores)"""
+        # TODO: use data writer to create the paths as they can be non-npz for example
+        if rep.binary_format.value == "chunked":
+            store_path = output_dir / rep.name / "chunked/data.chunked"
+            return ([ChunkedStoreFrame(store_path, ix) for ix in ixs],
+                    [output_dir / rep.name / f"chunked/{ix}_extra.npz" for ix in ixs])
+        return ([output_dir / rep.name / f"npz/{ix}.npz" for ix in ixs],
+                [output_dir / rep.name / f"npz/{ix}_extra.npz" for ix in ixs])
+
     def _load_from_disk_if_possible(self, rep: Representation, video: VREVideo, ixs: list[int],
                                     output_dir: Path) -> ReprOut | None:
         """loads (batched) data from disk if possible."""
         assert isinstance(rep, IORepresentationMixin), rep
         assert isinstance(ixs, list) and all(isinstance(ix, int) for ix in ixs), (type(ixs), [type(ix) for ix in ixs])
         assert output_dir is not None and output_dir.exists(), output_dir
-        # TODO: use data writer to create the paths as they can be non-npz for example
-        npz_paths: list[Path] = [output_dir / rep.name / f"npz/{ix}.npz" for ix in ixs]
-        extra_paths: list[Path] = [output_dir / rep.name / f"npz/{ix}_extra.npz" for ix in ixs]
+        npz_paths, extra_paths = self._disk_paths(rep, ixs, output_dir)
         if any(not x.exists() for x in npz_paths): # partial batches are considered 'not existing' and overwritten
             return None
         extras_exist = [x.exists() for x in extra_paths]
@@ -174,12 +218,17 @@ class VideoRepresentationsExtractor:
         loaded_data = self._load_from_disk_if_possible(rep, self.video, batch, output_dir)
         if loaded_data is not None:
             return loaded_data
+        if self.result_cache is not None and (cached := self.result_cache.get(rep, self.video, batch)) is not None:
+            return cached
         dep_data = []
         for dep in rep.dependencies:
             dep_data.append(self._compute_one_representation_batch(dep, batch, output_dir, depth + 1))
         if isinstance(rep, LearnedRepresentationMixin) and rep.setup_called is False:
             rep.vre_setup() # instantiates the model, loads to cuda device etc.
-        return rep.compute(self.video, ixs=batch, dep_data=dep_data)
+        res = rep.compute(self.video, ixs=batch, dep_data=dep_data)
+        if self.result_cache is not None:
+            self.result_cache.put(rep, self.video, res)
+        return res
 
     def _setup_graphviz(self, logs_dir: Path, run_id: str, now_str: str):
         try:
@@ -221,23 +270,57 @@ class VideoRepresentationsExtractor:
             return self[list(ix)]
         assert isinstance(ix, list), type(ix)
         assert all(isinstance(r, IORepresentationMixin) for r in self.representations), self.representations
+        return self._compute_window_in_memory(list(self.representations), ix, self.video, self.representations.names)
+
+    def stream(self, frames: list[int] | None = None, window_size: int | None = None,
+               outputs: list[str] | None = None, n_prefetch: int = 1) -> Iterator[dict[str, ReprOut]]:
+        """
+        Streaming (in memory, nothing is stored on the disk) version of vre[frames]. Yields the outputs of each window
+        of frames as soon as it is computed, so the memory is bounded by the window size and not by len(frames).
+        Note: setup and free should be called outside of this function, like for vre[frames]!
+        Parameters:
+        - frames The list of frames to stream. If None, streams all the frames of the video
+        - window_size The number of frames computed and yielded at once. If None, the max batch size of the needed reprs
+        - outputs The names of the representations that are yielded. If None, all of them. Only these and their
+          (recursive) dependencies are computed and the dependencies are freed as soon as all their consumers are done.
+        - n_prefetch The number of upcoming windows whose frames are read from the video on a background thread
+        Yields:
+        - A dict of {repr_name: ReprOut} for each window of frames, with the requested representations only.
+        """
+        assert all(isinstance(r, IORepresentationMixin) for r in self.representations), self.representations
+        frames = list(range(len(self.video))) if frames is None else frames
+        outputs = self.representations.names if outputs is None else outputs
+        assert all(name in self.representations.names for name in outputs), (outputs, self.representations.names)
+        exported = RepresentationsList([r for r in self.representations if r.name in outputs], topo_sort=False)
+        nodes = GraphScheduler._get_needed_nodes(self.representations, exported) # pylint: disable=protected-access
+        window_size = window_size or max(r.batch_size for r in nodes)
+        windows = make_batches(frames, window_size)
+        for window, video in zip(windows, VideoPrefetcher(self.video, windows, n_prefetch=n_prefetch)):
+            yield self._compute_window_in_memory(nodes, window, video, outputs)
 
+    def _compute_window_in_memory(self, nodes: list[Representation], ixs: list[int],
+                                  video: VREVideo | PrefetchedVideo, outputs: list[str]) -> dict[str, ReprOut]:
+        """
+        computes the topo-sorted nodes (in batches of their batch size) on the frames ixs. The outputs of nodes that
+        are not in 'outputs' are dropped as soon as their last consumer is computed.
+        """
+        n_consumers = {n.name: sum(n.name in c.dep_names for c in nodes) for n in nodes}
         res: dict[str, ReprOut] = {}
-        for vre_repr in (pbar := tqdm(self.representations, disable=os.getenv("VRE_PBAR", "1") == "0")):
-            pbar.set_description(f"[VRE Streaming] {vre_repr.name}")
-            dep_names = [r.name for r in vre_repr.dependencies]
-            batches = make_batches(ix, vre_repr.batch_size)
+        for vre_repr in nodes:
             batch_res: list[ReprOut] = []
-            for b_ixs in batches:
-                repr_out = vre_repr.compute(video=self.video, ixs=b_ixs,
-                                            dep_data=[res[dep_name] for dep_name in dep_names])
+            for b_ixs in make_batches(ixs, vre_repr.batch_size):
+                repr_out = vre_repr.compute(video=video, ixs=b_ixs,
+                                            dep_data=[slice_repr_out(res[dep_name], b_ixs)
+                                                      for dep_name in vre_repr.dep_names])
                 if vre_repr.output_size is not None:
                     repr_out = vre_repr.resize(repr_out, vre_repr.output_size)
                 batch_res.append(repr_out)
-            combined = ReprOut(frames=np.concatenate([br.frames for br in batch_res]),
-                               key=sum([br.key for br in batch_res], []),
-                               output=MemoryData(np.concatenate([br.output for br in batch_res])))
+            combined = concat_repr_outs(batch_res)
             if vre_repr.image_format.value != "not-set":
                 combined.output_images = vre_repr.make_images(combined)
             res[vre_repr.name] = combined
+            for dep_name in vre_repr.dep_names:
+                n_consumers[dep_name] -= 1
+                if n_consumers[dep_name] == 0 and dep_name not in outputs:
+                    del res[dep_name]
         return res
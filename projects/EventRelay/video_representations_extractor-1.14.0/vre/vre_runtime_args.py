@@ -18,11 +18,20 @@ class VRERuntimeArgs:
         - 'skip_representation' Will stop the run of the current representation and start the next one
         - 'stop_execution' (default) Will stop the execution of VRE
     - n_threads_data_storer The number of threads used by the DataStorer
+    - data_storer_mode The type of workers of the DataStorer: 'thread' (default) or 'process'
+    - data_storer_queue_size The max number of enqueued items in the DataStorer before the compute loop blocks
+    - scheduling_mode How the representations are scheduled: 'representation_major' (default) or 'frame_major'
+    - n_shards The number of processes the frames are split across. See ShardedRunner docstring. Default: 1.
     """
     def __init__(self, video: VREVideo, representations: list[Representation], frames: list[int] | None,
-                 exception_mode: str, n_threads_data_storer: int):
+                 exception_mode: str, n_threads_data_storer: int, scheduling_mode: str = "representation_major",
+                 data_storer_mode: str = "thread", data_storer_queue_size: int = 1, n_shards: int = 1):
         assert all(isinstance(r, Representation) for r in representations), representations
         assert exception_mode in ("stop_execution", "skip_representation"), exception_mode
+        assert scheduling_mode in ("representation_major", "frame_major"), scheduling_mode
+        assert data_storer_mode in ("thread", "process"), data_storer_mode
+        assert isinstance(data_storer_queue_size, int) and data_storer_queue_size >= 1, data_storer_queue_size
+        assert isinstance(n_shards, int) and n_shards >= 1, n_shards
         frames = sorted(list(range(len(video))) if frames is None else frames)
         assert all(isinstance(x, int) for x in frames), frames
         assert 0 <= frames[0] <= frames[-1] < len(video), f"{frames[0]=}, {frames[-1]=}, {len(video)=}"
@@ -33,6 +42,10 @@ class VRERuntimeArgs:
         self.representations = representations
         self.representation_names = [r.name for r in representations]
         self.n_threads_data_storer = n_threads_data_storer
+        self.scheduling_mode = scheduling_mode
+        self.data_storer_mode = data_storer_mode
+        self.data_storer_queue_size = data_storer_queue_size
+        self.n_shards = n_shards
 
     def to_dict(self) -> dict:
         """A dict representation of this runtime args. Used in Metadata() to be stored on disk during the run."""
@@ -44,6 +57,10 @@ class VRERuntimeArgs:
             "frames": self.frames,
             "exception_mode": self.exception_mode,
             "n_threads_data_storer": self.n_threads_data_storer,
+            "scheduling_mode": self.scheduling_mode,
+            "data_storer_mode": self.data_storer_mode,
+            "data_storer_queue_size": self.data_storer_queue_size,
+            "n_shards": self.n_shards,
         }
 
     def __repr__(self):
@@ -53,5 +70,8 @@ class VRERuntimeArgs:
 - Video shape: {self.video.shape} (FPS: {self.video.fps:.2f})
 - Output frames ({len(self.frames)}): [{self.frames[0]} : {self.frames[-1]}]
 - Exception mode: '{self.exception_mode}'
-- DataStorer Threads: {self.n_threads_data_storer} (0 = only using main thread)
+- DataStorer Workers: {self.n_threads_data_storer} (0 = only using main thread). Mode: '{self.data_storer_mode}', \
+queue size: {self.data_storer_queue_size}
+- Scheduling mode: '{self.scheduling_mode}'
+- Shards: {self.n_shards}
 """
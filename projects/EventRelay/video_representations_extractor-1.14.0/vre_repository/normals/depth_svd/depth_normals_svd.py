@@ -1,4 +1,5 @@
 """Depth normals representation using SVD."""
+import os
 from overrides import overrides
 import numpy as np
 
@@ -6,15 +7,19 @@ from vre_video import VREVideo
 from vre.utils import MemoryData, ReprOut
 from vre_repository.normals import NormalsRepresentation
 
-from .depth_svd_impl import depths_to_normals
+from .depth_svd_impl import depths_to_normals, depths_to_normals_tiled
 
 class DepthNormalsSVD(NormalsRepresentation):
     """
     General method for estimating normals from a depth map (+ intrinsics): a 2D window centered on each pixel is
     projected into 3D and then a plane is fitted on the 3D pointcloud using SVD.
+    - engine: 'closed_form' (default) or 'svd'. 'svd' is the original implementation that builds all the (B, H, W,
+    window_size**2, 3) windows and runs an SVD per pixel. 'closed_form' builds the covariances from box sums (integral
+    images) and solves the smallest eigenvector analytically, in row tiles of at most VRE_NORMALS_TILE_MB (default:
+    256) MB, giving the same output with bounded memory.
     """
     def __init__(self, sensor_fov: int, sensor_size: tuple[int, int], window_size: int,
-                 input_downsample_step: int = None, stride: int = None, **kwargs):
+                 input_downsample_step: int = None, stride: int = None, engine: str = "closed_form", **kwargs):
         NormalsRepresentation.__init__(self, **kwargs)
         assert window_size % 2 == 1, f"Expected odd window size. Got: {window_size}"
         self.sensor_fov = sensor_fov
@@ -22,7 +27,9 @@ class DepthNormalsSVD(NormalsRepresentation):
         self.window_size = window_size
         self.stride = stride or 1
         self.input_downsample_step = input_downsample_step or 1
+        self.engine = engine
         assert len(self.dependencies) == 1, f"Expected exactly one depth method, got: {self.dependencies}"
+        assert engine in ("closed_form", "svd"), f"The engine argument must be 'closed_form' or 'svd', not '{engine}'."
 
     @overrides
     def compute(self, video: VREVideo, ixs: list[int], dep_data: list[ReprOut] | None = None) -> ReprOut:
@@ -30,7 +37,12 @@ class DepthNormalsSVD(NormalsRepresentation):
         assert dep_data[0].key == ixs, (self, dep_data[0], ixs)
         depths = dep_data[0].output
         assert len(depths.shape) == 4 and depths.shape[-1] == 1, f"Expected (B, H, W, 1) got: {depths.shape}"
-        res = depths_to_normals(depths[..., 0], self.sensor_fov, self.window_size, self.stride,
-                                self.sensor_size, self.input_downsample_step)
+        if self.engine == "closed_form":
+            res = depths_to_normals_tiled(depths[..., 0], self.sensor_fov, self.window_size, self.stride,
+                                          self.sensor_size, self.input_downsample_step,
+                                          max_tile_bytes=int(os.getenv("VRE_NORMALS_TILE_MB", "256")) * 1024 ** 2)
+        else:
+            res = depths_to_normals(depths[..., 0], self.sensor_fov, self.window_size, self.stride,
+                                    self.sensor_size, self.input_downsample_step)
         res = (MemoryData(res).astype(np.float32) + 1) / 2
         return ReprOut(frames=video[ixs], output=res, key=ixs)
@@ -1,2 +1,2 @@
 """init file"""
-from .utils import get_sampling_grid, get_normalized_coords,  depths_to_normals
+from .utils import get_sampling_grid, get_normalized_coords, depths_to_normals, depths_to_normals_tiled
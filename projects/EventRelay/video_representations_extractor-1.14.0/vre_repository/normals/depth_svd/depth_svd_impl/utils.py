@@ -92,3 +92,88 @@ def depths_to_normals(depths: np.ndarray, sensor_fov: int, window_size: int, str
     neg_angle = (normalized_grid * -normals).sum(axis=-1)
     normals = np.where((angle > neg_angle)[..., None], normals, -normals)
     return normals
+
+def _strided_box_sum(x: np.ndarray, radius: int, stride: int, axis: int) -> np.ndarray:
+    """
+    Sum over the window {i + k * stride, k in [-radius, radius]} along axis (out of bounds values are 0) using a
+    cumulative sum on each of the stride lattices (integral image), so the cost does not depend on the window size.
+    """
+    x = np.moveaxis(x, axis, 0)
+    n = x.shape[0]
+    lattice_len = math.ceil((n + (2 * radius + 1) * stride) / stride)
+    padded = np.zeros((lattice_len * stride, *x.shape[1:]), dtype=x.dtype)
+    padded[(radius + 1) * stride: (radius + 1) * stride + n] = x
+    cumsum = padded.reshape(lattice_len, stride, *x.shape[1:]).cumsum(axis=0).reshape(padded.shape)
+    res = cumsum[(2 * radius + 1) * stride: (2 * radius + 1) * stride + n] - cumsum[0:n]
+    return np.moveaxis(res, 0, axis)
+
+def _smallest_eigenvectors_sym3(a00, a01, a02, a11, a12, a22) -> np.ndarray:
+    """
+    Closed form (trigonometric) unit eigenvector of the smallest eigenvalue of many 3x3 symmetric matrices given by
+    their upper triangle (each entry is an array of the same shape). Returns an array of shape (*a00.shape, 3).
+    """
+    q = (a00 + a11 + a22) / 3
+    p1 = a01 ** 2 + a02 ** 2 + a12 ** 2
+    p = np.sqrt(((a00 - q) ** 2 + (a11 - q) ** 2 + (a22 - q) ** 2 + 2 * p1) / 6)
+    safe_p = np.where(p > 0, p, 1)
+    b00, b11, b22, b01, b02, b12 = (a00 - q) / safe_p, (a11 - q) / safe_p, (a22 - q) / safe_p, \
+        a01 / safe_p, a02 / safe_p, a12 / safe_p
+    det_b = b00 * (b11 * b22 - b12 ** 2) - b01 * (b01 * b22 - b12 * b02) + b02 * (b01 * b12 - b11 * b02)
+    phi = np.arccos(np.clip(det_b / 2, -1, 1)) / 3
+    eig_min = q + 2 * p * np.cos(phi + 2 * math.pi / 3)
+
+    # the eigenvector is orthogonal to the rows of (A - eig_min * I): take the most stable cross product of two rows
+    r0 = np.stack([a00 - eig_min, a01, a02], axis=-1)
+    r1 = np.stack([a01, a11 - eig_min, a12], axis=-1)
+    r2 = np.stack([a02, a12, a22 - eig_min], axis=-1)
+    crosses = np.stack([np.cross(r0, r1), np.cross(r0, r2), np.cross(r1, r2)], axis=0)
+    norms = np.linalg.norm(crosses, axis=-1)
+    best = norms.argmax(axis=0)
+    vec = np.take_along_axis(crosses, best[None, ..., None], axis=0)[0]
+    vec_norm = np.take_along_axis(norms, best[None], axis=0)[0]
+    # degenerate (i.e. all points on a line or a single point): any direction is valid, use the optical axis like SVD
+    return np.where((vec_norm > 0)[..., None], vec / np.where(vec_norm > 0, vec_norm, 1)[..., None],
+                    np.array([0, 0, 1], dtype=vec.dtype))
+
+def depths_to_normals_tiled(depths: np.ndarray, sensor_fov: int, window_size: int, stride: int,
+                            sensor_size: tuple[int, int], input_downsample_step: int,
+                            max_tile_bytes: int = 256 * 1024 ** 2) -> np.ndarray:
+    """
+    Same output as depths_to_normals, without materializing the (B, H, W, window**2, 3) windows tensor: the 3x3
+    covariance of each window is built from box sums of the points and of their outer products (cov = sum(pp^T) -
+    n * c c^T), and its smallest eigenvector is computed in closed form. Each frame is processed in row tiles (plus
+    the halo rows needed by the window) whose float64 intermediates fit in max_tile_bytes.
+    """
+    B, H, W = depths.shape
+    H_down, W_down = H // input_downsample_step, W // input_downsample_step
+    K = fov_diag_to_intrinsic(sensor_fov, (sensor_size[0], sensor_size[1]), (W_down, H_down))
+    normalized_grid = get_normalized_coords(W_down, H_down, K)
+    assert normalized_grid.shape[0:2] == (H, W), (normalized_grid.shape, depths.shape)
+    radius = window_size // 2
+    halo = radius * stride
+    bytes_per_row = W * 8 * 40 # ~40 float64 (H, W) arrays alive at the same time (points, sums, eigen solver)
+    tile_rows = max(1, max_tile_bytes // bytes_per_row - 2 * halo)
+    # the number of (in bounds) samples of each window only depends on the position
+    counts = np.outer(_strided_box_sum(np.ones(H), radius, stride, 0), _strided_box_sum(np.ones(W), radius, stride, 0))
+
+    res = np.zeros((B, H, W, 3), dtype=np.float32)
+    for i in range(B):
+        for y0 in range(0, H, tile_rows):
+            y1 = min(y0 + tile_rows, H)
+            h0, h1 = max(y0 - halo, 0), min(y1 + halo, H)
+            grid = normalized_grid[h0:h1].astype(np.float64)
+            points = depths[i, h0:h1, :, None].astype(np.float64) * grid
+            px, py, pz = points[..., 0], points[..., 1], points[..., 2]
+            channels = np.stack([px, py, pz, px * px, px * py, px * pz, py * py, py * pz, pz * pz], axis=-1)
+            del points, px, py, pz
+            sums = _strided_box_sum(_strided_box_sum(channels, radius, stride, 0), radius, stride, 1)
+            sums = sums[y0 - h0: y1 - h0]
+            del channels
+            n = counts[y0:y1]
+            sx, sy, sz = sums[..., 0], sums[..., 1], sums[..., 2]
+            normals = _smallest_eigenvectors_sym3(sums[..., 3] - sx * sx / n, sums[..., 4] - sx * sy / n,
+                                                  sums[..., 5] - sx * sz / n, sums[..., 6] - sy * sy / n,
+                                                  sums[..., 7] - sy * sz / n, sums[..., 8] - sz * sz / n)
+            angle = (grid[y0 - h0: y1 - h0] * normals).sum(axis=-1)
+            res[i, y0:y1] = np.where((angle > 0)[..., None], normals, -normals)
+    return res
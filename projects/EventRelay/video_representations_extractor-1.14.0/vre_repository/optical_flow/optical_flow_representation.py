@@ -32,6 +32,10 @@ class OpticalFlowRepresentation(Representation, NpIORepresentation, NormedRepres
         """for a given list of frames at .compute() time, return the delta frames required to compute the flow"""
         return video[_get_delta_frames(video, ixs, self.delta)]
 
+    @overrides
+    def context_frames(self, video: VREVideo, ix: int) -> list[int]:
+        return _get_delta_frames(video, [ix], self.delta)
+
     @overrides
     def compute(self, video: VREVideo, ixs: list[int], dep_data = None) -> ReprOut:
         raise NotImplementedError(self)
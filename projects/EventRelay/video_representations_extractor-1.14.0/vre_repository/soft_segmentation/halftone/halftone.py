@@ -22,10 +22,13 @@ class Halftone(Representation, NpIORepresentation, NormedRepresentationMixin):
     - percentage: How much of the gray component to remove from the CMY channels and put in the K channel.
     - angles: A list of 4 angles that each screen channel should be rotated by.
     - antialias: boolean.
+    - engine: 'numpy' (default) or 'pil'. 'pil' is the original per-pixel/per-dot implementation. 'numpy' computes the
+    gray component replacement array-wide and rasterizes the dots of all sample boxes at once from (cached) disk masks,
+    giving the same output, much faster.
     """
 
     def __init__(self, sample: float, scale: float, percentage: float, angles: list[int],
-                 antialias: bool, resolution: tuple[int, int], **kwargs):
+                 antialias: bool, resolution: tuple[int, int], engine: str = "numpy", **kwargs):
         Representation.__init__(self, **kwargs)
         NpIORepresentation.__init__(self)
         NormedRepresentationMixin.__init__(self)
@@ -36,6 +39,8 @@ class Halftone(Representation, NpIORepresentation, NormedRepresentationMixin):
         self.angles = angles
         self.antialias = antialias
         self.resolution = resolution
+        self.engine = engine
+        self._disk_masks: dict[tuple[int, int], np.ndarray] = {} # (box_size, sum of the box) -> (B+1, B+1) mask
         self._check_arguments()
 
     @overrides
@@ -61,6 +66,12 @@ class Halftone(Representation, NpIORepresentation, NormedRepresentationMixin):
         cmyk_im = im.convert("CMYK")
         if not percentage:
             return cmyk_im
+        if self.engine == "numpy":
+            cmyk_arr = np.array(cmyk_im)
+            gray = (cmyk_arr[..., 0:3].min(axis=-1).astype(np.float64) * percentage / 100).astype(np.uint8)
+            cmyk_arr[..., 0:3] -= gray[..., None]
+            cmyk_arr[..., 3] = gray
+            return Image.fromarray(cmyk_arr, "CMYK")
         cmyk_im = cmyk_im.split()
         cmyk = []
         for i in range(4):
@@ -97,45 +108,10 @@ class Halftone(Representation, NpIORepresentation, NormedRepresentationMixin):
 
         for channel, angle in zip(cmyk, self.angles):
             channel = channel.rotate(angle, expand=1)
-            size = channel.size[0] * scale, channel.size[1] * scale
-            half_tone = Image.new("L", size)
-            draw = ImageDraw.Draw(half_tone)
-
-            # Cycle through one sample point at a time, drawing a circle for
-            # each one:
-            for x in range(0, channel.size[0], self.sample):
-                for y in range(0, channel.size[1], self.sample):
-
-                    # Area we sample to get the level:
-                    box = channel.crop((x, y, x + self.sample, y + self.sample))
-
-                    # The average level for that box (0-255):
-                    mean = ImageStat.Stat(box).mean[0]
-
-                    # The diameter of the circle to draw based on the mean (0-1):
-                    diameter = (mean / 255) ** 0.5
-
-                    # Size of the box we'll draw the circle in:
-                    box_size = self.sample * scale
-
-                    # Diameter of circle we'll draw:
-                    # If sample=10 and scale=1 then this is (0-10)
-                    draw_diameter = diameter * box_size
-
-                    # Position of top-left of box we'll draw the circle in:
-                    # x_pos, y_pos = (x * scale), (y * scale)
-                    box_x, box_y = (x * scale), (y * scale)
-
-                    # Positioned of top-left and bottom-right of circle:
-                    # A maximum-sized circle will have its edges at the edges
-                    # of the draw box.
-                    x1 = box_x + ((box_size - draw_diameter) / 2)
-                    y1 = box_y + ((box_size - draw_diameter) / 2)
-                    x2 = x1 + draw_diameter
-                    y2 = y1 + draw_diameter
-
-                    draw.ellipse([(x1, y1), (x2, y2)], fill=255)
-
+            if self.engine == "numpy":
+                half_tone = self._draw_dots_vectorized(channel, scale)
+            else:
+                half_tone = self._draw_dots(channel, scale)
             half_tone = half_tone.rotate(-angle, expand=1)
             width_half, height_half = half_tone.size
 
@@ -151,11 +127,86 @@ class Halftone(Representation, NpIORepresentation, NormedRepresentationMixin):
                 # Scale it back down to antialias the image.
                 w = int((xx2 - xx1) / antialias_scale)
                 h = int((yy2 - yy1) / antialias_scale)
-                half_tone = image_resize(half_tone, h, w)
+                half_tone = Image.fromarray(image_resize(np.array(half_tone), h, w), "L")
 
             dots.append(half_tone)
         return dots
 
+    def _draw_dots(self, channel: Image.Image, scale: int) -> Image.Image:
+        """draws one circle for each sample box of the (rotated) channel, one sample box at a time"""
+        size = channel.size[0] * scale, channel.size[1] * scale
+        half_tone = Image.new("L", size)
+        draw = ImageDraw.Draw(half_tone)
+
+        # Cycle through one sample point at a time, drawing a circle for
+        # each one:
+        for x in range(0, channel.size[0], self.sample):
+            for y in range(0, channel.size[1], self.sample):
+
+                # Area we sample to get the level:
+                box = channel.crop((x, y, x + self.sample, y + self.sample))
+
+                # The average level for that box (0-255):
+                mean = ImageStat.Stat(box).mean[0]
+
+                # The diameter of the circle to draw based on the mean (0-1):
+                diameter = (mean / 255) ** 0.5
+
+                # Size of the box we'll draw the circle in:
+                box_size = self.sample * scale
+
+                # Diameter of circle we'll draw:
+                # If sample=10 and scale=1 then this is (0-10)
+                draw_diameter = diameter * box_size
+
+                # Position of top-left of box we'll draw the circle in:
+                # x_pos, y_pos = (x * scale), (y * scale)
+                box_x, box_y = (x * scale), (y * scale)
+
+                # Positioned of top-left and bottom-right of circle:
+                # A maximum-sized circle will have its edges at the edges
+                # of the draw box.
+                x1 = box_x + ((box_size - draw_diameter) / 2)
+                y1 = box_y + ((box_size - draw_diameter) / 2)
+                x2 = x1 + draw_diameter
+                y2 = y1 + draw_diameter
+
+                draw.ellipse([(x1, y1), (x2, y2)], fill=255)
+        return half_tone
+
+    def _draw_dots_vectorized(self, channel: Image.Image, scale: int) -> Image.Image:
+        """
+        Vectorized `_draw_dots`. The level of each sample box is its sum (the mean is sum / sample^2), computed for all
+        boxes at once via a reshape. Each box's dot is then picked from a disk mask drawn once per (box size, level).
+        The masks are (B+1, B+1) because a max-sized circle touches the first row/column of the next boxes as well.
+        """
+        arr, s = np.array(channel), self.sample
+        box_size, (h, w) = s * scale, arr.shape
+        nh, nw = -(-h // s), -(-w // s)
+        padded = np.zeros((nh * s, nw * s), dtype=np.int64) # crops outside of the channel are filled with zeros
+        padded[0:h, 0:w] = arr
+        sums = padded.reshape(nh, s, nw, s).sum(axis=(1, 3))
+        uniques, inverse = np.unique(sums, return_inverse=True)
+        masks = np.stack([self._get_disk_mask(box_size, int(_sum)) for _sum in uniques])[inverse.reshape(nh, nw)]
+
+        B = box_size # pylint: disable=invalid-name
+        res = np.zeros((nh * B + 1, nw * B + 1), dtype=np.uint8)
+        res[0:nh * B, 0:nw * B] = masks[:, :, 0:B, 0:B].transpose(0, 2, 1, 3).reshape(nh * B, nw * B)
+        res[0:nh * B, B::B] |= masks[:, :, 0:B, B].transpose(0, 2, 1).reshape(nh * B, nw) # right spill
+        res[B::B, 0:nw * B] |= masks[:, :, B, 0:B].reshape(nh, nw * B) # bottom spill
+        res[B::B, B::B] |= masks[:, :, B, B] # corner spill
+        return Image.fromarray(res[0:h * scale, 0:w * scale], "L")
+
+    def _get_disk_mask(self, box_size: int, box_sum: int) -> np.ndarray:
+        """the circle drawn by `_draw_dots` for a sample box with this sum, drawn at the (0, 0) box. Cached."""
+        if (key := (box_size, box_sum)) not in self._disk_masks:
+            draw_diameter = ((box_sum / (self.sample * self.sample)) / 255) ** 0.5 * box_size
+            x1 = (box_size - draw_diameter) / 2
+            mask = Image.new("L", (box_size + 1, box_size + 1))
+            ImageDraw.Draw(mask).ellipse([(x1, x1), (x1 + draw_diameter, x1 + draw_diameter)], fill=255)
+            self._disk_masks[key] = np.array(mask)
+        return self._disk_masks[key]
+
     def _make_one_image(self, frame: np.ndarray) -> np.ndarray:
         frame = image_resize(frame, height=self.resolution[0], width=self.resolution[1])
         im = Image.fromarray(frame, "RGB")
@@ -175,3 +226,4 @@ class Halftone(Representation, NpIORepresentation, NormedRepresentationMixin):
             f"The percentage argument must be an integer or float, not '{self.percentage}'."
         assert isinstance(self.sample, int), f"The sample argument must be an integer, not '{self.sample}'."
         assert isinstance(self.scale, int), f"The scale argument must be an integer, not '{self.scale}'."
+        assert self.engine in ("numpy", "pil"), f"The engine argument must be 'numpy' or 'pil', not '{self.engine}'."
@@ -14,6 +14,9 @@ from ..utils.video_forwarder import VideoForwarder
 @dataclass
 class AgentOptions:
     model_dir: str
+    # "sequential": one loop feeds every audio stage in turn.
+    # "parallel": each participant gets its own task per audio stage.
+    audio_pipeline: Optional[str] = None
 
     def update(self, other: "AgentOptions") -> "AgentOptions":
         merged_dict = asdict(self)
@@ -30,7 +33,7 @@ _DEFAULT_MODEL_DIR = tempfile.gettempdir()
 
 
 def default_agent_options():
-    return AgentOptions(model_dir=_DEFAULT_MODEL_DIR)
+    return AgentOptions(model_dir=_DEFAULT_MODEL_DIR, audio_pipeline="sequential")
 
 
 @dataclass
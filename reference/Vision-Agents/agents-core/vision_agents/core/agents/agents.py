@@ -17,6 +17,7 @@ from getstream.video.rtc import Call
 from getstream.video.rtc.participants import ParticipantsState
 from getstream.video.rtc.pb.stream.video.sfu.models.models_pb2 import TrackType
 from .agent_types import AgentOptions, default_agent_options, LLMTurn, TrackInfo
+from .audio_pipeline import AudioStageFn, ParticipantAudioPipeline, run_audio_stage
 
 from ..edge import sfu_events
 from ..edge.events import (
@@ -56,7 +57,8 @@ from ..utils.video_track import VideoFileTrack
 from . import events
 from .conversation import Conversation
 from .transcript_buffer import TranscriptBuffer
-from ..profiling import Profiler
+from ..observability import agent_turn_latency_ms
+from ..profiling import EventLoopLagMonitor, Profiler
 from opentelemetry.trace import set_span_in_context
 from opentelemetry.trace.propagation import Span, Context
 from opentelemetry import trace, context as otel_context
@@ -139,6 +141,10 @@ class Agent:
         else:
             options = default_agent_options().update(options)
         self.options = options
+        if self.options.audio_pipeline not in ("sequential", "parallel"):
+            raise ValueError(
+                f"audio_pipeline must be 'sequential' or 'parallel', got {self.options.audio_pipeline}"
+            )
 
         # audio incoming is enqueued to self._incoming_audio_queue (eg. human audio)
         self._incoming_audio_queue: AudioQueue = AudioQueue(buffer_limit_ms=8000)
@@ -227,6 +233,11 @@ class Agent:
         self._realtime_connection = None
         self._pc_track_handler_attached: bool = False
         self._audio_consumer_task: Optional[asyncio.Task] = None
+        # audio_pipeline="parallel": the audio stages of each participant, by user id
+        self._audio_pipelines: Dict[str, ParticipantAudioPipeline] = {}
+        self._loop_lag_monitor = EventLoopLagMonitor()
+        # When the user turn that the TTS is about to answer ended
+        self._turn_awaiting_tts_audio: Optional[datetime.datetime] = None
 
         # validation time
         self._validate_configuration()
@@ -246,6 +257,7 @@ class Agent:
         self._pending_turn = None
         event = turn.response
         if self.tts and event and event.text and event.text.strip():
+            self._turn_awaiting_tts_audio = turn.started_at
             sanitized_text = self._sanitize_text(event.text)
             await self.tts.send(sanitized_text)
 
@@ -275,15 +287,21 @@ class Agent:
                     await self.tts.send(sanitized_text)
             else:
                 self._pending_turn.response = event
+                self._record_turn_latency("llm_response", self._pending_turn.started_at)
                 if self._pending_turn.turn_finished:
                     await self._finish_llm_turn()
                 else:
                     # we are in eager turn completion mode. wait for confirmation
                     self._pending_turn.response = event
 
-        # write tts pcm to output track (this is the AI talking to us)
-        @self.events.subscribe
+        # write tts pcm to output track (this is the AI talking to us), in order
+        @self.events.subscribe(ordered=True)
         async def _on_tts_audio_write_to_output(event: TTSAudioEvent):
+            if self._turn_awaiting_tts_audio is not None:
+                self._record_turn_latency(
+                    "tts_first_audio", self._turn_awaiting_tts_audio
+                )
+                self._turn_awaiting_tts_audio = None
             if self._audio_track is not None:
                 await self._audio_track.write(event.data)
 
@@ -301,8 +319,8 @@ class Agent:
                     self._on_track_added(event.track_id, event.track_type, event.user)
                 )
 
-        # audio event for the user talking to the AI
-        @self.edge.events.subscribe
+        # audio event for the user talking to the AI, in order
+        @self.edge.events.subscribe(ordered=True)
         async def on_audio_received(event: AudioReceivedEvent):
             if event.pcm_data is None:
                 return
@@ -535,6 +553,7 @@ class Agent:
         self._connection = connection
         self._is_running = True
         self._audio_consumer_task = asyncio.create_task(self._consume_incoming_audio())
+        self._loop_lag_monitor.start()
 
         self.logger.info(f"🤖 Agent joined call: {call.id}")
 
@@ -696,6 +715,12 @@ class Agent:
             except asyncio.CancelledError:
                 pass
             self._audio_consumer_task = None
+        await self._stop_audio_pipelines()
+        await self._loop_lag_monitor.stop()
+        if self._loop_lag_monitor.samples:
+            self.logger.info(
+                f"Max event loop lag during the call: {self._loop_lag_monitor.max_lag_ms:.1f}ms"
+            )
 
         # run stop on all subclasses
         await self._apply("stop")
@@ -902,28 +927,12 @@ class Agent:
 
                     participant = pcm.participant
 
-                    if (
-                        participant
-                        and getattr(participant, "user_id", None) != self.agent_user.id
-                    ):
-                        # first forward to processors
-                        for processor in self.audio_processors:
-                            if processor is None:
-                                continue
-                            await processor.process_audio(pcm)
-
-                        # when in Realtime mode call the Realtime directly (non-blocking)
-                        if _is_audio_llm(self.llm):
-                            await self.simple_audio_response(pcm, participant)
-
-                        # Process audio through STT
-                        elif self.stt:
-                            await self.stt.process_audio(pcm, participant)
-
-                    if self.turn_detection is not None and participant is not None:
-                        await self.turn_detection.process_audio(
-                            pcm, participant, conversation=self.conversation
-                        )
+                    if participant is not None:
+                        if self.options.audio_pipeline == "parallel":
+                            self._audio_pipeline_for(participant).put(pcm)
+                        else:
+                            for name, stage in self._audio_stages(participant).items():
+                                await run_audio_stage(name, stage, pcm, participant)
 
                 except (asyncio.TimeoutError, asyncio.QueueEmpty):
                     # No audio data available, continue loop to check _is_running
@@ -941,6 +950,68 @@ class Agent:
         except Exception as e:
             self.logger.error(f"❌ Error in audio consumer: {e}", exc_info=True)
 
+    def _audio_stages(self, participant: Participant) -> Dict[str, AudioStageFn]:
+        """The audio stages a participant's audio goes through, in order."""
+        stages: Dict[str, AudioStageFn] = {}
+        if getattr(participant, "user_id", None) != self.agent_user.id:
+            # first forward to processors
+            if self.audio_processors:
+                stages["processors"] = self._audio_to_processors
+            # when in Realtime mode call the Realtime directly (non-blocking)
+            if _is_audio_llm(self.llm):
+                stages["llm"] = self.simple_audio_response
+            # Process audio through STT
+            elif self.stt:
+                stages["stt"] = self._audio_to_stt
+        if self.turn_detection is not None:
+            stages["turn_detection"] = self._audio_to_turn_detection
+        return stages
+
+    async def _audio_to_processors(
+        self, pcm: PcmData, participant: Participant
+    ) -> None:
+        for processor in self.audio_processors:
+            if processor is None:
+                continue
+            await processor.process_audio(pcm)
+
+    async def _audio_to_stt(self, pcm: PcmData, participant: Participant) -> None:
+        if self.stt:
+            await self.stt.process_audio(pcm, participant)
+
+    async def _audio_to_turn_detection(
+        self, pcm: PcmData, participant: Participant
+    ) -> None:
+        if self.turn_detection is not None:
+            await self.turn_detection.process_audio(
+                pcm, participant, conversation=self.conversation
+            )
+
+    def _audio_pipeline_for(self, participant: Participant) -> ParticipantAudioPipeline:
+        pipeline = self._audio_pipelines.get(participant.user_id)
+        if pipeline is None:
+            pipeline = ParticipantAudioPipeline(
+                participant, self._audio_stages(participant)
+            )
+            pipeline.start()
+            self._audio_pipelines[participant.user_id] = pipeline
+        return pipeline
+
+    def _record_turn_latency(
+        self, stage: str, turn_ended_at: datetime.datetime
+    ) -> None:
+        elapsed = datetime.datetime.now() - turn_ended_at
+        agent_turn_latency_ms.record(elapsed.total_seconds() * 1000, {"stage": stage})
+
+    async def _stop_audio_pipelines(self, user_id: Optional[str] = None) -> None:
+        if user_id is None:
+            pipelines = list(self._audio_pipelines.values())
+            self._audio_pipelines.clear()
+        else:
+            pipeline = self._audio_pipelines.pop(user_id, None)
+            pipelines = [pipeline] if pipeline is not None else []
+        await asyncio.gather(*(p.stop() for p in pipelines))
+
     async def _track_to_video_processors(self, track: TrackInfo):
         """
         Send the track to the video processors
@@ -980,6 +1051,9 @@ class Agent:
     async def _on_track_removed(
         self, track_id: str, track_type: int, participant: Participant
     ):
+        if track_type == TrackType.TRACK_TYPE_AUDIO and participant is not None:
+            await self._stop_audio_pipelines(participant.user_id)
+
         track = self._active_video_tracks.pop(track_id, None)
         if track is not None:
             await track.forwarder.stop()
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+from getstream.video.rtc.track_util import PcmData
+
+from ..edge.types import Participant
+from ..observability import audio_slices_dropped, audio_stage_latency_ms
+
+logger = logging.getLogger(__name__)
+
+AudioStageFn = Callable[[PcmData, Participant], Awaitable[None]]
+
+
+async def run_audio_stage(
+    name: str, fn: AudioStageFn, pcm: PcmData, participant: Participant
+) -> None:
+    """Run one audio stage on a slice of audio and record its latency."""
+    start = time.perf_counter()
+    try:
+        await fn(pcm, participant)
+    finally:
+        audio_stage_latency_ms.record(
+            (time.perf_counter() - start) * 1000, {"stage": name}
+        )
+
+
+class AudioPipelineStage:
+    """
+    A single audio stage of a participant: a bounded queue and the task draining it.
+    When the stage falls behind, the oldest audio slices are dropped.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: AudioStageFn,
+        participant: Participant,
+        max_queue_size: int,
+    ):
+        self.name = name
+        self.fn = fn
+        self.participant = participant
+        self.queue: asyncio.Queue[PcmData] = asyncio.Queue(maxsize=max_queue_size)
+        self.dropped = 0
+        self.processed = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def put(self, pcm: PcmData) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            audio_slices_dropped.add(1, {"stage": self.name})
+        self.queue.put_nowait(pcm)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            pcm = await self.queue.get()
+            try:
+                await run_audio_stage(self.name, self.fn, pcm, self.participant)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(
+                    f"Audio stage {self.name} failed for participant {self.participant.user_id}"
+                )
+            self.processed += 1
+
+
+class ParticipantAudioPipeline:
+    """
+    The audio stages (processors, STT/LLM, turn detection) of one participant.
+
+    Every stage has its own bounded queue and task, so the stages run concurrently
+    and a slow stage (or participant) doesn't delay the others. The audio of a
+    participant is still processed in order within each stage.
+
+    Example:
+
+        pipeline = ParticipantAudioPipeline(
+            participant, {"stt": stt_fn, "turn_detection": turn_fn}
+        )
+        pipeline.start()
+        pipeline.put(pcm)
+        await pipeline.stop()
+    """
+
+    def __init__(
+        self,
+        participant: Participant,
+        stages: dict[str, AudioStageFn],
+        max_queue_size: int = 100,
+    ):
+        """
+        Args:
+            participant: The participant whose audio goes through this pipeline
+            stages: Stage name -> coroutine function called with (pcm, participant)
+            max_queue_size: Max audio slices waiting per stage (100 x 20ms = 2s)
+        """
+        self.participant = participant
+        self.stages = [
+            AudioPipelineStage(name, fn, participant, max_queue_size)
+            for name, fn in stages.items()
+        ]
+
+    def start(self) -> None:
+        for stage in self.stages:
+            stage.start()
+
+    def put(self, pcm: PcmData) -> None:
+        """Hand a slice of audio to every stage, without waiting for them."""
+        for stage in self.stages:
+            stage.put(pcm)
+
+    async def stop(self) -> None:
+        await asyncio.gather(*(stage.stop() for stage in self.stages))
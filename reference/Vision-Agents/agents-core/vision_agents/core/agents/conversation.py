@@ -5,7 +5,7 @@ import uuid
 from abc import ABC, abstractmethod
 from typing import Optional, List, Any, Dict
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 logger = logging.getLogger(__name__)
 
@@ -32,16 +32,24 @@ class ContentBuffer:
         self.last_index = -1
         self.accumulated = ""
 
-    def add_fragment(self, index: int, text: str):
-        """Add a fragment and apply all sequential pending fragments."""
+    def add_fragment(self, index: int, text: str) -> bool:
+        """Add a fragment and apply all sequential pending fragments.
+
+        Returns:
+            True if the accumulated text changed, False if the fragment is waiting
+            for an earlier one.
+        """
         self.fragments[index] = text
-        self._apply_pending()
+        return self._apply_pending()
 
-    def _apply_pending(self):
+    def _apply_pending(self) -> bool:
         """Apply all sequential fragments starting from last_index + 1."""
+        applied = False
         while (self.last_index + 1) in self.fragments:
             self.accumulated += self.fragments.pop(self.last_index + 1)
             self.last_index += 1
+            applied = True
+        return applied
 
     def get_accumulated(self) -> str:
         return self.accumulated
@@ -64,18 +72,56 @@ class MessageState:
         ] = []  # For chunking: multiple backend IDs per internal ID
 
 
+@dataclass
+class _MessageLock:
+    """Serializes the updates of one message. Dropped once nobody uses it."""
+
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    users: int = 0
+
+
 class Conversation(ABC):
-    """Base conversation class with unified message API."""
+    """Base conversation class with unified message API.
+
+    Messages are indexed by id, so upserting a streaming delta doesn't scan the
+    history. Updates of the same message are applied in order, while updates of
+    different messages (e.g. a user transcript and the assistant's response)
+    don't wait for each other's backend sync.
+
+    The history can be bounded with ``max_messages``: the oldest completed messages
+    are then removed and passed to ``summarize()``, which can return a message to
+    keep in their place.
+    """
 
     def __init__(
         self,
         instructions: str,
         messages: List[Message],
+        max_messages: Optional[int] = None,
     ):
+        """
+        Args:
+            instructions: System instructions
+            messages: Initial messages
+            max_messages: Max messages kept in the history, not counting the summary
+                returned by summarize(). None keeps all of them.
+        """
+        if max_messages is not None and max_messages < 1:
+            raise ValueError(f"max_messages must be >= 1, got {max_messages}")
         self.instructions = instructions
         self.messages = [m for m in messages]
+        self.max_messages = max_messages
         self._message_states: Dict[str, MessageState] = {}
-        self._lock = asyncio.Lock()  # One lock to rule them all
+        self._message_locks: Dict[str, _MessageLock] = {}
+        self._summary: Optional[Message] = None
+        # Trims rewrite self.messages around the summarize() call, one at a time
+        self._trim_lock = asyncio.Lock()
+
+        # Message id -> message. self.messages is public and LLM plugins append to
+        # it directly, so the index catches up with it on lookup (see _sync_index)
+        self._messages_by_id: Dict[str, Message] = {}
+        self._indexed_messages: List[Message] = self.messages
+        self._indexed_count = 0
 
     async def send_message(
         self,
@@ -155,59 +201,97 @@ class Conversation(ABC):
             # Simple non-streaming
             await conv.upsert_message("user", "user123", "Hi there!")
         """
-        async with self._lock:
-            # Generate ID if not provided
-            if message_id is None:
-                message_id = str(uuid.uuid4())
-
-            # Find or create message
-            message = self._find_message(message_id)
-            if message is None:
-                # New message
-                message = Message(
-                    id=message_id,
-                    role=role,
-                    user_id=user_id,
-                    content="",
-                    original=original,
+        # Generate ID if not provided
+        if message_id is None:
+            message_id = str(uuid.uuid4())
+
+        message_lock = self._message_locks.get(message_id)
+        if message_lock is None:
+            message_lock = self._message_locks[message_id] = _MessageLock()
+        message_lock.users += 1
+        try:
+            async with message_lock.lock:
+                return await self._upsert_message(
+                    role,
+                    user_id,
+                    content,
+                    message_id,
+                    content_index,
+                    completed,
+                    replace,
+                    original,
                 )
-                self.messages.append(message)
-                state = MessageState(message_id)
-                self._message_states[message_id] = state
-            else:
-                # Existing message - get its state
-                state_or_none = self._message_states.get(message_id)
-                if state_or_none is None:
-                    # Message exists but no state - was already completed
-                    # Ignore late updates (deltas arriving after completion)
-                    logger.debug(
-                        f"Message {message_id} already completed, ignoring update. "
-                        f"This happens when deltas arrive after completion."
-                    )
-                    return message
-                state = state_or_none
-
-            # Update content
-            if content_index is not None:
-                # Streaming: buffer fragments in order
-                state.buffer.add_fragment(content_index, content)
+        finally:
+            message_lock.users -= 1
+            if message_lock.users == 0:
+                self._message_locks.pop(message_id, None)
+
+    async def _upsert_message(
+        self,
+        role: str,
+        user_id: str,
+        content: str,
+        message_id: str,
+        content_index: Optional[int],
+        completed: bool,
+        replace: bool,
+        original: Any,
+    ) -> Message:
+        # Find or create message
+        message = self._find_message(message_id)
+        is_new = message is None
+        if message is None:
+            # New message
+            message = Message(
+                id=message_id,
+                role=role,
+                user_id=user_id,
+                content="",
+                original=original,
+            )
+            self.messages.append(message)
+            self._sync_index()
+            state = MessageState(message_id)
+            self._message_states[message_id] = state
+        else:
+            # Existing message - get its state
+            state_or_none = self._message_states.get(message_id)
+            if state_or_none is None:
+                # Message exists but no state - was already completed
+                # Ignore late updates (deltas arriving after completion)
+                logger.debug(
+                    f"Message {message_id} already completed, ignoring update. "
+                    f"This happens when deltas arrive after completion."
+                )
+                return message
+            state = state_or_none
+
+        # Update content
+        if content_index is not None:
+            # Streaming: buffer fragments in order
+            if state.buffer.add_fragment(content_index, content):
                 message.content = state.buffer.get_accumulated()
-            elif replace:
-                # Replace all content
-                state.buffer.clear()
-                message.content = content
-            else:
-                # Append to existing
-                message.content += content
+        elif replace:
+            # Replace all content
+            state.buffer.clear()
+            message.content = content
+        else:
+            # Append to existing
+            message.content += content
+
+        # Sync to backend (implementation-specific)
+        await self._sync_to_backend(message, state, completed)
 
-            # Sync to backend (implementation-specific)
-            await self._sync_to_backend(message, state, completed)
+        # Once the new message has its content, so it's never seen empty while
+        # the history is summarized. It still has its state, so it's kept
+        if is_new:
+            await self._trim_history()
 
-            # Cleanup state if completed
-            if completed:
-                self._message_states.pop(message_id, None)
+        # Cleanup state if completed
+        if completed:
+            self._message_states.pop(message_id, None)
 
-            return message
+        return message
 
     @abstractmethod
     async def _sync_to_backend(
@@ -222,9 +306,88 @@ class Conversation(ABC):
         """
         pass
 
+    async def summarize(self, messages: List[Message]) -> Optional[Message]:
+        """Hook called with the messages removed from a bounded history (max_messages).
+
+        Override it to summarize them, e.g. with an LLM. The returned message is kept
+        at the start of the history, and doesn't count towards max_messages. The next
+        time messages are removed, it is passed back first, to be folded into the new
+        summary.
+
+        Args:
+            messages: The removed messages, oldest first (the previous summary first)
+
+        Returns:
+            A message to keep in their place, or None to drop them.
+        """
+        return None
+
+    async def _trim_history(self):
+        """Remove the oldest completed messages above max_messages."""
+        if self.max_messages is None:
+            return
+        async with self._trim_lock:
+            # Read after acquiring the lock, the previous trim may have replaced it.
+            # The summary of earlier trims doesn't count
+            summary = self._summary
+            if not any(message is summary for message in self.messages):
+                summary = None
+            excess = len(self.messages) - (summary is not None) - self.max_messages
+            if excess <= 0:
+                return
+
+            removed: List[Message] = []
+            kept: List[Message] = []
+            for message in self.messages:
+                if message is summary:
+                    continue
+                # Messages still streaming are never removed
+                if excess and message.id not in self._message_states:
+                    removed.append(message)
+                    excess -= 1
+                else:
+                    kept.append(message)
+            if not removed:
+                return
+
+            self.messages[:] = kept if summary is None else [summary, *kept]
+            self._reindex()
+            if summary is not None:
+                # Fold the previous summary into the new one
+                removed.insert(0, summary)
+            new_summary = await self.summarize(removed)
+            # Messages may have been appended meanwhile, but not removed
+            self.messages[:] = [m for m in self.messages if m is not summary]
+            self._summary = new_summary
+            if new_summary is not None:
+                self.messages.insert(0, new_summary)
+            self._reindex()
+
     def _find_message(self, message_id: str) -> Optional[Message]:
         """Find a message by ID."""
-        return next((m for m in self.messages if m.id == message_id), None)
+        self._sync_index()
+        return self._messages_by_id.get(message_id)
+
+    def _sync_index(self):
+        """Index the messages appended to self.messages since the last lookup."""
+        if (
+            self._indexed_messages is not self.messages
+            or len(self.messages) < self._indexed_count
+        ):
+            # The list was replaced or shortened outside of this class
+            self._reindex()
+            return
+        for i in range(self._indexed_count, len(self.messages)):
+            message = self.messages[i]
+            if message.id is not None:
+                self._messages_by_id.setdefault(message.id, message)
+        self._indexed_count = len(self.messages)
+
+    def _reindex(self):
+        self._messages_by_id = {}
+        self._indexed_messages = self.messages
+        self._indexed_count = 0
+        self._sync_index()
 
 
 class InMemoryConversation(Conversation):
@@ -1,11 +1,13 @@
 import asyncio
-import uuid
 import collections
 import logging
+import time
 import types
 import typing
-from typing import Any, Deque, Dict, Optional, Union, get_args, get_origin
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Hashable, Optional, Union, get_args, get_origin
 
+from ..observability import event_dispatch_latency_ms, event_handler_duration_ms
 from .base import (
     ConnectionClosedEvent,
     ConnectionErrorEvent,
@@ -53,6 +55,40 @@ def _truncate_event_for_logging(event, max_length=200):
     return event_str
 
 
+def _default_coalesce_key(event) -> Hashable:
+    """Events of the same type and participant supersede each other."""
+    user_id = event.user_id() if callable(getattr(event, "user_id", None)) else None
+    return event.type, user_id
+
+
+@dataclass
+class _HandlerState:
+    """
+    Delivery settings and pending events of a handler subscribed with options.
+
+    Events wait in ``pending`` and are handed to at most ``max_concurrency``
+    worker tasks, which exit once nothing is pending.
+    """
+
+    max_concurrency: int
+    max_queue_size: Optional[int]
+    coalesce_key: Optional[typing.Callable[[Any], Hashable]]
+    # [coalesce key or None, event]. Coalesced events are replaced in place
+    pending: Deque[list] = field(default_factory=collections.deque)
+    pending_by_key: Dict[Hashable, list] = field(default_factory=dict)
+    workers: int = 0
+    not_full: asyncio.Event = field(default_factory=asyncio.Event)
+    coalesced: int = 0
+
+    def __post_init__(self):
+        self.not_full.set()
+
+    def full(self) -> bool:
+        return (
+            self.max_queue_size is not None and len(self.pending) >= self.max_queue_size
+        )
+
+
 class EventManager:
     """
     A comprehensive event management system for handling asynchronous event-driven communication.
@@ -68,6 +104,7 @@ class EventManager:
     - Error handling with automatic exception events
     - Support for Union types in handlers
     - Event queuing and batch processing
+    - Per-handler concurrency limits, ordered delivery, coalescing and bounded queues
 
     Example:
         ```python
@@ -116,8 +153,18 @@ class EventManager:
             confidence=0.98
         ))
 
+        # High rate events: deliver in order, one at a time, at most 100 pending
+        @manager.subscribe(ordered=True, max_queue_size=100)
+        async def handle_audio(event: TTSAudioEvent):
+            ...
+
+        # Only the latest pending partial transcript of each participant is delivered
+        @manager.subscribe(coalesce=True)
+        async def handle_partial(event: STTPartialTranscriptEvent):
+            ...
+
         # Before shutdown, ensure all events are processed
-        await manager.shutdown()
+        await manager.wait()
         ```
 
     Args:
@@ -133,7 +180,8 @@ class EventManager:
             ignore_unknown_events (bool): If True, unknown events are ignored rather than raising errors.
                 Defaults to True.
         """
-        self._queue: Deque[Any] = collections.deque([])
+        # (event, time.perf_counter() when it was sent)
+        self._queue: Deque[tuple[Any, float]] = collections.deque([])
         self._events: Dict[str, type] = {}
         self._handlers: Dict[type, typing.List[typing.Callable]] = {}
         self._modules: Dict[str, typing.List[type]] = {}
@@ -141,7 +189,8 @@ class EventManager:
         self._processing_task: Optional[asyncio.Task[Any]] = None
         self._shutdown = False
         self._silent_events: set[type] = set()
-        self._handler_tasks: Dict[uuid.UUID, asyncio.Task[Any]] = {}
+        self._handler_tasks: set[asyncio.Task[Any]] = set()
+        self._handler_states: Dict[typing.Callable, _HandlerState] = {}
         self._received_event = asyncio.Event()
 
         self.register(ExceptionEvent)
@@ -203,6 +252,7 @@ class EventManager:
         self._modules.update(em._modules)
         self._handlers.update(em._handlers)
         self._silent_events.update(em._silent_events)
+        self._handler_states.update(em._handler_states)
         for event in em._queue:
             self._queue.append(event)
 
@@ -213,6 +263,7 @@ class EventManager:
         em._handlers = self._handlers
         em._queue = self._queue
         em._silent_events = self._silent_events
+        em._handler_states = self._handler_states
         em._processing_task = None  # Clear the stopped task reference
         em._received_event = self._received_event
 
@@ -297,14 +348,32 @@ class EventManager:
                 funcs.remove(function)
             except ValueError:
                 pass
-
-    def subscribe(self, function):
+        self._handler_states.pop(function, None)
+
+    def subscribe(
+        self,
+        function=None,
+        *,
+        max_concurrency: Optional[int] = None,
+        ordered: bool = False,
+        coalesce: Union[bool, typing.Callable[[Any], Hashable]] = False,
+        max_queue_size: Optional[int] = None,
+    ):
         """
         Subscribe a function to handle specific event types.
 
         The function must have type hints indicating which event types it handles.
         Supports both single event types and Union types for handling multiple event types.
 
+        By default every event is handled in its own task, with no limit. The keyword
+        arguments change how events are delivered to this handler:
+        - max_concurrency: at most N events are handled at the same time, the rest wait
+        - ordered: events are handled one at a time, in the order they were sent
+        - coalesce: a pending event is replaced by a newer one of the same type and
+          participant (or the same key, if a key function is given), e.g. partial transcripts
+        - max_queue_size: at most N events wait for this handler. When full, event
+          dispatch waits for it (backpressure) instead of growing without bound
+
         Example:
             ```python
             # Single event type
@@ -316,11 +385,20 @@ class EventManager:
             @manager.subscribe
             async def handle_audio_events(event: VADSpeechStartEvent | VADSpeechEndEvent):
                 print(f"VAD event: {event.type}")
+
+            # Options
+            @manager.subscribe(ordered=True)
+            async def handle_audio(event: AudioReceivedEvent):
+                ...
             ```
 
         Args:
             function: The async function to subscribe as an event handler.
                 Must have type hints for event parameters.
+            max_concurrency: Max events handled at the same time by this handler
+            ordered: Handle events one at a time, in order (same as max_concurrency=1)
+            coalesce: True, or a function returning the key of events that supersede each other
+            max_queue_size: Max events waiting for this handler
 
         Returns:
             The decorated function (for use as decorator).
@@ -329,6 +407,32 @@ class EventManager:
             RuntimeError: If handler has multiple separate event parameters (use Union instead)
             KeyError: If event type is not registered and ignore_unknown_events is False
         """
+        if ordered:
+            if max_concurrency not in (None, 1):
+                raise ValueError("ordered handlers have a max_concurrency of 1")
+            max_concurrency = 1
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be >= 1, got {max_concurrency}")
+        if max_queue_size is not None and max_queue_size < 1:
+            raise ValueError(f"max_queue_size must be >= 1, got {max_queue_size}")
+
+        if function is None:
+            return lambda f: self.subscribe(
+                f,
+                max_concurrency=max_concurrency,
+                coalesce=coalesce,
+                max_queue_size=max_queue_size,
+            )
+
+        if max_concurrency is not None or coalesce or max_queue_size is not None:
+            self._handler_states[function] = _HandlerState(
+                max_concurrency=max_concurrency or 2**31,
+                max_queue_size=max_queue_size,
+                coalesce_key=(
+                    _default_coalesce_key if coalesce is True else (coalesce or None)
+                ),
+            )
+
         subscribed = False
         is_union = False
         annotations = typing.get_type_hints(function)
@@ -473,10 +577,11 @@ class EventManager:
         Raises:
             RuntimeError: If event type is not registered and ignore_unknown_events is False
         """
+        sent_at = time.perf_counter()
         for event in events:
             event = self._prepare_event(event)
             if event:
-                self._queue.append(event)
+                self._queue.append((event, sent_at))
 
         self._received_event.set()
 
@@ -491,6 +596,7 @@ class EventManager:
         """
         start_time = asyncio.get_event_loop().time()
         while (asyncio.get_event_loop().time() - start_time) < timeout:
+            # Handlers with options have a worker task while they have pending events
             if not self._queue and not self._handler_tasks:
                 break
             await asyncio.sleep(0.01)
@@ -514,30 +620,33 @@ class EventManager:
         cancelled_exc = None
         while True:
             if self._queue:
-                event = self._queue.popleft()
+                event, sent_at = self._queue.popleft()
+                event_dispatch_latency_ms.record(
+                    (time.perf_counter() - sent_at) * 1000, {"event_type": event.type}
+                )
+                # Handlers that got the event are popped, so a cancelled dispatch
+                # resumes from the handler it was waiting for
+                handlers = collections.deque(self._handlers.get(event.type, []))
                 try:
-                    await self._process_single_event(event)
+                    await self._process_single_event(
+                        event, backpressure=cancelled_exc is None, handlers=handlers
+                    )
                 except asyncio.CancelledError as exc:
                     cancelled_exc = exc
                     logger.debug(
                         f"Event processing task was cancelled, processing remaining events, {len(self._queue)}"
                     )
-                    await self._process_single_event(event)
+                    await self._process_single_event(
+                        event, backpressure=False, handlers=handlers
+                    )
             elif cancelled_exc:
                 raise cancelled_exc
             else:
-                cleanup_ids = set(
-                    task_id
-                    for task_id, task in self._handler_tasks.items()
-                    if task.done()
-                )
-                for task_id in cleanup_ids:
-                    self._handler_tasks.pop(task_id)
-
                 await self._received_event.wait()
                 self._received_event.clear()
 
     async def _run_handler(self, handler, event):
+        start = time.perf_counter()
         try:
             return await handler(event)
         except Exception as exc:
@@ -546,16 +655,83 @@ class EventManager:
             logger.exception(
                 f"Error calling handler {handler.__name__} from {module_name} for event {event.type}"
             )
+        finally:
+            event_handler_duration_ms.record(
+                (time.perf_counter() - start) * 1000,
+                {
+                    "event_type": event.type,
+                    "handler": getattr(handler, "__qualname__", repr(handler)),
+                },
+            )
 
-    async def _process_single_event(self, event):
-        """Process a single event."""
-        for handler in self._handlers.get(event.type, []):
+    async def _process_single_event(
+        self,
+        event,
+        backpressure: bool = True,
+        handlers: Optional[Deque] = None,
+    ):
+        """
+        Process a single event.
+
+        Args:
+            event: The event to hand to its handlers
+            backpressure: Wait for handlers whose queue is full. Off while shutting down
+            handlers: The handlers still to call, popped once they got the event.
+                Defaults to all the handlers of the event type
+        """
+        if handlers is None:
+            handlers = collections.deque(self._handlers.get(event.type, []))
+        while handlers:
+            handler = handlers[0]
             module_name = getattr(handler, "__module__", "unknown")
             if event.type not in self._silent_events:
                 logger.debug(
                     f"Called handler {handler.__name__} from {module_name} for event {event.type}"
                 )
 
-            loop = asyncio.get_running_loop()
-            handler_task = loop.create_task(self._run_handler(handler, event))
-            self._handler_tasks[uuid.uuid4()] = handler_task
+            state = self._handler_states.get(handler)
+            if state is None:
+                self._spawn_handler_task(self._run_handler(handler, event))
+                handlers.popleft()
+                continue
+
+            while backpressure and state.full():
+                state.not_full.clear()
+                await state.not_full.wait()
+            self._enqueue_for_handler(handler, state, event)
+            handlers.popleft()
+
+    def _spawn_handler_task(self, coro) -> None:
+        handler_task = asyncio.get_running_loop().create_task(coro)
+        self._handler_tasks.add(handler_task)
+        handler_task.add_done_callback(self._handler_tasks.discard)
+
+    def _enqueue_for_handler(self, handler, state: _HandlerState, event) -> None:
+        key = state.coalesce_key(event) if state.coalesce_key else None
+        entry = state.pending_by_key.get(key) if key is not None else None
+        if entry is not None:
+            # Supersede the pending event, keeping its place in the queue
+            entry[1] = event
+            state.coalesced += 1
+        else:
+            entry = [key, event]
+            state.pending.append(entry)
+            if key is not None:
+                state.pending_by_key[key] = entry
+
+        if state.workers < state.max_concurrency:
+            state.workers += 1
+            self._spawn_handler_task(self._handler_worker(handler, state))
+
+    async def _handler_worker(self, handler, state: _HandlerState) -> None:
+        """Handle the pending events of a handler with options, exits when none are left."""
+        try:
+            while state.pending:
+                key, event = state.pending.popleft()
+                if key is not None:
+                    state.pending_by_key.pop(key, None)
+                if not state.full():
+                    state.not_full.set()
+                await self._run_handler(handler, event)
+        finally:
+            state.workers -= 1
@@ -15,6 +15,15 @@ from .metrics import (
     tts_errors,
     tts_events_emitted,
     inflight_ops,
+    video_frames_dropped,
+    video_handler_lag_ms,
+    audio_stage_latency_ms,
+    audio_slices_dropped,
+    event_loop_lag_ms,
+    event_dispatch_latency_ms,
+    event_handler_duration_ms,
+    video_handler_duration_ms,
+    agent_turn_latency_ms,
 )
 
 __all__ = [
@@ -28,4 +37,13 @@ __all__ = [
     "tts_errors",
     "tts_events_emitted",
     "inflight_ops",
+    "video_frames_dropped",
+    "video_handler_lag_ms",
+    "audio_stage_latency_ms",
+    "audio_slices_dropped",
+    "event_loop_lag_ms",
+    "event_dispatch_latency_ms",
+    "event_handler_duration_ms",
+    "video_handler_duration_ms",
+    "agent_turn_latency_ms",
 ]
@@ -75,3 +75,49 @@ tts_events_emitted = meter.create_counter(
 inflight_ops = meter.create_up_down_counter(
     "voice.ops.inflight", description="Inflight voice ops"
 )
+
+video_frames_dropped = meter.create_counter(
+    "video.frames.dropped",
+    description="Video frames dropped because a frame handler fell behind",
+)
+video_handler_lag_ms = meter.create_histogram(
+    "video.handler.lag.ms",
+    unit="ms",
+    description="Time a video frame waited before its frame handler started on it",
+)
+
+audio_stage_latency_ms = meter.create_histogram(
+    "agent.audio.stage.latency.ms",
+    unit="ms",
+    description="Time an agent audio stage (processors, stt, llm, turn detection) took for one audio slice",
+)
+audio_slices_dropped = meter.create_counter(
+    "agent.audio.slices.dropped",
+    description="Audio slices dropped because an agent audio stage fell behind",
+)
+
+event_loop_lag_ms = meter.create_histogram(
+    "event_loop.lag.ms",
+    unit="ms",
+    description="How late the asyncio event loop woke up a sleeping task",
+)
+event_dispatch_latency_ms = meter.create_histogram(
+    "events.dispatch.latency.ms",
+    unit="ms",
+    description="Time between sending an event and handing it to its handlers",
+)
+event_handler_duration_ms = meter.create_histogram(
+    "events.handler.duration.ms",
+    unit="ms",
+    description="Time an event handler took for one event",
+)
+video_handler_duration_ms = meter.create_histogram(
+    "video.handler.duration.ms",
+    unit="ms",
+    description="Time a video frame handler (e.g. a processor) took for one frame",
+)
+agent_turn_latency_ms = meter.create_histogram(
+    "agent.turn.latency.ms",
+    unit="ms",
+    description="Time from the end of a user turn to the LLM response and the first TTS audio",
+)
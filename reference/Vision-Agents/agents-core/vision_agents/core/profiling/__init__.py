@@ -1,3 +1,4 @@
 from .base import Profiler
+from .event_loop import EventLoopLagMonitor
 
-__all__ = ["Profiler"]
+__all__ = ["Profiler", "EventLoopLagMonitor"]
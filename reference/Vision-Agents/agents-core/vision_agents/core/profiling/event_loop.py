@@ -0,0 +1,83 @@
+import asyncio
+import logging
+from typing import Optional
+
+from vision_agents.core.observability import event_loop_lag_ms
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopLagMonitor:
+    """Continuously samples how late the asyncio event loop runs its tasks.
+
+    A background task sleeps for ``interval`` seconds and measures how much later
+    than that it actually woke up. The difference is time the loop spent running
+    other (blocking) code, and it is recorded in the ``event_loop.lag.ms``
+    histogram. A single sleeping task is cheap enough to run in production.
+
+    Example:
+        monitor = EventLoopLagMonitor(interval=0.1)
+        monitor.start()
+        ...
+        await monitor.stop()
+        print(monitor.max_lag_ms)
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        warn_threshold_ms: Optional[float] = 100.0,
+        attributes: Optional[dict] = None,
+    ):
+        """Initialize the monitor.
+
+        Args:
+            interval: Seconds between two samples.
+            warn_threshold_ms: Log a warning when the lag is above this. None disables it.
+            attributes: Attributes recorded with every sample, e.g. {"call_id": ...}.
+        """
+        if interval <= 0:
+            raise ValueError(f"interval must be > 0, got {interval}")
+        self.interval = interval
+        self.warn_threshold_ms = warn_threshold_ms
+        self.attributes = attributes or {}
+        self.samples = 0
+        self.last_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record((loop.time() - expected) * 1000)
+
+    def record(self, lag_ms: float) -> None:
+        lag_ms = max(lag_ms, 0.0)
+        self.samples += 1
+        self.last_lag_ms = lag_ms
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        event_loop_lag_ms.record(lag_ms, self.attributes)
+        if self.warn_threshold_ms is not None and lag_ms > self.warn_threshold_ms:
+            logger.warning(
+                f"Event loop lag of {lag_ms:.1f}ms, something is blocking the event loop"
+            )
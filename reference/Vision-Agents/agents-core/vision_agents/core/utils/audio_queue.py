@@ -1,7 +1,8 @@
 import asyncio
 import logging
 from collections import deque
-from typing import Optional
+from dataclasses import dataclass
+from typing import Any, Optional
 
 import numpy as np
 from getstream.video.rtc.track_util import PcmData
@@ -9,15 +10,30 @@ from getstream.video.rtc.track_util import PcmData
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class _Chunk:
+    """A PcmData that was put in the queue. Its samples live in the ring buffer."""
+
+    num_samples: int
+    participant: Any
+    # The PcmData as it was put, returned by get() while none of its samples were consumed
+    item: Optional[PcmData] = None
+
+
 class AudioQueue:
     """
     Queue for audio.
     - allows you to read a specific number of samples or duration of audio (needed for Silero)
     - supports a limit defined in seconds
 
-    If the queue is full when adding to it, log a warning
+    If the queue is full when adding to it, log a warning and drop the oldest audio
     When using queue.get allow specifying either the number of samples or the duration
 
+    The samples are stored in a preallocated ring buffer, created for the sample rate,
+    channels and format of the first item (later items are converted to it). Writes
+    copy the new samples once, and reads return their own copy of the samples, so the
+    returned audio stays valid however long it is kept. ``get`` returns the PcmData
+    that was put as is, unless part of it was already consumed or dropped.
     """
 
     def __init__(self, buffer_limit_ms: int):
@@ -28,11 +44,21 @@ class AudioQueue:
             buffer_limit_ms: Maximum buffer duration in milliseconds
         """
         self.buffer_limit_ms = buffer_limit_ms
-        self._buffer: deque[PcmData] = deque()
+        self._buffer: deque[_Chunk] = deque()
         self._total_samples = 0
         self._sample_rate: Optional[int] = None
+        self._channels = 1
+        self._format: Any = None
         self._not_empty = asyncio.Event()
-        self._lock = asyncio.Lock()
+
+        # Ring buffer of (channels, capacity) samples, allocated on the first put
+        self._ring: Optional[np.ndarray] = None
+        self._limit_samples = 0
+        self._read_pos = 0
+
+        # Stats
+        self._dropped_samples = 0
+        self._max_total_samples = 0
 
     def empty(self) -> bool:
         """Check if the queue is empty."""
@@ -55,33 +81,9 @@ class AudioQueue:
         Args:
             item: PcmData to add to the queue
 
-        Logs a warning if adding the item would exceed the buffer limit.
+        Logs a warning and drops the oldest audio if adding the item would exceed the buffer limit.
         """
-        if not isinstance(item, PcmData):
-            raise TypeError(f"AudioQueue only accepts PcmData, got {type(item)}")
-
-        async with self._lock:
-            # Track sample rate from first item
-            if self._sample_rate is None:
-                self._sample_rate = item.sample_rate
-            elif self._sample_rate != item.sample_rate:
-                logger.warning(
-                    f"Sample rate mismatch: expected {self._sample_rate}, got {item.sample_rate}"
-                )
-
-            # Check if adding this would exceed the buffer limit
-            new_samples = len(item.samples)
-            new_total_samples = self._total_samples + new_samples
-            new_duration_ms = (new_total_samples / item.sample_rate) * 1000
-
-            if new_duration_ms > self.buffer_limit_ms:
-                logger.warning(
-                    f"AudioQueue buffer limit exceeded: {new_duration_ms:.1f}ms > {self.buffer_limit_ms}ms"
-                )
-
-            self._buffer.append(item)
-            self._total_samples += new_samples
-            self._not_empty.set()
+        self.put_nowait(item)
 
     def put_nowait(self, item: PcmData) -> None:
         """
@@ -90,31 +92,53 @@ class AudioQueue:
         Args:
             item: PcmData to add to the queue
 
-        Logs a warning if adding the item would exceed the buffer limit.
+        Logs a warning and drops the oldest audio if adding the item would exceed the buffer limit.
         """
         if not isinstance(item, PcmData):
             raise TypeError(f"AudioQueue only accepts PcmData, got {type(item)}")
 
-        # Track sample rate from first item
-        if self._sample_rate is None:
-            self._sample_rate = item.sample_rate
-        elif self._sample_rate != item.sample_rate:
-            logger.warning(
-                f"Sample rate mismatch: expected {self._sample_rate}, got {item.sample_rate}"
-            )
+        if self._ring is None:
+            self._init_ring(item)
+        # Only an item in the queue's format can be handed back as is by get()
+        original = (
+            item
+            if item.sample_rate == self._sample_rate
+            and item.channels == self._channels
+            and item.samples.dtype == self._ring.dtype
+            else None
+        )
+        samples = self._to_ring_layout(item)
+        new_samples = samples.shape[1]
+        if new_samples == 0:
+            return
 
         # Check if adding this would exceed the buffer limit
-        new_samples = len(item.samples)
         new_total_samples = self._total_samples + new_samples
-        new_duration_ms = (new_total_samples / item.sample_rate) * 1000
-
-        if new_duration_ms > self.buffer_limit_ms:
+        if new_total_samples > self._limit_samples:
+            new_duration_ms = (new_total_samples / self._sample_rate) * 1000
+            overflow = new_total_samples - self._limit_samples
             logger.warning(
-                f"AudioQueue buffer limit exceeded: {new_duration_ms:.1f}ms > {self.buffer_limit_ms}ms"
+                f"AudioQueue buffer limit exceeded: {new_duration_ms:.1f}ms > {self.buffer_limit_ms}ms, "
+                f"dropping the oldest {overflow} samples"
             )
-
-        self._buffer.append(item)
+            self._dropped_samples += overflow
+            self._discard(min(overflow, self._total_samples))
+            if new_samples > self._limit_samples:
+                # The item alone is larger than the whole buffer, keep its newest samples
+                samples = samples[:, -self._limit_samples :]
+                new_samples = self._limit_samples
+                original = None
+
+        self._write(samples)
+        self._buffer.append(
+            _Chunk(
+                num_samples=new_samples,
+                participant=item.participant,
+                item=original,
+            )
+        )
         self._total_samples += new_samples
+        self._max_total_samples = max(self._max_total_samples, self._total_samples)
         self._not_empty.set()
 
     async def get(self) -> PcmData:
@@ -125,15 +149,11 @@ class AudioQueue:
             PcmData object from the queue
         """
         while True:
-            async with self._lock:
-                if self._buffer:
-                    item = self._buffer.popleft()
-                    self._total_samples -= len(item.samples)
-                    if not self._buffer:
-                        self._not_empty.clear()
-                    return item
+            if self._buffer:
+                return self.get_nowait()
 
             # Wait for items to be added
+            self._not_empty.clear()
             await self._not_empty.wait()
 
     def get_nowait(self) -> PcmData:
@@ -141,16 +161,17 @@ class AudioQueue:
         Get the next PcmData from the queue without waiting.
 
         Returns:
-            PcmData object from the queue
+            The PcmData that was put, or a copy of its remaining samples if part of
+            it was already consumed (or it was converted to the queue's format)
         """
         if not self._buffer:
             raise asyncio.QueueEmpty("Queue is empty")
 
-        item = self._buffer.popleft()
-        self._total_samples -= len(item.samples)
-        if not self._buffer:
-            self._not_empty.clear()
-        return item
+        chunk = self._buffer[0]
+        if chunk.item is not None:
+            self._discard(chunk.num_samples)
+            return chunk.item
+        return self._read(chunk.num_samples)
 
     async def get_samples(self, num_samples: int, timeout: float = 0.1) -> PcmData:
         """
@@ -161,81 +182,17 @@ class AudioQueue:
             timeout: Max time to wait for more samples when queue is empty (seconds)
 
         Returns:
-            PcmData containing exactly num_samples (or less if queue empties)
+            PcmData containing exactly num_samples (or less if queue empties). Its
+            samples are a copy, they are not changed by later puts
         """
-        collected_samples: list[np.ndarray] = []
-        collected_count = 0
-        last_item_format = None
-        last_item_channels = 1
-        last_participant = None
-
-        while collected_count < num_samples:
-            # Wait for items if queue is empty, with timeout
-            if self.empty():
-                # If we've already collected some samples, return what we have
-                if collected_samples:
-                    break
-                # Otherwise wait for items
-                try:
-                    await asyncio.wait_for(self._not_empty.wait(), timeout=timeout)
-                except asyncio.TimeoutError:
-                    # No items arrived in time
-                    if collected_samples:
-                        break
-                    raise asyncio.QueueEmpty("Queue is empty")
-
-            async with self._lock:
-                if not self._buffer:
-                    continue
-
-                item = self._buffer.popleft()
-                self._total_samples -= len(item.samples)
-                last_participant = item.participant
-
-                last_item_format = item.format
-                last_item_channels = item.channels
-
-                samples_needed = num_samples - collected_count
-
-                if len(item.samples) <= samples_needed:
-                    # Use the entire item
-                    collected_samples.append(item.samples)
-                    collected_count += len(item.samples)
-                else:
-                    # Split the item - take what we need, put rest back
-                    collected_samples.append(item.samples[:samples_needed])
-                    collected_count += samples_needed
-
-                    # Put the remainder back at the front
-                    remainder = PcmData(
-                        samples=item.samples[samples_needed:],
-                        sample_rate=item.sample_rate,
-                        format=item.format,
-                        channels=item.channels,
-                    )
-                    self._buffer.appendleft(remainder)
-                    self._total_samples += len(remainder.samples)
-                    break
-
-                # Clear event if buffer is now empty
-                if not self._buffer:
-                    self._not_empty.clear()
-
-        if not collected_samples:
-            raise asyncio.QueueEmpty("Queue is empty")
+        if self.empty():
+            try:
+                await asyncio.wait_for(self._wait_not_empty(), timeout=timeout)
+            except asyncio.TimeoutError:
+                # No items arrived in time
+                raise asyncio.QueueEmpty("Queue is empty")
 
-        # Concatenate all collected samples
-        all_samples = np.concatenate(collected_samples)
-
-        # Use properties from the last item we got
-        pcm = PcmData(
-            samples=all_samples,
-            sample_rate=self._sample_rate,
-            format=last_item_format,
-            channels=last_item_channels,
-        )
-        pcm.participant = last_participant
-        return pcm
+        return self._read(min(num_samples, self._total_samples))
 
     async def get_duration(self, duration_ms: float) -> PcmData:
         """
@@ -245,7 +202,8 @@ class AudioQueue:
             duration_ms: Duration in milliseconds to retrieve
 
         Returns:
-            PcmData containing audio for the requested duration (or less if queue empties)
+            PcmData containing audio for the requested duration (or less if queue empties).
+            Its samples are a copy, they are not changed by later puts
         """
         # Wait for first item if needed to determine sample rate
         if self._sample_rate is None:
@@ -272,4 +230,101 @@ class AudioQueue:
             "sample_rate": self._sample_rate,
             "num_chunks": len(self._buffer),
             "queue_size": self.qsize(),
+            "occupancy": (
+                self._total_samples / self._limit_samples
+                if self._limit_samples
+                else 0.0
+            ),
+            "max_total_samples": self._max_total_samples,
+            "dropped_samples": self._dropped_samples,
         }
+
+    async def _wait_not_empty(self) -> None:
+        while self.empty():
+            self._not_empty.clear()
+            await self._not_empty.wait()
+
+    def _init_ring(self, item: PcmData) -> None:
+        self._sample_rate = item.sample_rate
+        self._channels = item.channels
+        self._format = item.format
+        self._limit_samples = max(
+            1, int(self.buffer_limit_ms * self._sample_rate / 1000)
+        )
+        self._ring = np.zeros(
+            (self._channels, self._limit_samples), dtype=item.samples.dtype
+        )
+
+    def _to_ring_layout(self, item: PcmData) -> np.ndarray:
+        """Convert an item to the queue's format and return its samples as (channels, n)."""
+        assert self._ring is not None
+        if item.sample_rate != self._sample_rate or item.channels != self._channels:
+            logger.warning(
+                f"Sample rate mismatch: expected {self._sample_rate}, got {item.sample_rate}"
+                if item.sample_rate != self._sample_rate
+                else f"Channels mismatch: expected {self._channels}, got {item.channels}"
+            )
+            item = item.resample(self._sample_rate, self._channels)
+        if item.samples.dtype != self._ring.dtype:
+            item = (
+                item.to_float32() if self._ring.dtype == np.float32 else item.to_int16()
+            )
+        if item.samples.ndim == 1 and self._channels > 1:
+            # Interleaved [L, R, L, R, ...]
+            return item.samples.reshape(-1, self._channels).T
+        return item.samples.reshape(self._channels, -1)
+
+    def _write(self, samples: np.ndarray) -> None:
+        assert self._ring is not None
+        capacity = self._ring.shape[1]
+        start = (self._read_pos + self._total_samples) % capacity
+        first = min(samples.shape[1], capacity - start)
+        self._ring[:, start : start + first] = samples[:, :first]
+        if first < samples.shape[1]:
+            self._ring[:, : samples.shape[1] - first] = samples[:, first:]
+
+    def _read(self, num_samples: int) -> PcmData:
+        """Consume num_samples from the front of the queue, as one PcmData."""
+        assert self._ring is not None
+        capacity = self._ring.shape[1]
+        end = self._read_pos + num_samples
+        if end <= capacity:
+            # A copy: the ring slots are reused by later puts
+            samples = self._ring[:, self._read_pos : end].copy()
+        else:
+            samples = np.concatenate(
+                (self._ring[:, self._read_pos :], self._ring[:, : end - capacity]),
+                axis=1,
+            )
+
+        participant = self._discard(num_samples)
+        pcm = PcmData(
+            samples=samples[0] if self._channels == 1 else samples,
+            sample_rate=self._sample_rate,
+            format=self._format,
+            channels=self._channels,
+        )
+        pcm.participant = participant
+        return pcm
+
+    def _discard(self, num_samples: int) -> Any:
+        """Drop num_samples from the front of the queue. Returns the participant of the last item touched."""
+        assert self._ring is not None
+        participant = None
+        remaining = num_samples
+        while remaining > 0 and self._buffer:
+            chunk = self._buffer[0]
+            participant = chunk.participant
+            if chunk.num_samples <= remaining:
+                remaining -= chunk.num_samples
+                self._buffer.popleft()
+            else:
+                chunk.num_samples -= remaining
+                chunk.item = None
+                remaining = 0
+
+        self._read_pos = (self._read_pos + num_samples) % self._ring.shape[1]
+        self._total_samples -= num_samples
+        if not self._buffer:
+            self._not_empty.clear()
+        return participant
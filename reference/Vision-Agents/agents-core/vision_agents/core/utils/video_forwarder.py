@@ -1,13 +1,22 @@
 import asyncio
 import datetime
 import logging
+import time
 from dataclasses import dataclass
 from typing import Any, Callable, Optional
 
 import av
+import numpy as np
 from aiortc import MediaStreamError, VideoStreamTrack
 from av.frame import Frame
+from PIL import Image
+from vision_agents.core.observability import (
+    video_frames_dropped,
+    video_handler_duration_ms,
+    video_handler_lag_ms,
+)
 from vision_agents.core.utils.video_queue import VideoLatestNQueue
+from vision_agents.core.utils.video_utils import FrameConverter, get_frame_converter
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +30,17 @@ class FrameHandler:
     name: str
     last_ts: float = 0.0
 
+    # Only used in fan-out mode: the handler's own queue of (frame, enqueued at) and its task
+    queue: Optional[VideoLatestNQueue[tuple[av.VideoFrame, float]]] = None
+    task: Optional[asyncio.Task] = None
+
+    # Stats
+    frames_processed: int = 0
+    frames_dropped: int = 0
+    # Seconds the last frame waited before the handler started on it
+    last_lag: float = 0.0
+    max_lag: float = 0.0
+
 
 class VideoForwarder:
     """
@@ -34,6 +54,15 @@ class VideoForwarder:
 
         # start's automatically when attaching handlers
 
+    By default, handlers are awaited one after the other for each frame, so a slow
+    handler delays all the others. With ``fan_out=True`` every handler gets its own
+    latest-N queue (of ``handler_buffer`` frames) and task, so a slow handler only
+    drops its own frames (see ``FrameHandler.frames_dropped`` and ``last_lag``).
+
+    Handlers that need the decoded pixels can call ``forwarder.to_ndarray(frame)`` or
+    ``forwarder.to_image(frame)``. They go through the ``FrameConverter`` (the shared
+    one by default), so a frame is decoded once no matter how many handlers or
+    plugins use it. The decoded arrays are read-only, copy them before modifying.
     """
 
     def __init__(
@@ -43,11 +72,19 @@ class VideoForwarder:
         max_buffer: int = 10,
         fps: Optional[float] = 30,
         name: str = "video-forwarder",
+        fan_out: bool = False,
+        handler_buffer: int = 1,
+        frame_converter: Optional[FrameConverter] = None,
     ):
+        if handler_buffer < 1:
+            raise ValueError(f"handler_buffer must be >= 1, got {handler_buffer}")
         self.name = name
         self.input_track = input_track
         self.queue: VideoLatestNQueue[Frame] = VideoLatestNQueue(maxlen=max_buffer)
         self.fps = fps  # None = unlimited, else forward at ~fps
+        self.fan_out = fan_out
+        self.handler_buffer = handler_buffer
+        self.frame_converter = frame_converter or get_frame_converter()
 
         self._producer_task: Optional[asyncio.Task] = None
         self._consumer_task: Optional[asyncio.Task] = None
@@ -82,6 +119,8 @@ class VideoForwarder:
             name=handler_name,
         )
         self._frame_handlers.append(handler)
+        if self._started:
+            self._start_handler_task(handler)
         self.start()
 
     async def remove_frame_handler(
@@ -96,11 +135,13 @@ class VideoForwarder:
         Returns:
             True if the handler was found and removed, False otherwise
         """
-        original_len = len(self._frame_handlers)
+        removed_handlers = [h for h in self._frame_handlers if h.callback == on_frame]
         self._frame_handlers = [
             h for h in self._frame_handlers if h.callback != on_frame
         ]
-        removed = len(self._frame_handlers) < original_len
+        removed = len(removed_handlers) > 0
+        for handler in removed_handlers:
+            self._stop_handler_task(handler)
 
         if len(self._frame_handlers) == 0:
             await self.stop()
@@ -117,6 +158,8 @@ class VideoForwarder:
         self._started = True
         self._producer_task = asyncio.create_task(self._producer())
         self._consumer_task = asyncio.create_task(self._start_consumer())
+        for handler in self._frame_handlers:
+            self._start_handler_task(handler)
 
     @property
     def started(self) -> bool:
@@ -130,10 +173,42 @@ class VideoForwarder:
             self._producer_task.cancel()
         if self._consumer_task is not None:
             self._consumer_task.cancel()
+        for handler in self._frame_handlers:
+            self._stop_handler_task(handler)
         self._started = False
 
         return
 
+    def to_ndarray(self, frame: av.VideoFrame, format: str = "rgb24") -> np.ndarray:
+        """
+        Decode a frame to a read-only numpy array, sharing the result between handlers.
+
+        Args:
+            frame: A frame received by a handler
+            format: The pixel format to convert to (see ``av.VideoFrame.to_ndarray``)
+        """
+        return self.frame_converter.to_ndarray(frame, format)
+
+    def to_image(self, frame: av.VideoFrame) -> Image.Image:
+        """
+        Decode a frame to a PIL image, sharing the result between handlers.
+        The image must not be modified in place.
+        """
+        return self.frame_converter.to_image(frame)
+
+    def _start_handler_task(self, handler: FrameHandler) -> None:
+        if not self.fan_out or handler.task is not None:
+            return
+        handler.queue = VideoLatestNQueue(maxlen=self.handler_buffer)
+        handler.task = asyncio.create_task(self._run_handler(handler))
+
+    @staticmethod
+    def _stop_handler_task(handler: FrameHandler) -> None:
+        if handler.task is not None:
+            handler.task.cancel()
+        handler.task = None
+        handler.queue = None
+
     async def _producer(self):
         # read from the input track and stick it on a queue
         try:
@@ -158,7 +233,7 @@ class VideoForwarder:
                 now = loop.time()
 
                 # Call each handler if enough time has passed per its fps setting
-                for handler in self._frame_handlers:
+                for handler in list(self._frame_handlers):
                     min_interval = (
                         (1.0 / handler.fps)
                         if (handler.fps and handler.fps > 0)
@@ -169,17 +244,57 @@ class VideoForwarder:
                     if min_interval == 0.0 or (now - handler.last_ts) >= min_interval:
                         handler.last_ts = now
 
-                        # Call handler (sync or async)
-                        try:
-                            if asyncio.iscoroutinefunction(handler.callback):
-                                await handler.callback(frame)
-                            else:
-                                handler.callback(frame)
-                        except asyncio.CancelledError:
-                            raise
-                        except Exception:
-                            logger.exception(
-                                f"Frame handler {handler.name} failed with an exception"
-                            )
+                        if self.fan_out:
+                            self._enqueue_for_handler(handler, frame, now)
+                        else:
+                            await self._call_handler(handler, frame, now)
         except asyncio.CancelledError:
             raise
+
+    def _enqueue_for_handler(
+        self, handler: FrameHandler, frame: av.VideoFrame, now: float
+    ) -> None:
+        """Put a frame on the handler's queue, dropping its oldest frame if it fell behind."""
+        if handler.queue is None:
+            return
+        if handler.queue.full():
+            handler.frames_dropped += 1
+            video_frames_dropped.add(
+                1, {"forwarder": self.name, "handler": handler.name}
+            )
+        handler.queue.put_latest_nowait((frame, now))
+
+    async def _run_handler(self, handler: FrameHandler) -> None:
+        """Fan-out mode: the task feeding a single handler from its own queue."""
+        queue = handler.queue
+        assert queue is not None
+        while True:
+            frame, enqueued_at = await queue.get()
+            await self._call_handler(handler, frame, enqueued_at)
+
+    async def _call_handler(
+        self, handler: FrameHandler, frame: av.VideoFrame, received_at: float
+    ) -> None:
+        lag = asyncio.get_running_loop().time() - received_at
+        handler.last_lag = lag
+        handler.max_lag = max(handler.max_lag, lag)
+        video_handler_lag_ms.record(
+            lag * 1000, {"forwarder": self.name, "handler": handler.name}
+        )
+
+        # Call handler (sync or async)
+        start = time.perf_counter()
+        try:
+            if asyncio.iscoroutinefunction(handler.callback):
+                await handler.callback(frame)
+            else:
+                handler.callback(frame)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception(f"Frame handler {handler.name} failed with an exception")
+        video_handler_duration_ms.record(
+            (time.perf_counter() - start) * 1000,
+            {"forwarder": self.name, "handler": handler.name},
+        )
+        handler.frames_processed += 1
@@ -1,11 +1,16 @@
 """Video frame utilities."""
 
+import asyncio
 import io
 import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Optional
 
 import av
+import numpy as np
 from PIL import Image
-from PIL.Image import Resampling
 
 logger = logging.getLogger(__name__)
 
@@ -33,12 +38,282 @@ def ensure_even_dimensions(frame: av.VideoFrame) -> av.VideoFrame:
     return cropped
 
 
+class FrameConverter:
+    """
+    Converts video frames to RGB arrays, JPEG/PNG bytes and resized frames.
+
+    - Results are cached per frame, keyed by (frame, pts, size, format), so several
+      plugins converting the same frame (e.g. to JPEG for an LLM) only pay once.
+    - Resizing is done by libswscale straight from the frame's pixel format
+      (``av.VideoFrame.reformat``), which is several times faster than
+      ``to_image()`` followed by a PIL LANCZOS resize.
+    - The ``*_async`` methods run the conversion on a thread pool, so conversions
+      don't block the event loop. Its threads are started on demand, up to
+      ``max_workers``.
+
+    Cached arrays are read-only, cached results must not be modified.
+    Use the shared instance returned by ``get_frame_converter()``, configured with
+    ``configure_frame_converter()``.
+
+    Example:
+
+        converter = get_frame_converter()
+        jpeg = await converter.to_jpeg_bytes_async(frame, 800, 600)
+    """
+
+    def __init__(
+        self,
+        cache_size: int = 64,
+        max_workers: Optional[int] = None,
+        interpolation: str = "AREA",
+    ):
+        """
+        Args:
+            cache_size: Max conversion results kept (LRU). 0 disables the cache.
+            max_workers: Max threads used by the ``*_async`` methods. Defaults to
+                the ``ThreadPoolExecutor`` default, based on the number of CPUs.
+            interpolation: libswscale interpolation used for resizing
+                (see ``av.video.reformatter.Interpolation``).
+        """
+        self.cache_size = cache_size
+        self.interpolation = interpolation
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict[Hashable, tuple[av.VideoFrame, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def to_rgb(
+        self,
+        frame: av.VideoFrame,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Decode a frame to a read-only RGB array of shape (height, width, 3).
+
+        Args:
+            frame: The video frame.
+            width: Width to resize to. Defaults to the frame width.
+            height: Height to resize to. Defaults to the frame height.
+        """
+        width = width or frame.width
+        height = height or frame.height
+        return self._cached(
+            frame, ("rgb", width, height), lambda: self._decode(frame, width, height)
+        )
+
+    def to_ndarray(self, frame: av.VideoFrame, format: str = "rgb24") -> np.ndarray:
+        """
+        Decode a frame to a read-only array in any pixel format, at its own size.
+
+        Args:
+            frame: The video frame.
+            format: The pixel format (see ``av.VideoFrame.to_ndarray``).
+        """
+        if format == "rgb24":
+            return self.to_rgb(frame)
+
+        def decode() -> np.ndarray:
+            array = frame.to_ndarray(format=format)
+            array.flags.writeable = False
+            return array
+
+        return self._cached(frame, ("ndarray", format), decode)
+
+    def to_image(self, frame: av.VideoFrame) -> Image.Image:
+        """Convert a frame to a RGB PIL image, at its own size. It must not be modified."""
+        return self._cached(
+            frame,
+            ("image", frame.width, frame.height),
+            lambda: Image.fromarray(self.to_rgb(frame)),
+        )
+
+    def to_jpeg_bytes(
+        self,
+        frame: av.VideoFrame,
+        target_width: int,
+        target_height: int,
+        quality: int = 85,
+    ) -> bytes:
+        """
+        Convert a frame to JPEG bytes, resized to fit within the target size
+        (keeping the aspect ratio).
+        """
+        width, height = _fit_size(frame, target_width, target_height)
+
+        def encode() -> bytes:
+            img = Image.fromarray(self.to_rgb(frame, width, height))
+            buf = io.BytesIO()
+            img.save(buf, "JPEG", quality=quality, optimize=True)
+            return buf.getvalue()
+
+        return self._cached(frame, ("jpeg", width, height, quality), encode)
+
+    def to_png_bytes(self, frame: av.VideoFrame) -> bytes:
+        """Convert a frame to PNG bytes, at its own size."""
+
+        def encode() -> bytes:
+            buf = io.BytesIO()
+            Image.fromarray(self.to_rgb(frame)).save(buf, format="PNG")
+            return buf.getvalue()
+
+        return self._cached(frame, ("png", frame.width, frame.height), encode)
+
+    def resize(
+        self, frame: av.VideoFrame, target_width: int, target_height: int
+    ) -> av.VideoFrame:
+        """
+        Resize a frame to exactly the target size, keeping the aspect ratio and
+        centering it on a black background. Returns a new frame.
+        """
+
+        def letterbox() -> np.ndarray:
+            width, height = _fit_size(frame, target_width, target_height)
+            result = np.zeros((target_height, target_width, 3), dtype=np.uint8)
+            x_offset = (target_width - width) // 2
+            y_offset = (target_height - height) // 2
+            result[y_offset : y_offset + height, x_offset : x_offset + width] = (
+                self.to_rgb(frame, width, height)
+            )
+            result.flags.writeable = False
+            return result
+
+        array = self._cached(
+            frame, ("letterbox", target_width, target_height), letterbox
+        )
+        # A new frame every time, callers set its pts
+        return av.VideoFrame.from_ndarray(array, format="rgb24")
+
+    async def to_rgb_async(
+        self,
+        frame: av.VideoFrame,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+    ) -> np.ndarray:
+        return await self._run(self.to_rgb, frame, width, height)
+
+    async def to_jpeg_bytes_async(
+        self,
+        frame: av.VideoFrame,
+        target_width: int,
+        target_height: int,
+        quality: int = 85,
+    ) -> bytes:
+        return await self._run(
+            self.to_jpeg_bytes, frame, target_width, target_height, quality
+        )
+
+    async def to_png_bytes_async(self, frame: av.VideoFrame) -> bytes:
+        return await self._run(self.to_png_bytes, frame)
+
+    async def resize_async(
+        self, frame: av.VideoFrame, target_width: int, target_height: int
+    ) -> av.VideoFrame:
+        return await self._run(self.resize, frame, target_width, target_height)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def close(self) -> None:
+        self.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers, thread_name_prefix="frame-converter"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    def _decode(self, frame: av.VideoFrame, width: int, height: int) -> np.ndarray:
+        if width == frame.width and height == frame.height:
+            array = frame.to_ndarray(format="rgb24")
+        else:
+            array = frame.reformat(
+                width=width,
+                height=height,
+                format="rgb24",
+                interpolation=self.interpolation,
+            ).to_ndarray()
+        array.flags.writeable = False
+        return array
+
+    def _cached(
+        self, frame: av.VideoFrame, kind: tuple, convert: Callable[[], Any]
+    ) -> Any:
+        if self.cache_size <= 0:
+            return convert()
+
+        # id() alone could be reused by a new frame, the entry keeps a reference
+        # to its frame and is only used for that same frame
+        key = (id(frame), frame.pts, *kind)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] is frame:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        # Convert outside the lock, other threads can convert other frames
+        value = convert()
+        with self._lock:
+            self._cache[key] = (frame, value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return value
+
+
+def _fit_size(
+    frame: av.VideoFrame, target_width: int, target_height: int
+) -> tuple[int, int]:
+    """The largest size that fits within the target size, keeping the aspect ratio."""
+    scale = min(target_width / frame.width, target_height / frame.height)
+    return max(1, int(frame.width * scale)), max(1, int(frame.height * scale))
+
+
+_shared_frame_converter: Optional[FrameConverter] = None
+
+
+def get_frame_converter() -> FrameConverter:
+    """The frame converter shared by the whole process, so plugins share its cache."""
+    global _shared_frame_converter
+    if _shared_frame_converter is None:
+        _shared_frame_converter = FrameConverter()
+    return _shared_frame_converter
+
+
+def configure_frame_converter(**kwargs: Any) -> FrameConverter:
+    """
+    Replace the shared frame converter by one built with these arguments, e.g.
+    ``configure_frame_converter(max_workers=8, cache_size=256)`` for agents
+    converting many streams. Call it before the agents start.
+
+    Returns:
+        The new shared frame converter.
+    """
+    global _shared_frame_converter
+    if _shared_frame_converter is not None:
+        _shared_frame_converter.close()
+    _shared_frame_converter = FrameConverter(**kwargs)
+    return _shared_frame_converter
+
+
 def frame_to_jpeg_bytes(
     frame: av.VideoFrame, target_width: int, target_height: int, quality: int = 85
 ) -> bytes:
     """
     Convert a video frame to JPEG bytes with resizing.
 
+    Uses the shared ``FrameConverter``, see ``get_frame_converter()``.
+
     Args:
         frame: an instance of `av.VideoFrame`.
         target_width: target width in pixels.
@@ -48,44 +323,24 @@ def frame_to_jpeg_bytes(
     Returns: frame as JPEG bytes.
 
     """
-    # Convert frame to a PIL image
-    img = frame.to_image()
-
-    # Calculate scaling to maintain aspect ratio
-    src_width, src_height = img.size
-    # Calculate scale factor (fit within target dimensions)
-    scale = min(target_width / src_width, target_height / src_height)
-    new_width = int(src_width * scale)
-    new_height = int(src_height * scale)
-
-    # Resize with aspect ratio maintained
-    resized = img.resize((new_width, new_height), Resampling.LANCZOS)
-
-    # Save as JPEG with quality control
-    buf = io.BytesIO()
-    resized.save(buf, "JPEG", quality=quality, optimize=True)
-    return buf.getvalue()
+    return get_frame_converter().to_jpeg_bytes(
+        frame, target_width, target_height, quality
+    )
 
 
 def frame_to_png_bytes(frame: av.VideoFrame) -> bytes:
     """
     Convert a video frame to PNG bytes.
 
+    Uses the shared ``FrameConverter``, see ``get_frame_converter()``.
+
     Args:
         frame: Video frame object that can be converted to an image
 
     Returns:
         PNG bytes of the frame, or empty bytes if conversion fails
     """
-    if hasattr(frame, "to_image"):
-        img = frame.to_image()
-    else:
-        arr = frame.to_ndarray(format="rgb24")
-        img = Image.fromarray(arr)
-
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    return buf.getvalue()
+    return get_frame_converter().to_png_bytes(frame)
 
 
 def resize_frame(self, frame: av.VideoFrame) -> av.VideoFrame:
@@ -93,6 +348,8 @@ def resize_frame(self, frame: av.VideoFrame) -> av.VideoFrame:
     Resizes a video frame to target dimensions while maintaining the aspect ratio. The method centers the resized
     image on a black background if the target dimensions do not match the original aspect ratio.
 
+    Uses the shared ``FrameConverter``, see ``get_frame_converter()``.
+
     Parameters:
         frame (av.VideoFrame): The input video frame to be resized.
 
@@ -102,26 +359,4 @@ def resize_frame(self, frame: av.VideoFrame) -> av.VideoFrame:
     Raises:
         None
     """
-    img = frame.to_image()
-
-    # Calculate scaling to maintain aspect ratio
-    src_width, src_height = img.size
-    target_width, target_height = self.width, self.height
-
-    # Calculate scale factor (fit within target dimensions)
-    scale = min(target_width / src_width, target_height / src_height)
-    new_width = int(src_width * scale)
-    new_height = int(src_height * scale)
-
-    # Resize with aspect ratio maintained
-    resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-
-    # Create black background at target resolution
-    result = Image.new("RGB", (target_width, target_height), (0, 0, 0))
-
-    # Paste resized image centered
-    x_offset = (target_width - new_width) // 2
-    y_offset = (target_height - new_height) // 2
-    result.paste(resized, (x_offset, y_offset))
-
-    return av.VideoFrame.from_image(result)
+    return get_frame_converter().resize(frame, self.width, self.height)
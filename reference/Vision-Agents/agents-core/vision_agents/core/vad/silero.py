@@ -1,5 +1,8 @@
 import os
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 
 import numpy as np
 import asyncio
@@ -8,6 +11,7 @@ from getstream.video.rtc import PcmData
 from vision_agents.core.utils.utils import ensure_model
 
 SILERO_CHUNK = 512
+SILERO_CONTEXT = 64  # Silero uses 64-sample context at 16 kHz
 SILERO_ONNX_FILENAME = "silero_vad.onnx"
 SILERO_ONNX_URL = "https://github.com/snakers4/silero-vad/raw/master/src/silero_vad/data/silero_vad.onnx"
 
@@ -30,22 +34,22 @@ class SileroVAD:
         opts = ort.SessionOptions()
         opts.inter_op_num_threads = 1
         self.session = ort.InferenceSession(model_path, sess_options=opts)
-        self.context_size = 64  # Silero uses 64-sample context at 16 kHz
+        self.context_size = SILERO_CONTEXT
         self.reset_interval_seconds = reset_interval_seconds
         self._state: np.ndarray = np.zeros((2, 1, 128), dtype=np.float32)  # (2, B, 128)
-        self._context: np.ndarray = np.zeros((1, 64), dtype=np.float32)
+        # Model input, reused for every chunk: [context (64) | chunk (512)]
+        self._input = np.zeros((1, self.context_size + SILERO_CHUNK), dtype=np.float32)
+        self._sr = np.array(16000, dtype=np.int64)
         self._init_states()
 
     def predict_speech(self, pcm: PcmData):
         # convert from pcm to the right format for silero
-
-        chunks = pcm.resample(16000, 1).to_float32().chunks(SILERO_CHUNK, pad_last=True)
-        scores = [self._predict_speech(c.samples) for c in chunks]
+        scores = [self._predict_speech(c) for c in _pcm_to_chunks(pcm)]
         return max(scores)
 
     def _init_states(self):
         self._state = np.zeros((2, 1, 128), dtype=np.float32)  # (2, B, 128)
-        self._context = np.zeros((1, self.context_size), dtype=np.float32)
+        self._input[:, : self.context_size] = 0.0
         self._last_reset_time = time.time()
 
     def _maybe_reset(self):
@@ -64,19 +68,19 @@ class SileroVAD:
             raise ValueError(
                 f"incorrect usage for predict speech. only send audio data in chunks of 512. got {x.shape[1]}"
             )
-        x = np.concatenate((self._context, x), axis=1)
+        self._input[:, self.context_size :] = x
 
         # Run ONNX
         ort_inputs = {
-            "input": x.astype(np.float32),
+            "input": self._input,
             "state": self._state,
-            "sr": np.array(16000, dtype=np.int64),
+            "sr": self._sr,
         }
         outputs = self.session.run(None, ort_inputs)
         out, self._state = outputs
 
         # Update context (keep last 64 samples)
-        self._context = x[:, -self.context_size :]
+        self._input[:, : self.context_size] = self._input[:, -self.context_size :]
         self._maybe_reset()
 
         # out shape is (1, 1) -> return scalar
@@ -84,6 +88,190 @@ class SileroVAD:
         return prediction
 
 
+@dataclass
+class _StreamState:
+    """Silero state of one audio stream (i.e. a participant) in the batched VAD."""
+
+    state: np.ndarray = field(
+        default_factory=lambda: np.zeros((2, 128), dtype=np.float32)
+    )
+    context: np.ndarray = field(
+        default_factory=lambda: np.zeros(SILERO_CONTEXT, dtype=np.float32)
+    )
+    last_reset_time: float = field(default_factory=time.time)
+
+
+@dataclass
+class _Request:
+    stream_id: str
+    pcm: PcmData
+    future: Future
+
+
+class BatchedSileroVAD:
+    """
+    Silero VAD shared by many audio streams.
+
+    Chunks from all the streams waiting for a prediction are stacked into a single
+    ONNX call (with one row of state per stream) on a dedicated thread, so the event
+    loop never runs inference and many participants cost one call instead of one
+    per chunk. Each stream keeps its own state, identified by ``stream_id``.
+
+    Example:
+
+        vad = await prepare_batched_silero_vad(model_dir)
+        probability = await vad.predict_speech(participant.user_id, pcm)
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        reset_interval_seconds: float = 5.0,
+        max_batch_size: int = 64,
+    ):
+        """
+        Initialize the batched Silero VAD.
+
+        Args:
+            model_path: Path to the ONNX model file
+            reset_interval_seconds: Reset a stream's state every N seconds to prevent drift
+            max_batch_size: Maximum number of chunks per ONNX call
+        """
+        import onnxruntime as ort
+
+        opts = ort.SessionOptions()
+        opts.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(model_path, sess_options=opts)
+        self.reset_interval_seconds = reset_interval_seconds
+        self.max_batch_size = max_batch_size
+
+        self._streams: dict[str, _StreamState] = {}
+        self._sr = np.array(16000, dtype=np.int64)
+        # Model input, reused for every batch: one [context | chunk] row per stream
+        self._input = np.zeros(
+            (max_batch_size, SILERO_CONTEXT + SILERO_CHUNK), dtype=np.float32
+        )
+
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="silero-vad")
+        self._pending: list[_Request] = []
+        self._pending_lock = threading.Lock()
+        self._draining = False
+
+    async def predict_speech(self, stream_id: str, pcm: PcmData) -> float:
+        """
+        Return the max speech probability of the 512-sample chunks in ``pcm``.
+
+        Args:
+            stream_id: The audio stream the data belongs to (i.e. the participant)
+            pcm: The audio data, in any sample rate/format
+        """
+        return await asyncio.wrap_future(self.submit(stream_id, pcm))
+
+    def submit(self, stream_id: str, pcm: PcmData) -> "Future[float]":
+        """Thread-safe, non-async variant of ``predict_speech``."""
+        request = _Request(stream_id=stream_id, pcm=pcm, future=Future())
+        with self._pending_lock:
+            self._pending.append(request)
+            if not self._draining:
+                self._draining = True
+                self._executor.submit(self._drain)
+        return request.future
+
+    def remove_stream(self, stream_id: str) -> None:
+        """Forget the state of a stream that ended."""
+        self._streams.pop(stream_id, None)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _drain(self) -> None:
+        # Requests that arrive while a batch runs are picked up together by the next one
+        while True:
+            with self._pending_lock:
+                requests, self._pending = self._pending, []
+                if not requests:
+                    self._draining = False
+                    return
+            self._run_requests(requests)
+
+    def _run_requests(self, requests: list[_Request]) -> None:
+        # Chunks of each stream in order. Chunk i of every stream goes in round i
+        stream_chunks: dict[str, list[np.ndarray]] = {}
+        spans: list[tuple[_Request, int, int]] = []
+        for request in requests:
+            if not request.future.set_running_or_notify_cancel():
+                continue
+            try:
+                chunks = _pcm_to_chunks(request.pcm)
+            except Exception as e:
+                request.future.set_exception(e)
+                continue
+            stream = stream_chunks.setdefault(request.stream_id, [])
+            spans.append((request, len(stream), len(stream) + len(chunks)))
+            stream.extend(chunks)
+
+        scores = {sid: np.zeros(len(c), np.float32) for sid, c in stream_chunks.items()}
+        try:
+            n_rounds = max((len(c) for c in stream_chunks.values()), default=0)
+            for i in range(n_rounds):
+                active = [sid for sid, c in stream_chunks.items() if len(c) > i]
+                for start in range(0, len(active), self.max_batch_size):
+                    batch = active[start : start + self.max_batch_size]
+                    probabilities = self._predict_batch(
+                        batch, [stream_chunks[sid][i] for sid in batch]
+                    )
+                    for sid, probability in zip(batch, probabilities):
+                        scores[sid][i] = probability
+        except Exception as e:
+            for request, _, _ in spans:
+                request.future.set_exception(e)
+            return
+
+        for request, start, end in spans:
+            stream_scores = scores[request.stream_id][start:end]
+            request.future.set_result(
+                float(stream_scores.max()) if len(stream_scores) else 0.0
+            )
+
+    def _predict_batch(self, stream_ids: list[str], chunks: list[np.ndarray]):
+        """Run one ONNX call for one chunk of each stream and update their states."""
+        streams = [self._streams.setdefault(sid, _StreamState()) for sid in stream_ids]
+        x = self._input[: len(streams)]
+        for row, stream, chunk in zip(x, streams, chunks):
+            row[:SILERO_CONTEXT] = stream.context
+            row[SILERO_CONTEXT:] = chunk
+
+        ort_inputs = {
+            "input": x,
+            "state": np.stack([stream.state for stream in streams], axis=1),
+            "sr": self._sr,
+        }
+        out, state = self.session.run(None, ort_inputs)
+
+        now = time.time()
+        for i, stream in enumerate(streams):
+            if now - stream.last_reset_time >= self.reset_interval_seconds:
+                stream.state[:] = 0.0
+                stream.context[:] = 0.0
+                stream.last_reset_time = now
+            else:
+                stream.state[:] = state[:, i, :]
+                stream.context[:] = x[i, -SILERO_CONTEXT:]
+        return out[:, 0]
+
+
+def _pcm_to_chunks(pcm: PcmData) -> np.ndarray:
+    """Convert audio to 16 kHz mono float32, as rows of 512 samples (last one zero-padded)."""
+    samples = pcm.resample(16000, 1).to_float32().samples.reshape(-1)
+    n_chunks = -(-len(samples) // SILERO_CHUNK)
+    chunks = np.zeros((n_chunks, SILERO_CHUNK), dtype=np.float32)
+    chunks.reshape(-1)[: len(samples)] = samples
+    return chunks
+
+
+_shared_batched_vads: dict[str, BatchedSileroVAD] = {}
+
+
 async def prepare_silero_vad(model_dir: str) -> SileroVAD:
     path = os.path.join(model_dir, SILERO_ONNX_FILENAME)
     await ensure_model(path, SILERO_ONNX_URL)
@@ -94,3 +282,19 @@ async def prepare_silero_vad(model_dir: str) -> SileroVAD:
         )
     )
     return vad
+
+
+async def prepare_batched_silero_vad(model_dir: str) -> BatchedSileroVAD:
+    """
+    Return the batched Silero VAD of this process for the model in ``model_dir``.
+
+    The instance is shared, so streams from every agent in the process are batched
+    together. Use a unique ``stream_id`` per stream.
+    """
+    path = os.path.join(model_dir, SILERO_ONNX_FILENAME)
+    await ensure_model(path, SILERO_ONNX_URL)
+    vad = _shared_batched_vads.get(path)
+    if vad is None:
+        vad = await asyncio.to_thread(BatchedSileroVAD, path)
+        vad = _shared_batched_vads.setdefault(path, vad)
+    return vad
@@ -7,7 +7,7 @@ from PIL import Image
 from aiortc import MediaStreamTrack, VideoStreamTrack
 
 from vision_agents.core.utils.video_queue import VideoLatestNQueue
-from vision_agents.core.utils.video_utils import resize_frame
+from vision_agents.core.utils.video_utils import get_frame_converter
 
 logger = logging.getLogger(__name__)
 
@@ -48,7 +48,9 @@ class DecartVideoTrack(VideoStreamTrack):
         if not isinstance(frame, av.VideoFrame):
             return
         if frame.width != self.width or frame.height != self.height:
-            frame = await asyncio.to_thread(resize_frame, self, frame)
+            frame = await get_frame_converter().resize_async(
+                frame, self.width, self.height
+            )
         self.frame_queue.put_latest_nowait(frame)
 
     async def recv(self) -> av.VideoFrame:
@@ -3,7 +3,6 @@ import contextlib
 import copy
 import logging
 from asyncio import CancelledError
-from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Optional, cast
 
 import aiortc
@@ -40,7 +39,7 @@ from vision_agents.core.llm.llm import LLMResponseEvent
 from vision_agents.core.llm.llm_types import ToolSchema
 from vision_agents.core.processors import Processor
 from vision_agents.core.utils.video_forwarder import VideoForwarder
-from vision_agents.core.utils.video_utils import frame_to_png_bytes
+from vision_agents.core.utils.video_utils import get_frame_converter
 
 logger = logging.getLogger(__name__)
 
@@ -147,7 +146,6 @@ class GeminiRealtime(realtime.Realtime):
         self._real_session: Optional[AsyncSession] = None
         self._processing_task: Optional[asyncio.Task] = None
         self._exit_stack = contextlib.AsyncExitStack()
-        self._executor = ThreadPoolExecutor(max_workers=1)
 
     @property
     def _session(self):
@@ -245,12 +243,9 @@ class GeminiRealtime(realtime.Realtime):
         Parameters:
             frame: Video frame to send.
         """
-        loop = asyncio.get_running_loop()
-
         # Run frame conversion in a separate thread to avoid blocking the loop.
-        png_bytes = await loop.run_in_executor(
-            self._executor, frame_to_png_bytes, frame
-        )
+        # The converter is shared, so a frame already converted by another plugin is reused
+        png_bytes = await get_frame_converter().to_png_bytes_async(frame)
 
         blob = Blob(data=png_bytes, mime_type="image/png")
         try:
@@ -295,9 +290,6 @@ class GeminiRealtime(realtime.Realtime):
 
         await self._stop_watching_video_track()
 
-        # Do not wait for threads to complete to avoid blocking the loop
-        self._executor.shutdown(wait=False)
-
         if self._processing_task is not None:
             self._processing_task.cancel()
             await self._processing_task
@@ -1,5 +1,5 @@
 import logging
-from typing import List, Dict
+from typing import Dict, List, Optional
 
 from getstream.models import MessageRequest
 from getstream.chat.async_channel import Channel
@@ -28,6 +28,7 @@ class StreamConversation(Conversation):
         messages: List[Message],
         channel: Channel,
         chunk_size: int = 1000,
+        max_messages: Optional[int] = None,
     ):
         """Initialize StreamConversation with automatic message chunking.
 
@@ -36,8 +37,9 @@ class StreamConversation(Conversation):
             messages: Initial messages
             channel: Stream channel for persistence
             chunk_size: Maximum characters per message chunk (default 1000)
+            max_messages: Max messages kept in memory, see Conversation
         """
-        super().__init__(instructions, messages)
+        super().__init__(instructions, messages, max_messages=max_messages)
         self.channel = channel
         self.internal_ids_to_stream_ids = {}
         self.chunk_size = chunk_size
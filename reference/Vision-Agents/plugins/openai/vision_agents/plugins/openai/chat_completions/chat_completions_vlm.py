@@ -1,7 +1,8 @@
+import asyncio
 import base64
 import logging
 from collections import deque
-from typing import Iterator, Optional, cast
+from typing import Optional, cast
 
 import av
 from aiortc.mediastreams import MediaStreamTrack, VideoStreamTrack
@@ -15,7 +16,7 @@ from vision_agents.core.llm.events import (
 from vision_agents.core.llm.llm import LLMResponseEvent, VideoLLM
 from vision_agents.core.processors import Processor
 from vision_agents.core.utils.video_forwarder import VideoForwarder
-from vision_agents.core.utils.video_utils import frame_to_jpeg_bytes
+from vision_agents.core.utils.video_utils import get_frame_converter
 
 from .. import events
 
@@ -230,17 +231,20 @@ class ChatCompletionsVLM(VideoLLM):
             self._frame_buffer.append, fps=self._fps
         )
 
-    def _get_frames_bytes(self) -> Iterator[bytes]:
+    async def _get_frames_bytes(self) -> list[bytes]:
         """
-        Iterate over all buffered video frames.
+        Convert all buffered video frames to JPEG, off the event loop.
+        Frames already converted for a previous request come from the converter's cache.
         """
-        for frame in self._frame_buffer:
-            yield frame_to_jpeg_bytes(
-                frame=frame,
-                target_width=self._frame_width,
-                target_height=self._frame_height,
-                quality=85,
+        converter = get_frame_converter()
+        return await asyncio.gather(
+            *(
+                converter.to_jpeg_bytes_async(
+                    frame, self._frame_width, self._frame_height, quality=85
+                )
+                for frame in list(self._frame_buffer)
             )
+        )
 
     async def _build_model_request(self) -> list[dict]:
         messages: list[dict] = []
@@ -265,7 +269,7 @@ class ChatCompletionsVLM(VideoLLM):
 
         # Attach the latest buffered frames to the request
         frames_data = []
-        for frame_bytes in self._get_frames_bytes():
+        for frame_bytes in await self._get_frames_bytes():
             frame_b64 = base64.b64encode(frame_bytes).decode("utf-8")
             frame_msg = {
                 "type": "image_url",
@@ -17,7 +17,10 @@ from vision_agents.core.turn_detection import (
     TurnStartedEvent,
 )
 from vision_agents.core.utils.utils import ensure_model
-from vision_agents.core.vad.silero import prepare_silero_vad
+from vision_agents.core.vad.silero import (
+    BatchedSileroVAD,
+    prepare_batched_silero_vad,
+)
 
 import logging
 
@@ -108,6 +111,9 @@ class SmartTurnDetection(TurnDetector):
         self._processing_active = (
             asyncio.Event()
         )  # Tracks if background task is processing
+        self.vad: Optional[BatchedSileroVAD] = None
+        # The VAD is shared by the process, this is our stream in it
+        self._vad_stream_id = f"smart-turn-{id(self)}"
 
         if options is None:
             self.options = default_agent_options()
@@ -140,7 +146,7 @@ class SmartTurnDetection(TurnDetector):
         self.smart_turn = await asyncio.to_thread(self._build_smart_turn_session)
 
     async def _prepare_silero_vad(self):
-        self.vad = await prepare_silero_vad(self.options.model_dir)
+        self.vad = await prepare_batched_silero_vad(self.options.model_dir)
 
     async def process_audio(
         self,
@@ -226,8 +232,13 @@ class SmartTurnDetection(TurnDetector):
 
         # detect speech in small 512 chunks, gather to larger audio segments with speech
         for chunk in audio_chunks[:-1]:
-            # predict if this segment has speech (run in thread to avoid blocking)
-            speech_probability = await asyncio.to_thread(self.vad.predict_speech, chunk)
+            if self.vad is None:
+                continue
+
+            # predict if this segment has speech (batched with other streams, off the loop)
+            speech_probability = await self.vad.predict_speech(
+                self._vad_stream_id, chunk
+            )
             is_speech = speech_probability > self.speech_probability_threshold
 
             if self._active_segment is not None:
@@ -327,6 +338,8 @@ class SmartTurnDetection(TurnDetector):
             except asyncio.CancelledError:
                 pass
             self._processing_task = None
+        if self.vad is not None:
+            self.vad.remove_stream(self._vad_stream_id)
 
     async def _predict_turn_completed(
         self, pcm: PcmData, participant: Participant
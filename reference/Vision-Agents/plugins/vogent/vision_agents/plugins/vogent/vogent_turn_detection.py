@@ -13,7 +13,10 @@ from vision_agents.core.turn_detection import (
     TurnDetector,
     TurnStartedEvent,
 )
-from vision_agents.core.vad.silero import prepare_silero_vad, SileroVAD
+from vision_agents.core.vad.silero import (
+    BatchedSileroVAD,
+    prepare_batched_silero_vad,
+)
 from vision_agents.plugins import fast_whisper
 
 import logging
@@ -100,7 +103,9 @@ class VogentTurnDetection(TurnDetector):
         self._shutdown_event = asyncio.Event()
 
         # Model instances (initialized in start())
-        self.vad: Optional[SileroVAD] = None
+        self.vad: Optional[BatchedSileroVAD] = None
+        # The VAD is shared by the process, this is our stream in it
+        self._vad_stream_id = f"vogent-{id(self)}"
         self.whisper_stt = fast_whisper.STT(
             model_size=whisper_model_size,
             device="cpu",
@@ -129,7 +134,7 @@ class VogentTurnDetection(TurnDetector):
 
     async def _prepare_silero_vad(self) -> None:
         """Load Silero VAD model for speech detection."""
-        self.vad = await prepare_silero_vad(self.model_dir)
+        self.vad = await prepare_batched_silero_vad(self.model_dir)
 
     async def _prepare_whisper(self) -> None:
         """Load faster-whisper model for transcription."""
@@ -231,8 +236,10 @@ class VogentTurnDetection(TurnDetector):
             if self.vad is None:
                 continue
 
-            # Run VAD in thread pool to avoid blocking event loop
-            speech_probability = await asyncio.to_thread(self.vad.predict_speech, chunk)
+            # Batched with other streams and run off the event loop
+            speech_probability = await self.vad.predict_speech(
+                self._vad_stream_id, chunk
+            )
             is_speech = speech_probability > self.speech_probability_threshold
 
             if self._active_segment is not None:
@@ -332,6 +339,8 @@ class VogentTurnDetection(TurnDetector):
             except asyncio.CancelledError:
                 pass
             self._processing_task = None
+        if self.vad is not None:
+            self.vad.remove_stream(self._vad_stream_id)
         if self.whisper_stt:
             await self.whisper_stt.close()
 
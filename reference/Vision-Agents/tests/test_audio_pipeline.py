@@ -0,0 +1,99 @@
+import asyncio
+
+import numpy as np
+
+from getstream.video.rtc.track_util import PcmData, AudioFormat
+from vision_agents.core.agents.audio_pipeline import ParticipantAudioPipeline
+from vision_agents.core.edge.types import Participant
+
+
+def _pcm(value: int) -> PcmData:
+    return PcmData(
+        samples=np.full(320, value, dtype=np.int16),
+        sample_rate=16000,
+        format=AudioFormat.S16,
+        channels=1,
+    )
+
+
+class TestParticipantAudioPipeline:
+    async def test_slow_stage_does_not_delay_other_stages(self):
+        """Test that each stage drains its own queue concurrently."""
+        participant = Participant(original=None, user_id="user-1")
+        fast_received = []
+        slow_started = asyncio.Event()
+        slow_release = asyncio.Event()
+
+        async def fast_stage(pcm, p):
+            fast_received.append(int(pcm.samples[0]))
+
+        async def slow_stage(pcm, p):
+            slow_started.set()
+            await slow_release.wait()
+
+        pipeline = ParticipantAudioPipeline(
+            participant, {"fast": fast_stage, "slow": slow_stage}
+        )
+        pipeline.start()
+        try:
+            for i in range(5):
+                pipeline.put(_pcm(i))
+            await slow_started.wait()
+            await asyncio.sleep(0.01)
+
+            # The fast stage processed everything, in order, while the slow one is stuck
+            assert fast_received == [0, 1, 2, 3, 4]
+            slow_release.set()
+        finally:
+            await pipeline.stop()
+
+    async def test_full_stage_drops_oldest(self):
+        """Test that a stage that falls behind drops its oldest audio slices."""
+        participant = Participant(original=None, user_id="user-1")
+        received = []
+        release = asyncio.Event()
+
+        async def stage(pcm, p):
+            await release.wait()
+            received.append(int(pcm.samples[0]))
+
+        pipeline = ParticipantAudioPipeline(
+            participant, {"stage": stage}, max_queue_size=2
+        )
+        pipeline.start()
+        try:
+            pipeline.put(_pcm(0))
+            await asyncio.sleep(0)  # the stage takes slice 0 and waits
+
+            for i in range(1, 5):
+                pipeline.put(_pcm(i))
+
+            release.set()
+            await asyncio.sleep(0.01)
+
+            assert received == [0, 3, 4]
+            assert pipeline.stages[0].dropped == 2
+        finally:
+            await pipeline.stop()
+
+    async def test_stage_error_does_not_stop_stage(self):
+        """Test that a failing slice is logged and the stage keeps running."""
+        participant = Participant(original=None, user_id="user-1")
+        received = []
+
+        async def stage(pcm, p):
+            if pcm.samples[0] == 0:
+                raise ValueError("Failed")
+            received.append(int(pcm.samples[0]))
+
+        pipeline = ParticipantAudioPipeline(participant, {"stage": stage})
+        pipeline.start()
+        try:
+            pipeline.put(_pcm(0))
+            pipeline.put(_pcm(1))
+            await asyncio.sleep(0.01)
+
+            assert received == [1]
+            assert pipeline.stages[0].processed == 2
+        finally:
+            await pipeline.stop()
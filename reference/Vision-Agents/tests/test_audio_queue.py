@@ -430,3 +430,102 @@ class TestAudioQueue(BaseTest):
         assert np.array_equal(result3.samples, [700, 800])
 
         assert queue.empty()
+
+    async def test_audio_queue_buffer_limit_drops_oldest(self):
+        """Test that the oldest samples are dropped when the buffer limit is exceeded."""
+        queue = AudioQueue(buffer_limit_ms=100)  # 1600 samples at 16kHz
+
+        for i in range(3):
+            samples = np.arange(i * 800, (i + 1) * 800, dtype=np.int16)
+            pcm = PcmData(
+                samples=samples, sample_rate=16000, format=AudioFormat.S16, channels=1
+            )
+            await queue.put(pcm)
+
+        info = queue.get_buffer_info()
+        assert info["total_samples"] == 1600
+        assert info["dropped_samples"] == 800
+        assert info["occupancy"] == 1.0
+
+        result = await queue.get_samples(1600)
+        assert np.array_equal(result.samples, np.arange(800, 2400, dtype=np.int16))
+        assert queue.empty()
+
+    async def test_audio_queue_reads_are_not_overwritten(self):
+        """Test that samples returned by reads stay valid after the ring buffer is reused."""
+        queue = AudioQueue(buffer_limit_ms=10)  # 160 samples, ring of 160
+
+        await queue.put(
+            PcmData(
+                samples=np.arange(160, dtype=np.int16),
+                sample_rate=16000,
+                format=AudioFormat.S16,
+                channels=1,
+            )
+        )
+        kept = await queue.get_samples(100)
+        kept_duration = await queue.get_duration(duration_ms=2)
+
+        # Reuse every slot of the ring
+        for i in range(4):
+            await queue.put(
+                PcmData(
+                    samples=np.full(160, -1, dtype=np.int16),
+                    sample_rate=16000,
+                    format=AudioFormat.S16,
+                    channels=1,
+                )
+            )
+            await queue.get_samples(160)
+
+        assert np.array_equal(kept.samples, np.arange(100, dtype=np.int16))
+        assert np.array_equal(
+            kept_duration.samples, np.arange(100, 132, dtype=np.int16)
+        )
+
+    async def test_audio_queue_get_returns_the_item_put(self):
+        """Test that get returns the PcmData as it was put, unless it was partly consumed."""
+        queue = AudioQueue(buffer_limit_ms=1000)
+
+        pcm1 = PcmData(
+            samples=np.arange(100, dtype=np.int16),
+            sample_rate=16000,
+            format=AudioFormat.S16,
+            channels=1,
+        )
+        pcm2 = PcmData(
+            samples=np.arange(100, 200, dtype=np.int16),
+            sample_rate=16000,
+            format=AudioFormat.S16,
+            channels=1,
+        )
+        await queue.put(pcm1)
+        await queue.put(pcm2)
+
+        assert await queue.get() is pcm1
+
+        await queue.get_samples(10)
+        rest = await queue.get()
+        assert rest is not pcm2
+        assert np.array_equal(rest.samples, np.arange(110, 200, dtype=np.int16))
+        assert queue.empty()
+
+    async def test_audio_queue_wraps_around(self):
+        """Test reading and writing across the end of the ring buffer."""
+        queue = AudioQueue(buffer_limit_ms=10)  # 160 samples, ring of 160
+
+        expected = []
+        results = []
+        for i in range(10):
+            samples = np.arange(i * 150, (i + 1) * 150, dtype=np.int16)
+            pcm = PcmData(
+                samples=samples, sample_rate=16000, format=AudioFormat.S16, channels=1
+            )
+            await queue.put(pcm)
+            expected.append(samples[:100])
+            results.append((await queue.get_samples(100)).samples.copy())
+            await queue.get_samples(50)
+
+        for result, samples in zip(results, expected):
+            assert np.array_equal(result, samples)
+        assert queue.empty()
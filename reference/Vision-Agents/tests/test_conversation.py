@@ -1,3 +1,4 @@
+import asyncio
 import datetime
 import pytest
 
@@ -271,3 +272,114 @@ class TestInMemoryConversation:
 
         # Content should be unchanged
         assert conversation.messages[-1].content == initial_content
+
+    @pytest.mark.asyncio
+    async def test_upsert_finds_messages_appended_directly(self, conversation):
+        """Test that messages appended to the list by LLM plugins are found by id."""
+        conversation.messages.append(
+            Message(content="Appended", role="assistant", user_id="agent", id="ext")
+        )
+
+        await conversation.upsert_message(
+            role="assistant",
+            user_id="agent",
+            content="ignored",
+            message_id="ext",
+        )
+
+        # Found the existing (completed) message instead of creating a new one
+        assert len(conversation.messages) == 3
+        assert conversation.messages[-1].content == "Appended"
+
+    @pytest.mark.asyncio
+    async def test_other_messages_do_not_wait_for_backend_sync(self):
+        """Test that a slow backend sync only blocks updates of the same message."""
+        release = asyncio.Event()
+
+        class SlowConversation(InMemoryConversation):
+            async def _sync_to_backend(self, message, state, completed):
+                if message.id == "slow":
+                    await release.wait()
+
+        conversation = SlowConversation("instructions", [])
+        slow = asyncio.create_task(
+            conversation.upsert_message("assistant", "agent", "a", message_id="slow")
+        )
+        await asyncio.sleep(0)
+
+        await asyncio.wait_for(
+            conversation.upsert_message("user", "user1", "b", message_id="fast"),
+            timeout=1,
+        )
+        assert not slow.done()
+        release.set()
+        await slow
+
+    @pytest.mark.asyncio
+    async def test_bounded_history_summarizes_removed_messages(self):
+        """Test that max_messages removes the oldest messages and keeps their summary."""
+
+        class SummarizingConversation(InMemoryConversation):
+            async def summarize(self, messages):
+                text = " ".join(m.content for m in messages)
+                return Message(content=f"summary: {text}", role="system", id="sum")
+
+        conversation = SummarizingConversation("instructions", [], max_messages=3)
+        await conversation.upsert_message("user", "user1", "one")
+        await conversation.upsert_message("user", "user1", "two")
+        await conversation.upsert_message(
+            "assistant", "agent", "three", message_id="streaming", completed=False
+        )
+        await conversation.upsert_message("user", "user1", "four")
+
+        assert [m.content for m in conversation.messages] == [
+            "summary: one",
+            "two",
+            "three",
+            "four",
+        ]
+
+        # The previous summary is folded into the next one
+        await conversation.upsert_message("user", "user1", "five")
+        assert [m.content for m in conversation.messages] == [
+            "summary: summary: one two",
+            "three",
+            "four",
+            "five",
+        ]
+
+        # The message that was still streaming can still be updated
+        await conversation.upsert_message(
+            "assistant", "agent", " more", message_id="streaming"
+        )
+        assert conversation.messages[1].content == "three more"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_trims_are_serialized(self):
+        """Test that upserts crossing max_messages while summarize() runs lose no message."""
+        release = asyncio.Event()
+        summarized = []
+
+        class SlowSummarizingConversation(InMemoryConversation):
+            async def summarize(self, messages):
+                await release.wait()
+                summarized.extend(m.content for m in messages if m.role != "system")
+                return Message(content="summary", role="system")
+
+        conversation = SlowSummarizingConversation("instructions", [], max_messages=2)
+        await conversation.upsert_message("user", "user1", "a")
+        await conversation.upsert_message("user", "user1", "b")
+
+        tasks = [
+            asyncio.create_task(conversation.upsert_message("user", "user1", text))
+            for text in ("c", "d", "e")
+        ]
+        await asyncio.sleep(0.01)
+        # The new messages have their content while the first trim waits
+        assert all(m.content for m in conversation.messages)
+        release.set()
+        await asyncio.gather(*tasks)
+
+        assert summarized == ["a", "b", "c"]
+        assert [m.content for m in conversation.messages] == ["summary", "d", "e"]
+        assert sum(m.role == "system" for m in conversation.messages) == 1
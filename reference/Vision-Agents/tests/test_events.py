@@ -1,6 +1,8 @@
+import asyncio
 import pytest
 import types
 import dataclasses
+from typing import Union
 
 from vision_agents.core.events.manager import EventManager, ExceptionEvent
 
@@ -419,3 +421,146 @@ async def test_track_published_event_with_participant_property():
     assert unpublished_event.participant is not None
     assert unpublished_event.participant.user_id == "user123"
     assert unpublished_event.cause == 1
+
+
+@pytest.mark.asyncio
+async def test_subscribe_ordered_handles_events_one_at_a_time_in_order():
+    manager = EventManager()
+    manager.register(ValidEvent)
+    received = []
+    running = 0
+    max_running = 0
+
+    @manager.subscribe(ordered=True)
+    async def handler(event: ValidEvent):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.001 * (5 - event.field))
+        received.append(event.field)
+        running -= 1
+
+    for i in range(5):
+        manager.send(ValidEvent(field=i))
+    await manager.wait()
+
+    assert received == [0, 1, 2, 3, 4]
+    assert max_running == 1
+
+
+@pytest.mark.asyncio
+async def test_subscribe_max_concurrency_limits_running_handlers():
+    manager = EventManager()
+    manager.register(ValidEvent)
+    running = 0
+    max_running = 0
+    handled = 0
+
+    @manager.subscribe(max_concurrency=2)
+    async def handler(event: ValidEvent):
+        nonlocal running, max_running, handled
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+        handled += 1
+
+    for i in range(10):
+        manager.send(ValidEvent(field=i))
+    await manager.wait()
+
+    assert handled == 10
+    assert max_running == 2
+
+
+@pytest.mark.asyncio
+async def test_subscribe_coalesce_delivers_latest_pending_event():
+    manager = EventManager()
+    manager.register(ValidEvent)
+    manager.register(AnotherEvent)
+    received = []
+    release = asyncio.Event()
+
+    @manager.subscribe(ordered=True, coalesce=True)
+    async def handler(event: Union[ValidEvent, AnotherEvent]):
+        await release.wait()
+        received.append(getattr(event, "field", None) or event.value)
+
+    manager.send(ValidEvent(field=1))
+    await asyncio.sleep(0.01)  # the handler takes event 1 and waits
+    for i in range(2, 6):
+        manager.send(ValidEvent(field=i))
+    manager.send(AnotherEvent(value="a"))
+    await asyncio.sleep(0.01)
+    release.set()
+    await manager.wait()
+
+    # Events 2..4 were superseded by 5, the other event type was kept
+    assert received == [1, 5, "a"]
+
+
+@pytest.mark.asyncio
+async def test_subscribe_max_queue_size_applies_backpressure():
+    manager = EventManager()
+    manager.register(ValidEvent)
+    release = asyncio.Event()
+    received = []
+
+    @manager.subscribe(ordered=True, max_queue_size=2)
+    async def handler(event: ValidEvent):
+        await release.wait()
+        received.append(event.field)
+
+    for i in range(6):
+        manager.send(ValidEvent(field=i))
+    await asyncio.sleep(0.01)
+
+    # One event is being handled and two are waiting, the rest wait to be dispatched
+    assert manager._queue
+    release.set()
+    await manager.wait()
+    assert received == [0, 1, 2, 3, 4, 5]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_backpressure_wait_does_not_duplicate_events():
+    manager = EventManager()
+    manager.register(ValidEvent)
+    release = asyncio.Event()
+    plain = []
+    bounded = []
+
+    @manager.subscribe
+    async def plain_handler(event: ValidEvent):
+        plain.append(event.field)
+
+    @manager.subscribe(ordered=True, max_queue_size=1)
+    async def bounded_handler(event: ValidEvent):
+        await release.wait()
+        bounded.append(event.field)
+
+    for i in range(4):
+        manager.send(ValidEvent(field=i))
+    await asyncio.sleep(0.01)
+
+    # Event 2 was handed to plain_handler and its dispatch waits for bounded_handler
+    assert plain == [0, 1, 2]
+    manager._processing_task.cancel()
+    await asyncio.sleep(0.01)
+    release.set()
+    await manager.wait()
+
+    # The cancelled dispatch resumed from bounded_handler instead of starting over
+    assert plain == [0, 1, 2, 3]
+    assert bounded == [0, 1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_subscribe_invalid_options_raise_value_error():
+    manager = EventManager()
+    manager.register(ValidEvent)
+
+    with pytest.raises(ValueError):
+        manager.subscribe(max_concurrency=0)
+    with pytest.raises(ValueError):
+        manager.subscribe(ordered=True, max_concurrency=2)
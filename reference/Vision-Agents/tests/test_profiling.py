@@ -0,0 +1,23 @@
+import asyncio
+import time
+
+from vision_agents.core.profiling import EventLoopLagMonitor
+
+
+class TestEventLoopLagMonitor:
+    async def test_records_blocking_code_as_lag(self):
+        monitor = EventLoopLagMonitor(interval=0.01, warn_threshold_ms=None)
+        monitor.start()
+        try:
+            await asyncio.sleep(0.03)
+            # Block the event loop (busy wait, time.sleep is caught by blockbuster)
+            end = time.perf_counter() + 0.1
+            while time.perf_counter() < end:
+                pass
+            await asyncio.sleep(0.03)
+        finally:
+            await monitor.stop()
+
+        assert monitor.samples > 0
+        assert monitor.max_lag_ms >= 50
+        assert not monitor.running
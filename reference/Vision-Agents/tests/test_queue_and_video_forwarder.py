@@ -3,6 +3,7 @@ import asyncio
 import pytest
 from vision_agents.core.utils.video_forwarder import VideoForwarder
 from vision_agents.core.utils.video_queue import VideoLatestNQueue
+from vision_agents.core.utils.video_utils import FrameConverter
 
 
 class TestLatestNQueue:
@@ -285,3 +286,67 @@ class TestVideoForwarder:
         await finished.wait()
         assert frames_failed == frames_to_fail
         assert frames_succeeded == frames_to_succeed
+
+    async def test_fan_out_slow_handler_does_not_throttle_others(
+        self, bunny_video_track
+    ):
+        """Test that in fan-out mode a slow handler only drops its own frames"""
+        forwarder = VideoForwarder(
+            bunny_video_track, max_buffer=3, fps=10.0, fan_out=True
+        )
+
+        fast_frames = []
+        slow_frames = []
+
+        async def fast_handler(frame):
+            fast_frames.append(frame)
+
+        async def slow_handler(frame):
+            slow_frames.append(frame)
+            await asyncio.sleep(0.5)
+
+        try:
+            forwarder.add_frame_handler(slow_handler, name="slow")
+            forwarder.add_frame_handler(fast_handler, name="fast")
+
+            await asyncio.sleep(1.0)
+
+            assert 7 <= len(fast_frames) <= 13, (
+                f"Expected ~10 frames for the fast handler, got {len(fast_frames)}"
+            )
+            assert 1 <= len(slow_frames) <= 3
+            slow, fast = forwarder.frame_handlers
+            assert slow.frames_dropped > 0
+            assert fast.frames_dropped == 0
+            assert fast.frames_processed == len(fast_frames)
+        finally:
+            await forwarder.stop()
+
+        assert all(h.task is None for h in forwarder.frame_handlers)
+
+    async def test_shared_decoded_frames(self, bunny_video_track):
+        """Test that handlers share the decoded frame through the frame converter"""
+        converter = FrameConverter(cache_size=2)
+        forwarder = VideoForwarder(
+            bunny_video_track, max_buffer=3, fps=10.0, frame_converter=converter
+        )
+
+        arrays = []
+        finished = asyncio.Event()
+
+        def handler(frame):
+            arrays.append(forwarder.to_ndarray(frame))
+            if len(arrays) == 4:
+                finished.set()
+
+        try:
+            forwarder.add_frame_handler(handler, name="handler-1")
+            forwarder.add_frame_handler(handler, name="handler-2")
+            await finished.wait()
+        finally:
+            await forwarder.stop()
+
+        assert arrays[0] is arrays[1]
+        assert arrays[2] is arrays[3]
+        assert arrays[0] is not arrays[2]
+        assert not arrays[0].flags.writeable
@@ -1,8 +1,14 @@
+import asyncio
+
 import numpy as np
 import pytest
 from getstream.video.rtc import PcmData, AudioFormat
 
-from vision_agents.core.vad.silero import prepare_silero_vad, SILERO_CHUNK
+from vision_agents.core.vad.silero import (
+    prepare_batched_silero_vad,
+    prepare_silero_vad,
+    SILERO_CHUNK,
+)
 from conftest import skip_blockbuster
 
 
@@ -36,3 +42,29 @@ class TestSileroVAD:
 
         # Real speech should have high speech probability
         assert score > 0.5
+
+    async def test_batched_matches_single_stream(self, tmp_path, mia_audio_16khz):
+        """Test that batching streams together gives the same scores as one VAD per stream."""
+        tmpdir = str(tmp_path)
+        batched_vad = await prepare_batched_silero_vad(tmpdir)
+
+        silence = PcmData(
+            samples=np.zeros(SILERO_CHUNK * 2, dtype=np.float32),
+            sample_rate=16000,
+            channels=1,
+            format=AudioFormat.F32,
+        )
+        streams = {"speech": mia_audio_16khz, "silence": silence}
+
+        expected = {}
+        for stream_id, pcm in streams.items():
+            vad = await prepare_silero_vad(tmpdir)
+            expected[stream_id] = vad.predict_speech(pcm)
+
+        scores = await asyncio.gather(
+            *[batched_vad.predict_speech(sid, pcm) for sid, pcm in streams.items()]
+        )
+
+        assert scores == pytest.approx(list(expected.values()), abs=1e-5)
+        assert scores[0] > 0.5
+        assert scores[1] < 0.3
@@ -0,0 +1,84 @@
+import io
+
+import av
+import numpy as np
+from PIL import Image
+
+from vision_agents.core.utils.video_utils import (
+    FrameConverter,
+    configure_frame_converter,
+    get_frame_converter,
+)
+
+
+def _frame(width: int = 1280, height: int = 720) -> av.VideoFrame:
+    array = np.zeros((height, width, 3), dtype=np.uint8)
+    array[:, : width // 2] = 200
+    frame = av.VideoFrame.from_ndarray(array, format="rgb24").reformat(format="yuv420p")
+    frame.pts = 1
+    return frame
+
+
+class TestFrameConverter:
+    def test_jpeg_keeps_aspect_ratio_and_is_cached(self):
+        converter = FrameConverter()
+        frame = _frame()
+
+        jpeg = converter.to_jpeg_bytes(frame, 800, 600)
+        assert Image.open(io.BytesIO(jpeg)).size == (800, 450)
+
+        # Converting the same frame again comes from the cache
+        assert converter.to_jpeg_bytes(frame, 800, 600) is jpeg
+        assert converter.hits == 1
+
+        # Another frame with the same pts is not mixed up with the first one
+        assert converter.to_jpeg_bytes(_frame(640, 480), 800, 600) is not jpeg
+
+    def test_resize_letterboxes_to_target_size(self):
+        converter = FrameConverter()
+        resized = converter.resize(_frame(), 640, 640)
+
+        assert (resized.width, resized.height) == (640, 640)
+        pixels = resized.to_ndarray(format="rgb24")
+        # Black bars above and below, the frame in the middle
+        assert pixels[0, 0].tolist() == [0, 0, 0]
+        assert pixels[320, 100].max() > 150
+
+    def test_cached_rgb_is_read_only(self):
+        converter = FrameConverter()
+        rgb = converter.to_rgb(_frame(), 320, 180)
+
+        assert rgb.shape == (180, 320, 3)
+        assert not rgb.flags.writeable
+
+    async def test_async_conversion(self):
+        converter = FrameConverter()
+        try:
+            png = await converter.to_png_bytes_async(_frame())
+            assert Image.open(io.BytesIO(png)).size == (1280, 720)
+        finally:
+            converter.close()
+
+    def test_ndarray_and_image_share_the_decoded_frame(self):
+        converter = FrameConverter()
+        frame = _frame(320, 180)
+
+        rgb = converter.to_ndarray(frame)
+        assert rgb is converter.to_rgb(frame)
+        assert converter.to_image(frame) is converter.to_image(frame)
+        assert converter.to_image(frame).size == (320, 180)
+
+        gray = converter.to_ndarray(frame, format="gray")
+        assert gray.shape == (180, 320)
+        assert not gray.flags.writeable
+
+
+def test_configure_frame_converter_replaces_the_shared_instance():
+    previous = get_frame_converter()
+    try:
+        converter = configure_frame_converter(max_workers=8, cache_size=16)
+        assert get_frame_converter() is converter
+        assert converter is not previous
+        assert converter.cache_size == 16
+    finally:
+        configure_frame_converter()